@@ -3,17 +3,24 @@ AP2 Authentication Middleware
 Handles authentication and authorization for AP2 protocol requests
 """
 from typing import Optional, Dict, Any
+import hashlib
 from fastapi import HTTPException, status, Request, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from datetime import datetime, timedelta
 import json
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.exceptions import InvalidSignature
 
 from ...config.ap2_settings import ap2_settings, is_ap2_enabled
 from ...core.payments.models import VerifiableCredential
+from ...core.payments.crypto_executor import get_crypto_executor
+from ...core.payments.cryptographic_mandate_validator import get_mandate_validator
+from ...core.payments.replay_store import MANDATE_NONCE_NAMESPACE, get_replay_store
+from ...core.canonical_json import canonicalize, legacy_json, legacy_signatures_accepted, record_legacy_fallback
+
+# Label for signatures accepted under the pre-RFC 8785 encoding
+LEGACY_VERIFIER = "ap2_auth_middleware"
 
 
 class AP2AuthenticationError(Exception):
@@ -21,6 +28,11 @@ class AP2AuthenticationError(Exception):
     pass
 
 
+class AP2MandateTypeError(AP2AuthenticationError):
+    """Raised when the presented mandate is not of the required type"""
+    pass
+
+
 class AP2AuthMiddleware:
     """
     AP2 Authentication Middleware
@@ -49,24 +61,21 @@ class AP2AuthMiddleware:
             bool: True if signature is valid, False otherwise
         """
         try:
-            # Load the public key
-            public_key = serialization.load_pem_public_key(public_key_pem.encode())
-            
-            # Prepare the data for verification
-            mandate_json = json.dumps(mandate_data, sort_keys=True)
+            # The signed bytes are the RFC 8785 form, as produced by AP2Client._sign_mandate
+            message = canonicalize(mandate_data)
             signature_bytes = bytes.fromhex(signature)
             
-            # Verify the signature
-            public_key.verify(
-                signature_bytes,
-                mandate_json.encode(),
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
+            # Verify off the event loop; the PEM is parsed once and cached
+            crypto = get_crypto_executor()
+            if await crypto.verify(public_key_pem, signature_bytes, message):
+                return True
             
+            # Signed before the RFC 8785 switch: json.dumps(sort_keys=True), during the transition only
+            if not legacy_signatures_accepted():
+                return False
+            if not await crypto.verify(public_key_pem, signature_bytes, legacy_json(mandate_data)):
+                return False
+            record_legacy_fallback(LEGACY_VERIFIER)
             return True
             
         except (InvalidSignature, ValueError, Exception):
@@ -101,7 +110,7 @@ class AP2AuthMiddleware:
         except Exception:
             return False
     
-    async def _verify_credential_with_issuer(self, credential: AP2Credential) -> bool:
+    async def _verify_credential_with_issuer(self, credential: VerifiableCredential) -> bool:
         """Verify credential with its issuer using cryptographic proof."""
         try:
             # In a real implementation, this would:
@@ -144,12 +153,20 @@ class AP2AuthMiddleware:
         
         return None
     
-    async def authenticate_request(self, request: Request) -> Dict[str, Any]:
+    async def authenticate_request(
+        self,
+        request: Request,
+        mandate_type: Optional[str] = None,
+        redeem: bool = False
+    ) -> Dict[str, Any]:
         """
         Authenticate an AP2 request
         
         Args:
             request: The FastAPI request object
+            mandate_type: Required mandate type ("intent" or "cart"), if any
+            redeem: Consume the mandate's nonce, for requests that act on it;
+                the same signed mandate is then rejected within the signature max age
             
         Returns:
             Dict[str, Any]: Authentication context including user and mandate info
@@ -165,15 +182,14 @@ class AP2AuthMiddleware:
         if not mandate_data:
             raise AP2AuthenticationError("No AP2 mandate found in request")
         
-        # Verify mandate signature
-        signature = request.headers.get("X-AP2-Signature")
-        public_key = request.headers.get("X-AP2-Public-Key")
-        
-        if not signature or not public_key:
-            raise AP2AuthenticationError("Missing AP2 signature or public key")
+        # A complete signed mandate ({"mandate", "signature": {..., "nonce"}}) carries its own signature
+        signed_mandate = None
+        if isinstance(mandate_data.get("signature"), dict) and isinstance(mandate_data.get("mandate"), dict):
+            signed_mandate, mandate_data = mandate_data, mandate_data["mandate"]
         
-        if not await self.verify_mandate_signature(mandate_data, signature, public_key):
-            raise AP2AuthenticationError("Invalid AP2 mandate signature")
+        # Checked before the signature so a rejected request never consumes a nonce
+        if mandate_type and mandate_data.get("type") != mandate_type:
+            raise AP2MandateTypeError(f"AP2 {mandate_type} mandate required")
         
         # Check mandate expiry
         if "expiresAt" in mandate_data:
@@ -181,6 +197,24 @@ class AP2AuthMiddleware:
             if expires_at < datetime.utcnow():
                 raise AP2AuthenticationError("AP2 mandate has expired")
         
+        if signed_mandate is not None:
+            await self._verify_signed_mandate(signed_mandate, redeem)
+        else:
+            # Verify mandate signature
+            signature = request.headers.get("X-AP2-Signature")
+            public_key = request.headers.get("X-AP2-Public-Key")
+            
+            if not signature or not public_key:
+                raise AP2AuthenticationError("Missing AP2 signature or public key")
+            
+            if not await self.verify_mandate_signature(mandate_data, signature, public_key):
+                raise AP2AuthenticationError("Invalid AP2 mandate signature")
+            
+            # Detached signatures have no nonce; RSA-PSS signatures are randomized, so the signature is one
+            if redeem and await get_replay_store(MANDATE_NONCE_NAMESPACE).check_and_record(
+                    "sig:" + hashlib.sha256(signature.lower().encode()).hexdigest()):
+                raise AP2AuthenticationError("AP2 mandate has already been used")
+        
         # Return authentication context
         return {
             "mandate": mandate_data,
@@ -189,62 +223,57 @@ class AP2AuthMiddleware:
             "mandate_type": mandate_data.get("type"),
             "authenticated": True
         }
+    
+    @staticmethod
+    async def _verify_signed_mandate(signed_mandate: Dict[str, Any], redeem: bool) -> None:
+        """Verify (and with redeem, consume) a mandate signed by the cryptographic validator"""
+        validator = get_mandate_validator()
+        try:
+            if redeem:
+                valid = await validator.redeem_signed_mandate_async(signed_mandate)
+            else:
+                valid = await validator.verify_signed_mandate_async(signed_mandate)
+        except Exception as e:
+            raise AP2AuthenticationError(f"Invalid AP2 mandate signature: {e}")
+        if not valid:
+            raise AP2AuthenticationError(
+                "AP2 mandate has already been used" if redeem else "Invalid AP2 mandate signature"
+            )
 
 
 # Global middleware instance
 ap2_auth_middleware = AP2AuthMiddleware()
 
 
-def require_ap2_auth(request: Request) -> Dict[str, Any]:
+async def require_ap2_auth(request: Request) -> Dict[str, Any]:
     """
     Dependency for AP2 authentication
     
     Use this as a FastAPI dependency to require AP2 authentication
     """
-    try:
-        return await ap2_auth_middleware.authenticate_request(request)
-    except AP2AuthenticationError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"AP2 authentication failed: {str(e)}"
-        )
+    return await _authenticate(request)
 
 
-def require_ap2_intent_mandate(request: Request) -> Dict[str, Any]:
+async def require_ap2_intent_mandate(request: Request) -> Dict[str, Any]:
     """
     Dependency for AP2 intent mandate authentication
     
     Use this as a FastAPI dependency to require a valid intent mandate
     """
-    auth_context = require_ap2_auth(request)
-    
-    if auth_context["mandate_type"] != "intent":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="AP2 intent mandate required"
-        )
-    
-    return auth_context
+    return await _authenticate(request, mandate_type="intent")
 
 
-def require_ap2_cart_mandate(request: Request) -> Dict[str, Any]:
+async def require_ap2_cart_mandate(request: Request) -> Dict[str, Any]:
     """
     Dependency for AP2 cart mandate authentication
     
-    Use this as a FastAPI dependency to require a valid cart mandate
+    Use this as a FastAPI dependency to require a valid cart mandate. A cart
+    mandate authorizes one payment, so it is redeemed: presenting it again fails.
     """
-    auth_context = require_ap2_auth(request)
-    
-    if auth_context["mandate_type"] != "cart":
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="AP2 cart mandate required"
-        )
-    
-    return auth_context
+    return await _authenticate(request, mandate_type="cart", redeem=True)
 
 
-def optional_ap2_auth(request: Request) -> Optional[Dict[str, Any]]:
+async def optional_ap2_auth(request: Request) -> Optional[Dict[str, Any]]:
     """
     Optional AP2 authentication dependency
     
@@ -255,3 +284,18 @@ def optional_ap2_auth(request: Request) -> Optional[Dict[str, Any]]:
         return await ap2_auth_middleware.authenticate_request(request)
     except AP2AuthenticationError:
         return None
+
+
+async def _authenticate(request: Request, mandate_type: Optional[str] = None, redeem: bool = False) -> Dict[str, Any]:
+    try:
+        return await ap2_auth_middleware.authenticate_request(request, mandate_type, redeem)
+    except AP2MandateTypeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except AP2AuthenticationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"AP2 authentication failed: {str(e)}"
+        )
@@ -18,10 +18,22 @@ from ...core.mcp_sse_transport import (
     get_sse_transport_manager
 )
 from ...core.a2a_integration import A2ATaskStatus, A2ATaskResult
+from ...core.subscription_index import SubscriptionIndex
 from ...core.mcp_error_handler import MCPErrorHandler, ValidationError
 
 router = APIRouter(prefix="/a2a/sse", tags=["A2A SSE"])
 
+A2A_SSE_CHANNEL = "a2a_sse"
+A2A_BROADCAST_SUBSCRIPTION = "a2a_tasks"  # Transport subscription that receives every task event
+
+
+def _task_topic(task_id: str) -> tuple:
+    return ("task", task_id)
+
+
+def _agent_topic(agent_id: str) -> tuple:
+    return ("agent", agent_id)
+
 
 class A2ATaskEventType(Enum):
     """A2A task event types for SSE streaming"""
@@ -57,31 +69,55 @@ class A2ASSEConnectionManager:
     
     def __init__(self, sse_transport_manager: MCPSSETransportManager):
         self._sse_manager = sse_transport_manager
-        self._task_subscribers: Dict[str, List[str]] = {}  # task_id -> [client_ids]
-        self._agent_subscribers: Dict[str, List[str]] = {}  # agent_id -> [client_ids]
+        self._subscriptions = SubscriptionIndex()  # ("task"|"agent", id) <-> client_ids
         self._client_filters: Dict[str, Dict[str, Any]] = {}  # client_id -> filters
         self._active_tasks: Dict[str, A2ATaskStatus] = {}
         self._task_results: Dict[str, A2ATaskResult] = {}
+        self._backplane = getattr(sse_transport_manager, "backplane", None)
+        self._backplane_attached = False
+    
+    async def _attach_backplane(self):
+        """Receive task events published on other workers"""
+        if self._backplane is not None and not self._backplane_attached:
+            self._backplane_attached = True
+            await self._backplane.subscribe(A2A_SSE_CHANNEL, self._on_backplane_message)
+    
+    async def _on_backplane_message(self, message: Dict[str, Any]):
+        # Clients subscribed to a2a_tasks get the transport's own relay of this event
+        self._sse_manager.send_local_many(
+            self._match_subscribers(message.get("task_id"), message.get("agent_id")),
+            message["wire"].encode("utf-8"),
+            skip_subscription=A2A_BROADCAST_SUBSCRIPTION
+        )
+    
+    def _match_subscribers(self, task_id: Optional[str], agent_id: Optional[str]) -> set:
+        """Clients following the task or the agent, each once"""
+        return self._subscriptions.match((_task_topic(task_id), _agent_topic(agent_id)))
+    
+    def subscribe_task(self, client_id: str, task_id: str) -> bool:
+        return self._subscriptions.subscribe(client_id, _task_topic(task_id))
+    
+    def unsubscribe_task(self, client_id: str, task_id: str) -> bool:
+        return self._subscriptions.unsubscribe(client_id, _task_topic(task_id))
+    
+    def subscribe_agent(self, client_id: str, agent_id: str) -> bool:
+        return self._subscriptions.subscribe(client_id, _agent_topic(agent_id))
     
     async def connect_client(self, client_id: str, filters: Dict[str, Any]) -> str:
         """Connect a new A2A SSE client with filters"""
         try:
+            await self._attach_backplane()
+            
             # Store client filters
             self._client_filters[client_id] = filters
             
             # Subscribe to specific tasks if specified
-            if filters.get("task_ids"):
-                for task_id in filters["task_ids"]:
-                    if task_id not in self._task_subscribers:
-                        self._task_subscribers[task_id] = []
-                    self._task_subscribers[task_id].append(client_id)
+            for task_id in filters.get("task_ids") or ():
+                self.subscribe_task(client_id, task_id)
             
             # Subscribe to specific agents if specified
-            if filters.get("agent_ids"):
-                for agent_id in filters["agent_ids"]:
-                    if agent_id not in self._agent_subscribers:
-                        self._agent_subscribers[agent_id] = []
-                    self._agent_subscribers[agent_id].append(client_id)
+            for agent_id in filters.get("agent_ids") or ():
+                self.subscribe_agent(client_id, agent_id)
             
             # Create SSE connection
             client_info = {
@@ -100,8 +136,7 @@ class A2ASSEConnectionManager:
                     "message": "Connected to A2A task stream",
                     "filters": filters,
                     "timestamp": datetime.now().isoformat()
-                },
-                id=str(uuid.uuid4())
+                }
             ))
             
             return client_id
@@ -113,13 +148,7 @@ class A2ASSEConnectionManager:
         """Disconnect an A2A SSE client"""
         try:
             # Remove from all subscriptions
-            for task_id, subscribers in self._task_subscribers.items():
-                if client_id in subscribers:
-                    subscribers.remove(client_id)
-            
-            for agent_id, subscribers in self._agent_subscribers.items():
-                if client_id in subscribers:
-                    subscribers.remove(client_id)
+            self._subscriptions.remove_client(client_id)
             
             # Remove client filters
             if client_id in self._client_filters:
@@ -149,25 +178,27 @@ class A2ASSEConnectionManager:
                 "timestamp": datetime.now().isoformat()
             }
             
-            # Create SSE event
+            # Create SSE event; broadcasting assigns its sequence id
             sse_event = MCPSSEEvent(
                 event_type="a2a_task_event",
-                data=event_data,
-                id=str(uuid.uuid4())
+                data=event_data
             )
             
-            # Broadcast to task subscribers
-            if task_id in self._task_subscribers:
-                for client_id in self._task_subscribers[task_id]:
-                    await self._sse_manager.send_to_client(client_id, sse_event)
-            
-            # Broadcast to agent subscribers
-            if agent_id in self._agent_subscribers:
-                for client_id in self._agent_subscribers[agent_id]:
-                    await self._sse_manager.send_to_client(client_id, sse_event)
+            # One delivery pass: general A2A subscribers plus task and agent
+            # subscribers, each once (relayed by the transport's backplane)
+            await self._sse_manager.broadcast_event(
+                sse_event,
+                A2A_BROADCAST_SUBSCRIPTION,
+                extra_clients=self._match_subscribers(task_id, agent_id)
+            )
             
-            # Broadcast to general A2A subscribers
-            await self._sse_manager.broadcast_event(sse_event, "a2a_tasks")
+            # Task and agent subscribers on every other worker
+            if self._backplane is not None:
+                await self._backplane.publish(A2A_SSE_CHANNEL, {
+                    "task_id": task_id,
+                    "agent_id": agent_id,
+                    "wire": sse_event.to_sse_format()
+                })
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to broadcast A2A task event: {str(e)}")
@@ -239,10 +270,11 @@ class A2ASSEConnectionManager:
     
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get connection statistics"""
+        counts = self._subscriptions.topic_counts()
         return {
             "total_clients": len(self._client_filters),
-            "task_subscriptions": {task_id: len(subs) for task_id, subs in self._task_subscribers.items()},
-            "agent_subscriptions": {agent_id: len(subs) for agent_id, subs in self._agent_subscribers.items()},
+            "task_subscriptions": {topic[1]: n for topic, n in counts.items() if topic[0] == "task"},
+            "agent_subscriptions": {topic[1]: n for topic, n in counts.items() if topic[0] == "agent"},
             "active_tasks": len(self._active_tasks),
             "completed_tasks": len(self._task_results)
         }
@@ -344,9 +376,8 @@ async def connect_a2a_stream(
                         "message": "Connected to A2A task stream",
                         "filters": filters,
                         "timestamp": datetime.now().isoformat()
-                    },
-                    id=str(uuid.uuid4())
-                ).to_sse_format()
+                    }
+                ).encode()
                 
                 # Process events from queue
                 while True:
@@ -358,7 +389,8 @@ async def connect_a2a_stream(
                         if event is None:
                             break
                         
-                        yield event.to_sse_format()
+                        # Already-encoded bytes shared with every other subscriber
+                        yield event
                         
                         # Mark task as done
                         queue.task_done()
@@ -367,16 +399,14 @@ async def connect_a2a_stream(
                         # Send ping to keep connection alive
                         yield MCPSSEEvent(
                             event_type="ping",
-                            data={"timestamp": datetime.now().isoformat()},
-                            id=str(uuid.uuid4())
-                        ).to_sse_format()
+                            data={"timestamp": datetime.now().isoformat()}
+                        ).encode()
                         
                     except Exception as e:
                         yield MCPSSEEvent(
                             event_type="error",
-                            data={"error": str(e)},
-                            id=str(uuid.uuid4())
-                        ).to_sse_format()
+                            data={"error": str(e)}
+                        ).encode()
                         break
             
             finally:
@@ -496,11 +526,7 @@ async def subscribe_to_task(
     """
     try:
         # Add task subscription
-        if task_id not in a2a_manager._task_subscribers:
-            a2a_manager._task_subscribers[task_id] = []
-        
-        if client_id not in a2a_manager._task_subscribers[task_id]:
-            a2a_manager._task_subscribers[task_id].append(client_id)
+        a2a_manager.subscribe_task(client_id, task_id)
         
         return {
             "success": True,
@@ -527,9 +553,7 @@ async def unsubscribe_from_task(
     """
     try:
         # Remove task subscription
-        if task_id in a2a_manager._task_subscribers:
-            if client_id in a2a_manager._task_subscribers[task_id]:
-                a2a_manager._task_subscribers[task_id].remove(client_id)
+        a2a_manager.unsubscribe_task(client_id, task_id)
         
         return {
             "success": True,
@@ -5,8 +5,10 @@ with BAIS tool integration
 """
 
 from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
+import asyncio
 import os
 import json
 import re
@@ -18,7 +20,8 @@ from requests.exceptions import ConnectionError, Timeout, RequestException
 
 # Import BAIS tools directly
 from ...core.universal_tools import BAISUniversalToolHandler, BAISUniversalTool
-from ...core.database_models import DatabaseManager, Business
+from ...core.database_models import get_request_database_manager
+from ...core.tool_scheduler import ToolCall, ToolScheduler, ToolTurn
 
 # Optional imports (only imported when needed)
 try:
@@ -67,17 +70,8 @@ def get_bais_tool_handler() -> BAISUniversalToolHandler:
         
         if database_url and database_url.strip() and database_url != "not_set":
             try:
-                db_manager = DatabaseManager(database_url)
-                logger.info(f"✅ Created BAIS tool handler with Railway database connection")
-                # Test connection by checking business count
-                try:
-                    with db_manager.get_session() as session:
-                        count = session.query(Business).count()
-                        active_count = session.query(Business).filter(Business.status == "active").count()
-                        logger.info(f"✅ Database connection verified: {count} total businesses, {active_count} active")
-                except Exception as test_error:
-                    logger.warning(f"⚠️ Database connection test failed: {test_error}")
-                    logger.debug(f"Connection test error details: {traceback.format_exc()}")
+                # Shared per-URL engine - pooled connections are reused across requests
+                db_manager = get_request_database_manager(database_url)
                 return BAISUniversalToolHandler(db_manager=db_manager)
             except Exception as e:
                 logger.error(f"❌ Could not create database manager: {e}")
@@ -148,7 +142,13 @@ def get_bais_tool_definitions() -> List[Dict[str, Any]]:
                     "properties": {
                         "query": {"type": "string", "description": "Search query"},
                         "category": {"type": "string", "enum": ["restaurant", "hotel", "retail", "service", "healthcare"]},
-                        "location": {"type": "string", "description": "City or address"}
+                        "location": {"type": "string", "description": "City or address"},
+                        "near": {
+                            "type": "object",
+                            "description": "Coordinates to search around, nearest first",
+                            "properties": {"latitude": {"type": "number"}, "longitude": {"type": "number"}}
+                        },
+                        "radius_km": {"type": "number", "description": "Search radius around near, in km"}
                     },
                     "required": ["query"]
                 }
@@ -164,6 +164,23 @@ def get_bais_tool_definitions() -> List[Dict[str, Any]]:
                     "required": ["business_id"]
                 }
             },
+            {
+                "name": "bais_check_availability",
+                "description": "Check free booking slots for services over a date range and time window",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "business_id": {"type": "string", "description": "Business identifier"},
+                        "service_ids": {"type": "array", "items": {"type": "string"}},
+                        "start_date": {"type": "string", "description": "YYYY-MM-DD"},
+                        "end_date": {"type": "string", "description": "YYYY-MM-DD"},
+                        "start_time": {"type": "string", "description": "HH:MM"},
+                        "end_time": {"type": "string", "description": "HH:MM"},
+                        "weekdays": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["business_id", "service_ids"]
+                }
+            },
             {
                 "name": "bais_execute_service",
                 "description": "Execute a service (create booking, make reservation, etc.)",
@@ -188,7 +205,9 @@ async def call_bais_tool(tool_name: str, tool_input: Dict[str, Any], handler: BA
             result = await handler.search_businesses(
                 query=tool_input.get("query", ""),
                 category=tool_input.get("category"),
-                location=tool_input.get("location")
+                location=tool_input.get("location"),
+                near=tool_input.get("near"),
+                radius_km=tool_input.get("radius_km")
             )
             return result if isinstance(result, list) else []
             
@@ -199,6 +218,18 @@ async def call_bais_tool(tool_name: str, tool_input: Dict[str, Any], handler: BA
             # get_business_services returns a dict with business_id, business_name, and services
             return result if isinstance(result, dict) else {"error": "Failed to get services", "services": []}
             
+        elif tool_name == "bais_check_availability":
+            result = await handler.check_availability(
+                business_id=tool_input.get("business_id"),
+                service_ids=tool_input.get("service_ids", []),
+                start_date=tool_input.get("start_date"),
+                end_date=tool_input.get("end_date"),
+                start_time=tool_input.get("start_time"),
+                end_time=tool_input.get("end_time"),
+                weekdays=tool_input.get("weekdays")
+            )
+            return result if isinstance(result, dict) else {"error": "Failed to check availability"}
+            
         elif tool_name == "bais_execute_service":
             result = await handler.execute_service(
                 business_id=tool_input.get("business_id", ""),
@@ -215,90 +246,184 @@ async def call_bais_tool(tool_name: str, tool_input: Dict[str, Any], handler: BA
         return {"error": str(e)}
 
 
-async def chat_with_claude(messages: List[ChatMessage], api_key: str) -> ChatResponse:
-    """Chat with Claude using BAIS tools"""
+CLAUDE_MODEL = "claude-sonnet-4-20250514"
+CLAUDE_MAX_TOKENS = 4096
+CLAUDE_MAX_ITERATIONS = 5
+
+# (api_key, client) for the server's ANTHROPIC_API_KEY: one pooled client reused across requests
+_shared_anthropic_client: Optional[Tuple[str, Any]] = None
+
+
+def get_async_anthropic_client(api_key: str):
+    """
+    Async Anthropic client for a request. The server's ANTHROPIC_API_KEY gets
+    one shared client; a caller-supplied key gets its own client, which is
+    closed after the request (release_async_anthropic_client) and never cached.
+    """
+    global _shared_anthropic_client
     if anthropic is None:
         raise HTTPException(status_code=500, detail="anthropic package not installed")
-    
-    client = anthropic.Anthropic(api_key=api_key)
-    
-    # Get BAIS tool handler
-    handler = get_bais_tool_handler()
-    
-    # Get BAIS tools
-    bais_tools = get_bais_tool_definitions()
-    claude_tools = []
-    for tool in bais_tools:
-        claude_tools.append({
+    if api_key != os.getenv("ANTHROPIC_API_KEY"):
+        return anthropic.AsyncAnthropic(api_key=api_key)
+    if _shared_anthropic_client is None or _shared_anthropic_client[0] != api_key:
+        _shared_anthropic_client = (api_key, anthropic.AsyncAnthropic(api_key=api_key))
+    return _shared_anthropic_client[1]
+
+
+async def release_async_anthropic_client(client) -> None:
+    """Close a per-request client; the shared one stays open"""
+    if _shared_anthropic_client is not None and client is _shared_anthropic_client[1]:
+        return
+    close = getattr(client, "close", None)
+    if close is not None:
+        await close()
+
+
+def _prepare_claude_conversation(messages: List[ChatMessage]):
+    """Claude tool definitions and message list for a chat request"""
+    claude_tools = [
+        {
             "name": tool["name"],
             "description": tool["description"],
             "input_schema": tool["input_schema"]
-        })
-    
-    # Convert messages to Claude format
-    claude_messages = []
-    for msg in messages:
-        claude_messages.append({
-            "role": msg.role,
-            "content": msg.content
-        })
-    
-    # Call Claude with tools
-    max_iterations = 5
-    iteration = 0
-    tool_calls_made = []
-    
-    while iteration < max_iterations:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=4096,
-            tools=claude_tools,
-            messages=claude_messages
-        )
-        
-        # Check if Claude wants to use a tool
-        tool_uses = [item for item in response.content if hasattr(item, 'type') and item.type == 'tool_use']
-        
-        if not tool_uses:
-            # Final answer
-            text_content = [item for item in response.content if hasattr(item, 'text')]
-            if text_content:
-                return ChatResponse(message=text_content[0].text, tool_calls=tool_calls_made)
-            return ChatResponse(message=str(response.content[0]), tool_calls=tool_calls_made)
-        
-        # Handle tool calls
-        for tool_use in tool_uses:
-            tool_calls_made.append({
-                "name": tool_use.name,
-                "input": tool_use.input
-            })
-            
-            # Call BAIS tool directly (no HTTP overhead)
-            tool_result = await call_bais_tool(tool_use.name, tool_use.input, handler)
-            
-            # Add tool result to conversation
-            claude_messages.append({
-                "role": "assistant",
-                "content": [{
-                    "type": "tool_use",
-                    "id": tool_use.id,
-                    "name": tool_use.name,
-                    "input": tool_use.input
-                }]
-            })
-            
-            claude_messages.append({
-                "role": "user",
-                "content": [{
-                    "type": "tool_result",
-                    "tool_use_id": tool_use.id,
-                    "content": json.dumps(tool_result)
-                }]
-            })
-        
-        iteration += 1
-    
-    return ChatResponse(message="Max iterations reached", tool_calls=tool_calls_made)
+        }
+        for tool in get_bais_tool_definitions()
+    ]
+    claude_messages = [{"role": msg.role, "content": msg.content} for msg in messages]
+    return claude_tools, claude_messages
+
+
+def _block_to_dict(block) -> Dict[str, Any]:
+    """Serialize a response content block for the next request"""
+    if block.type == "tool_use":
+        return {"type": "tool_use", "id": block.id, "name": block.name, "input": block.input}
+    if block.type == "text":
+        return {"type": "text", "text": block.text}
+    return block.model_dump(exclude_none=True)
+
+
+def _tool_uses(response) -> List[Any]:
+    return [item for item in response.content if getattr(item, "type", None) == "tool_use"]
+
+
+def _tool_scheduler(handler: BAISUniversalToolHandler) -> ToolScheduler:
+    async def execute(tool_name: str, tool_input: Dict[str, Any]):
+        # Call BAIS tool directly (no HTTP overhead)
+        return await call_bais_tool(tool_name, tool_input, handler)
+    return ToolScheduler(execute)
+
+
+async def _run_claude_tools(response, claude_messages: List[Dict[str, Any]], tool_calls_made: List[Dict[str, Any]],
+                            handler: BAISUniversalToolHandler) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the tool_use blocks of a Claude response concurrently, yielding tool_call
+    events, tool_result events as each call finishes and a closing tool_turn timing
+    event, then append the assistant turn and its tool results to the conversation
+    """
+    calls = [ToolCall(id=block.id, name=block.name, input=block.input) for block in _tool_uses(response)]
+    for call in calls:
+        tool_calls_made.append({"name": call.name, "input": call.input})
+        yield "tool_call", {"id": call.id, "name": call.name, "input": call.input}
+
+    turn = ToolTurn()
+    async for outcome in _tool_scheduler(handler).iter_completed(calls, turn):
+        yield "tool_result", {"id": outcome.call.id, "name": outcome.call.name, "result": outcome.result}
+    yield "tool_turn", turn.to_dict()
+
+    # The whole assistant turn, then all of its results (in request order) in a single user message
+    claude_messages.append({
+        "role": "assistant",
+        "content": [_block_to_dict(block) for block in response.content]
+    })
+    claude_messages.append({
+        "role": "user",
+        "content": [
+            {"type": "tool_result", "tool_use_id": outcome.call.id, "content": json.dumps(outcome.result, default=str)}
+            for outcome in turn.results
+        ]
+    })
+
+
+def _final_text(response) -> str:
+    text_content = [item.text for item in response.content if hasattr(item, "text")]
+    if text_content:
+        return "".join(text_content)
+    return str(response.content[0]) if response.content else ""
+
+
+async def chat_with_claude(messages: List[ChatMessage], api_key: str) -> ChatResponse:
+    """Chat with Claude using BAIS tools"""
+    client = get_async_anthropic_client(api_key)
+    try:
+        handler = get_bais_tool_handler()
+        claude_tools, claude_messages = _prepare_claude_conversation(messages)
+        tool_calls_made = []
+
+        for _ in range(CLAUDE_MAX_ITERATIONS):
+            response = await client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=CLAUDE_MAX_TOKENS,
+                tools=claude_tools,
+                messages=claude_messages
+            )
+
+            if not _tool_uses(response):
+                return ChatResponse(message=_final_text(response), tool_calls=tool_calls_made)
+
+            async for _ in _run_claude_tools(response, claude_messages, tool_calls_made, handler):
+                pass
+
+        return ChatResponse(message="Max iterations reached", tool_calls=tool_calls_made)
+    finally:
+        await release_async_anthropic_client(client)
+
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def stream_chat_with_claude(messages: List[ChatMessage], api_key: str) -> AsyncIterator[str]:
+    """
+    Chat with Claude using BAIS tools, yielding SSE events as they arrive:
+    token (text deltas), tool_call, tool_result, tool_turn (timing), then done or error.
+    """
+    tool_calls_made: List[Dict[str, Any]] = []
+    client = None
+
+    try:
+        client = get_async_anthropic_client(api_key)
+        handler = get_bais_tool_handler()
+        claude_tools, claude_messages = _prepare_claude_conversation(messages)
+
+        for _ in range(CLAUDE_MAX_ITERATIONS):
+            async with client.messages.stream(
+                model=CLAUDE_MODEL,
+                max_tokens=CLAUDE_MAX_TOKENS,
+                tools=claude_tools,
+                messages=claude_messages
+            ) as stream:
+                async for event in stream:
+                    if event.type == "text":
+                        yield format_sse_event("token", {"text": event.text})
+                response = await stream.get_final_message()
+
+            if not _tool_uses(response):
+                yield format_sse_event("done", {"message": _final_text(response), "tool_calls": tool_calls_made})
+                return
+
+            async for event, data in _run_claude_tools(response, claude_messages, tool_calls_made, handler):
+                yield format_sse_event(event, data)
+
+        yield format_sse_event("done", {"message": "Max iterations reached", "tool_calls": tool_calls_made})
+    except HTTPException as e:
+        yield format_sse_event("error", {"error": e.detail})
+    except Exception as e:
+        logger.error(f"Claude streaming error: {e}", exc_info=True)
+        yield format_sse_event("error", {"error": str(e)})
+    finally:
+        if client is not None:
+            await release_async_anthropic_client(client)
 
 
 async def chat_with_ollama(messages: List[ChatMessage], host: str, model_name: str) -> ChatResponse:
@@ -440,7 +565,7 @@ AFTER I execute the tool and provide results:
     }
     
     try:
-        response = requests.post(ollama_url, json=payload, timeout=60)
+        response = await asyncio.to_thread(requests.post, ollama_url, json=payload, timeout=60)
         response.raise_for_status()
         result = response.json()
         response_text = result.get("response", "").strip()
@@ -486,7 +611,9 @@ AFTER I execute the tool and provide results:
                         response_text = clean_json_artifacts(response_text)
         
         if tool_name and tool_input:
-            tool_result = await call_bais_tool(tool_name, tool_input, handler)
+            # Ollama emits one tool call per response; the scheduler still applies the per-tool timeout
+            turn = await _tool_scheduler(handler).run([ToolCall(id="ollama", name=tool_name, input=tool_input)])
+            tool_result = turn.results[0].result
             logger.info(f"Tool {tool_name} returned: {type(tool_result)}, length: {len(tool_result) if isinstance(tool_result, (list, dict)) else 'N/A'}")
             
             # Tool result is already the actual result (not wrapped in response)
@@ -940,7 +1067,7 @@ CRITICAL: DO NOT include any JSON, tool calls, or technical formatting in your r
                 }
             }
             
-            follow_up_response = requests.post(ollama_url, json=follow_up_payload, timeout=60)
+            follow_up_response = await asyncio.to_thread(requests.post, ollama_url, json=follow_up_payload, timeout=60)
             follow_up_response.raise_for_status()
             follow_up_result = follow_up_response.json()
             final_response = follow_up_result.get("response", "").strip()
@@ -1035,6 +1162,49 @@ async def chat_message(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"Chat error: {str(e)}")
 
 
+@router.post("/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Stream chat responses as Server-Sent Events: token, tool_call, tool_result,
+    tool_turn, then done (or error). Models without native streaming send one token event.
+    """
+    if request.model == "claude":
+        api_key = request.api_key or os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise HTTPException(status_code=400, detail="ANTHROPIC_API_KEY required")
+        event_stream = stream_chat_with_claude(request.messages, api_key)
+
+    elif request.model == "ollama":
+        host = request.ollama_host or os.getenv("OLLAMA_HOST", "http://golem:11434")
+        model_name = request.ollama_model_name or os.getenv("OLLAMA_MODEL", "gpt-oss:120b")
+
+        async def event_stream_ollama():
+            try:
+                response = await chat_with_ollama(request.messages, host, model_name)
+                yield format_sse_event("token", {"text": response.message})
+                yield format_sse_event("done", {"message": response.message, "tool_calls": response.tool_calls or []})
+            except HTTPException as e:
+                yield format_sse_event("error", {"error": e.detail})
+
+        event_stream = event_stream_ollama()
+
+    elif request.model in ("chatgpt", "gemini"):
+        raise HTTPException(status_code=501, detail=f"{request.model} integration coming soon")
+
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown model: {request.model}")
+
+    return StreamingResponse(
+        event_stream,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @router.get("/models")
 async def get_available_models():
     """Get list of available models"""
@@ -3,34 +3,41 @@ Dashboard API Router for BAIS Platform
 Provides business and platform dashboard endpoints
 """
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
-from ..services.business_service import BusinessService
-from ..core.database_models import DatabaseManager
-from ..api_models import *
+from ...services.business_service import BusinessService
+from ...core.database_models import AsyncDatabaseManager, get_async_database_manager
+from ...config.settings import get_database_url
+from ...api_models import *
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
+def get_async_db_manager() -> AsyncDatabaseManager:
+    """Get the shared async database manager (pool disposed at application shutdown)"""
+    return get_async_database_manager(get_database_url())
 
-def get_business_dashboard_data(db: DatabaseManager, business_id: str) -> Dict[str, Any]:
+
+async def get_business_dashboard_data(db: AsyncDatabaseManager, business_id: str) -> Dict[str, Any]:
     """Get business dashboard data from database"""
     
-    # Get business info
-    business = db.get_business_by_id(business_id)
-    if not business:
-        raise HTTPException(status_code=404, detail="Business not found")
-    
     # Get metrics for last 30 days
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
     
-    # Query transaction metrics
-    transactions = db.get_business_transactions(
-        business_id=business_id,
-        start_date=start_date,
-        end_date=end_date
+    # Business info, transaction metrics and services are independent queries
+    business, transactions, services = await asyncio.gather(
+        db.get_business_by_id(business_id),
+        db.get_business_transactions(
+            business_id=business_id,
+            start_date=start_date,
+            end_date=end_date
+        ),
+        db.get_business_services(business_id)
     )
+    if not business:
+        raise HTTPException(status_code=404, detail="Business not found")
     
     # Calculate metrics
     total_revenue = sum(t.get('amount', 0) for t in transactions)
@@ -46,7 +53,6 @@ def get_business_dashboard_data(db: DatabaseManager, business_id: str) -> Dict[s
         platform_breakdown[platform]['revenue'] += transaction.get('amount', 0)
     
     # Get services performance
-    services = db.get_business_services(business_id)
     services_performance = []
     for service in services:
         service_transactions = [t for t in transactions if t.get('service_id') == service['id']]
@@ -79,19 +85,19 @@ def get_business_dashboard_data(db: DatabaseManager, business_id: str) -> Dict[s
     }
 
 
-def get_platform_dashboard_data(db: DatabaseManager) -> Dict[str, Any]:
+async def get_platform_dashboard_data(db: AsyncDatabaseManager) -> Dict[str, Any]:
     """Get platform-wide dashboard data"""
     
-    # Get total businesses
-    businesses = db.get_all_businesses()
-    total_businesses = len(businesses)
-    
     # Get metrics for last 30 days
     end_date = datetime.now()
     start_date = end_date - timedelta(days=30)
     
-    # Get all transactions
-    all_transactions = db.get_all_transactions(start_date=start_date, end_date=end_date)
+    # Get total businesses and all transactions
+    businesses, all_transactions = await asyncio.gather(
+        db.get_all_businesses(),
+        db.get_all_transactions(start_date=start_date, end_date=end_date)
+    )
+    total_businesses = len(businesses)
     
     # Calculate platform metrics
     total_transactions = len(all_transactions)
@@ -174,11 +180,11 @@ def get_platform_dashboard_data(db: DatabaseManager) -> Dict[str, Any]:
 @router.get("/business/{business_id}")
 async def get_business_dashboard(
     business_id: str,
-    db: DatabaseManager = Depends(get_db_manager)
+    db: AsyncDatabaseManager = Depends(get_async_db_manager)
 ):
     """Get business dashboard data"""
     try:
-        data = get_business_dashboard_data(db, business_id)
+        data = await get_business_dashboard_data(db, business_id)
         return {
             "success": True,
             "data": data
@@ -189,11 +195,11 @@ async def get_business_dashboard(
 
 @router.get("/platform")
 async def get_platform_dashboard(
-    db: DatabaseManager = Depends(get_db_manager)
+    db: AsyncDatabaseManager = Depends(get_async_db_manager)
 ):
     """Get platform dashboard data"""
     try:
-        data = get_platform_dashboard_data(db)
+        data = await get_platform_dashboard_data(db)
         return {
             "success": True,
             "data": data
@@ -205,11 +211,11 @@ async def get_platform_dashboard(
 @router.get("/business/{business_id}/services")
 async def get_business_services(
     business_id: str,
-    db: DatabaseManager = Depends(get_db_manager)
+    db: AsyncDatabaseManager = Depends(get_async_db_manager)
 ):
     """Get business services with performance metrics"""
     try:
-        services = db.get_business_services(business_id)
+        services = await db.get_business_services(business_id)
         return {
             "success": True,
             "data": services
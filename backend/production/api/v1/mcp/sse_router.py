@@ -151,14 +151,16 @@ async def get_active_clients():
     """
     Get information about active SSE clients
     
-    Returns the count and basic information about currently connected SSE clients.
-    Useful for monitoring and debugging.
+    Returns the count and basic information about currently connected SSE clients,
+    with per-client queue depth, lag and drop counters. Useful for monitoring and debugging.
     """
     try:
         transport_manager = get_sse_transport_manager()
         
         return {
             "active_clients": await transport_manager.get_active_clients_count(),
+            "delivery": transport_manager.get_fanout_stats(),
+            "clients": transport_manager.get_client_metrics(),
             "timestamp": datetime.now().isoformat(),
             "transport_status": "active"
         }
@@ -195,10 +197,10 @@ async def broadcast_event(
         # Create and broadcast event
         event = MCPSSEEvent(
             event_type=event_type,
-            data=data,
-            id=str(uuid.uuid4())
+            data=data
         )
         
+        # Broadcasting assigns the replayable sequence id
         transport_manager = get_sse_transport_manager()
         await transport_manager.broadcast_event(event, subscription_type)
         
@@ -27,7 +27,10 @@ router = APIRouter(prefix="/mcp/subscriptions", tags=["MCP Subscriptions"])
 class SubscriptionFilterRequest(BaseModel):
     """Request model for subscription filters"""
     resource_uris: Optional[List[str]] = Field(None, description="Specific resource URIs to monitor")
+    resource_uri_prefixes: Optional[List[str]] = Field(None, description="Resource URI prefixes to monitor")
+    resource_uri_patterns: Optional[List[str]] = Field(None, description="Regexes matching whole resource URIs")
     resource_types: Optional[List[str]] = Field(None, description="Resource types to monitor")
+    business_ids: Optional[List[str]] = Field(None, description="Business IDs to monitor")
     tool_names: Optional[List[str]] = Field(None, description="Tool names to monitor")
     prompt_names: Optional[List[str]] = Field(None, description="Prompt names to monitor")
     event_types: Optional[List[str]] = Field(None, description="Event types to monitor")
@@ -98,7 +101,10 @@ async def create_subscription(
         if request.filter_criteria:
             filter_criteria = SubscriptionFilter(
                 resource_uris=request.filter_criteria.resource_uris,
+                resource_uri_prefixes=request.filter_criteria.resource_uri_prefixes,
+                resource_uri_patterns=request.filter_criteria.resource_uri_patterns,
                 resource_types=request.filter_criteria.resource_types,
+                business_ids=request.filter_criteria.business_ids,
                 tool_names=request.filter_criteria.tool_names,
                 prompt_names=request.filter_criteria.prompt_names,
                 event_types=request.filter_criteria.event_types,
@@ -127,6 +133,9 @@ async def create_subscription(
         
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=e.message)
+    except ValueError as e:
+        # Invalid or oversized filter, or the client's subscription limit
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create subscription: {str(e)}")
 
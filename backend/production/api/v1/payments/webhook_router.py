@@ -8,7 +8,8 @@ the existing monitoring metrics with actual webhook endpoints.
 
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.responses import JSONResponse
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
 import json
 import hashlib
 import hmac
@@ -17,6 +18,7 @@ from pydantic import BaseModel, Field
 
 from ...core.payments.payment_coordinator import PaymentCoordinator
 from ...core.payments.ap2_client import AP2Client
+from ...core.payments.replay_store import WEBHOOK_NAMESPACE, ReplayStore, get_replay_store
 from ...core.protocol_configurations import AP2_CONFIG, AP2EventType
 from ...monitoring.metrics import track_webhook_processing
 from ...core.exceptions import ValidationError, IntegrationError
@@ -61,10 +63,10 @@ class AP2WebhookValidator:
     Implements proper security validation for webhook endpoints with replay protection
     """
     
-    def __init__(self, webhook_secret: str):
+    def __init__(self, webhook_secret: str, replay_store: Optional[ReplayStore] = None):
         self.webhook_secret = webhook_secret.encode('utf-8')
-        self._processed_webhooks = set()  # Simple in-memory replay protection
-        self._max_replay_window = 300  # 5 minutes
+        # Shared across requests (and across workers when Redis is configured)
+        self._replay_store = replay_store or get_replay_store(WEBHOOK_NAMESPACE)
     
     def validate_webhook_signature(self, payload: str, signature: str) -> bool:
         """
@@ -119,31 +121,28 @@ class AP2WebhookValidator:
         ).hexdigest()
         return content_hash
     
-    def _cleanup_old_webhooks(self):
-        """Clean up old webhook IDs to prevent memory leaks"""
-        # In a production system, this would be more sophisticated
-        # For now, we'll keep it simple and rely on the short window
-        if len(self._processed_webhooks) > 1000:
-            self._processed_webhooks.clear()
-    
-    def check_replay_attack(self, webhook_data: PaymentWebhookData, signature: str) -> bool:
+    @asynccontextmanager
+    async def replay_guard(self, webhook_data: PaymentWebhookData, signature: str):
         """
-        Check if this webhook has been processed recently (replay protection)
+        Replay protection around processing a webhook. The webhook ID is
+        claimed on entry, recorded for the replay window only if the body
+        completes, and released if it raises so the provider's retry is accepted.
         
-        Returns:
-            True if this is a potential replay attack, False if safe to process
+        Raises:
+            HTTPException 409 if the webhook was processed recently or is being processed
         """
         webhook_id = self._generate_webhook_id(webhook_data, signature)
         
-        if webhook_id in self._processed_webhooks:
+        if not await self._replay_store.claim(webhook_id):
             logger.warning(f"Potential replay attack detected for webhook ID: {webhook_id}")
-            return True
-        
-        # Add to processed webhooks and cleanup old ones
-        self._processed_webhooks.add(webhook_id)
-        self._cleanup_old_webhooks()
+            raise HTTPException(status_code=409, detail="Webhook already processed (replay attack)")
         
-        return False
+        try:
+            yield webhook_id
+        except BaseException:
+            await self._replay_store.release(webhook_id)
+            raise
+        await self._replay_store.commit(webhook_id)
     
     def validate_webhook_data(self, webhook_data: PaymentWebhookData) -> WebhookValidationResult:
         """
@@ -263,32 +262,29 @@ async def handle_payment_webhook(
         if not validator.validate_webhook_signature(payload, signature):
             raise HTTPException(status_code=401, detail="Invalid webhook signature")
         
-        # Check for replay attacks
-        if validator.check_replay_attack(webhook_data, signature):
-            raise HTTPException(status_code=409, detail="Webhook already processed (replay attack)")
-        
         # Validate webhook data
         validation_result = validator.validate_webhook_data(webhook_data)
         if not validation_result.is_valid:
             raise HTTPException(status_code=400, detail=validation_result.error_message)
         
-        # Process webhook based on event type
+        # Process webhook based on event type; recorded for replay protection only on success
         event_type = AP2EventType(webhook_data.event_type)
         
-        if event_type == AP2EventType.PAYMENT_COMPLETED:
-            await _handle_payment_completion(webhook_data, coordinator)
-        elif event_type == AP2EventType.PAYMENT_FAILED:
-            await _handle_payment_failure(webhook_data, coordinator)
-        elif event_type == AP2EventType.MANDATE_REVOKED:
-            await _handle_mandate_revocation(webhook_data, coordinator)
-        elif event_type == AP2EventType.MANDATE_EXPIRED:
-            await _handle_mandate_expiry(webhook_data, coordinator)
-        elif event_type == AP2EventType.PAYMENT_AUTHORIZED:
-            await _handle_payment_authorization(webhook_data, coordinator)
-        elif event_type == AP2EventType.PAYMENT_DECLINED:
-            await _handle_payment_decline(webhook_data, coordinator)
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported event type: {webhook_data.event_type}")
+        async with validator.replay_guard(webhook_data, signature):
+            if event_type == AP2EventType.PAYMENT_COMPLETED:
+                await _handle_payment_completion(webhook_data, coordinator)
+            elif event_type == AP2EventType.PAYMENT_FAILED:
+                await _handle_payment_failure(webhook_data, coordinator)
+            elif event_type == AP2EventType.MANDATE_REVOKED:
+                await _handle_mandate_revocation(webhook_data, coordinator)
+            elif event_type == AP2EventType.MANDATE_EXPIRED:
+                await _handle_mandate_expiry(webhook_data, coordinator)
+            elif event_type == AP2EventType.PAYMENT_AUTHORIZED:
+                await _handle_payment_authorization(webhook_data, coordinator)
+            elif event_type == AP2EventType.PAYMENT_DECLINED:
+                await _handle_payment_decline(webhook_data, coordinator)
+            else:
+                raise HTTPException(status_code=400, detail=f"Unsupported event type: {webhook_data.event_type}")
         
         return {
             "status": "processed",
@@ -423,22 +419,21 @@ async def handle_mandate_webhook(
         if not validator.validate_webhook_signature(payload, signature):
             raise HTTPException(status_code=401, detail="Invalid webhook signature")
         
-        # Check for replay attacks
-        if validator.check_replay_attack(webhook_data, signature):
-            raise HTTPException(status_code=409, detail="Webhook already processed (replay attack)")
-        
         validation_result = validator.validate_webhook_data(webhook_data)
         if not validation_result.is_valid:
             raise HTTPException(status_code=400, detail=validation_result.error_message)
         
-        # Process mandate events
-        if webhook_data.event_type == AP2EventType.MANDATE_REVOKED.value:
-            await _handle_mandate_revocation(webhook_data, coordinator)
-        elif webhook_data.event_type == AP2EventType.MANDATE_EXPIRED.value:
-            await _handle_mandate_expiry(webhook_data, coordinator)
-        else:
+        # Unsupported types are rejected before the webhook ID is claimed
+        if webhook_data.event_type not in (AP2EventType.MANDATE_REVOKED.value, AP2EventType.MANDATE_EXPIRED.value):
             raise HTTPException(status_code=400, detail=f"Unsupported mandate event type: {webhook_data.event_type}")
         
+        # Process mandate events; recorded for replay protection only on success
+        async with validator.replay_guard(webhook_data, signature):
+            if webhook_data.event_type == AP2EventType.MANDATE_REVOKED.value:
+                await _handle_mandate_revocation(webhook_data, coordinator)
+            else:
+                await _handle_mandate_expiry(webhook_data, coordinator)
+        
         return {
             "status": "processed",
             "event_id": webhook_data.mandate_id or webhook_data.payment_id,
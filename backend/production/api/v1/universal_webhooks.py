@@ -82,7 +82,9 @@ async def handle_claude_tool_use(
             result = await handler.search_businesses(
                 query=tool_input.get("query"),
                 category=tool_input.get("category"),
-                location=tool_input.get("location")
+                location=tool_input.get("location"),
+                near=tool_input.get("near"),
+                radius_km=tool_input.get("radius_km")
             )
             
         elif tool_name == "bais_get_business_services":
@@ -90,6 +92,17 @@ async def handle_claude_tool_use(
                 business_id=tool_input.get("business_id")
             )
             
+        elif tool_name == "bais_check_availability":
+            result = await handler.check_availability(
+                business_id=tool_input.get("business_id"),
+                service_ids=tool_input.get("service_ids", []),
+                start_date=tool_input.get("start_date"),
+                end_date=tool_input.get("end_date"),
+                start_time=tool_input.get("start_time"),
+                end_time=tool_input.get("end_time"),
+                weekdays=tool_input.get("weekdays")
+            )
+            
         elif tool_name == "bais_execute_service":
             result = await handler.execute_service(
                 business_id=tool_input.get("business_id"),
@@ -151,7 +164,9 @@ async def handle_chatgpt_function_call(
             result = await handler.search_businesses(
                 query=function_args.get("query"),
                 category=function_args.get("category"),
-                location=function_args.get("location")
+                location=function_args.get("location"),
+                near=function_args.get("near"),
+                radius_km=function_args.get("radius_km")
             )
             
         elif function_name == "bais_get_business_services":
@@ -159,6 +174,17 @@ async def handle_chatgpt_function_call(
                 business_id=function_args.get("business_id")
             )
             
+        elif function_name == "bais_check_availability":
+            result = await handler.check_availability(
+                business_id=function_args.get("business_id"),
+                service_ids=function_args.get("service_ids", []),
+                start_date=function_args.get("start_date"),
+                end_date=function_args.get("end_date"),
+                start_time=function_args.get("start_time"),
+                end_time=function_args.get("end_time"),
+                weekdays=function_args.get("weekdays")
+            )
+            
         elif function_name == "bais_execute_service":
             result = await handler.execute_service(
                 business_id=function_args.get("business_id"),
@@ -218,7 +244,9 @@ async def handle_gemini_function_call(
             result = await handler.search_businesses(
                 query=function_args.get("query"),
                 category=function_args.get("category"),
-                location=function_args.get("location")
+                location=function_args.get("location"),
+                near=function_args.get("near"),
+                radius_km=function_args.get("radius_km")
             )
             
         elif function_name == "bais_get_business_services":
@@ -226,6 +254,17 @@ async def handle_gemini_function_call(
                 business_id=function_args.get("business_id")
             )
             
+        elif function_name == "bais_check_availability":
+            result = await handler.check_availability(
+                business_id=function_args.get("business_id"),
+                service_ids=function_args.get("service_ids", []),
+                start_date=function_args.get("start_date"),
+                end_date=function_args.get("end_date"),
+                start_time=function_args.get("start_time"),
+                end_time=function_args.get("end_time"),
+                weekdays=function_args.get("weekdays")
+            )
+            
         elif function_name == "bais_execute_service":
             result = await handler.execute_service(
                 business_id=function_args.get("business_id"),
@@ -323,6 +362,7 @@ async def webhook_health():
         "tools": {
             "search": "bais_search_businesses",
             "services": "bais_get_business_services",
+            "availability": "bais_check_availability",
             "execute": "bais_execute_service"
         },
         "timestamp": datetime.utcnow().isoformat()
@@ -344,6 +384,8 @@ async def test_universal_tools(
             result = await handler.search_businesses(**tool_input)
         elif tool_name == "bais_get_business_services":
             result = await handler.get_business_services(**tool_input)
+        elif tool_name == "bais_check_availability":
+            result = await handler.check_availability(**tool_input)
         elif tool_name == "bais_execute_service":
             result = await handler.execute_service(**tool_input)
         else:
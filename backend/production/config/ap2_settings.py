@@ -58,7 +58,7 @@ class AP2Settings(BaseSettings):
     )
     ap2_signature_algorithm: str = Field(
         default="RS256",
-        description="Signature algorithm for AP2 mandates"
+        description="Signature algorithm for AP2 mandates (RS256, ES256 or EdDSA)"
     )
     
     # Webhook Configuration
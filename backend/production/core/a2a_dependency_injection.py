@@ -7,6 +7,7 @@ from typing import Optional
 from fastapi import Depends
 from .a2a_processor_manager import A2AProcessorManager, A2AConfiguration
 from .payments.ap2_client import AP2ClientConfig
+from .database_models import get_request_database_manager
 from ..config.settings import get_settings
 
 
@@ -20,9 +21,10 @@ class A2AProcessorManagerFactory:
     def create_manager(cls, 
                       config: A2AConfiguration,
                       business_config: dict,
-                      ap2_config: Optional[AP2ClientConfig] = None) -> A2AProcessorManager:
+                      ap2_config: Optional[AP2ClientConfig] = None,
+                      db_manager=None) -> A2AProcessorManager:
         """Create processor manager with configuration"""
-        return A2AProcessorManager(config, business_config, ap2_config)
+        return A2AProcessorManager(config, business_config, ap2_config, db_manager)
     
     @classmethod 
     def get_or_create_manager(cls) -> A2AProcessorManager:
@@ -33,7 +35,10 @@ class A2AProcessorManagerFactory:
             business_config = settings.business.dict()
             ap2_config = settings.ap2 if settings.ap2.enabled else None
             
-            cls._instance = cls.create_manager(config, business_config, ap2_config)
+            # Bookings share the request database's Booking table and availability engine
+            db_manager = get_request_database_manager(settings.database.url)
+            
+            cls._instance = cls.create_manager(config, business_config, ap2_config, db_manager)
         
         return cls._instance
     
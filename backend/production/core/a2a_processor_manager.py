@@ -42,11 +42,13 @@ class A2AProcessorManager:
         self, 
         config: A2AConfiguration,
         business_config: Dict[str, Any],
-        ap2_config: Optional[AP2ClientConfig] = None
+        ap2_config: Optional[AP2ClientConfig] = None,
+        db_manager: Any = None
     ):
         self.config = config
         self.business_config = business_config
         self.ap2_config = ap2_config
+        self.db_manager = db_manager
         self._processor: Optional[A2ATaskProcessor] = None
         self._lock = asyncio.Lock()
         self._initialization_attempts = 0
@@ -83,7 +85,7 @@ class A2AProcessorManager:
             self._initialization_attempts += 1
             
             # Create business system adapter
-            adapter = BusinessSystemAdapter(self.business_config)
+            adapter = BusinessSystemAdapter(self.business_config, db_manager=self.db_manager)
             
             # Create AP2 client if configuration provided
             ap2_client = None
@@ -185,12 +187,13 @@ class A2AProcessorManagerFactory:
     """Factory for creating A2A processor managers"""
     
     @staticmethod
-    def create_default_manager(business_config: Dict[str, Any]) -> A2AProcessorManager:
+    def create_default_manager(business_config: Dict[str, Any], db_manager: Any = None) -> A2AProcessorManager:
         """
         Create default A2A processor manager
         
         Args:
             business_config: Business configuration
+            db_manager: Database whose Booking table holds the processor's bookings
             
         Returns:
             A2AProcessorManager instance
@@ -209,7 +212,8 @@ class A2AProcessorManagerFactory:
         return A2AProcessorManager(
             config=config,
             business_config=business_config,
-            ap2_config=ap2_config
+            ap2_config=ap2_config,
+            db_manager=db_manager
         )
     
     @staticmethod
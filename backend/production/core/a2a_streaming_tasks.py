@@ -4,20 +4,39 @@ Implements Server-Sent Events for real-time A2A task updates
 
 This module addresses the critical gap in A2A task coordination by implementing
 proper streaming task management with Server-Sent Events (SSE).
+
+Task events are also published to an EventBackplane, so a client streaming a
+task from a different worker than the one running it still receives updates.
+The running worker holds the task's owner record on the backplane; another
+worker only follows ("mirrors") a task that has one, and drops the mirror when
+its last subscriber leaves.
+
+Task events carry monotonic sequence ids and are retained per task, so a
+client reconnecting with Last-Event-ID is replayed only what it missed.
+
+Subscriber queues are bounded; progress events coalesce, so a slow consumer
+receives the latest progress instead of a backlog.
 """
 
-from typing import Dict, Any, Optional, AsyncGenerator, List
+from typing import Dict, Any, Optional, AsyncGenerator, List, Set
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 import asyncio
 import json
 import uuid
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from .a2a_integration import A2ATaskStatus, A2ATaskResult, A2ATaskRequest
+from .constants import SSEConnectionLimits
+from .event_backplane import EventBackplane, get_event_backplane
+from .sse_backpressure import BackpressurePolicy, ClientEventQueue
+from .sse_replay import EventReplayBuffer, SequenceClock, parse_event_id
+
+A2A_TASK_STREAM_CHANNEL = "a2a_task_stream"
+A2A_TASK_OWNER_PREFIX = "a2a_task:"
 
 
 class TaskStreamEventType(Enum):
@@ -31,6 +50,13 @@ class TaskStreamEventType(Enum):
     HEARTBEAT = "heartbeat"
 
 
+TERMINAL_EVENT_TYPES = frozenset({
+    TaskStreamEventType.TASK_COMPLETED,
+    TaskStreamEventType.TASK_FAILED,
+    TaskStreamEventType.TASK_CANCELLED
+})
+
+
 @dataclass
 class TaskStreamEvent:
     """Represents a task stream event"""
@@ -39,18 +65,33 @@ class TaskStreamEvent:
     timestamp: datetime
     data: Dict[str, Any]
     message: Optional[str] = None
+    id: Optional[int] = None  # Sequence id; heartbeats and snapshots have none
     
-    def to_sse_format(self) -> str:
-        """Convert to Server-Sent Events format"""
-        event_data = {
+    def to_dict(self) -> Dict[str, Any]:
+        return {
             "event_type": self.event_type.value,
             "task_id": self.task_id,
             "timestamp": self.timestamp.isoformat(),
             "data": self.data,
-            "message": self.message
+            "message": self.message,
+            "id": self.id
         }
-        
-        return f"data: {json.dumps(event_data)}\n\n"
+    
+    @classmethod
+    def from_dict(cls, event_data: Dict[str, Any]) -> "TaskStreamEvent":
+        return cls(
+            event_type=TaskStreamEventType(event_data["event_type"]),
+            task_id=event_data["task_id"],
+            timestamp=datetime.fromisoformat(event_data["timestamp"]),
+            data=event_data.get("data") or {},
+            message=event_data.get("message"),
+            id=event_data.get("id")
+        )
+    
+    def to_sse_format(self) -> str:
+        """Convert to Server-Sent Events format"""
+        data = f"data: {json.dumps(self.to_dict(), default=str)}\n\n"
+        return data if self.id is None else f"id: {self.id}\n{data}"
 
 
 @dataclass
@@ -76,12 +117,24 @@ class A2ATaskStreamManager:
     and progress updates.
     """
     
-    def __init__(self):
-        self.active_streams: Dict[str, asyncio.Queue] = {}
+    def __init__(
+        self,
+        backplane: Optional[EventBackplane] = None,
+        backpressure_policy: BackpressurePolicy = BackpressurePolicy.COALESCE,
+        queue_size: int = SSEConnectionLimits.TASK_STREAM_QUEUE_SIZE
+    ):
+        # stream_id -> one queue per connected stream
+        self.active_streams: Dict[str, Set[ClientEventQueue]] = {}
+        self.backpressure_policy = backpressure_policy
+        self.queue_size = queue_size
         self.task_progress: Dict[str, TaskProgress] = {}
         self.task_metadata: Dict[str, Dict[str, Any]] = {}
         self.heartbeat_interval = timedelta(seconds=30)
         self.max_stream_duration = timedelta(hours=1)
+        self.backplane = backplane
+        self._backplane_attached = False
+        self._clock = SequenceClock()
+        self.replay = EventReplayBuffer()
     
     def create_task_stream(self, task_id: str, task_request: A2ATaskRequest) -> str:
         """
@@ -96,12 +149,12 @@ class A2ATaskStreamManager:
         """
         stream_id = str(uuid.uuid4())
         
-        # Create stream queue
-        self.active_streams[stream_id] = asyncio.Queue()
+        # Subscribers register their own queues
+        self.active_streams[stream_id] = set()
         
         # Initialize task metadata
         self.task_metadata[task_id] = {
-            "task_request": asdict(task_request),
+            "task_request": task_request.model_dump(mode="json"),
             "created_at": datetime.utcnow(),
             "stream_id": stream_id,
             "subscribers": set()
@@ -116,19 +169,40 @@ class A2ATaskStreamManager:
         )
         
         # Send initial event
-        asyncio.create_task(self._send_task_event(
+        asyncio.create_task(self._announce_task(
             stream_id,
             TaskStreamEvent(
                 event_type=TaskStreamEventType.TASK_CREATED,
                 task_id=task_id,
                 timestamp=datetime.utcnow(),
-                data={"task_request": asdict(task_request)},
+                data={"task_request": task_request.model_dump(mode="json")},
                 message=f"Task {task_id} created successfully"
             )
         ))
         
         return stream_id
     
+    async def _announce_task(self, stream_id: str, event: TaskStreamEvent) -> None:
+        """Record this worker as the task's owner, then send the created event"""
+        if self.backplane is not None:
+            await self.backplane.set_owner(
+                A2A_TASK_OWNER_PREFIX + event.task_id, int(self.max_stream_duration.total_seconds())
+            )
+        await self._send_task_event(stream_id, event)
+    
+    async def task_exists(self, task_id: str) -> bool:
+        """True if the task runs here, or another worker holds its owner record"""
+        metadata = self.task_metadata.get(task_id)
+        if metadata is not None and not metadata.get("mirror"):
+            return True
+        return await self._owned_elsewhere(task_id)
+    
+    async def _owned_elsewhere(self, task_id: str) -> bool:
+        if self.backplane is None:
+            return False
+        owner = await self.backplane.get_owner(A2A_TASK_OWNER_PREFIX + task_id)
+        return owner is not None and owner != self.backplane.worker_id
+    
     async def update_task_progress(
         self, 
         task_id: str, 
@@ -204,7 +278,7 @@ class A2ATaskStreamManager:
                 task_id=task_id,
                 timestamp=datetime.utcnow(),
                 data={
-                    "result": asdict(result),
+                    "result": result.model_dump(mode="json"),
                     "progress": asdict(progress)
                 },
                 message=f"Task {'completed' if success else 'failed'}"
@@ -234,29 +308,55 @@ class A2ATaskStreamManager:
         # Clean up immediately
         await self._cleanup_task_stream(task_id, delay_seconds=0)
     
-    async def get_task_stream(self, task_id: str) -> AsyncGenerator[str, None]:
+    async def get_task_stream(
+        self,
+        task_id: str,
+        last_event_id: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
         """
         Get streaming response for task updates
         
         Args:
             task_id: Task identifier
+            last_event_id: Last-Event-ID of a reconnecting client; only later
+                events are replayed. Without it every retained event is sent.
             
         Yields:
             Server-Sent Events formatted strings
         """
         if task_id not in self.task_metadata:
-            raise HTTPException(status_code=404, detail="Task not found")
+            if not await self.task_exists(task_id):
+                raise HTTPException(status_code=404, detail="Task not found")
+            if task_id not in self.task_metadata:
+                # Running on another worker: follow it through the backplane
+                self._open_mirror_stream(task_id)
+        await self._attach_backplane()
         
-        stream_id = self.task_metadata[task_id]["stream_id"]
-        stream_queue = self.active_streams[stream_id]
+        metadata = self.task_metadata[task_id]
+        stream_id = metadata["stream_id"]
+        deadline = asyncio.get_running_loop().time() + self.max_stream_duration.total_seconds()
+        stream_queue = ClientEventQueue(maxsize=self.queue_size, policy=self.backpressure_policy)
+        
+        # Register and snapshot in one step: later events land in the queue only
+        self.active_streams.setdefault(stream_id, set()).add(stream_queue)
+        missed = self.replay.since(task_id, parse_event_id(last_event_id))
         
         # Add subscriber
-        self.task_metadata[task_id]["subscribers"].add(stream_id)
+        metadata["subscribers"].add(stream_id)
         
         try:
             # Send initial heartbeat
             yield self._create_heartbeat_event(task_id).to_sse_format()
             
+            if missed is None:
+                # Replay no longer reaches back: send current state instead
+                yield self._create_snapshot_event(task_id).to_sse_format()
+            else:
+                for _, event in missed:
+                    yield event.to_sse_format()
+                if missed and missed[-1][1].event_type in TERMINAL_EVENT_TYPES:
+                    return
+            
             # Stream events
             while True:
                 try:
@@ -266,17 +366,26 @@ class A2ATaskStreamManager:
                         timeout=self.heartbeat_interval.total_seconds()
                     )
                     
+                    # Closed as a slow consumer; the client resumes with Last-Event-ID
+                    if event is None:
+                        break
+                    
                     yield event.to_sse_format()
                     
                     # Check if task is complete
-                    if event.event_type in [
-                        TaskStreamEventType.TASK_COMPLETED,
-                        TaskStreamEventType.TASK_FAILED,
-                        TaskStreamEventType.TASK_CANCELLED
-                    ]:
+                    if event.event_type in TERMINAL_EVENT_TYPES:
                         break
                         
                 except asyncio.TimeoutError:
+                    # Stop following a task that is gone: cleaned up here, past
+                    # its lifetime, or no longer owned by any worker
+                    if self.task_metadata.get(task_id) is not metadata:
+                        break
+                    if asyncio.get_running_loop().time() >= deadline:
+                        break
+                    if metadata.get("mirror") and not await self._owned_elsewhere(task_id):
+                        break
+                    
                     # Send heartbeat
                     yield self._create_heartbeat_event(task_id).to_sse_format()
                     
@@ -286,16 +395,63 @@ class A2ATaskStreamManager:
                     
         finally:
             # Remove subscriber
-            self.task_metadata[task_id]["subscribers"].discard(stream_id)
+            self.active_streams.get(stream_id, set()).discard(stream_queue)
+            if self.task_metadata.get(task_id) is metadata:
+                if metadata.get("mirror"):
+                    # Nothing to keep a mirror for once its last subscriber leaves
+                    if not self.active_streams.get(stream_id):
+                        self._drop_task_stream(task_id)
+                else:
+                    metadata["subscribers"].discard(stream_id)
     
     async def _send_task_event(self, stream_id: str, event: TaskStreamEvent) -> None:
-        """Send event to task stream"""
-        if stream_id in self.active_streams:
+        """Send event to task stream, and to other workers following the task"""
+        event.id = await self._clock.next_shared(self.backplane, A2A_TASK_STREAM_CHANNEL)
+        self.replay.append(event.task_id, event.id, event)
+        await self._deliver_local(stream_id, event)
+        if self.backplane is not None:
+            await self.backplane.publish(A2A_TASK_STREAM_CHANNEL, {"event": event.to_dict()})
+    
+    async def _deliver_local(self, stream_id: str, event: TaskStreamEvent) -> None:
+        # A pending progress event is superseded by the newer one
+        coalesce_key = "progress" if event.event_type == TaskStreamEventType.TASK_PROGRESS else None
+        for stream_queue in list(self.active_streams.get(stream_id, ())):
             try:
-                await self.active_streams[stream_id].put(event)
+                stream_queue.offer(event, coalesce_key)
             except Exception as e:
                 print(f"Failed to send event to stream {stream_id}: {e}")
     
+    def _open_mirror_stream(self, task_id: str) -> None:
+        """Local stream for a task owned by another worker, fed by the backplane"""
+        stream_id = str(uuid.uuid4())
+        self.active_streams[stream_id] = set()
+        self.task_metadata[task_id] = {
+            "created_at": datetime.utcnow(),
+            "stream_id": stream_id,
+            "subscribers": set(),
+            "mirror": True
+        }
+    
+    async def _attach_backplane(self) -> None:
+        if self.backplane is not None and not self._backplane_attached:
+            self._backplane_attached = True
+            await self.backplane.subscribe(A2A_TASK_STREAM_CHANNEL, self._on_backplane_message)
+    
+    async def _on_backplane_message(self, message: Dict[str, Any]) -> None:
+        """Deliver another worker's task event to streams following that task here"""
+        event = TaskStreamEvent.from_dict(message["event"])
+        metadata = self.task_metadata.get(event.task_id)
+        if metadata is None:
+            return
+        if event.id is not None:
+            self._clock.observe(event.id)
+            self.replay.append(event.task_id, event.id, event)
+        await self._deliver_local(metadata["stream_id"], event)
+        if metadata.get("mirror") and event.event_type in TERMINAL_EVENT_TYPES:
+            asyncio.create_task(self._cleanup_task_stream(
+                event.task_id, delay_seconds=60, stream_id=metadata["stream_id"]
+            ))
+    
     def _create_heartbeat_event(self, task_id: str) -> TaskStreamEvent:
         """Create heartbeat event"""
         return TaskStreamEvent(
@@ -306,24 +462,46 @@ class A2ATaskStreamManager:
             message="Heartbeat"
         )
     
-    async def _cleanup_task_stream(self, task_id: str, delay_seconds: int = 60) -> None:
-        """Clean up task stream after delay"""
+    def _create_snapshot_event(self, task_id: str) -> TaskStreamEvent:
+        """Current progress, for a client whose missed events are no longer retained"""
+        progress = self.task_progress.get(task_id)
+        return TaskStreamEvent(
+            event_type=TaskStreamEventType.TASK_PROGRESS,
+            task_id=task_id,
+            timestamp=datetime.utcnow(),
+            data=asdict(progress) if progress else {},
+            message="Task progress snapshot"
+        )
+    
+    async def _cleanup_task_stream(
+        self,
+        task_id: str,
+        delay_seconds: int = 60,
+        stream_id: Optional[str] = None
+    ) -> None:
+        """Clean up task stream after delay (only if it is still stream_id, when given)"""
         if delay_seconds > 0:
             await asyncio.sleep(delay_seconds)
         
-        if task_id in self.task_metadata:
-            stream_id = self.task_metadata[task_id]["stream_id"]
-            
-            # Close stream queue
-            if stream_id in self.active_streams:
-                del self.active_streams[stream_id]
-            
-            # Clean up metadata
-            del self.task_metadata[task_id]
-            
-            # Clean up progress
-            if task_id in self.task_progress:
-                del self.task_progress[task_id]
+        metadata = self.task_metadata.get(task_id)
+        if metadata is None or (stream_id is not None and metadata["stream_id"] != stream_id):
+            return
+        self._drop_task_stream(task_id)
+        if self.backplane is not None and not metadata.get("mirror"):
+            await self.backplane.clear_owner(A2A_TASK_OWNER_PREFIX + task_id)
+    
+    def _drop_task_stream(self, task_id: str) -> None:
+        metadata = self.task_metadata.pop(task_id, None)
+        if metadata is None:
+            return
+        
+        # Close stream queue
+        self.active_streams.pop(metadata["stream_id"], None)
+        
+        # Clean up progress
+        self.task_progress.pop(task_id, None)
+        
+        self.replay.drop(task_id)
     
     async def cleanup_expired_streams(self) -> int:
         """Clean up expired streams"""
@@ -349,8 +527,16 @@ class A2ATaskStreamManager:
             "task_id": task_id,
             "progress": asdict(self.task_progress[task_id]) if task_id in self.task_progress else None,
             "metadata": self.task_metadata[task_id],
-            "has_active_stream": self.task_metadata[task_id]["stream_id"] in self.active_streams
+            "has_active_stream": self.task_metadata[task_id]["stream_id"] in self.active_streams,
+            "streams": self.get_stream_metrics(task_id)
         }
+    
+    def get_stream_metrics(self, task_id: str) -> List[Dict[str, Any]]:
+        """Queue depth, lag, drops and coalesced events for each subscriber of a task"""
+        metadata = self.task_metadata.get(task_id)
+        if metadata is None:
+            return []
+        return [stream_queue.metrics() for stream_queue in self.active_streams.get(metadata["stream_id"], ())]
 
 
 class A2AStreamingTaskServer:
@@ -369,15 +555,19 @@ class A2AStreamingTaskServer:
         """Setup FastAPI routes for task streaming"""
         
         @self.app.get("/a2a/tasks/{task_id}/stream")
-        async def stream_task_updates(task_id: str):
+        async def stream_task_updates(task_id: str, request: Request):
             """
             Stream task updates using Server-Sent Events
             
             This endpoint provides real-time task updates for A2A coordination.
+            A Last-Event-ID header resumes after that event.
             """
             try:
+                # Checked up front: once the response starts, a 404 can no longer be sent
+                if not await self.task_manager.task_exists(task_id):
+                    raise HTTPException(status_code=404, detail="Task not found")
                 return StreamingResponse(
-                    self.task_manager.get_task_stream(task_id),
+                    self.task_manager.get_task_stream(task_id, request.headers.get("last-event-id")),
                     media_type="text/plain",
                     headers={
                         "Cache-Control": "no-cache",
@@ -519,7 +709,7 @@ class A2AStreamingFactory:
     @staticmethod
     def create_task_manager() -> A2ATaskStreamManager:
         """Create task stream manager"""
-        return A2ATaskStreamManager()
+        return A2ATaskStreamManager(backplane=get_event_backplane())
     
     @staticmethod
     def create_streaming_server(task_manager: A2ATaskStreamManager) -> A2AStreamingTaskServer:
@@ -533,7 +723,7 @@ class A2AStreamingFactory:
     ) -> A2ATaskStreamManager:
         """Create integrated streaming A2A server"""
         if task_manager is None:
-            task_manager = A2ATaskStreamManager()
+            task_manager = A2ATaskStreamManager(backplane=get_event_backplane())
         
         integrate_streaming_with_a2a_server(a2a_server, task_manager)
         return task_manager
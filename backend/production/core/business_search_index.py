@@ -0,0 +1,700 @@
+"""
+BAIS Business Search Index
+Relevance-ranked business discovery for the universal search tool
+
+PostgreSQL deployments use a weighted tsvector column with a GIN index plus a
+pg_trgm index for fuzzy name matching; the DDL runs at startup (create_tables),
+and searches only read which indexes exist. SQLite deployments and the in-memory
+BUSINESS_STORE fallback use an in-process inverted index with BM25 scoring, so
+search cost tracks the size of the matching postings rather than the table.
+"""
+
+import asyncio
+import bisect
+import itertools
+import logging
+import math
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .constants import SearchLimits
+from .geo_index import GeoGridIndex
+
+logger = logging.getLogger(__name__)
+
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Field weights: a hit in the business name outranks a hit in a service name,
+# which outranks a hit in the free-text description
+NAME_WEIGHT = 3.0
+SERVICE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Prefix expansions score lower than exact term hits
+PREFIX_MATCH_FACTOR = 0.5
+
+# BM25 tuning parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STATE_ALIASES: Dict[str, str] = {
+    "nv": "nevada", "nevada": "nv",
+    "ca": "california", "california": "ca",
+    "ny": "new york", "new york": "ny",
+    "ut": "utah", "utah": "ut",
+}
+
+
+def tokenize(text: Optional[str], min_length: int = SearchLimits.MIN_TOKEN_LENGTH) -> List[str]:
+    """Split text into lowercase alphanumeric search terms"""
+    if not text:
+        return []
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if len(token) >= min_length]
+
+
+def compound_terms(tokens: List[str]) -> List[str]:
+    """
+    Join adjacent tokens so spaced and unspaced spellings meet in the index
+    ("med spa" -> "medspa").
+    """
+    return [tokens[i] + tokens[i + 1] for i in range(len(tokens) - 1)]
+
+
+def location_terms(location: Optional[str]) -> Set[str]:
+    """Normalize a city/state string into index terms, including state aliases"""
+    if not location:
+        return set()
+    normalized = " ".join(location.lower().replace(",", " ").replace(".", " ").split())
+    terms = set(tokenize(normalized, min_length=2))
+    terms.update(compound_terms(tokenize(normalized, min_length=2)))
+    for name, alias in STATE_ALIASES.items():
+        if name in terms or (" " in name and name in normalized):
+            terms.add(alias.replace(" ", ""))
+    return terms
+
+
+@dataclass
+class IndexedBusiness:
+    """Filterable attributes kept alongside the postings for one business"""
+    business_id: str
+    category: str = ""
+    location_terms: Set[str] = field(default_factory=set)
+    terms: Tuple[str, ...] = ()
+    length: float = 0.0
+
+
+class CandidateFilter:
+    """
+    AND of OR-clauses over index sets, evaluated lazily.
+    Broad filters (a whole state, a common category) cost no set copies:
+    membership checks probe the index sets directly.
+    """
+
+    def __init__(self, clauses: List[List[Set[str]]]):
+        self.clauses = clauses
+
+    def __contains__(self, business_id: str) -> bool:
+        return all(any(business_id in members for members in clause) for clause in self.clauses)
+
+    def __iter__(self):
+        # Walk the narrowest clause and check the rest
+        narrowest = min(self.clauses, key=lambda clause: sum(len(members) for members in clause))
+        seen: Set[str] = set()
+        for members in narrowest:
+            for business_id in members:
+                if business_id not in seen and business_id in self:
+                    seen.add(business_id)
+                    yield business_id
+
+    def is_empty(self) -> bool:
+        if not all(any(clause) for clause in self.clauses):
+            return True
+        return next(iter(self), None) is None
+
+
+class InvertedBusinessIndex:
+    """
+    In-process inverted index over business name, description and service names.
+    Used for SQLite and the in-memory store, where no native full-text index exists.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        # Sorted terms for prefix expansion, re-sorted lazily after writes so bulk loads stay linear
+        self._vocabulary: List[str] = []
+        self._vocabulary_stale = False
+        self._documents: Dict[str, IndexedBusiness] = {}
+        self._category_index: Dict[str, Set[str]] = defaultdict(set)
+        self._location_index: Dict[str, Set[str]] = defaultdict(set)
+        self._total_length = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, business_id: str) -> bool:
+        return business_id in self._documents
+
+    def add(
+        self,
+        business_id: str,
+        name: str = "",
+        description: str = "",
+        service_names: Iterable[str] = (),
+        category: str = "",
+        city: str = "",
+        state: str = ""
+    ) -> None:
+        """Index (or re-index) a business"""
+        weighted_terms: Dict[str, float] = defaultdict(float)
+
+        name_tokens = tokenize(name)
+        for term in name_tokens + compound_terms(name_tokens):
+            weighted_terms[term] += NAME_WEIGHT
+        for service_name in service_names:
+            service_tokens = tokenize(service_name)
+            for term in service_tokens + compound_terms(service_tokens):
+                weighted_terms[term] += SERVICE_WEIGHT
+        for term in tokenize(description):
+            weighted_terms[term] += DESCRIPTION_WEIGHT
+
+        with self._lock:
+            if business_id in self._documents:
+                self._remove_locked(business_id)
+
+            document = IndexedBusiness(
+                business_id=business_id,
+                category=(category or "").lower(),
+                location_terms=location_terms(city) | location_terms(state),
+                terms=tuple(weighted_terms),
+                length=sum(weighted_terms.values())
+            )
+            self._documents[business_id] = document
+            self._total_length += document.length
+
+            for term, weight in weighted_terms.items():
+                postings = self._postings[term]
+                if not postings:
+                    self._vocabulary_stale = True
+                postings[business_id] = weight
+
+            if document.category:
+                self._category_index[document.category].add(business_id)
+            for term in document.location_terms:
+                self._location_index[term].add(business_id)
+
+    def remove(self, business_id: str) -> None:
+        """Drop a business from the index"""
+        with self._lock:
+            if business_id in self._documents:
+                self._remove_locked(business_id)
+
+    def clear(self) -> None:
+        """Drop every indexed business"""
+        with self._lock:
+            self._postings.clear()
+            self._vocabulary.clear()
+            self._vocabulary_stale = False
+            self._documents.clear()
+            self._category_index.clear()
+            self._location_index.clear()
+            self._total_length = 0.0
+
+    def _remove_locked(self, business_id: str) -> None:
+        document = self._documents.pop(business_id)
+        self._total_length -= document.length
+
+        for term in document.terms:
+            postings = self._postings[term]
+            postings.pop(business_id, None)
+            if not postings:
+                del self._postings[term]
+                self._vocabulary_stale = True
+
+        if document.category:
+            self._category_index[document.category].discard(business_id)
+        for term in document.location_terms:
+            self._location_index[term].discard(business_id)
+
+    def search(
+        self,
+        query: Optional[str],
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        limit: int = SearchLimits.DEFAULT_RESULT_LIMIT
+    ) -> List[Tuple[str, float]]:
+        """
+        Return (business_id, score) pairs ordered by descending relevance.
+        An empty query returns filtered businesses with a score of 0.
+        """
+        with self._lock:
+            allowed = self._filter_candidates(category, location)
+            if allowed is not None and allowed.is_empty():
+                return []
+
+            query_terms = self._query_terms(query)
+            if not query_terms:
+                candidates = allowed if allowed is not None else self._documents.keys()
+                return [(business_id, 0.0) for business_id in itertools.islice(candidates, limit)]
+
+            scores: Dict[str, float] = defaultdict(float)
+            for term, factor in self._expand_terms(query_terms):
+                self._score_term(term, factor, scores, allowed)
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return ranked[:limit]
+
+    def matcher(
+        self,
+        query: Optional[str],
+        category: Optional[str] = None,
+        location: Optional[str] = None
+    ) -> Callable[[str], bool]:
+        """
+        Predicate: does a business match the category/location filters and at least
+        one query term (exact or prefix)? For filtering candidates found by other
+        indexes, such as the geo index.
+        """
+        with self._lock:
+            allowed = self._filter_candidates(category, location)
+            query_terms = self._query_terms(query)
+            postings = [self._postings[term] for term, _ in self._expand_terms(query_terms)
+                        if term in self._postings]
+
+        def matches(business_id: str) -> bool:
+            if allowed is not None and business_id not in allowed:
+                return False
+            return not query_terms or any(business_id in term_postings for term_postings in postings)
+
+        return matches
+
+    @staticmethod
+    def _query_terms(query: Optional[str]) -> List[str]:
+        query_tokens = tokenize(query)
+        query_terms = list(dict.fromkeys(query_tokens + compound_terms(query_tokens)))
+        normalized_query = re.sub(r"[^a-z0-9]", "", (query or "").lower())
+        if len(normalized_query) >= SearchLimits.MIN_TOKEN_LENGTH and normalized_query not in query_terms:
+            query_terms.append(normalized_query)
+        return query_terms
+
+    def _filter_candidates(self, category: Optional[str], location: Optional[str]) -> Optional["CandidateFilter"]:
+        """Combine the category and location indexes; None means unfiltered"""
+        clauses: List[List[Set[str]]] = []
+        if category:
+            clauses.append([self._category_index.get(category.lower(), set())])
+        if location:
+            clauses.append([self._location_index[term] for term in location_terms(location)
+                            if term in self._location_index])
+        return CandidateFilter(clauses) if clauses else None
+
+    def _expand_terms(self, query_terms: List[str]) -> List[Tuple[str, float]]:
+        """Map query terms to indexed terms: exact hits plus bounded prefix expansion"""
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_stale = False
+        vocabulary = self._vocabulary
+        expanded: Dict[str, float] = {}
+        for term in query_terms:
+            if term in self._postings:
+                expanded[term] = max(expanded.get(term, 0.0), 1.0)
+            start = bisect.bisect_left(vocabulary, term)
+            for candidate in vocabulary[start:start + SearchLimits.MAX_PREFIX_EXPANSIONS]:
+                if not candidate.startswith(term):
+                    break
+                if candidate != term:
+                    expanded[candidate] = max(expanded.get(candidate, 0.0), PREFIX_MATCH_FACTOR)
+        return list(expanded.items())
+
+    def _score_term(
+        self,
+        term: str,
+        factor: float,
+        scores: Dict[str, float],
+        allowed: Optional["CandidateFilter"]
+    ) -> None:
+        """Accumulate the BM25 contribution of one term"""
+        postings = self._postings.get(term)
+        if not postings:
+            return
+
+        document_count = len(self._documents)
+        average_length = (self._total_length / document_count) if document_count else 1.0
+        idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+
+        for business_id, weight in postings.items():
+            if allowed is not None and business_id not in allowed:
+                continue
+            length = self._documents[business_id].length or 1.0
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (average_length or 1.0))
+            scores[business_id] += factor * idf * (weight * (BM25_K1 + 1)) / (weight + norm)
+
+
+# ============================================================================
+# PostgreSQL full-text search
+# ============================================================================
+
+POSTGRES_FTS_DDL = [
+    """
+    ALTER TABLE businesses ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(business_type, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_business_search_vector ON businesses USING GIN (search_vector)",
+    "CREATE INDEX IF NOT EXISTS idx_service_name_fts ON business_services "
+    "USING GIN (to_tsvector('english', name))",
+]
+
+POSTGRES_TRIGRAM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_business_name_trgm ON businesses USING GIN (name gin_trgm_ops)",
+]
+
+
+@dataclass
+class PostgresSearchCapabilities:
+    """Which PostgreSQL search features are available on an engine"""
+    full_text: bool = False
+    trigram: bool = False
+
+
+_postgres_capabilities: Dict[str, PostgresSearchCapabilities] = {}
+_postgres_lock = threading.Lock()
+
+
+def _database_key(engine) -> str:
+    """Identity of the database behind an engine, the same for its sync and async drivers"""
+    url = engine.url
+    return f"{url.get_backend_name()}://{url.username or ''}@{url.host or ''}:{url.port or ''}/{url.database or ''}"
+
+
+def _run_ddl(engine, statements: List[str]) -> bool:
+    """Run idempotent DDL statements; report whether all of them succeeded"""
+    from sqlalchemy import text
+
+    try:
+        with engine.begin() as connection:
+            for statement in statements:
+                connection.execute(text(statement))
+        return True
+    except Exception as e:
+        logger.warning(f"Search index DDL failed: {e}")
+        return False
+
+
+def ensure_postgres_search_index(engine) -> PostgresSearchCapabilities:
+    """
+    Create the tsvector column, GIN index and trigram index if missing.
+    Startup DDL (create_tables), run once per database; missing privileges
+    (e.g. CREATE EXTENSION) only disable the affected feature.
+    """
+    key = _database_key(engine)
+    capabilities = _postgres_capabilities.get(key)
+    if capabilities is not None:
+        return capabilities
+
+    # Never block on the lock: async callers share one thread, so waiting here
+    # while another coroutine runs the DDL would deadlock
+    if not _postgres_lock.acquire(blocking=False):
+        return PostgresSearchCapabilities()
+    try:
+        capabilities = _postgres_capabilities.get(key)
+        if capabilities is None:
+            capabilities = PostgresSearchCapabilities(
+                full_text=_run_ddl(engine, POSTGRES_FTS_DDL),
+                trigram=_run_ddl(engine, POSTGRES_TRIGRAM_DDL)
+            )
+            logger.info(
+                f"PostgreSQL search index ready: full_text={capabilities.full_text}, "
+                f"trigram={capabilities.trigram}"
+            )
+            _postgres_capabilities[key] = capabilities
+    finally:
+        _postgres_lock.release()
+    return capabilities
+
+
+def postgres_search_capabilities(engine) -> PostgresSearchCapabilities:
+    """
+    Search features available on a database, for the request path: no DDL.
+    When this process did not run the startup DDL, the catalog is read once.
+    """
+    key = _database_key(engine)
+    capabilities = _postgres_capabilities.get(key)
+    if capabilities is not None:
+        return capabilities
+
+    from sqlalchemy import text
+
+    try:
+        with engine.connect() as connection:
+            capabilities = PostgresSearchCapabilities(
+                full_text=connection.execute(text(
+                    "SELECT 1 FROM pg_attribute WHERE attrelid = to_regclass('businesses') "
+                    "AND attname = 'search_vector' AND NOT attisdropped"
+                )).first() is not None,
+                trigram=connection.execute(text(
+                    "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+                )).first() is not None
+            )
+    except Exception as e:
+        logger.warning(f"Search index lookup failed, using the in-process index: {e}")
+        return PostgresSearchCapabilities()
+    if not (capabilities.full_text or capabilities.trigram):
+        logger.warning("⚠️ PostgreSQL search indexes missing; run create_tables() at startup")
+    return _postgres_capabilities.setdefault(key, capabilities)
+
+
+def cached_postgres_search_capabilities(engine) -> Optional[PostgresSearchCapabilities]:
+    """Capabilities already known for a database, without touching it"""
+    return _postgres_capabilities.get(_database_key(engine))
+
+
+def postgres_search_clause(query: str, capabilities: PostgresSearchCapabilities):
+    """
+    (match clause, rank expression) for a text query over the PostgreSQL
+    indexes: websearch_to_tsquery against the weighted vector and service names,
+    with trigram similarity on the name as a typo-tolerant fallback.
+
+    The matchers are UNIONed rather than ORed: an OR across a correlated EXISTS
+    on business_services and the businesses indexes cannot become a BitmapOr,
+    so PostgreSQL falls back to a sequential scan of businesses. Each UNION arm
+    is a bitmap index scan, run once as an InitPlan, and ``id = ANY(ARRAY(...))``
+    turns the outer query into a primary-key index scan:
+
+        Index Scan using businesses_pkey on businesses
+          Index Cond: ((id)::text = ANY (($0)::text[]))
+          InitPlan 1 -> HashAggregate -> Append
+            -> Bitmap Index Scan on idx_business_search_vector
+            -> Bitmap Index Scan on idx_service_name_fts
+
+    Returns (None, None) without any search index.
+    """
+    from sqlalchemy import any_, func, literal_column, select, union
+    from .database_models import Business, BusinessService
+
+    arms = []
+    rank = None
+
+    if capabilities.full_text:
+        # Literal regconfig so the planner can match the expression index on service names
+        regconfig = literal_column("'english'")
+        ts_query = func.websearch_to_tsquery(regconfig, query)
+        search_vector = literal_column("businesses.search_vector")
+        arms.append(select(Business.id).where(search_vector.op("@@")(ts_query)))
+        arms.append(
+            select(BusinessService.business_id)
+            .where(func.to_tsvector(regconfig, BusinessService.name).op("@@")(ts_query))
+        )
+        rank = func.ts_rank_cd(search_vector, ts_query)
+
+    if capabilities.trigram:
+        arms.append(select(Business.id).where(Business.name.op("%")(query)))
+        similarity = func.similarity(Business.name, query)
+        rank = similarity if rank is None else rank + similarity
+
+    if not arms:
+        return None, None
+    matching_ids = union(*arms) if len(arms) > 1 else arms[0]
+    return Business.id == any_(func.array(matching_ids.scalar_subquery())), rank
+
+
+def apply_postgres_search(query_obj, query: str, capabilities: PostgresSearchCapabilities):
+    """Filter and rank a Business query with the PostgreSQL indexes; None without them"""
+    match, rank = postgres_search_clause(query, capabilities)
+    if match is None:
+        return None
+    return query_obj.filter(match).order_by(rank.desc())
+
+
+# ============================================================================
+# Index registries
+# ============================================================================
+
+class DatabaseSearchIndex:
+    """
+    Inverted index mirroring the active businesses of one non-PostgreSQL database.
+    Built lazily; after SearchLimits.INDEX_REFRESH_SECONDS or invalidate(),
+    searches keep serving the previous build while it is rebuilt in the background.
+    """
+
+    def __init__(self, refresh_seconds: int = SearchLimits.INDEX_REFRESH_SECONDS, db_manager=None):
+        self.index = InvertedBusinessIndex()
+        self.geo = GeoGridIndex()
+        self.refresh_seconds = refresh_seconds
+        self.db_manager = db_manager  # opens the background rebuild's own session
+        self._built_at: Optional[float] = None
+        self._has_built = False
+        self._rebuilding = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._first_build: Optional[asyncio.Future] = None
+        self._refresh: Optional[Any] = None  # running background rebuild (task or thread)
+
+    def invalidate(self) -> None:
+        """Mark the mirror stale; the next search starts a background rebuild"""
+        with self._lock:
+            self._generation += 1
+        self._built_at = None
+
+    async def prepare(self, db_manager) -> None:
+        """
+        Build the mirror before the first search through an AsyncDatabaseManager.
+        Concurrent first searches await one shared build instead of each loading
+        every business (after that, stale refreshes serve the previous build).
+        """
+        if self._has_built:
+            return
+        build = self._first_build
+        if build is None or build.done():
+            build = self._first_build = asyncio.ensure_future(db_manager.run_sync(self._ensure_fresh))
+        # Shielded: a cancelled search must not cancel the build others await
+        await asyncio.shield(build)
+
+    def search(self, session, query: Optional[str], category: Optional[str] = None,
+               location: Optional[str] = None,
+               limit: int = SearchLimits.DEFAULT_RESULT_LIMIT) -> List[Tuple[str, float]]:
+        """Search the database mirror, building it from the session on first use"""
+        self._ensure_fresh(session)
+        return self.index.search(query, category=category, location=location, limit=limit)
+
+    def nearby(self, session, latitude: float, longitude: float, radius_km: Optional[float] = None,
+               query: Optional[str] = None, category: Optional[str] = None,
+               limit: int = SearchLimits.DEFAULT_RESULT_LIMIT) -> List[Tuple[str, float]]:
+        """(business_id, distance_km) nearest first, filtered by query terms and category"""
+        self._ensure_fresh(session)
+        return self.geo.nearest(latitude, longitude, limit=limit, radius_km=radius_km,
+                                predicate=self.index.matcher(query, category=category))
+
+    def _ensure_fresh(self, session) -> None:
+        built_at = self._built_at
+        if built_at is not None and time.monotonic() - built_at < self.refresh_seconds:
+            return
+        # The lock only guards the flags, never the rebuild query: under
+        # AsyncDatabaseManager the query yields to the event loop, and a second
+        # coroutine on the same thread blocking on the lock would deadlock.
+        with self._lock:
+            if self._rebuilding:
+                if self._has_built:
+                    return  # serve the previous build while another caller refreshes
+            elif self._has_built and self.db_manager is not None:
+                self._rebuilding = True
+                self._start_background_rebuild()
+                return
+            self._rebuilding = True
+        try:
+            self._refresh_from(session)
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _refresh_from(self, session) -> None:
+        generation = self._generation
+        self._rebuild(session)
+        self._has_built = True
+        # A write during the rebuild may be missing from it: stay stale
+        self._built_at = time.monotonic() if generation == self._generation else None
+
+    def _start_background_rebuild(self) -> None:
+        """Rebuild in a session of our own, off the request path (called with _lock held)"""
+        db_manager = self.db_manager
+        if getattr(db_manager, "is_async", False):
+            # Called from run_sync on the event loop thread
+            self._refresh = asyncio.get_running_loop().create_task(self._rebuild_async(db_manager))
+        else:
+            self._refresh = threading.Thread(
+                target=self._rebuild_in_thread, args=(db_manager,), name="search-index-rebuild", daemon=True
+            )
+            self._refresh.start()
+
+    async def _rebuild_async(self, db_manager) -> None:
+        try:
+            await db_manager.run_sync(self._refresh_from)
+        except Exception as e:
+            logger.error(f"Background search index rebuild failed: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _rebuild_in_thread(self, db_manager) -> None:
+        try:
+            with db_manager.get_session() as session:
+                self._refresh_from(session)
+        except Exception as e:
+            logger.error(f"Background search index rebuild failed: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def _rebuild(self, session) -> None:
+        from sqlalchemy.orm import selectinload
+        from .database_models import Business
+
+        started = time.perf_counter()
+        fresh = InvertedBusinessIndex()
+        fresh_geo = GeoGridIndex()
+        businesses = session.query(Business).options(
+            selectinload(Business.services)
+        ).filter(Business.status == "active").all()
+        for business in businesses:
+            fresh.add(
+                business.id,
+                name=business.name,
+                description=business.description or "",
+                service_names=[svc.name for svc in business.services],
+                category=business.business_type or "",
+                city=business.city or "",
+                state=business.state or ""
+            )
+            if business.latitude is not None and business.longitude is not None:
+                fresh_geo.add(business.id, business.latitude, business.longitude)
+        self.index = fresh
+        self.geo = fresh_geo
+        logger.info(f"Rebuilt business search index: {len(fresh)} businesses in "
+                    f"{(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+_database_indexes: Dict[str, DatabaseSearchIndex] = {}
+_database_indexes_lock = threading.Lock()
+
+
+def get_database_search_index(db_manager) -> DatabaseSearchIndex:
+    """Get the search index mirroring a database (one per engine URL)"""
+    key = str(db_manager.engine.url)
+    index = _database_indexes.get(key)
+    if index is None:
+        with _database_indexes_lock:
+            index = _database_indexes.setdefault(key, DatabaseSearchIndex())
+    index.db_manager = db_manager  # the latest manager for this URL serves background rebuilds
+    return index
+
+
+def invalidate_search_indexes() -> None:
+    """Mark every database mirror stale after a business or service write"""
+    # Loaded as core.* and backend.production.core.*, each copy with its own mirrors
+    for module_name in {__name__, "core.business_search_index", "backend.production.core.business_search_index"}:
+        module = sys.modules.get(module_name)
+        for index in list(getattr(module, "_database_indexes", {}).values()):
+            index.invalidate()
+
+
+def index_store_business(index: InvertedBusinessIndex, business_id: str, business_data: Dict[str, Any]) -> None:
+    """Index a BUSINESS_STORE entry"""
+    location = business_data.get("location", {}) or {}
+    index.add(
+        business_id,
+        name=business_data.get("business_name", ""),
+        description=(business_data.get("business_info", {}) or {}).get("description", ""),
+        service_names=[svc.get("name", "") for svc in business_data.get("services_config", [])],
+        category=business_data.get("business_type", ""),
+        city=location.get("city", ""),
+        state=location.get("state", "")
+    )
@@ -0,0 +1,227 @@
+"""
+BAIS Indexed Business Store
+In-memory business registry used when no database is configured
+
+Business IDs resolve through an alias map, so "New_Life_New_Image_Med_Spa",
+"new-life-new-image-med-spa" and "newlifenewimagemedspa" all reach the same
+entry in O(1). Secondary indexes on category, city, state and service name
+answer filter lookups without a scan. Ranked text matching goes through the
+token postings of an InvertedBusinessIndex, and nearby search through a
+GeoGridIndex over registered coordinates.
+"""
+
+import re
+import threading
+from collections import defaultdict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .business_search_index import InvertedBusinessIndex, index_store_business
+from .constants import SearchLimits
+from .geo_index import GeoGridIndex, location_coordinates
+
+_SEPARATORS = re.compile(r"[\s_\-]+")
+_NON_ALPHANUMERIC = re.compile(r"[^a-z0-9]")
+
+
+def canonical_business_id(business_id: Optional[str]) -> str:
+    """Lowercase, with runs of spaces/underscores/hyphens collapsed to one hyphen"""
+    return _SEPARATORS.sub("-", (business_id or "").strip().lower()).strip("-")
+
+
+def compact_business_id(business_id: Optional[str]) -> str:
+    """Alphanumerics only ("newlife_newimage_medspa" -> "newlifenewimagemedspa")"""
+    return _NON_ALPHANUMERIC.sub("", (business_id or "").lower())
+
+
+def business_id_variants(business_id: Optional[str]) -> List[str]:
+    """Spellings a stored external_id may use for the same business, for exact-match lookups"""
+    stripped = (business_id or "").strip()
+    canonical = canonical_business_id(stripped)
+    return list(dict.fromkeys(
+        variant for variant in (stripped, stripped.lower(), canonical, canonical.replace("-", "_")) if variant
+    ))
+
+
+def _index_key(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+class IndexedBusinessStore(MutableMapping):
+    """
+    Dict-compatible business registry (business_id -> registration data)
+    with ID aliasing, secondary indexes and a ranked text index
+    """
+
+    def __init__(self):
+        self._businesses: Dict[str, Dict[str, Any]] = {}
+        self._aliases: Dict[str, str] = {}
+        self._alias_claims: Dict[str, List[str]] = {}  # alias -> businesses spelling it, oldest first
+        self._indexes: Dict[str, Dict[str, Set[str]]] = {
+            "category": defaultdict(set),
+            "city": defaultdict(set),
+            "state": defaultdict(set),
+            "service": defaultdict(set),
+        }
+        self._index_keys: Dict[str, List[Tuple[str, str]]] = {}
+        self.search_index = InvertedBusinessIndex()
+        self.geo_index = GeoGridIndex()
+        self._lock = threading.RLock()
+
+    # Mapping protocol
+
+    def __getitem__(self, business_id: str) -> Dict[str, Any]:
+        return self._businesses[business_id]
+
+    def __setitem__(self, business_id: str, business_data: Dict[str, Any]) -> None:
+        with self._lock:
+            if business_id in self._businesses:
+                self._unindex(business_id)
+            else:
+                self._claim_aliases(business_id)
+            self._businesses[business_id] = business_data
+            self._index(business_id, business_data)
+        index_store_business(self.search_index, business_id, business_data)
+        coordinates = location_coordinates(business_data.get("location"))
+        if coordinates:
+            self.geo_index.add(business_id, *coordinates)
+        else:
+            self.geo_index.remove(business_id)
+
+    def __delitem__(self, business_id: str) -> None:
+        with self._lock:
+            if business_id not in self._businesses:
+                raise KeyError(business_id)
+            self._unindex(business_id)
+            self._release_aliases(business_id)
+            del self._businesses[business_id]
+        self.search_index.remove(business_id)
+        self.geo_index.remove(business_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._businesses)
+
+    def __len__(self) -> int:
+        return len(self._businesses)
+
+    def __contains__(self, business_id: object) -> bool:
+        return business_id in self._businesses
+
+    def clear(self) -> None:
+        with self._lock:
+            self._businesses.clear()
+            self._aliases.clear()
+            self._alias_claims.clear()
+            self._index_keys.clear()
+            for index in self._indexes.values():
+                index.clear()
+        self.search_index.clear()
+        self.geo_index.clear()
+
+    def copy(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self._businesses)
+
+    # ID resolution
+
+    def resolve(self, business_id: Optional[str]) -> Optional[str]:
+        """Stored business_id for any spelling of it, or None"""
+        if not business_id:
+            return None
+        if business_id in self._businesses:
+            return business_id
+        return (self._aliases.get(canonical_business_id(business_id))
+                or self._aliases.get(compact_business_id(business_id)))
+
+    def lookup(self, business_id: Optional[str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(stored business_id, data) for any spelling of the ID, or None"""
+        resolved = self.resolve(business_id)
+        if resolved is None:
+            return None
+        business_data = self._businesses.get(resolved)
+        return (resolved, business_data) if business_data is not None else None
+
+    # Secondary indexes
+
+    def find_ids(
+        self,
+        category: Optional[str] = None,
+        city: Optional[str] = None,
+        state: Optional[str] = None,
+        service: Optional[str] = None
+    ) -> Set[str]:
+        """IDs matching every given attribute exactly (case-insensitive)"""
+        filters = [(name, _index_key(value)) for name, value in
+                   (("category", category), ("city", city), ("state", state), ("service", service)) if value]
+        with self._lock:
+            if not filters:
+                return set(self._businesses)
+            matches = sorted((self._indexes[name].get(key, set()) for name, key in filters), key=len)
+            return set(matches[0]).intersection(*matches[1:])
+
+    def search(
+        self,
+        query: Optional[str],
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        limit: int = SearchLimits.DEFAULT_RESULT_LIMIT
+    ) -> List[Tuple[str, float]]:
+        """Relevance-ranked (business_id, score) pairs"""
+        return self.search_index.search(query, category=category, location=location, limit=limit)
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: Optional[float] = None,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = SearchLimits.DEFAULT_RESULT_LIMIT
+    ) -> List[Tuple[str, float]]:
+        """(business_id, distance_km) nearest first, filtered by query terms and category"""
+        return self.geo_index.nearest(latitude, longitude, limit=limit, radius_km=radius_km,
+                                      predicate=self.search_index.matcher(query, category=category))
+
+    # Internals (called with the lock held)
+
+    def _index(self, business_id: str, business_data: Dict[str, Any]) -> None:
+        location = business_data.get("location", {}) or {}
+        keys = [
+            ("category", _index_key(business_data.get("business_type"))),
+            ("city", _index_key(location.get("city"))),
+            ("state", _index_key(location.get("state"))),
+        ]
+        keys += [("service", _index_key(svc.get("name"))) for svc in business_data.get("services_config", []) or []]
+        keys = [(name, key) for name, key in dict.fromkeys(keys) if key]
+        for name, key in keys:
+            self._indexes[name][key].add(business_id)
+        self._index_keys[business_id] = keys
+
+    def _unindex(self, business_id: str) -> None:
+        for name, key in self._index_keys.pop(business_id, []):
+            members = self._indexes[name].get(key)
+            if members is not None:
+                members.discard(business_id)
+                if not members:
+                    del self._indexes[name][key]
+
+
+    def _claim_aliases(self, business_id: str) -> None:
+        # First registration wins an alias, so one business cannot shadow another's exact ID
+        for alias in dict.fromkeys((canonical_business_id(business_id), compact_business_id(business_id))):
+            if alias:
+                self._alias_claims.setdefault(alias, []).append(business_id)
+                self._aliases.setdefault(alias, business_id)
+
+    def _release_aliases(self, business_id: str) -> None:
+        # An alias passes to the next business that registered a spelling of it
+        for alias in dict.fromkeys((canonical_business_id(business_id), compact_business_id(business_id))):
+            claims = self._alias_claims.get(alias)
+            if not claims or business_id not in claims:
+                continue
+            claims.remove(business_id)
+            if claims:
+                if self._aliases.get(alias) == business_id:
+                    self._aliases[alias] = claims[0]
+            else:
+                del self._alias_claims[alias]
+                self._aliases.pop(alias, None)
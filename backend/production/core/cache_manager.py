@@ -4,12 +4,42 @@ Intelligent caching strategy for performance optimization
 """
 
 import redis
+import redis.asyncio as aioredis
+import asyncio
 import json
-from typing import Any, Optional, Callable
+import logging
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
 from functools import wraps
 from datetime import timedelta
 import hashlib
 
+from .constants import CacheLimits
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# EXPIRE only when it extends the key's TTL (or it has none): EXPIRE GT without
+# needing Redis 7. KEYS[1] = key, ARGV[1] = ttl seconds
+EXTEND_TTL_SCRIPT = """
+local ttl = redis.call('TTL', KEYS[1])
+if ttl < tonumber(ARGV[1]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return ttl
+"""
+
 class CacheManager:
     """
     Redis-based caching manager
@@ -51,9 +81,15 @@ class CacheManager:
     def invalidate_pattern(self, pattern: str):
         """Invalidate all keys matching pattern"""
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                self.redis_client.delete(*keys)
+            # SCAN walks the keyspace incrementally; KEYS blocks Redis for everyone
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=CacheLimits.CACHE_SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= CacheLimits.CACHE_SCAN_BATCH_SIZE:
+                    self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                self.redis_client.unlink(*batch)
         except Exception as e:
             print(f"Cache invalidate error: {e}")
     
@@ -64,6 +100,224 @@ class CacheManager:
         return hashlib.md5(key_data.encode()).hexdigest()
 
 
+class JSONSerializer:
+    """Standard library JSON (always available)"""
+    name = "json"
+    
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value).encode()
+    
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer:
+    """orjson - several times faster than json, same wire format"""
+    name = "orjson"
+    
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value)
+    
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """msgpack - compact binary encoding"""
+    name = "msgpack"
+    
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+    
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+def get_serializer(name: Optional[str] = None):
+    """Serializer by name; defaults to orjson when installed, otherwise json"""
+    if name is None:
+        name = "orjson" if orjson is not None else "json"
+    if name == "orjson" and orjson is not None:
+        return OrjsonSerializer()
+    if name == "msgpack" and msgpack is not None:
+        return MsgpackSerializer()
+    if name == "json":
+        return JSONSerializer()
+    raise ValueError(f"Cache serializer '{name}' is not available")
+
+
+class AsyncCacheManager:
+    """
+    Asyncio Redis caching manager
+    Batched reads/writes (MGET, pipelines), SCAN and tag-set invalidation,
+    single-flight miss coalescing and probabilistic early expiry (XFetch)
+    """
+    
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        serializer=None,
+        default_ttl: int = CacheLimits.DEFAULT_CACHE_TTL_SECONDS,
+        early_expiry_beta: float = CacheLimits.CACHE_EARLY_EXPIRY_BETA,
+        redis_client=None
+    ):
+        self.redis_client = redis_client or aioredis.from_url(redis_url)
+        self.serializer = serializer or get_serializer()
+        self.default_ttl = default_ttl
+        self.early_expiry_beta = early_expiry_beta
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    @staticmethod
+    def tag_key(tag: str) -> str:
+        return f"cache:tag:{tag}"
+    
+    # Entries are stored as [value, compute_seconds, expires_at] so readers can
+    # refresh a hot key shortly before it expires instead of all missing at once
+    
+    def _encode(self, value: Any, ttl: int, compute_seconds: float) -> bytes:
+        return self.serializer.dumps([value, compute_seconds, time.time() + ttl])
+    
+    def _decode(self, data: Optional[bytes]) -> Optional[List[Any]]:
+        if data is None:
+            return None
+        try:
+            return self.serializer.loads(data)
+        except Exception as e:
+            logger.warning(f"Cache decode error: {e}")
+            return None
+    
+    def _should_refresh_early(self, compute_seconds: float, expires_at: float) -> bool:
+        """XFetch: the closer to expiry and the slower the recompute, the likelier"""
+        jitter = -math.log(1.0 - random.random())
+        return time.time() + compute_seconds * self.early_expiry_beta * jitter >= expires_at
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache"""
+        try:
+            envelope = self._decode(await self.redis_client.get(key))
+        except Exception as e:
+            logger.warning(f"Cache get error: {e}")
+            return None
+        return envelope[0] if envelope else None
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several values in one MGET round trip (missing keys are omitted)"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            values = await self.redis_client.mget(keys)
+        except Exception as e:
+            logger.warning(f"Cache mget error: {e}")
+            return {}
+        found = {}
+        for key, data in zip(keys, values):
+            envelope = self._decode(data)
+            if envelope:
+                found[key] = envelope[0]
+        return found
+    
+    async def set(self, key: str, value: Any, ttl: int = None, tags: Iterable[str] = (),
+                  compute_seconds: float = 0.0):
+        """Set value in cache, optionally registering it under invalidation tags"""
+        await self.set_many({key: value}, ttl=ttl, tags=tags, compute_seconds=compute_seconds)
+    
+    async def set_many(self, mapping: Dict[str, Any], ttl: int = None, tags: Iterable[str] = (),
+                       compute_seconds: float = 0.0):
+        """Set several values in one pipelined round trip"""
+        if not mapping:
+            return
+        ttl = ttl or self.default_ttl
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    pipe.set(key, self._encode(value, ttl, compute_seconds), ex=ttl)
+                for tag in tags:
+                    tag_key = self.tag_key(tag)
+                    pipe.sadd(tag_key, *mapping.keys())
+                    # Tag sets live as long as their longest-lived member
+                    pipe.eval(EXTEND_TTL_SCRIPT, 1, tag_key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache set error: {e}")
+    
+    async def delete(self, *keys: str):
+        """Delete keys from cache (UNLINK frees memory off the Redis main thread)"""
+        if not keys:
+            return
+        try:
+            await self.redis_client.unlink(*keys)
+        except Exception as e:
+            logger.warning(f"Cache delete error: {e}")
+    
+    async def invalidate_pattern(self, pattern: str,
+                                 batch_size: int = CacheLimits.CACHE_SCAN_BATCH_SIZE) -> int:
+        """Invalidate all keys matching pattern with incremental SCAN instead of KEYS"""
+        deleted = 0
+        batch: List[bytes] = []
+        try:
+            async for key in self.redis_client.scan_iter(match=pattern, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await self.redis_client.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self.redis_client.unlink(*batch)
+        except Exception as e:
+            logger.warning(f"Cache invalidate error: {e}")
+        return deleted
+    
+    async def invalidate_tags(self, *tags: str) -> int:
+        """Invalidate every key registered under the given tags (count includes the tag sets)"""
+        if not tags:
+            return 0
+        tag_keys = [self.tag_key(tag) for tag in tags]
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for tag_key in tag_keys:
+                    pipe.smembers(tag_key)
+                members = await pipe.execute()
+            keys = set().union(*members)
+            return await self.redis_client.unlink(*keys, *tag_keys)
+        except Exception as e:
+            logger.warning(f"Cache tag invalidate error: {e}")
+            return 0
+    
+    async def get_or_set(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int = None,
+                         tags: Iterable[str] = ()) -> Any:
+        """
+        Read-through get. Concurrent misses on one key share a single loader call,
+        and hot keys are refreshed early (jittered) so they never all miss together.
+        """
+        try:
+            envelope = self._decode(await self.redis_client.get(key))
+        except Exception as e:
+            logger.warning(f"Cache get error: {e}")
+            envelope = None
+        if envelope and not self._should_refresh_early(envelope[1], envelope[2]):
+            return envelope[0]
+        
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._load(key, loader, ttl, tuple(tags)))
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda done: self._inflight.pop(key, None)
+                                     if self._inflight.get(key) is done else None)
+        # Shielded: one cancelled caller must not cancel the load the others await
+        return await asyncio.shield(flight)
+    
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: Optional[int],
+                    tags: tuple) -> Any:
+        started = time.monotonic()
+        value = await loader()
+        await self.set(key, value, ttl=ttl, tags=tags, compute_seconds=time.monotonic() - started)
+        return value
+    
+    async def close(self):
+        """Close the connection pool"""
+        await self.redis_client.aclose()
+
+
 def cached(ttl: int = 300, key_prefix: str = ""):
     """
     Caching decorator
@@ -77,23 +331,13 @@ def cached(ttl: int = 300, key_prefix: str = ""):
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Get cache manager
-            cache = get_cache_manager()
+            cache = get_async_cache_manager()
             
             # Generate cache key
             cache_key = f"{key_prefix}:{CacheManager.cache_key(*args, **kwargs)}"
             
-            # Try to get from cache
-            cached_value = cache.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-            
-            # Execute function
-            result = await func(*args, **kwargs)
-            
-            # Store in cache
-            cache.set(cache_key, result, ttl)
-            
-            return result
+            # Read-through with single-flight: concurrent misses execute func once
+            return await cache.get_or_set(cache_key, lambda: func(*args, **kwargs), ttl)
         return wrapper
     return decorator
 
@@ -109,3 +353,16 @@ def get_cache_manager() -> CacheManager:
         redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         _cache_manager = CacheManager(redis_url)
     return _cache_manager
+
+
+_async_cache_manager: Optional[AsyncCacheManager] = None
+
+def get_async_cache_manager() -> AsyncCacheManager:
+    """Get singleton async cache manager (serializer from BAIS_CACHE_SERIALIZER)"""
+    global _async_cache_manager
+    if _async_cache_manager is None:
+        import os
+        redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        serializer = get_serializer(os.getenv("BAIS_CACHE_SERIALIZER") or None)
+        _async_cache_manager = AsyncCacheManager(redis_url, serializer=serializer)
+    return _async_cache_manager
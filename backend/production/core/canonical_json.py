@@ -0,0 +1,222 @@
+"""
+Canonical JSON (RFC 8785, JSON Canonicalization Scheme)
+One deterministic encoding for everything that is signed, hashed or HMACed:
+sorted keys (UTF-16 code unit order), no whitespace, minimal string escaping
+and ECMAScript number formatting. orjson encodes payloads whose output is
+already canonical; anything else goes through the reference encoder.
+
+Signatures made before the switch covered json.dumps(sort_keys=True) bytes.
+Verifiers fall back to that encoding (legacy_json) for one signature max age
+after the cutover (JCS_CUTOVER, overridable with BAIS_JCS_CUTOVER in ISO-8601
+UTC), counting every signature accepted that way.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from json.encoder import encode_basestring
+from typing import Any, Dict, List, Optional, Tuple
+
+from .constants import AP2Limits
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MAX_SAFE_INTEGER = 2 ** 53  # Integers beyond this are not exact as IEEE doubles
+
+
+class CanonicalJSONError(ValueError):
+    """Raised for values JCS cannot represent (NaN, Infinity)"""
+    pass
+
+
+def format_number(value: float) -> str:
+    """ECMAScript Number.prototype.toString for a finite double, as RFC 8785 requires"""
+    if value != value or value in (float("inf"), float("-inf")):
+        raise CanonicalJSONError(f"{value} is not allowed in canonical JSON")
+    if value == 0:
+        return "0"  # also -0
+
+    # repr gives the shortest round-tripping digits, as ECMAScript does
+    text = repr(value)
+    sign = ""
+    if text[0] == "-":
+        sign, text = "-", text[1:]
+    mantissa, _, exponent = text.partition("e")
+    integer, _, fraction = mantissa.partition(".")
+    all_digits = integer + fraction
+    digits = all_digits.lstrip("0")
+    # value = 0.digits x 10^point
+    point = len(integer) + int(exponent or 0) - (len(all_digits) - len(digits))
+    digits = digits.rstrip("0")
+    length = len(digits)
+
+    if length <= point <= 21:
+        return sign + digits + "0" * (point - length)
+    if 0 < point <= 21:
+        return sign + digits[:point] + "." + digits[point:]
+    if -6 < point <= 0:
+        return sign + "0." + "0" * -point + digits
+    exponent_value = point - 1
+    exponent_text = ("e+" if exponent_value >= 0 else "e-") + str(abs(exponent_value))
+    if length == 1:
+        return sign + digits + exponent_text
+    return sign + digits[0] + "." + digits[1:] + exponent_text
+
+
+def _sort_key(key: str) -> bytes:
+    return key.encode("utf-16-be")
+
+
+def _encode(value: Any, parts: List[str]) -> None:
+    if isinstance(value, str):
+        parts.append(encode_basestring(value))
+    elif value is None:
+        parts.append("null")
+    elif value is True:
+        parts.append("true")
+    elif value is False:
+        parts.append("false")
+    elif isinstance(value, int):
+        if -MAX_SAFE_INTEGER <= value <= MAX_SAFE_INTEGER:
+            parts.append(str(int(value)))
+        else:
+            parts.append(format_number(float(value)))
+    elif isinstance(value, float):
+        parts.append(format_number(value))
+    elif isinstance(value, dict):
+        for key in value:
+            if not isinstance(key, str):
+                raise TypeError(f"Canonical JSON object keys must be strings, not {type(key).__name__}")
+        keys = sorted(value) if all(key.isascii() for key in value) else sorted(value, key=_sort_key)
+        parts.append("{")
+        for index, key in enumerate(keys):
+            if index:
+                parts.append(",")
+            parts.append(encode_basestring(key))
+            parts.append(":")
+            _encode(value[key], parts)
+        parts.append("}")
+    elif isinstance(value, (list, tuple)):
+        parts.append("[")
+        for index, item in enumerate(value):
+            if index:
+                parts.append(",")
+            _encode(item, parts)
+        parts.append("]")
+    else:
+        raise TypeError(f"Object of type {type(value).__name__} is not canonical JSON serializable")
+
+
+def _orjson_canonical(value: Any) -> bool:
+    """
+    True if orjson's OPT_SORT_KEYS output for value is already canonical:
+    exact types only, no non-BMP keys, safe integers, and floats that both
+    formatters write the same way (non-integral, 1e-4 <= |x| < 1e16).
+    """
+    value_type = type(value)
+    if value_type is str or value_type is bool or value is None:
+        return True
+    if value_type is int:
+        return -MAX_SAFE_INTEGER <= value <= MAX_SAFE_INTEGER
+    if value_type is float:
+        return 1e-4 <= abs(value) < 1e16 and not value.is_integer()
+    if value_type is dict:
+        for key, item in value.items():
+            if type(key) is not str or (not key.isascii() and max(key) > "\uffff"):
+                return False
+            if not _orjson_canonical(item):
+                return False
+        return True
+    if value_type is list or value_type is tuple:
+        return all(_orjson_canonical(item) for item in value)
+    return False
+
+
+def canonicalize(value: Any, accelerated: bool = True) -> bytes:
+    """
+    RFC 8785 canonical UTF-8 bytes of a JSON-compatible value.
+
+    Raises:
+        TypeError: for non-JSON types or non-string object keys
+        CanonicalJSONError: for NaN or Infinity
+    """
+    if accelerated and orjson is not None and _orjson_canonical(value):
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    parts: List[str] = []
+    _encode(value, parts)
+    return "".join(parts).encode("utf-8")
+
+
+def canonical_str(value: Any) -> str:
+    """canonicalize() as text"""
+    return canonicalize(value).decode("utf-8")
+
+
+def canonical_sha256(value: Any) -> str:
+    """Hex SHA-256 of the canonical form, for integrity hashes and dedupe keys"""
+    return hashlib.sha256(canonicalize(value)).hexdigest()
+
+
+def backend() -> str:
+    """Name of the accelerated backend in use"""
+    return "orjson" if orjson is not None else "python"
+
+
+# Transition from json.dumps(sort_keys=True) signing
+
+# When RFC 8785 signing shipped. Fixed, so restarts do not reopen the window
+JCS_CUTOVER = "2026-10-16T00:00:00+00:00"
+
+_legacy_fallbacks: Dict[str, int] = defaultdict(int)
+
+
+def _cutover_timestamp() -> float:
+    value = os.getenv("BAIS_JCS_CUTOVER") or JCS_CUTOVER
+    try:
+        cutover = datetime.fromisoformat(value)
+    except ValueError:
+        logger.error(f"❌ Invalid BAIS_JCS_CUTOVER {value!r}; using {JCS_CUTOVER}")
+        cutover = datetime.fromisoformat(JCS_CUTOVER)
+    if cutover.tzinfo is None:
+        cutover = cutover.replace(tzinfo=timezone.utc)
+    return cutover.timestamp()
+
+
+def legacy_signatures_accepted(now: Optional[float] = None) -> bool:
+    """True while pre-RFC 8785 signatures can still be inside their max age"""
+    deadline = _cutover_timestamp() + AP2Limits.MANDATE_SIGNATURE_MAX_AGE_SECONDS
+    return (time.time() if now is None else now) < deadline
+
+
+def legacy_json(value: Any, separators: Optional[Tuple[str, str]] = None) -> bytes:
+    """The json.dumps(sort_keys=True) bytes signatures covered before RFC 8785; verification only"""
+    return json.dumps(value, sort_keys=True, separators=separators).encode("utf-8")
+
+
+def record_legacy_fallback(verifier: str) -> None:
+    """Count a signature that verified only under the legacy encoding"""
+    _legacy_fallbacks[verifier] += 1
+    if _legacy_fallbacks[verifier] == 1:
+        logger.warning(f"⚠️ {verifier} accepted a legacy json.dumps signature; RFC 8785 is required after the transition")
+    try:
+        from ..monitoring.metrics import ap2_legacy_signature_fallbacks
+        ap2_legacy_signature_fallbacks.labels(verifier=verifier).inc()
+    except Exception:
+        pass  # Loaded outside the package, or without prometheus_client
+
+
+def get_legacy_fallback_stats() -> Dict[str, Any]:
+    """Legacy-encoding signature acceptances per verifier, and whether the window is open"""
+    return {
+        "accepting": legacy_signatures_accepted(),
+        "fallbacks": dict(_legacy_fallbacks),
+    }
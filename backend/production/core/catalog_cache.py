@@ -0,0 +1,331 @@
+"""
+BAIS Business Catalog Cache
+Read-through cache for the universal tool catalog reads (search and services)
+
+Two tiers: an in-process LRU with TTL and a size bound, and an optional shared
+Redis tier through CacheManager. Writes (business registration and updates)
+invalidate both tiers. Other workers drop their in-process copies when the short
+local TTL lapses. Redis entries are keyed by generation counters: one for all
+searches, one per business for its services, and one for all services. A write
+is an INCR from any worker, with no key scan and no need to know which database
+scopes other workers have cached under.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .constants import CacheLimits
+
+logger = logging.getLogger(__name__)
+
+
+KEY_PREFIX = "bais:catalog"
+SEARCH_GENERATION_KEY = f"{KEY_PREFIX}:search:generation"
+SERVICES_GENERATION_KEY = f"{KEY_PREFIX}:services-generation"
+
+# Generation INCRs this process has sent off the event loop and not yet finished
+_pending_invalidations: Set[asyncio.Task] = set()
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a key"""
+    return " ".join((value or "").lower().split())
+
+
+def normalize_business_id(business_id: Optional[str]) -> str:
+    """Canonical form of a business external_id"""
+    return normalize_text(business_id).replace("_", "-")
+
+
+@dataclass
+class CatalogCacheStats:
+    """Counters for sizing the catalog cache"""
+    hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = asdict(self)
+        lookups = self.hits + self.redis_hits + self.misses
+        stats["hit_rate"] = round((self.hits + self.redis_hits) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+class LRUTTLCache:
+    """Thread-safe LRU with per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, stats: CatalogCacheStats):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = stats
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.stats.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class BusinessCatalogCache:
+    """Two-tier cache for bais_search_businesses and bais_get_business_services results"""
+
+    def __init__(
+        self,
+        cache_manager=None,
+        max_entries: int = CacheLimits.CATALOG_LOCAL_MAX_ENTRIES,
+        local_ttl_seconds: float = CacheLimits.CATALOG_LOCAL_TTL_SECONDS,
+        redis_ttl_seconds: int = CacheLimits.CATALOG_REDIS_TTL_SECONDS
+    ):
+        self.stats = CatalogCacheStats()
+        self.local = LRUTTLCache(max_entries, local_ttl_seconds, self.stats)
+        self.cache_manager = cache_manager
+        self.redis_ttl_seconds = redis_ttl_seconds
+        # Requested ID variant -> canonical external_id, learned from successful
+        # lookups; bounded like the entries, since IDs come from LLM tool calls
+        self._aliases = LRUTTLCache(max_entries, redis_ttl_seconds, CatalogCacheStats())
+
+    # Keys
+
+    @staticmethod
+    def _search_key(scope: str, query: Optional[str], category: Optional[str], location: Optional[str]) -> str:
+        digest = hashlib.md5(json.dumps(
+            [scope, normalize_text(query), normalize_text(category), normalize_text(location)]
+        ).encode()).hexdigest()
+        return f"{KEY_PREFIX}:search:{digest}"
+
+    @staticmethod
+    def _services_key(scope: str, business_id: str) -> str:
+        scope_digest = hashlib.md5(scope.encode()).hexdigest()[:12]
+        return f"{KEY_PREFIX}:services:{normalize_business_id(business_id)}:{scope_digest}"
+
+    @staticmethod
+    def _services_generation_keys(business_id: str) -> Tuple[str, ...]:
+        return SERVICES_GENERATION_KEY, f"{SERVICES_GENERATION_KEY}:{normalize_business_id(business_id)}"
+
+    # Reads
+
+    async def get_search(self, scope: str, query: Optional[str], category: Optional[str],
+                         location: Optional[str]) -> Optional[Any]:
+        return await self._get(self._search_key(scope, query, category, location), (SEARCH_GENERATION_KEY,))
+
+    async def get_services(self, scope: str, business_id: str) -> Optional[Any]:
+        canonical = self._aliases.get(normalize_business_id(business_id)) or business_id
+        return await self._get(self._services_key(scope, canonical), self._services_generation_keys(canonical))
+
+    async def _get(self, key: str, generations: Tuple[str, ...]) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            self.stats.hits += 1
+            return value
+
+        if self.cache_manager is not None:
+            await self._invalidations_published()
+            value = await asyncio.to_thread(self._redis_get, key, generations)
+            if value is not None:
+                self.stats.redis_hits += 1
+                self.local.set(key, value)
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    # Writes
+
+    async def set_search(self, scope: str, query: Optional[str], category: Optional[str],
+                         location: Optional[str], value: Any) -> None:
+        await self._set(self._search_key(scope, query, category, location), value, (SEARCH_GENERATION_KEY,))
+
+    async def set_services(self, scope: str, business_id: str, value: Dict[str, Any]) -> None:
+        canonical = normalize_business_id(value.get("business_id") or business_id)
+        if normalize_business_id(business_id) != canonical:
+            self._aliases.set(normalize_business_id(business_id), canonical)
+        await self._set(self._services_key(scope, canonical), value, self._services_generation_keys(canonical))
+
+    async def _set(self, key: str, value: Any, generations: Tuple[str, ...]) -> None:
+        self.local.set(key, value)
+        if self.cache_manager is not None:
+            await asyncio.to_thread(self._redis_set, key, value, generations)
+
+    # Redis tier (sync client, run off the event loop)
+
+    def _shared_key(self, key: str, generations: Tuple[str, ...]) -> Optional[str]:
+        """
+        Shared keys carry their invalidation generations. None if they cannot be
+        read: a key built on a stale generation could serve invalidated data.
+        """
+        try:
+            values = self.cache_manager.redis_client.mget(list(generations))
+        except Exception as e:
+            logger.debug(f"Catalog cache generation read failed: {e}")
+            return None
+        return f"{key}:g" + ".".join(str(int(value or 0)) for value in values)
+
+    def _redis_get(self, key: str, generations: Tuple[str, ...]) -> Optional[Any]:
+        shared_key = self._shared_key(key, generations)
+        return self.cache_manager.get(shared_key) if shared_key else None
+
+    def _redis_set(self, key: str, value: Any, generations: Tuple[str, ...]) -> None:
+        shared_key = self._shared_key(key, generations)
+        if shared_key:
+            self.cache_manager.set(shared_key, value, self.redis_ttl_seconds)
+
+    # Invalidation
+
+    def invalidate_business(self, business_id: Optional[str] = None) -> None:
+        """
+        Drop cached services for a business and every cached search
+        (any search result may include the business).
+        """
+        self.stats.invalidations += 1
+        self.local.delete_prefix(f"{KEY_PREFIX}:search:")
+        if business_id:
+            self.local.delete_prefix(f"{KEY_PREFIX}:services:{normalize_business_id(business_id)}:")
+        else:
+            self.local.delete_prefix(f"{KEY_PREFIX}:services:")
+
+        if self.cache_manager is not None:
+            services_generation = self._services_generation_keys(business_id)[1] if business_id \
+                else SERVICES_GENERATION_KEY
+            generations = (SEARCH_GENERATION_KEY, services_generation)
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self._incr_generations(generations)
+                return
+            # Reached from request handlers: INCR off the event loop
+            task = loop.create_task(asyncio.to_thread(self._incr_generations, generations))
+            _pending_invalidations.add(task)
+            task.add_done_callback(_pending_invalidations.discard)
+
+    def _incr_generations(self, generations: Tuple[str, ...]) -> None:
+        """Bump the generations in one round trip"""
+        try:
+            pipe = self.cache_manager.redis_client.pipeline(transaction=False)
+            for generation in generations:
+                pipe.incr(generation)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Catalog cache Redis invalidation failed: {e}")
+
+    @staticmethod
+    async def _invalidations_published() -> None:
+        """Wait for this worker's in-flight INCRs, so a read cannot refill from a stale generation"""
+        loop = asyncio.get_running_loop()
+        pending = [task for task in _pending_invalidations if task.get_loop() is loop]
+        if pending:
+            await asyncio.wait(pending)
+
+    def clear(self) -> None:
+        """Drop every in-process entry (tests, admin)"""
+        self.local.clear()
+        self._aliases.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats["local_entries"] = len(self.local)
+        stats["local_max_entries"] = self.local.max_entries
+        stats["redis_enabled"] = self.cache_manager is not None
+        return stats
+
+
+# Singleton instance
+_catalog_cache: Optional[BusinessCatalogCache] = None
+_catalog_cache_lock = threading.Lock()
+
+
+def get_catalog_cache() -> BusinessCatalogCache:
+    """Get singleton catalog cache (Redis tier only when REDIS_URL is configured)"""
+    global _catalog_cache
+    if _catalog_cache is None:
+        with _catalog_cache_lock:
+            if _catalog_cache is None:
+                cache_manager = None
+                redis_url = os.getenv("REDIS_URL")
+                if redis_url:
+                    try:
+                        from .cache_manager import CacheManager
+                        cache_manager = CacheManager(redis_url)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Catalog cache running without Redis tier: {e}")
+                _catalog_cache = BusinessCatalogCache(cache_manager=cache_manager)
+    return _catalog_cache
+
+
+def _loaded_catalog_caches():
+    # This module is importable as core.* and backend.production.core.*, and each
+    # copy holds its own singleton
+    for module_name in {__name__, "core.catalog_cache", "backend.production.core.catalog_cache"}:
+        cache = getattr(sys.modules.get(module_name), "_catalog_cache", None)
+        if cache is not None:
+            yield cache
+
+
+def get_catalog_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters summed over every loaded catalog cache"""
+    totals = CatalogCacheStats()
+    local_entries = 0
+    redis_enabled = False
+    for cache in _loaded_catalog_caches():
+        for counter, value in asdict(cache.stats).items():
+            setattr(totals, counter, getattr(totals, counter) + value)
+        local_entries += len(cache.local)
+        redis_enabled = redis_enabled or cache.cache_manager is not None
+    stats = totals.to_dict()
+    stats["local_entries"] = local_entries
+    stats["local_max_entries"] = CacheLimits.CATALOG_LOCAL_MAX_ENTRIES
+    stats["redis_enabled"] = redis_enabled
+    return stats
+
+
+def invalidate_catalog_cache(business_id: Optional[str] = None) -> None:
+    """Publish a catalog write: drop cached searches and the business's services"""
+    for cache in _loaded_catalog_caches():
+        try:
+            cache.invalidate_business(business_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Catalog cache invalidation failed: {e}")
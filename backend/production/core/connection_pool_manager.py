@@ -379,3 +379,13 @@ REGISTRY_POOL_CONFIG = ConnectionPoolConfig(
     retries=2,
     backoff_factor=0.1
 )
+
+WEBHOOK_POOL_CONFIG = ConnectionPoolConfig(
+    max_connections=4,
+    max_keepalive_connections=4,
+    keepalive_expiry=60,
+    connect_timeout=5,
+    read_timeout=10,
+    retries=0,  # WebhookDispatcher schedules its own retries
+    backoff_factor=0.0
+)
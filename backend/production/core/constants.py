@@ -115,6 +115,10 @@ class WorkflowLimits:
     # Retry configuration
     MAX_RETRY_ATTEMPTS_PER_STEP: Final[int] = 10
     DEFAULT_RETRY_ATTEMPTS: Final[int] = 3
+    
+    # Workflow event bus
+    EVENT_HISTORY_SIZE: Final[int] = 1000  # Recent events kept for get_event_history
+    LISTENER_QUEUE_SIZE: Final[int] = 1000  # Pending events per listener before its overflow policy applies
 
 
 class IntegrationLimits:
@@ -169,10 +173,22 @@ class SSEConnectionLimits:
     # Queue limits
     MAX_QUEUE_SIZE: Final[int] = 100  # Prevents memory issues
     QUEUE_CLEANUP_INTERVAL_SECONDS: Final[int] = 300  # 5 minutes cleanup cycle
+    TASK_STREAM_QUEUE_SIZE: Final[int] = 100  # Per-subscriber A2A task stream queue
+    BACKPRESSURE_POLICY: Final[str] = "coalesce"  # drop_newest | drop_oldest | coalesce | disconnect
+    MAX_DROPS_BEFORE_DISCONNECT: Final[int] = 50  # Slow-consumer limit for the disconnect policy
     
     # Event limits
     MAX_EVENT_SIZE_BYTES: Final[int] = 1024 * 1024  # 1MB max event size
     MAX_EVENTS_PER_SECOND: Final[int] = 100  # Rate limiting for events
+    
+    # Cross-worker backplane
+    BACKPLANE_STREAM_MAXLEN: Final[int] = 10000  # Approximate cap per Redis stream
+    BACKPLANE_BLOCK_MS: Final[int] = 1000  # XREAD block; also bounds pickup of new channels
+    BACKPLANE_READ_COUNT: Final[int] = 100  # Entries per XREAD call
+    BACKPLANE_RETRY_SECONDS: Final[float] = 1.0  # Back-off after a Redis read error
+    
+    # Last-Event-ID replay
+    REPLAY_BUFFER_SIZE: Final[int] = 1000  # Events retained per topic for reconnecting clients
 
 
 class A2ALimits:
@@ -203,16 +219,27 @@ class AP2Limits:
     MANDATE_EXPIRY_HOURS: Final[int] = 24  # Default mandate expiry
     MAX_MANDATE_AMOUNT: Final[float] = 50000.0  # Max mandate amount
     MANDATE_SIGNATURE_TIMEOUT_SECONDS: Final[int] = 30  # Signature timeout
+    MANDATE_SIGNATURE_MAX_AGE_SECONDS: Final[int] = 24 * 3600  # Oldest mandate signature accepted; nonces are remembered this long
     
     # Webhook limits
     WEBHOOK_SIGNATURE_TIMEOUT_SECONDS: Final[int] = 300  # 5 minutes for timestamp validation
     WEBHOOK_REPLAY_WINDOW_SECONDS: Final[int] = 300  # 5 minutes replay protection
     MAX_WEBHOOK_RETRIES: Final[int] = 3  # Webhook delivery retries
     
+    # Replay protection store
+    REPLAY_WINDOW_CAPACITY: Final[int] = 1000000  # Keys per window before the Bloom false positive rate rises
+    REPLAY_FALSE_POSITIVE_RATE: Final[float] = 1e-9  # Chance a fresh key is reported as a replay
+    REPLAY_BUCKETS: Final[int] = 6  # Rotating Bloom filters per window (a key lives at most one bucket longer)
+    REPLAY_CLAIM_LEASE_SECONDS: Final[int] = 60  # A claimed but uncommitted key is freed after this (worker crashed mid-processing)
+    
     # Key management limits
     KEY_ROTATION_DAYS: Final[int] = 90  # Key rotation interval
     MAX_KEY_SIZE_BITS: Final[int] = 4096  # Maximum key size
     MIN_KEY_SIZE_BITS: Final[int] = 2048  # Minimum key size
+    
+    # Crypto execution limits
+    CRYPTO_WORKER_THREADS: Final[int] = 4  # Threads running RSA sign/verify off the event loop
+    PUBLIC_KEY_CACHE_SIZE: Final[int] = 1024  # Parsed public keys kept by PEM hash or key id
 
 
 class MCPLimits:
@@ -236,7 +263,32 @@ class MCPLimits:
     MAX_SUBSCRIPTIONS_PER_CLIENT: Final[int] = 100  # Client subscription limit
     DEFAULT_SUBSCRIPTION_EXPIRY_HOURS: Final[int] = 24  # Default expiry
     MAX_SUBSCRIPTION_FILTERS: Final[int] = 20  # Max filter criteria
+    MAX_SUBSCRIPTION_URI_PATTERNS: Final[int] = 10  # Regexes per filter (each is a fullmatch per event)
+    MAX_URI_PATTERN_LENGTH: Final[int] = 256  # Characters per regex
     SUBSCRIPTION_CLEANUP_INTERVAL_SECONDS: Final[int] = 300  # 5 minutes cleanup
+    MAX_CONCURRENT_NOTIFICATIONS: Final[int] = 50  # In-flight deliveries per published event
+
+
+class WebhookLimits:
+    """Outbound webhook (subscription callback) delivery limits"""
+    # Retries
+    MAX_ATTEMPTS: Final[int] = 8  # Attempts before dead-lettering
+    BASE_BACKOFF_SECONDS: Final[float] = 1.0  # First retry delay
+    MAX_BACKOFF_SECONDS: Final[float] = 300.0  # 5 minutes max retry delay
+    
+    # Concurrency
+    MAX_IN_FLIGHT: Final[int] = 200  # Deliveries being sent, all destinations
+    MAX_CONCURRENT_PER_DESTINATION: Final[int] = 4  # Concurrent POSTs per origin
+    
+    # Batching
+    MAX_BATCH_SIZE: Final[int] = 50  # Notifications per batched POST
+    
+    # Worker
+    REQUEST_TIMEOUT_SECONDS: Final[float] = 10.0  # Per POST
+    CLAIM_LEASE_SECONDS: Final[int] = 120  # Claimed deliveries return to the queue after this
+    CLAIM_SCAN_MAX: Final[int] = 1000  # Due deliveries examined per claim when skipping busy destinations
+    POLL_INTERVAL_SECONDS: Final[float] = 1.0  # Idle wait between outbox checks
+    DEAD_LETTER_MAX: Final[int] = 1000  # Dead-lettered deliveries kept for inspection
 
 
 class CircuitBreakerLimits:
@@ -278,6 +330,33 @@ class CacheLimits:
     # Eviction limits
     CACHE_CLEANUP_INTERVAL_SECONDS: Final[int] = 600  # 10 minutes cleanup
     MAX_CACHE_ENTRIES: Final[int] = 10000  # Maximum cache entries
+    
+    # Async cache manager
+    CACHE_EARLY_EXPIRY_BETA: Final[float] = 1.0  # XFetch beta; >1 refreshes earlier
+    CACHE_SCAN_BATCH_SIZE: Final[int] = 500  # Keys per SCAN page / UNLINK batch
+    
+    # Business catalog cache (universal tool results)
+    CATALOG_LOCAL_MAX_ENTRIES: Final[int] = 2048  # In-process LRU bound
+    CATALOG_LOCAL_TTL_SECONDS: Final[int] = 60  # Short, so other workers converge after writes
+    CATALOG_REDIS_TTL_SECONDS: Final[int] = 300  # Shared tier TTL
+
+
+class SearchLimits:
+    """Business search and indexing limits"""
+    DEFAULT_RESULT_LIMIT: Final[int] = 10  # Results returned to the LLM per search
+    MAX_SERVICES_PER_RESULT: Final[int] = 5  # Keeps tool results compact
+    MIN_TOKEN_LENGTH: Final[int] = 3  # Shorter words are too unselective to index
+    MAX_PREFIX_EXPANSIONS: Final[int] = 20  # Bounds fan-out of partial-word queries
+    INDEX_REFRESH_SECONDS: Final[int] = 300  # Rebuild interval for in-process DB mirrors
+    GEO_GRID_CELL_DEGREES: Final[float] = 0.25  # ~28km grid cells for the in-process geo index
+    GEO_MAX_RADIUS_KM: Final[float] = 500.0  # Horizon for nearest-business search without a radius
+
+
+class ToolExecutionLimits:
+    """LLM tool call scheduling limits (per model turn)"""
+    MAX_CONCURRENT_TOOL_CALLS: Final[int] = 4  # Bounds database pool use per conversation
+    DEFAULT_TOOL_TIMEOUT_SECONDS: Final[float] = 15.0  # Catalog lookups
+    EXECUTE_SERVICE_TIMEOUT_SECONDS: Final[float] = 30.0  # Bookings may call out to business systems
 
 
 class LoggingLimits:
@@ -403,6 +482,14 @@ class BusinessConstants:
     MIN_BOOKING_ADVANCE_HOURS: Final[int] = 1  # 1 hour minimum advance
     MAX_BOOKING_DURATION_DAYS: Final[int] = 30  # 30 days max duration
     
+    # Appointment slot grid
+    DEFAULT_OPENING_MINUTE: Final[int] = 9 * 60  # 09:00
+    DEFAULT_CLOSING_MINUTE: Final[int] = 17 * 60  # 17:00, last slot starts before this
+    DEFAULT_SLOT_MINUTES: Final[int] = 30  # Slot length
+    MAX_AVAILABILITY_RANGE_DAYS: Final[int] = 92  # Longest date range one availability search covers
+    DEFAULT_AVAILABILITY_DAYS: Final[int] = 7  # Horizon of the availability:// resource without a range
+    AVAILABILITY_REFRESH_SECONDS: Final[int] = 30  # Loaded days are re-read from the Booking table after this
+    
     # Pricing constraints
     MAX_PRICE_DECIMAL_PLACES: Final[int] = 2  # Standard currency precision
     MIN_PRICE: Final[float] = 0.01  # Minimum price
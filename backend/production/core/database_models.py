@@ -9,13 +9,21 @@ from sqlalchemy import (
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
-from sqlalchemy import create_engine, event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import create_engine, event, inspect, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from datetime import datetime
 import uuid
 from typing import Dict, List, Any, Optional, TYPE_CHECKING
 from pydantic import BaseModel
+import asyncio
 import json
+import logging
 import os
+import threading
+
+logger = logging.getLogger(__name__)
 
 # Use compatible types that work with both PostgreSQL and SQLite
 # String(36) for UUIDs works with both databases
@@ -327,6 +335,10 @@ class Booking(Base):
         Index('idx_booking_business_status', 'business_id', 'status'),
         Index('idx_booking_service_date', 'service_date'),
         Index('idx_booking_customer_email', 'customer_email'),
+        # One live booking per slot; cancelled bookings free the slot
+        Index('uq_booking_active_slot', 'business_id', 'service_id', 'service_date', unique=True,
+              postgresql_where=text("status <> 'cancelled'"),
+              sqlite_where=text("status <> 'cancelled'")),
         CheckConstraint('total_amount >= 0', name='positive_amount'),
     )
 
@@ -365,6 +377,48 @@ class BusinessMetrics(Base):
         Index('idx_metrics_business_date', 'business_id', 'metric_date'),
     )
 
+# create_all() adds indexes only to new tables; bookings tables that predate the
+# slot index get it from this statement at startup
+BOOKING_SLOT_INDEX_DDL = (
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_booking_active_slot "
+    "ON bookings (business_id, service_id, service_date) WHERE status <> 'cancelled'"
+)
+
+
+def ensure_booking_slot_index(engine) -> bool:
+    """
+    Add the one-live-booking-per-slot index to an existing bookings table.
+    Fails while the table holds two live bookings for one slot; those must be
+    cancelled first, and until then concurrent bookings are not race-free.
+    """
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(BOOKING_SLOT_INDEX_DDL))
+        return True
+    except Exception as e:
+        logger.error(f"❌ Could not create uq_booking_active_slot, slots can be double-booked: {e}")
+        return False
+
+
+def booking_slot_index_present(connection) -> bool:
+    """Whether the bookings table (if any) has the unique active-slot index"""
+    inspector = inspect(connection)
+    if not inspector.has_table("bookings"):
+        return True
+    return any(index["name"] == "uq_booking_active_slot" for index in inspector.get_indexes("bookings"))
+
+
+def _touch_updated_at(mapper, connection, target):
+    target.updated_at = datetime.utcnow()
+
+
+def _setup_timestamp_listeners():
+    """Setup database event listeners (shared by the sync and async managers)"""
+    for model in (Business, BusinessService):
+        if not event.contains(model, 'before_update', _touch_updated_at):
+            event.listen(model, 'before_update', _touch_updated_at)
+
+
 # Database session management
 class DatabaseManager:
     """Database connection and session management"""
@@ -394,18 +448,18 @@ class DatabaseManager:
     
     def _setup_event_listeners(self):
         """Setup database event listeners"""
-        
-        @event.listens_for(Business, 'before_update')
-        def business_before_update(mapper, connection, target):
-            target.updated_at = datetime.utcnow()
-        
-        @event.listens_for(BusinessService, 'before_update')
-        def service_before_update(mapper, connection, target):
-            target.updated_at = datetime.utcnow()
+        _setup_timestamp_listeners()
     
     def create_tables(self):
         """Create all database tables"""
         Base.metadata.create_all(bind=self.engine)
+        ensure_booking_slot_index(self.engine)
+        if self.engine.dialect.name == "postgresql":
+            # Full-text, trigram and spatial indexes for bais_search_businesses
+            from .business_search_index import ensure_postgres_search_index
+            from .geo_index import ensure_postgres_geo_index
+            ensure_postgres_search_index(self.engine)
+            ensure_postgres_geo_index(self.engine)
     
     def get_session(self):
         """Get database session"""
@@ -421,15 +475,7 @@ class DatabaseManager:
         session = self.get_session()
         try:
             business = session.query(Business).filter(Business.id == business_id).first()
-            if business:
-                return {
-                    'id': str(business.id),
-                    'name': business.name,
-                    'business_type': business.business_type,
-                    'category': business.business_type,  # Using business_type as category
-                    'status': business.status
-                }
-            return None
+            return _business_summary(business) if business else None
         finally:
             session.close()
     
@@ -438,16 +484,7 @@ class DatabaseManager:
         session = self.get_session()
         try:
             businesses = session.query(Business).filter(Business.status == 'active').all()
-            return [
-                {
-                    'id': str(business.id),
-                    'name': business.name,
-                    'business_type': business.business_type,
-                    'category': business.business_type,
-                    'status': business.status
-                }
-                for business in businesses
-            ]
+            return [_business_summary(business) for business in businesses]
         finally:
             session.close()
     
@@ -461,25 +498,7 @@ class DatabaseManager:
                 AgentInteraction.created_at >= start_date,
                 AgentInteraction.created_at <= end_date
             ).all()
-            
-            transactions = []
-            for interaction in interactions:
-                # Extract amount from metadata if available
-                amount = 0
-                if interaction.metadata and 'amount' in interaction.metadata:
-                    amount = float(interaction.metadata['amount'])
-                
-                transactions.append({
-                    'id': str(interaction.id),
-                    'business_id': str(interaction.business_id),
-                    'user_id': str(interaction.user_id) if interaction.user_id else None,
-                    'amount': amount,
-                    'ai_provider': interaction.metadata.get('ai_provider', 'unknown') if interaction.metadata else 'unknown',
-                    'service_id': interaction.metadata.get('service_id') if interaction.metadata else None,
-                    'created_at': interaction.created_at.isoformat()
-                })
-            
-            return transactions
+            return [_interaction_transaction(interaction, include_service=True) for interaction in interactions]
         finally:
             session.close()
     
@@ -491,23 +510,7 @@ class DatabaseManager:
                 AgentInteraction.created_at >= start_date,
                 AgentInteraction.created_at <= end_date
             ).all()
-            
-            transactions = []
-            for interaction in interactions:
-                amount = 0
-                if interaction.metadata and 'amount' in interaction.metadata:
-                    amount = float(interaction.metadata['amount'])
-                
-                transactions.append({
-                    'id': str(interaction.id),
-                    'business_id': str(interaction.business_id),
-                    'user_id': str(interaction.user_id) if interaction.user_id else None,
-                    'amount': amount,
-                    'ai_provider': interaction.metadata.get('ai_provider', 'unknown') if interaction.metadata else 'unknown',
-                    'created_at': interaction.created_at.isoformat()
-                })
-            
-            return transactions
+            return [_interaction_transaction(interaction) for interaction in interactions]
         finally:
             session.close()
     
@@ -519,20 +522,175 @@ class DatabaseManager:
                 BusinessService.business_id == business_id,
                 BusinessService.enabled == True
             ).all()
-            
-            return [
-                {
-                    'id': str(service.id),
-                    'name': service.name,
-                    'description': service.description,
-                    'category': service.category,
-                    'status': 'active' if service.enabled else 'inactive'
-                }
-                for service in services
-            ]
+            return [_service_summary(service) for service in services]
         finally:
             session.close()
 
+
+def to_async_database_url(database_url: str):
+    """
+    Map a sync database URL onto its asyncio driver
+    (postgresql -> asyncpg, sqlite -> aiosqlite). Returns (url, connect_args).
+    """
+    if database_url.startswith('postgres://'):
+        database_url = 'postgresql://' + database_url[len('postgres://'):]
+    url = make_url(database_url)
+    connect_args: Dict[str, Any] = {}
+    
+    if url.get_backend_name() == 'postgresql':
+        # asyncpg does not understand libpq's sslmode query parameter
+        sslmode = url.query.get('sslmode')
+        if sslmode:
+            url = url.difference_update_query(['sslmode'])
+            if sslmode != 'disable':
+                connect_args['ssl'] = sslmode
+        url = url.set(drivername='postgresql+asyncpg')
+        connect_args['timeout'] = 10
+    elif url.get_backend_name() == 'sqlite':
+        url = url.set(drivername='sqlite+aiosqlite')
+        connect_args['timeout'] = 10
+    
+    return url, connect_args
+
+
+class AsyncDatabaseManager:
+    """
+    Async counterpart of DatabaseManager (SQLAlchemy asyncio on asyncpg/aiosqlite).
+    Queries await the driver instead of blocking the event loop.
+    """
+    
+    is_async = True
+    
+    def __init__(self, database_url: str):
+        url, connect_args = to_async_database_url(database_url)
+        pool_args: Dict[str, Any] = {}
+        if url.get_backend_name() == 'sqlite':
+            # aiosqlite defaults to NullPool, which starts a connection thread per session
+            pool_args['poolclass'] = AsyncAdaptedQueuePool
+        self.engine = create_async_engine(
+            url,
+            pool_size=10,
+            max_overflow=20,
+            pool_pre_ping=True,
+            pool_recycle=3600,
+            connect_args=connect_args,
+            pool_timeout=10,
+            **pool_args
+        )
+        self.SessionLocal = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        _setup_timestamp_listeners()
+    
+    async def create_tables(self):
+        """Create all database tables"""
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with self.engine.connect() as connection:
+            await connection.run_sync(lambda sync_connection: ensure_booking_slot_index(sync_connection.engine))
+        if self.engine.dialect.name == "postgresql":
+            from .business_search_index import ensure_postgres_search_index
+            from .geo_index import ensure_postgres_geo_index
+            async with self.engine.connect() as connection:
+                await connection.run_sync(lambda sync_connection: ensure_postgres_search_index(sync_connection.engine))
+                await connection.run_sync(lambda sync_connection: ensure_postgres_geo_index(sync_connection.engine))
+    
+    def get_session(self) -> AsyncSession:
+        """Get database session (use as ``async with``)"""
+        return self.SessionLocal()
+    
+    async def run_sync(self, fn, *args, **kwargs):
+        """
+        Run sync ORM code ``fn(session, *args, **kwargs)`` against an async session.
+        Lazy loads inside ``fn`` are awaited on the driver, not blocking the loop.
+        """
+        async with self.get_session() as session:
+            return await session.run_sync(fn, *args, **kwargs)
+    
+    async def close(self):
+        """Close database connections"""
+        await self.engine.dispose()
+    
+    # Dashboard-specific methods
+    async def get_business_by_id(self, business_id: str) -> Optional[Dict[str, Any]]:
+        """Get business by ID"""
+        async with self.get_session() as session:
+            business = await session.scalar(select(Business).where(Business.id == business_id))
+            return _business_summary(business) if business else None
+    
+    async def get_all_businesses(self) -> List[Dict[str, Any]]:
+        """Get all businesses"""
+        async with self.get_session() as session:
+            businesses = await session.scalars(select(Business).where(Business.status == 'active'))
+            return [_business_summary(business) for business in businesses]
+    
+    async def get_business_transactions(self, business_id: str, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """Get business transactions within date range"""
+        async with self.get_session() as session:
+            interactions = await session.scalars(select(AgentInteraction).where(
+                AgentInteraction.business_id == business_id,
+                AgentInteraction.created_at >= start_date,
+                AgentInteraction.created_at <= end_date
+            ))
+            return [_interaction_transaction(interaction, include_service=True) for interaction in interactions]
+    
+    async def get_all_transactions(self, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+        """Get all transactions within date range"""
+        async with self.get_session() as session:
+            interactions = await session.scalars(select(AgentInteraction).where(
+                AgentInteraction.created_at >= start_date,
+                AgentInteraction.created_at <= end_date
+            ))
+            return [_interaction_transaction(interaction) for interaction in interactions]
+    
+    async def get_business_services(self, business_id: str) -> List[Dict[str, Any]]:
+        """Get business services"""
+        async with self.get_session() as session:
+            services = await session.scalars(select(BusinessService).where(
+                BusinessService.business_id == business_id,
+                BusinessService.enabled == True
+            ))
+            return [_service_summary(service) for service in services]
+
+
+def _business_summary(business: Business) -> Dict[str, Any]:
+    return {
+        'id': str(business.id),
+        'name': business.name,
+        'business_type': business.business_type,
+        'category': business.business_type,  # Using business_type as category
+        'status': business.status
+    }
+
+
+def _interaction_transaction(interaction: AgentInteraction, include_service: bool = False) -> Dict[str, Any]:
+    # Extract amount from metadata if available
+    amount = 0
+    if interaction.metadata and 'amount' in interaction.metadata:
+        amount = float(interaction.metadata['amount'])
+    
+    transaction = {
+        'id': str(interaction.id),
+        'business_id': str(interaction.business_id),
+        'user_id': str(interaction.user_id) if interaction.user_id else None,
+        'amount': amount,
+        'ai_provider': interaction.metadata.get('ai_provider', 'unknown') if interaction.metadata else 'unknown',
+    }
+    if include_service:
+        transaction['service_id'] = interaction.metadata.get('service_id') if interaction.metadata else None
+    transaction['created_at'] = interaction.created_at.isoformat()
+    return transaction
+
+
+def _service_summary(service: BusinessService) -> Dict[str, Any]:
+    return {
+        'id': str(service.id),
+        'name': service.name,
+        'description': service.description,
+        'category': service.category,
+        'status': 'active' if service.enabled else 'inactive'
+    }
+
 # Repository pattern for clean data access
 class BusinessRepository:
     """Repository for business data operations"""
@@ -564,6 +722,11 @@ class BusinessRepository:
                 setattr(business, key, value)
             self.db.commit()
             self.db.refresh(business)
+            # Publish the write to cached catalog reads and the search mirrors
+            from .business_search_index import invalidate_search_indexes
+            from .catalog_cache import invalidate_catalog_cache
+            invalidate_search_indexes()
+            invalidate_catalog_cache(business.external_id)
         return business
     
     def list_businesses(self, criteria: 'BusinessSearchCriteria') -> List[Business]:
@@ -702,6 +865,95 @@ class MetricsRepository:
         # Implementation needs calculate daily totals from interaction and booking data
         pass
 
+# Process-wide engine registry: one manager (and connection pool) per database URL,
+# so requests reuse warm connections instead of building an engine each time
+_database_managers: Dict[str, DatabaseManager] = {}
+_async_database_managers: Dict[str, AsyncDatabaseManager] = {}
+_database_managers_lock = threading.Lock()
+
+
+def get_database_manager(database_url: str) -> DatabaseManager:
+    """Get the shared DatabaseManager for a URL"""
+    manager = _database_managers.get(database_url)
+    if manager is None:
+        with _database_managers_lock:
+            manager = _database_managers.get(database_url)
+            if manager is None:
+                manager = DatabaseManager(database_url)
+                _database_managers[database_url] = manager
+                logger.info("🔌 Created shared database engine")
+    return manager
+
+
+def get_async_database_manager(database_url: str) -> AsyncDatabaseManager:
+    """Get the shared AsyncDatabaseManager for a URL"""
+    manager = _async_database_managers.get(database_url)
+    if manager is None:
+        with _database_managers_lock:
+            manager = _async_database_managers.get(database_url)
+            if manager is None:
+                manager = AsyncDatabaseManager(database_url)
+                _async_database_managers[database_url] = manager
+                logger.info("🔌 Created shared async database engine")
+    return manager
+
+
+def get_request_database_manager(database_url: str):
+    """
+    Shared manager for request handlers: async when its driver (asyncpg/aiosqlite)
+    is installed, otherwise the sync DatabaseManager.
+    """
+    try:
+        return get_async_database_manager(database_url)
+    except ImportError as e:
+        logger.warning(f"⚠️ Async database driver unavailable, using sync engine: {e}")
+        return get_database_manager(database_url)
+
+
+def _ping(connection) -> None:
+    connection.execute(text("SELECT 1"))
+
+
+def _check_booking_slot_index(connection) -> None:
+    if not booking_slot_index_present(connection):
+        logger.error(
+            "❌ bookings has no uq_booking_active_slot index: concurrent bookings on different "
+            "workers can take the same slot. Run create_tables() to add it."
+        )
+
+
+async def warmup_database_managers(database_url: str) -> None:
+    """
+    Open the shared pools (connect, TLS and auth handshake) before the first
+    request, and report schema the booking path depends on but lacks.
+    """
+    manager = get_request_database_manager(database_url)
+    if getattr(manager, "is_async", False):
+        async with manager.engine.connect() as connection:
+            await connection.run_sync(_ping)
+            await connection.run_sync(_check_booking_slot_index)
+    else:
+        def ping_sync():
+            with manager.engine.connect() as connection:
+                _ping(connection)
+                _check_booking_slot_index(connection)
+        await asyncio.to_thread(ping_sync)
+    logger.info("✅ Database connection pool warmed up")
+
+
+async def dispose_database_managers() -> None:
+    """Close every shared pool (application shutdown)"""
+    with _database_managers_lock:
+        managers = list(_database_managers.values())
+        async_managers = list(_async_database_managers.values())
+        _database_managers.clear()
+        _async_database_managers.clear()
+    for manager in managers:
+        manager.close()
+    for async_manager in async_managers:
+        await async_manager.close()
+
+
 # Database initialization
 def init_database(database_url: str) -> DatabaseManager:
     """Initialize database with connection and tables"""
@@ -0,0 +1,338 @@
+"""
+BAIS Event Backplane
+Cross-worker pub/sub for the SSE transport and task-stream managers
+
+Client tables live in each worker's memory, so an event published on worker A
+must be relayed to the workers holding the other connections. Managers deliver
+to their own clients directly and publish to the backplane; every other worker
+receives the message and delivers it to its local clients. A worker never
+receives its own messages back.
+
+Owner records (key -> worker id, with a TTL) let a worker tell whether
+something it does not hold, such as a task, is live on another worker.
+
+Shared sequences are counters every worker draws from, so ids such as SSE
+event ids are ordered across workers rather than per worker.
+
+RedisStreamsBackplane is used when REDIS_URL is configured. InProcessBackplane
+connects instances that share a hub, which lets tests run several "workers"
+in one process.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .constants import SSEConnectionLimits
+
+logger = logging.getLogger(__name__)
+
+BACKPLANE_STREAM_PREFIX = "bais:backplane:"
+BACKPLANE_OWNER_PREFIX = "bais:backplane-owner:"
+BACKPLANE_SEQUENCE_PREFIX = "bais:backplane-seq:"
+
+# max(current + 1, floor), atomically
+_NEXT_SEQUENCE_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local value = math.max(current + 1, tonumber(ARGV[1]))
+redis.call('SET', KEYS[1], string.format('%d', value))
+return value
+"""
+
+BackplaneHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class EventBackplane:
+    """Channel -> handler registry; subclasses move messages between workers"""
+
+    def __init__(self, worker_id: Optional[str] = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, List[BackplaneHandler]] = defaultdict(list)
+        self.published = 0
+        self.received = 0
+        self.publish_errors = 0
+        self.sequence_errors = 0
+
+    async def subscribe(self, channel: str, handler: BackplaneHandler) -> None:
+        """Receive other workers' messages on channel"""
+        if handler not in self._handlers[channel]:
+            self._handlers[channel].append(handler)
+        await self._on_subscribe(channel)
+
+    async def unsubscribe(self, channel: str, handler: BackplaneHandler) -> None:
+        handlers = self._handlers.get(channel)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+            if not handlers:
+                del self._handlers[channel]
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> bool:
+        """
+        Relay a message to every other worker. The caller has already delivered
+        it locally, so a backplane outage only costs cross-worker delivery.
+        """
+        try:
+            await self._publish(channel, self.worker_id, message)
+            self.published += 1
+            return True
+        except Exception as e:
+            self.publish_errors += 1
+            logger.error(f"❌ Backplane publish to {channel} failed: {e}")
+            return False
+
+    async def set_owner(self, key: str, ttl_seconds: int) -> bool:
+        """Record this worker as the owner of key for ttl_seconds"""
+        try:
+            await self._set_owner(key, ttl_seconds)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Backplane owner record for {key} failed: {e}")
+            return False
+
+    async def get_owner(self, key: str) -> Optional[str]:
+        """Worker id owning key; None if unowned, expired or the lookup failed"""
+        try:
+            return await self._get_owner(key)
+        except Exception as e:
+            logger.error(f"❌ Backplane owner lookup for {key} failed: {e}")
+            return None
+
+    async def clear_owner(self, key: str) -> None:
+        """Drop key's owner record if this worker holds it"""
+        try:
+            if await self._get_owner(key) == self.worker_id:
+                await self._clear_owner(key)
+        except Exception as e:
+            logger.error(f"❌ Backplane owner release for {key} failed: {e}")
+
+    async def next_sequence(self, name: str, floor: int = 0) -> Optional[int]:
+        """
+        Next value of a counter shared by every worker, at least floor. None if
+        the counter is unreachable; the caller falls back to a local id.
+        """
+        try:
+            return await self._next_sequence(name, floor)
+        except Exception as e:
+            self.sequence_errors += 1
+            logger.error(f"❌ Backplane sequence {name} failed: {e}")
+            return None
+
+    async def _dispatch(self, channel: str, origin: str, message: Dict[str, Any]) -> None:
+        if origin == self.worker_id:
+            return
+        self.received += 1
+        for handler in list(self._handlers.get(channel, ())):
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.error(f"❌ Backplane handler for {channel} failed: {e}")
+
+    async def _publish(self, channel: str, origin: str, message: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def _set_owner(self, key: str, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    async def _get_owner(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    async def _clear_owner(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def _next_sequence(self, name: str, floor: int) -> int:
+        raise NotImplementedError
+
+    async def _on_subscribe(self, channel: str) -> None:
+        """Hook for transports that must start listening on a new channel"""
+
+    async def start(self) -> None:
+        """Start receiving (transports start lazily on first subscribe as well)"""
+
+    async def stop(self) -> None:
+        """Stop receiving"""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "worker_id": self.worker_id,
+            "channels": sorted(self._handlers),
+            "published": self.published,
+            "received": self.received,
+            "publish_errors": self.publish_errors,
+            "sequence_errors": self.sequence_errors,
+        }
+
+
+class InProcessBackplaneHub:
+    """Shared medium for InProcessBackplane instances"""
+
+    def __init__(self):
+        self.members: List["InProcessBackplane"] = []
+        self.owners: Dict[str, Tuple[str, float]] = {}  # key -> (worker id, monotonic expiry)
+        self.sequences: Dict[str, int] = {}
+
+
+class InProcessBackplane(EventBackplane):
+    """Backplane between instances sharing a hub, within one process"""
+
+    def __init__(self, hub: Optional[InProcessBackplaneHub] = None, worker_id: Optional[str] = None):
+        super().__init__(worker_id)
+        self.hub = hub or InProcessBackplaneHub()
+        self.hub.members.append(self)
+
+    async def _publish(self, channel: str, origin: str, message: Dict[str, Any]) -> None:
+        for member in list(self.hub.members):
+            if member is not self:
+                await member._dispatch(channel, origin, message)
+
+    async def _set_owner(self, key: str, ttl_seconds: int) -> None:
+        self.hub.owners[key] = (self.worker_id, time.monotonic() + ttl_seconds)
+
+    async def _get_owner(self, key: str) -> Optional[str]:
+        record = self.hub.owners.get(key)
+        if record is None:
+            return None
+        if record[1] <= time.monotonic():
+            self.hub.owners.pop(key, None)
+            return None
+        return record[0]
+
+    async def _clear_owner(self, key: str) -> None:
+        self.hub.owners.pop(key, None)
+
+    async def _next_sequence(self, name: str, floor: int) -> int:
+        value = max(self.hub.sequences.get(name, 0) + 1, floor)
+        self.hub.sequences[name] = value
+        return value
+
+    async def stop(self) -> None:
+        if self in self.hub.members:
+            self.hub.members.remove(self)
+
+
+class RedisStreamsBackplane(EventBackplane):
+    """
+    Backplane over Redis Streams: one capped stream per channel (XADD MAXLEN ~),
+    read by a single XREAD loop per worker. Streams rather than PUBLISH so a
+    reader that stalls briefly catches up instead of losing messages.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        redis_url: Optional[str] = None,
+        worker_id: Optional[str] = None,
+        maxlen: int = SSEConnectionLimits.BACKPLANE_STREAM_MAXLEN,
+        block_ms: int = SSEConnectionLimits.BACKPLANE_BLOCK_MS
+    ):
+        super().__init__(worker_id)
+        if redis_client is None:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.redis_client = redis_client
+        self.maxlen = maxlen
+        self.block_ms = block_ms
+        self._last_ids: Dict[str, str] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def stream_key(channel: str) -> str:
+        return f"{BACKPLANE_STREAM_PREFIX}{channel}"
+
+    async def _publish(self, channel: str, origin: str, message: Dict[str, Any]) -> None:
+        await self.redis_client.xadd(
+            self.stream_key(channel),
+            {"origin": origin, "data": json.dumps(message, default=str)},
+            maxlen=self.maxlen,
+            approximate=True
+        )
+
+    async def _set_owner(self, key: str, ttl_seconds: int) -> None:
+        await self.redis_client.set(f"{BACKPLANE_OWNER_PREFIX}{key}", self.worker_id, ex=ttl_seconds)
+
+    async def _get_owner(self, key: str) -> Optional[str]:
+        owner = await self.redis_client.get(f"{BACKPLANE_OWNER_PREFIX}{key}")
+        return _decode(owner) if owner is not None else None
+
+    async def _clear_owner(self, key: str) -> None:
+        await self.redis_client.delete(f"{BACKPLANE_OWNER_PREFIX}{key}")
+
+    async def _next_sequence(self, name: str, floor: int) -> int:
+        return int(await self.redis_client.eval(_NEXT_SEQUENCE_SCRIPT, 1, f"{BACKPLANE_SEQUENCE_PREFIX}{name}", floor))
+
+    async def _on_subscribe(self, channel: str) -> None:
+        stream = self.stream_key(channel)
+        if stream not in self._last_ids:
+            # Start after the newest entry; "$" would skip entries written between reads
+            latest = await self.redis_client.xrevrange(stream, count=1)
+            self._last_ids[stream] = _decode(latest[0][0]) if latest else "0-0"
+        await self.start()
+
+    async def start(self) -> None:
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_loop())
+
+    async def stop(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+
+    async def _read_loop(self) -> None:
+        prefix_length = len(BACKPLANE_STREAM_PREFIX)
+        while True:
+            try:
+                if not self._last_ids:
+                    await asyncio.sleep(self.block_ms / 1000)
+                    continue
+                response = await self.redis_client.xread(
+                    dict(self._last_ids),
+                    count=SSEConnectionLimits.BACKPLANE_READ_COUNT,
+                    block=self.block_ms
+                )
+                for stream, entries in response or []:
+                    stream = _decode(stream)
+                    channel = stream[prefix_length:]
+                    for entry_id, fields in entries:
+                        self._last_ids[stream] = _decode(entry_id)
+                        fields = {_decode(key): value for key, value in fields.items()}
+                        await self._dispatch(channel, _decode(fields.get("origin")), json.loads(fields["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Backplane read failed: {e}")
+                await asyncio.sleep(SSEConnectionLimits.BACKPLANE_RETRY_SECONDS)
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+_event_backplane: Optional[EventBackplane] = None
+
+
+def get_event_backplane() -> EventBackplane:
+    """
+    Get the process-wide backplane: Redis Streams when REDIS_URL is set,
+    otherwise in-process. BAIS_EVENT_BACKPLANE=memory|redis overrides.
+    """
+    global _event_backplane
+    if _event_backplane is None:
+        backend = os.getenv("BAIS_EVENT_BACKPLANE", "").lower()
+        redis_url = os.getenv("REDIS_URL")
+        if backend == "redis" or (backend != "memory" and redis_url):
+            _event_backplane = RedisStreamsBackplane(redis_url=redis_url)
+            logger.info("✅ Event backplane: Redis Streams")
+        else:
+            _event_backplane = InProcessBackplane()
+            logger.info("Event backplane: in-process (single worker)")
+    return _event_backplane
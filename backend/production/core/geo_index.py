@@ -0,0 +1,362 @@
+"""
+BAIS Geospatial Business Index
+Radius and nearest-business search for bais_search_businesses
+
+PostgreSQL deployments use PostGIS when the extension is installed, otherwise
+earthdistance (cube) with a GiST expression index. Both filter by radius and
+order by distance through the index. The DDL runs at startup (create_tables);
+searches only read which indexes exist. SQLite deployments and the in-memory
+BUSINESS_STORE use an in-process grid index: rings of cells are visited
+outward from the query point, so cost tracks the businesses nearby rather than
+the whole table.
+"""
+
+import heapq
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .constants import SearchLimits
+
+logger = logging.getLogger(__name__)
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+Coordinates = Tuple[float, float]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _valid(latitude: Any, longitude: Any) -> Optional[Coordinates]:
+    try:
+        latitude, longitude = float(latitude), float(longitude)
+    except (TypeError, ValueError):
+        return None
+    if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+        return latitude, longitude
+    return None
+
+
+def parse_coordinates(near: Any) -> Optional[Coordinates]:
+    """
+    (latitude, longitude) from a tool `near` input: {"latitude", "longitude"}
+    (or lat/lng/lon), a [lat, lon] pair or a "lat,lon" string. None if invalid.
+    """
+    if near is None:
+        return None
+    if isinstance(near, dict):
+        latitude = near.get("latitude", near.get("lat"))
+        longitude = near.get("longitude", near.get("lng", near.get("lon")))
+        return _valid(latitude, longitude)
+    if isinstance(near, str):
+        parts = near.replace(";", ",").split(",")
+        return _valid(*parts) if len(parts) == 2 else None
+    if isinstance(near, (list, tuple)) and len(near) == 2:
+        return _valid(*near)
+    return None
+
+
+def location_coordinates(location: Optional[Dict[str, Any]]) -> Optional[Coordinates]:
+    """Coordinates from a registration `location` block (latitude/longitude or coordinates)"""
+    if not location:
+        return None
+    if location.get("latitude") is not None and location.get("longitude") is not None:
+        return _valid(location["latitude"], location["longitude"])
+    return parse_coordinates(location.get("coordinates"))
+
+
+class GeoGridIndex:
+    """
+    In-process spatial index: businesses bucketed into fixed-size lat/lon cells.
+    Nearest-first search walks rings of cells outward from the query point.
+    """
+
+    def __init__(self, cell_degrees: float = SearchLimits.GEO_GRID_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self._rows = int(math.ceil(180 / cell_degrees))
+        self._columns = int(math.ceil(360 / cell_degrees))
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+        self._points: Dict[str, Tuple[float, float, Tuple[int, int]]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, business_id: str) -> bool:
+        return business_id in self._points
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row = min(int((latitude + 90) / self.cell_degrees), self._rows - 1)
+        column = int((longitude + 180) / self.cell_degrees) % self._columns
+        return row, column
+
+    def add(self, business_id: str, latitude: float, longitude: float) -> None:
+        """Index (or move) a business"""
+        cell = self._cell(latitude, longitude)
+        with self._lock:
+            self._remove_locked(business_id)
+            self._points[business_id] = (latitude, longitude, cell)
+            self._cells.setdefault(cell, set()).add(business_id)
+
+    def remove(self, business_id: str) -> None:
+        with self._lock:
+            self._remove_locked(business_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cells.clear()
+            self._points.clear()
+
+    def _remove_locked(self, business_id: str) -> None:
+        point = self._points.pop(business_id, None)
+        if point is None:
+            return
+        members = self._cells.get(point[2])
+        if members is not None:
+            members.discard(business_id)
+            if not members:
+                del self._cells[point[2]]
+
+    def _ring(
+        self, row: int, column: int, ring: int, half_width: int, previous_half_width: int
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Cells within `ring` rows and `half_width` columns of (row, column) that lie
+        outside the previous ring's block; columns wrap at the antimeridian
+        """
+        if ring == 0:
+            yield row, column
+            return
+        for d_row in range(-ring, ring + 1):
+            r = row + d_row
+            if not 0 <= r < self._rows:
+                continue
+            if abs(d_row) == ring:
+                for d_column in range(-half_width, half_width + 1):
+                    yield r, (column + d_column) % self._columns
+            else:
+                for d_column in range(previous_half_width + 1, half_width + 1):
+                    yield r, (column - d_column) % self._columns
+                    yield r, (column + d_column) % self._columns
+
+    def _column_half_width(self, ring: int, highest_latitude: float) -> int:
+        """
+        Columns either side of the query cell to visit with `ring` rows, so that
+        every unvisited cell is at least the ring's latitude distance away.
+        Longitude spans shrink toward the pole, so widen by the band's highest latitude.
+        """
+        full = self._columns // 2
+        cos_highest = math.cos(math.radians(highest_latitude))
+        if cos_highest <= 0:
+            return full
+        ratio = math.sin(math.radians(ring * self.cell_degrees) / 2) / cos_highest
+        if ratio >= 1:
+            return full
+        span_degrees = math.degrees(2 * math.asin(ratio))
+        return min(full, int(math.ceil(span_degrees / self.cell_degrees)))
+
+    def _ring_lower_bound_km(self, ring: int) -> float:
+        """Minimum distance from the query point to any cell beyond `ring`"""
+        return EARTH_RADIUS_KM * math.radians(ring * self.cell_degrees)
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: Optional[int] = SearchLimits.DEFAULT_RESULT_LIMIT,
+        radius_km: Optional[float] = None,
+        predicate: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        (business_id, distance_km) pairs ordered by distance. With radius_km, only
+        businesses inside the radius; without it, the `limit` nearest within
+        SearchLimits.GEO_MAX_RADIUS_KM. `predicate` filters candidates (text, category).
+        """
+        horizon = radius_km if radius_km is not None else SearchLimits.GEO_MAX_RADIUS_KM
+        row, column = self._cell(latitude, longitude)
+        # Nothing inside the horizon lies further than this in latitude, so rings
+        # stop once their latitude distance passes it and never cross the pole band
+        horizon_degrees = math.degrees(horizon / EARTH_RADIUS_KM)
+        highest_latitude = min(90.0, abs(latitude) + horizon_degrees)
+        max_ring = min(self._rows, int(math.ceil(horizon_degrees / self.cell_degrees)) + 1)
+
+        results: List[Tuple[str, float]] = []
+        pending: List[Tuple[float, str]] = []
+        visited: Set[Tuple[int, int]] = set()
+
+        with self._lock:
+            half_width = 0
+            for ring in range(max_ring + 1):
+                previous_half_width, half_width = half_width, self._column_half_width(ring, highest_latitude)
+                for cell in self._ring(row, column, ring, half_width, previous_half_width):
+                    if cell in visited:
+                        continue
+                    visited.add(cell)
+                    for business_id in self._cells.get(cell, ()):
+                        point_latitude, point_longitude, _ = self._points[business_id]
+                        distance = haversine_km(latitude, longitude, point_latitude, point_longitude)
+                        if distance <= horizon and (predicate is None or predicate(business_id)):
+                            heapq.heappush(pending, (distance, business_id))
+
+                # Everything closer than the unvisited cells can be emitted in order
+                bound = self._ring_lower_bound_km(ring)
+                while pending and pending[0][0] <= bound:
+                    distance, business_id = heapq.heappop(pending)
+                    results.append((business_id, distance))
+                    if limit is not None and len(results) >= limit:
+                        return results
+                if bound > horizon:
+                    break
+
+        while pending and (limit is None or len(results) < limit):
+            distance, business_id = heapq.heappop(pending)
+            results.append((business_id, distance))
+        return results
+
+
+# ============================================================================
+# PostgreSQL spatial search
+# ============================================================================
+
+POSTGIS_DDL = [
+    "CREATE INDEX IF NOT EXISTS idx_business_geography ON businesses USING GIST "
+    "((geography(ST_SetSRID(ST_MakePoint(longitude, latitude), 4326))))",
+]
+
+EARTHDISTANCE_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS cube",
+    "CREATE EXTENSION IF NOT EXISTS earthdistance",
+    "CREATE INDEX IF NOT EXISTS idx_business_earth ON businesses USING GIST (ll_to_earth(latitude, longitude))",
+]
+
+
+@dataclass
+class PostgresGeoCapabilities:
+    """Which PostgreSQL spatial features are available on an engine"""
+    postgis: bool = False
+    earthdistance: bool = False
+
+
+_postgres_geo_capabilities: Dict[str, PostgresGeoCapabilities] = {}
+_postgres_geo_lock = threading.Lock()
+
+
+def _postgis_installed(engine) -> bool:
+    from sqlalchemy import text
+
+    try:
+        with engine.connect() as connection:
+            return connection.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'")
+            ).first() is not None
+    except Exception as e:
+        logger.debug(f"PostGIS check failed: {e}")
+        return False
+
+
+def ensure_postgres_geo_index(engine) -> PostgresGeoCapabilities:
+    """
+    Create the spatial index: PostGIS when it is already installed, else
+    earthdistance. Startup DDL (create_tables), run once per database; missing
+    privileges fall back to the grid index.
+    """
+    from .business_search_index import _database_key, _run_ddl
+
+    key = _database_key(engine)
+    capabilities = _postgres_geo_capabilities.get(key)
+    if capabilities is not None:
+        return capabilities
+
+    # Non-blocking for the same reason as ensure_postgres_search_index
+    if not _postgres_geo_lock.acquire(blocking=False):
+        return PostgresGeoCapabilities()
+    try:
+        capabilities = _postgres_geo_capabilities.get(key)
+        if capabilities is None:
+            capabilities = PostgresGeoCapabilities()
+            if _postgis_installed(engine):
+                capabilities.postgis = _run_ddl(engine, POSTGIS_DDL)
+            if not capabilities.postgis:
+                capabilities.earthdistance = _run_ddl(engine, EARTHDISTANCE_DDL)
+            logger.info(
+                f"PostgreSQL geo index ready: postgis={capabilities.postgis}, "
+                f"earthdistance={capabilities.earthdistance}"
+            )
+            _postgres_geo_capabilities[key] = capabilities
+    finally:
+        _postgres_geo_lock.release()
+    return capabilities
+
+
+def postgres_geo_capabilities(engine) -> PostgresGeoCapabilities:
+    """
+    Spatial indexes available on a database, for the request path: no DDL.
+    When this process did not run the startup DDL, the catalog is read once.
+    """
+    from sqlalchemy import text
+    from .business_search_index import _database_key
+
+    key = _database_key(engine)
+    capabilities = _postgres_geo_capabilities.get(key)
+    if capabilities is not None:
+        return capabilities
+
+    try:
+        with engine.connect() as connection:
+            capabilities = PostgresGeoCapabilities(
+                postgis=connection.execute(text(
+                    "SELECT to_regclass('idx_business_geography') IS NOT NULL"
+                )).scalar() is True,
+                earthdistance=connection.execute(text(
+                    "SELECT to_regclass('idx_business_earth') IS NOT NULL"
+                )).scalar() is True
+            )
+    except Exception as e:
+        logger.warning(f"Geo index lookup failed, using the in-process grid: {e}")
+        return PostgresGeoCapabilities()
+    if not (capabilities.postgis or capabilities.earthdistance):
+        logger.warning("⚠️ PostgreSQL geo indexes missing; run create_tables() at startup")
+    return _postgres_geo_capabilities.setdefault(key, capabilities)
+
+
+def apply_postgres_geo(query_obj, latitude: float, longitude: float, radius_km: Optional[float],
+                       capabilities: PostgresGeoCapabilities):
+    """
+    Restrict a Business query to a radius and order it nearest first using the
+    spatial index (GiST KNN ordering). Returns None without a spatial index.
+    """
+    from sqlalchemy import func, literal
+    from .database_models import Business
+
+    horizon_m = (radius_km if radius_km is not None else SearchLimits.GEO_MAX_RADIUS_KM) * 1000
+    query_obj = query_obj.filter(Business.latitude.isnot(None), Business.longitude.isnot(None))
+
+    if capabilities.postgis:
+        def geography(lat, lon):
+            return func.geography(func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326))
+
+        business_point = geography(Business.latitude, Business.longitude)
+        origin = geography(literal(latitude), literal(longitude))
+        return query_obj.filter(
+            func.ST_DWithin(business_point, origin, horizon_m)
+        ).order_by(business_point.op("<->")(origin))
+
+    if capabilities.earthdistance:
+        business_point = func.ll_to_earth(Business.latitude, Business.longitude)
+        origin = func.ll_to_earth(literal(latitude), literal(longitude))
+        return query_obj.filter(
+            func.earth_box(origin, horizon_m).op("@>")(business_point),
+            func.earth_distance(origin, business_point) <= horizon_m
+        ).order_by(business_point.op("<->")(origin))
+
+    return None
@@ -13,6 +13,7 @@ from enum import Enum
 import asyncio
 from pathlib import Path
 
+from .canonical_json import canonical_sha256
 from .mcp_authentication_service import AuthContext
 
 
@@ -372,7 +373,7 @@ class MCPAuditLogger:
             error_code=None,
             error_message=None,
             metadata={
-                'arguments_hash': hashlib.sha256(json.dumps(arguments, sort_keys=True).encode()).hexdigest(),
+                'arguments_hash': canonical_sha256(arguments),
                 'result_size': len(json.dumps(result)),
                 'success': True
             }
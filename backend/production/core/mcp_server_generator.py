@@ -6,7 +6,8 @@ Generates actual MCP-compliant servers from BAIS business schemas
 from typing import Dict, List, Any, Optional, Callable
 import json
 import asyncio
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from urllib.parse import parse_qs
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import httpx
@@ -14,6 +15,8 @@ from pydantic import BaseModel
 import uuid
 from .payments.payment_coordinator import PaymentCoordinator, PaymentCoordinationRequest
 from .payments.models import PaymentStatus, PaymentMethodType
+from .constants import BusinessConstants
+from .slot_inventory import AvailabilityEngine, SlotSchedule, get_availability_engine, requested_slot
 
 # MCP Protocol Models (based on 2025-06-18 spec)
 class MCPResource(BaseModel):
@@ -128,7 +131,8 @@ class BAISMCPServer:
                     resources.append(MCPResource(
                         uri=f"availability://{service.id}",
                         name=f"{service.name} Availability",
-                        description=f"Real-time availability for {service.name}",
+                        description=(f"Real-time availability for {service.name}. Query a range with "
+                                     f"?from=YYYY-MM-DD&to=YYYY-MM-DD&start_time=HH:MM&end_time=HH:MM&weekdays=sat,sun"),
                         mimeType="application/json"
                     ))
                     
@@ -140,6 +144,14 @@ class BAISMCPServer:
                         mimeType="application/json"
                     ))
             
+            # Availability across every service in one read
+            resources.append(MCPResource(
+                uri="availability://*",
+                name="All Services Availability",
+                description="Availability of every service over a date range (same query parameters)",
+                mimeType="application/json"
+            ))
+            
             # Business information resource
             resources.append(MCPResource(
                 uri="business://info",
@@ -345,21 +357,55 @@ class BAISMCPServer:
         if not auth.credentials:
             raise HTTPException(status_code=401, detail="Authentication required")
     
-    async def _get_availability_resource(self, service_id: str) -> Dict[str, Any]:
-        """Get availability resource content"""
-        service = next((s for s in self.business_schema.services if s.id == service_id), None)
-        if not service:
-            raise HTTPException(status_code=404, detail="Service not found")
+    async def _get_availability_resource(self, path: str) -> Dict[str, Any]:
+        """
+        Get availability resource content. path is a service id, a comma-separated
+        list of them or "*", optionally followed by a range query:
+        ?from=&to=&start_time=&end_time=&weekdays=
+        """
+        target, _, query_string = path.partition("?")
+        query = {key: values[-1] for key, values in parse_qs(query_string).items()}
+        
+        enabled = [s for s in self.business_schema.services if s.enabled]
+        if target == "*":
+            services = enabled
+        else:
+            requested = [service_id for service_id in target.split(",") if service_id]
+            services = [s for s in self.business_schema.services if s.id in requested]
+            if not services or len(services) != len(set(requested)):
+                raise HTTPException(status_code=404, detail="Service not found")
         
-        # Get real-time availability from business system
-        availability = await self.business_adapter.get_availability(service_id)
+        if len(services) == 1 and not query:
+            service = services[0]
+            # Get real-time availability from business system
+            availability = await self.business_adapter.get_availability(service.id)
+            return {
+                "service_id": service.id,
+                "service_name": service.name,
+                "availability": availability,
+                "last_updated": datetime.utcnow().isoformat(),
+                "cache_timeout": service.availability.cache_timeout_seconds
+            }
         
+        try:
+            availability = await self.business_adapter.get_availability_range(
+                [s.id for s in services],
+                start_date=query.get("from") or query.get("start_date"),
+                end_date=query.get("to") or query.get("end_date"),
+                start_time=query.get("start_time"),
+                end_time=query.get("end_time"),
+                weekdays=query["weekdays"].split(",") if query.get("weekdays") else None
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        names = {s.id: s.name for s in services}
+        for entry in availability["services"]:
+            entry["service_name"] = names.get(entry["service_id"])
         return {
-            "service_id": service_id,
-            "service_name": service.name,
             "availability": availability,
             "last_updated": datetime.utcnow().isoformat(),
-            "cache_timeout": service.availability.cache_timeout_seconds
+            "cache_timeout": min(s.availability.cache_timeout_seconds for s in services)
         }
     
     async def _get_service_resource(self, service_id: str) -> Dict[str, Any]:
@@ -394,60 +440,115 @@ class BAISMCPServer:
 class BusinessSystemAdapter:
     """Interface for connecting to actual business systems"""
     
-    def __init__(self, business_config: Dict[str, Any]):
+    def __init__(
+        self,
+        business_config: Dict[str, Any],
+        availability_engine: Optional[AvailabilityEngine] = None,
+        db_manager=None
+    ):
         self.config = business_config
         self.client = httpx.AsyncClient()
+        self.business_id = business_config.get("business_id", "default")
+        if availability_engine is None:
+            # The process-wide engine, so MCP availability, the universal tools and
+            # bookings share one view; persisted in db_manager's Booking table when given
+            schedule = business_config.get("slot_schedule")
+            availability_engine = get_availability_engine(db_manager, SlotSchedule(**schedule) if schedule else None)
+        self.availability = availability_engine
     
     async def get_availability(self, service_id: str) -> Dict[str, Any]:
-        """Get real-time availability from business system"""
-        # This needs to integrate with actual PMS/POS systems
-        # For demo purposes, return mock data
+        """Get real-time availability for the next few days"""
+        availability = await self.get_availability_range([service_id])
         return {
             "available_slots": [
                 {
-                    "date": "2024-03-15",
-                    "available": True,
-                    "price": 159.00,
-                    "inventory": 5
-                },
-                {
-                    "date": "2024-03-16", 
+                    "date": day["date"],
                     "available": True,
-                    "price": 179.00,
-                    "inventory": 3
+                    "inventory": day["free_slots"],
+                    "times": day["times"]
                 }
+                for day in availability["services"][0]["days"]
             ],
+            "first_available": availability["first_available"],
             "constraints": {
                 "minimum_stay": 1,
-                "maximum_advance_booking": 365
+                "maximum_advance_booking": BusinessConstants.MAX_BOOKING_ADVANCE_DAYS
             }
         }
     
+    async def get_availability_range(
+        self,
+        service_ids: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        weekdays: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Free slots per service and day over a date range and time window"""
+        start_date = start_date or date.today().isoformat()
+        if not end_date:
+            horizon = BusinessConstants.DEFAULT_AVAILABILITY_DAYS - 1
+            end_date = (date.fromisoformat(start_date) + timedelta(days=horizon)).isoformat()
+        return await self.availability.search_range(
+            self.business_id, service_ids, start_date, end_date,
+            start_time=start_time, end_time=end_time, weekdays=weekdays
+        )
+    
     async def search_availability(self, service_id: str, search_params: Dict[str, Any]) -> Dict[str, Any]:
-        """Search for available options"""
-        # Implement actual search logic here
-        availability = await self.get_availability(service_id)
+        """Search for available options (one date, or start_date/end_date with an optional time window)"""
+        start_date = search_params.get("start_date") or search_params.get("date") or search_params.get("check_in")
+        end_date = search_params.get("end_date") or search_params.get("check_out") or start_date
+        availability = await self.get_availability_range(
+            [service_id],
+            start_date=start_date,
+            end_date=end_date,
+            start_time=search_params.get("start_time"),
+            end_time=search_params.get("end_time"),
+            weekdays=search_params.get("weekdays")
+        )
+        results = availability["services"][0]["days"]
         
         return {
             "search_id": str(uuid.uuid4()),
-            "results": availability["available_slots"],
+            "results": results,
+            "first_available": availability["first_available"],
             "search_params": search_params,
-            "total_results": len(availability["available_slots"])
+            "total_results": len(results)
         }
     
     async def create_booking(self, service_id: str, booking_params: Dict[str, Any]) -> Dict[str, Any]:
-        """Create a new booking"""
-        # Implement actual booking logic here
+        """Create a new booking, reserving the requested date and time on the availability engine"""
         booking_id = str(uuid.uuid4())
+        confirmation_number = f"BAIS-{booking_id[:8].upper()}"
+        total_amount = 159.00
+        
+        slot = requested_slot(booking_params)
+        if slot:
+            booking_fields = None
+            if self.availability.store is not None:
+                booking_fields = {
+                    "confirmation_number": confirmation_number,
+                    "agent_id": booking_params.get("agent_id") or "bais-mcp",
+                    "customer_name": booking_params.get("customer_name", ""),
+                    "customer_email": booking_params.get("customer_email", ""),
+                    "customer_phone": booking_params.get("customer_phone"),
+                    "booking_data": booking_params,
+                    "total_amount": total_amount,
+                }
+            if not await self.availability.reserve(
+                self.business_id, service_id, slot[0], slot[1], booking_id, booking_fields
+            ):
+                raise ValueError(f"Service {service_id} is not available on {slot[0]} at {slot[1]}")
         
         return {
             "booking_id": booking_id,
             "status": "confirmed",
             "service_id": service_id,
             "booking_params": booking_params,
-            "confirmation_number": f"BAIS-{booking_id[:8].upper()}",
+            "confirmation_number": confirmation_number,
             "created_at": datetime.utcnow().isoformat(),
-            "total_amount": 159.00,
+            "total_amount": total_amount,
             "currency": "USD"
         }
     
@@ -533,7 +634,11 @@ class BAISMCPServerFactory:
     """Factory for creating BAIS MCP servers"""
     
     @staticmethod
-    def create_server(business_schema: 'BAISBusinessSchema', business_config: Dict[str, Any] = None) -> BAISMCPServer:
+    def create_server(
+        business_schema: 'BAISBusinessSchema',
+        business_config: Dict[str, Any] = None,
+        db_manager=None
+    ) -> BAISMCPServer:
         """Create an MCP server for a business schema"""
         
         # Validate schema
@@ -544,7 +649,7 @@ class BAISMCPServerFactory:
             raise ValueError(f"Invalid business schema: {'; '.join(issues)}")
         
         # Create business adapter
-        adapter = BusinessSystemAdapter(business_config or {})
+        adapter = BusinessSystemAdapter(business_config or {}, db_manager=db_manager)
         
         # Create MCP server
         return BAISMCPServer(business_schema, adapter)
@@ -1,14 +1,29 @@
 """
 MCP Server-Sent Events (SSE) Transport Implementation
 Implements SSE transport for MCP protocol following best practices
+
+Events are encoded to wire bytes once and fanned out through SSEFanout, so a
+broadcast costs one json.dumps however many clients receive it. Client queues
+carry those bytes (or None to close the stream).
+
+With an EventBackplane, broadcasts and sends to clients held by other workers
+are relayed as wire bytes, so every worker delivers to its own connections.
+
+Broadcast events carry monotonic sequence ids and are retained per
+subscription type, so a client reconnecting with Last-Event-ID is replayed
+only what it missed. Control events (connected, ping) carry no id, so they
+never move the browser's last-event-id.
+
+Each client queue applies a BackpressurePolicy when the client falls behind;
+task updates carry a coalesce key so a slow client keeps only the latest one.
 """
 
 import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional, AsyncGenerator, List, Set
+from typing import Dict, Any, Optional, AsyncGenerator, Iterable, List, Set
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 import uuid
 from fastapi import FastAPI, Request, HTTPException, Depends
@@ -16,8 +31,17 @@ from fastapi.responses import StreamingResponse
 from sse_starlette import EventSourceResponse
 from contextlib import asynccontextmanager
 
+from .event_backplane import EventBackplane, get_event_backplane
+from .sse_backpressure import BackpressurePolicy, ClientEventQueue
+from .sse_fanout import SSEFanout
+from .sse_replay import EventReplayBuffer, ReplayEntry, SequenceClock, parse_event_id, payload_sequence
+
 logger = logging.getLogger(__name__)
 
+MCP_SSE_CHANNEL = "mcp_sse"
+ALL_CLIENTS_TOPIC = "*"  # Replay topic for broadcasts without a subscription type
+TERMINAL_TASK_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
 
 class MCPTransportType(Enum):
     """MCP transport types following protocol specification"""
@@ -34,22 +58,31 @@ class MCPSSEEvent:
     id: Optional[str] = None
     retry: Optional[int] = None
     timestamp: datetime = field(default_factory=datetime.now)
+    # Pending events with the same key are replaced by this one for slow clients
+    coalesce_key: Optional[str] = field(default=None, compare=False)
+    _encoded: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+    
+    def encode(self) -> bytes:
+        """Wire bytes for this event, serialized on first use and shared afterwards"""
+        if self._encoded is None:
+            lines = []
+            
+            if self.id:
+                lines.append(f"id: {self.id}")
+            
+            if self.retry:
+                lines.append(f"retry: {self.retry}")
+            
+            lines.append(f"event: {self.event_type}")
+            lines.append(f"data: {json.dumps(self.data)}")
+            
+            # Blank line terminates the event
+            self._encoded = ("\n".join(lines) + "\n\n").encode("utf-8")
+        return self._encoded
     
     def to_sse_format(self) -> str:
         """Convert to SSE format string"""
-        lines = []
-        
-        if self.id:
-            lines.append(f"id: {self.id}")
-        
-        if self.retry:
-            lines.append(f"retry: {self.retry}")
-        
-        lines.append(f"event: {self.event_type}")
-        lines.append(f"data: {json.dumps(self.data)}")
-        lines.append("")  # Empty line to end event
-        
-        return "\n".join(lines)
+        return self.encode().decode("utf-8")
 
 
 @dataclass
@@ -66,17 +99,54 @@ class MCPSSEClient:
 class MCPSSETransportManager:
     """SSE transport manager following best practices"""
     
-    def __init__(self, ping_interval_seconds: int = None, client_timeout_seconds: int = None):
+    def __init__(
+        self,
+        ping_interval_seconds: int = None,
+        client_timeout_seconds: int = None,
+        backplane: Optional[EventBackplane] = None,
+        backpressure_policy: Optional[BackpressurePolicy] = None
+    ):
         from .constants import SSEConnectionLimits
         self._ping_interval = ping_interval_seconds or SSEConnectionLimits.PING_INTERVAL_SECONDS
         self._client_timeout = client_timeout_seconds or SSEConnectionLimits.CLIENT_TIMEOUT_SECONDS
+        self._backpressure_policy = BackpressurePolicy(
+            backpressure_policy or SSEConnectionLimits.BACKPRESSURE_POLICY
+        )
         self._clients: Dict[str, MCPSSEClient] = {}
-        self._client_queues: Dict[str, asyncio.Queue] = {}
+        self._fanout = SSEFanout()
+        # Guards membership changes only; delivery never awaits and takes no lock
         self._lock = asyncio.Lock()
         self._cleanup_task: Optional[asyncio.Task] = None
+        self._backplane = backplane
+        self._backplane_attached = False
+        self._clock = SequenceClock()
+        self._replay = EventReplayBuffer()
+    
+    @property
+    def backplane(self) -> Optional[EventBackplane]:
+        return self._backplane
+    
+    async def _attach_backplane(self):
+        """Receive other workers' events (first start or client connect)"""
+        if self._backplane is not None and not self._backplane_attached:
+            self._backplane_attached = True
+            await self._backplane.subscribe(MCP_SSE_CHANNEL, self._on_backplane_message)
+    
+    async def _on_backplane_message(self, message: Dict[str, Any]):
+        """Deliver an event relayed by another worker to local clients only"""
+        payload = message["wire"].encode("utf-8")
+        if message.get("op") == "send":
+            self._fanout.send(message["client_id"], payload, message.get("coalesce_key"))
+        else:
+            sequence = message.get("sequence")
+            if sequence is not None:
+                self._clock.observe(sequence)
+                self._replay.append(message.get("subscription_type") or ALL_CLIENTS_TOPIC, sequence, payload)
+            self._fanout.publish(payload, message.get("subscription_type"), message.get("coalesce_key"))
     
     async def start(self):
         """Start the SSE transport manager"""
+        await self._attach_backplane()
         self._cleanup_task = asyncio.create_task(self._cleanup_inactive_clients())
         logger.info("MCP SSE transport manager started")
     
@@ -94,10 +164,20 @@ class MCPSSETransportManager:
             for client_id in list(self._clients.keys()):
                 await self._disconnect_client(client_id)
         
+        if self._backplane_attached:
+            await self._backplane.unsubscribe(MCP_SSE_CHANNEL, self._on_backplane_message)
+            self._backplane_attached = False
+        
         logger.info("MCP SSE transport manager stopped")
     
-    async def connect_client(self, client_id: str, client_info: Dict[str, Any]) -> asyncio.Queue:
-        """Connect a new SSE client"""
+    async def connect_client(
+        self,
+        client_id: str,
+        client_info: Dict[str, Any],
+        backpressure_policy: Optional[BackpressurePolicy] = None
+    ) -> asyncio.Queue:
+        """Connect a new SSE client; backpressure_policy overrides the manager default"""
+        await self._attach_backplane()
         async with self._lock:
             if client_id in self._clients:
                 await self._disconnect_client(client_id)
@@ -108,22 +188,24 @@ class MCPSSETransportManager:
             )
             
             from .constants import SSEConnectionLimits
-            queue = asyncio.Queue(maxsize=SSEConnectionLimits.MAX_QUEUE_SIZE)  # Prevent memory issues
+            queue = ClientEventQueue(  # Prevent memory issues
+                maxsize=SSEConnectionLimits.MAX_QUEUE_SIZE,
+                policy=backpressure_policy or self._backpressure_policy
+            )
             
             self._clients[client_id] = client
-            self._client_queues[client_id] = queue
+            self._fanout.register(client_id, queue)
             
             logger.info(f"SSE client connected: {client_id}")
             
             # Send connection confirmation
-            await self._send_to_client(client_id, MCPSSEEvent(
+            self._send_to_client(client_id, MCPSSEEvent(
                 event_type="connected",
                 data={
                     "client_id": client_id,
                     "server_time": datetime.now().isoformat(),
                     "protocol_version": "2025-06-18"
-                },
-                id=str(uuid.uuid4())
+                }
             ))
             
             return queue
@@ -140,14 +222,10 @@ class MCPSSETransportManager:
             client.is_active = False
             
             # Close the queue
-            if client_id in self._client_queues:
-                queue = self._client_queues[client_id]
+            subscriber = self._fanout.unregister(client_id)
+            if subscriber is not None:
                 # Put a sentinel value to signal end
-                try:
-                    queue.put_nowait(None)
-                except asyncio.QueueFull:
-                    pass
-                del self._client_queues[client_id]
+                subscriber.queue.close()
             
             del self._clients[client_id]
             logger.info(f"SSE client disconnected: {client_id}")
@@ -157,6 +235,7 @@ class MCPSSETransportManager:
         async with self._lock:
             if client_id in self._clients:
                 self._clients[client_id].subscriptions.add(subscription_type)
+                self._fanout.subscribe(client_id, subscription_type)
                 logger.info(f"Client {client_id} subscribed to {subscription_type}")
     
     async def unsubscribe_client(self, client_id: str, subscription_type: str):
@@ -164,38 +243,80 @@ class MCPSSETransportManager:
         async with self._lock:
             if client_id in self._clients:
                 self._clients[client_id].subscriptions.discard(subscription_type)
+                self._fanout.unsubscribe(client_id, subscription_type)
                 logger.info(f"Client {client_id} unsubscribed from {subscription_type}")
     
-    async def broadcast_event(self, event: MCPSSEEvent, subscription_type: str = None):
-        """Broadcast event to all subscribed clients"""
-        async with self._lock:
-            for client_id, client in self._clients.items():
-                if not client.is_active:
-                    continue
-                
-                # Check subscription filter
-                if subscription_type and subscription_type not in client.subscriptions:
-                    continue
-                
-                await self._send_to_client(client_id, event)
-    
-    async def send_to_client(self, client_id: str, event: MCPSSEEvent):
-        """Send event to specific client"""
-        async with self._lock:
-            await self._send_to_client(client_id, event)
-    
-    async def _send_to_client(self, client_id: str, event: MCPSSEEvent):
-        """Internal method to send event to client"""
-        if client_id not in self._clients or not self._clients[client_id].is_active:
-            return
+    async def broadcast_event(
+        self,
+        event: MCPSSEEvent,
+        subscription_type: str = None,
+        extra_clients: Iterable[str] = ()
+    ) -> int:
+        """
+        Broadcast event to all subscribed clients (every client without a subscription_type),
+        on this worker and, through the backplane, on every other worker.
+        extra_clients are local clients that also get it, deduplicated against subscribers.
+        Encodes once; returns how many local client queues accepted the event.
+        """
+        sequence = parse_event_id(event.id)
+        if sequence is None:
+            sequence = await self._clock.next_shared(self._backplane, MCP_SSE_CHANNEL)
+            event.id = str(sequence)
+        else:
+            self._clock.observe(sequence)
+        payload = event.encode()
+        self._replay.append(subscription_type or ALL_CLIENTS_TOPIC, sequence, payload)
         
-        if client_id in self._client_queues:
-            queue = self._client_queues[client_id]
-            try:
-                queue.put_nowait(event)
-                self._clients[client_id].last_ping = datetime.now()
-            except asyncio.QueueFull:
-                logger.warning(f"Client {client_id} queue full, dropping event")
+        accepted = self._fanout.publish(payload, subscription_type or None, event.coalesce_key, extra_clients)
+        if self._backplane is not None:
+            await self._backplane.publish(MCP_SSE_CHANNEL, {
+                "op": "broadcast",
+                "subscription_type": subscription_type or None,
+                "sequence": sequence,
+                "coalesce_key": event.coalesce_key,
+                "wire": payload.decode("utf-8")
+            })
+        return accepted
+    
+    def replay_events(self, subscriptions: List[str], last_event_id: Any) -> Optional[List[ReplayEntry]]:
+        """
+        (sequence, payload) broadcasts after last_event_id for a client with these
+        subscriptions. None when the buffer no longer covers the gap.
+        """
+        last_sequence = parse_event_id(last_event_id)
+        if last_sequence is None:
+            return None
+        return self._replay.since([ALL_CLIENTS_TOPIC, *subscriptions], last_sequence)
+    
+    async def send_to_client(self, client_id: str, event: MCPSSEEvent) -> bool:
+        """Send event to specific client, relaying it if another worker holds the connection"""
+        if client_id in self._fanout:
+            return self._send_to_client(client_id, event)
+        if self._backplane is not None:
+            await self._backplane.publish(MCP_SSE_CHANNEL, {
+                "op": "send",
+                "client_id": client_id,
+                "coalesce_key": event.coalesce_key,
+                "wire": event.to_sse_format()
+            })
+        return False
+    
+    def send_local(self, client_id: str, payload: bytes) -> bool:
+        """Deliver pre-encoded event bytes to a client connected to this worker"""
+        return self._fanout.send(client_id, payload)
+    
+    def send_local_many(
+        self,
+        client_ids: Iterable[str],
+        payload: bytes,
+        skip_subscription: Optional[str] = None
+    ) -> int:
+        """Deliver pre-encoded event bytes to several local clients in one pass"""
+        return self._fanout.send_many(client_ids, payload, skip_subscription)
+    
+    def _send_to_client(self, client_id: str, event: MCPSSEEvent) -> bool:
+        """Internal method to send event to client"""
+        return self._fanout.send(client_id, event.encode(), event.coalesce_key)
     
     async def get_client_info(self, client_id: str) -> Optional[MCPSSEClient]:
         """Get client information"""
@@ -204,8 +325,15 @@ class MCPSSETransportManager:
     
     async def get_active_clients_count(self) -> int:
         """Get count of active clients"""
-        async with self._lock:
-            return sum(1 for client in self._clients.values() if client.is_active)
+        return len(self._fanout)
+    
+    def get_fanout_stats(self) -> Dict[str, int]:
+        """Client, delivery and drop counters of the fan-out engine"""
+        return self._fanout.get_stats()
+    
+    def get_client_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-client queue depth, lag, drops and coalesced events"""
+        return self._fanout.client_metrics()
     
     async def _cleanup_inactive_clients(self):
         """Background task to cleanup inactive clients"""
@@ -213,17 +341,10 @@ class MCPSSETransportManager:
             try:
                 await asyncio.sleep(self._ping_interval)
                 
-                cutoff_time = datetime.now() - timedelta(seconds=self._client_timeout)
-                inactive_clients = []
-                
                 async with self._lock:
-                    for client_id, client in self._clients.items():
-                        if client.last_ping < cutoff_time:
-                            inactive_clients.append(client_id)
-                
-                for client_id in inactive_clients:
-                    await self._disconnect_client(client_id)
-                    logger.info(f"Cleaned up inactive client: {client_id}")
+                    for client_id in self._fanout.idle_clients(self._client_timeout):
+                        await self._disconnect_client(client_id)
+                        logger.info(f"Cleaned up inactive client: {client_id}")
                 
             except asyncio.CancelledError:
                 break
@@ -241,9 +362,15 @@ class MCPSSEHandler:
         self, 
         request: Request, 
         client_id: str = None,
-        subscriptions: List[str] = None
+        subscriptions: List[str] = None,
+        last_event_id: Optional[str] = None
     ) -> EventSourceResponse:
-        """Handle SSE connection request"""
+        """
+        Handle SSE connection request. A Last-Event-ID header (or last_event_id)
+        resumes the stream: missed broadcasts are replayed before live events.
+        """
+        if last_event_id is None:
+            last_event_id = request.headers.get("last-event-id")
         
         # Generate client ID if not provided
         if not client_id:
@@ -263,6 +390,11 @@ class MCPSSEHandler:
         for subscription_type in (subscriptions or []):
             await self._transport_manager.subscribe_client(client_id, subscription_type)
         
+        # Snapshot after subscribing: anything newer is also queued, and skipped below
+        missed = None
+        if last_event_id:
+            missed = self._transport_manager.replay_events(subscriptions or [], last_event_id)
+        
         # Create SSE response
         async def event_generator():
             """Generate SSE events for the client"""
@@ -274,9 +406,21 @@ class MCPSSEHandler:
                         "client_id": client_id,
                         "message": "Connected to MCP SSE transport",
                         "timestamp": datetime.now().isoformat()
-                    },
-                    id=str(uuid.uuid4())
-                ).to_sse_format()
+                    }
+                ).encode()
+                
+                replayed_upto = 0
+                if last_event_id:
+                    if missed is None:
+                        # Buffer no longer reaches back: client must refetch state
+                        yield MCPSSEEvent(
+                            event_type="stream_reset",
+                            data={"last_event_id": last_event_id, "reason": "replay_unavailable"}
+                        ).encode()
+                    else:
+                        for sequence, payload in missed:
+                            replayed_upto = sequence
+                            yield payload
                 
                 # Process events from queue
                 while True:
@@ -288,7 +432,10 @@ class MCPSSEHandler:
                         if event is None:
                             break
                         
-                        yield event.to_sse_format()
+                        sequence = payload_sequence(event)
+                        if sequence is None or sequence > replayed_upto:
+                            # Already-encoded bytes shared with every other subscriber
+                            yield event
                         
                         # Mark task as done
                         queue.task_done()
@@ -297,17 +444,15 @@ class MCPSSEHandler:
                         # Send ping to keep connection alive
                         yield MCPSSEEvent(
                             event_type="ping",
-                            data={"timestamp": datetime.now().isoformat()},
-                            id=str(uuid.uuid4())
-                        ).to_sse_format()
+                            data={"timestamp": datetime.now().isoformat()}
+                        ).encode()
                         
                     except Exception as e:
                         logger.error(f"Error in SSE event generator: {e}")
                         yield MCPSSEEvent(
                             event_type="error",
-                            data={"error": str(e)},
-                            id=str(uuid.uuid4())
-                        ).to_sse_format()
+                            data={"error": str(e)}
+                        ).encode()
                         break
             
             finally:
@@ -365,8 +510,7 @@ class MCPSSEIntegration:
                 "resource_uri": resource_uri,
                 "update_data": update_data,
                 "timestamp": datetime.now().isoformat()
-            },
-            id=str(uuid.uuid4())
+            }
         )
         
         await self._transport_manager.broadcast_event(event, "resources")
@@ -379,8 +523,7 @@ class MCPSSEIntegration:
                 "tool_name": tool_name,
                 "execution_result": execution_result,
                 "timestamp": datetime.now().isoformat()
-            },
-            id=str(uuid.uuid4())
+            }
         )
         
         await self._transport_manager.broadcast_event(event, "tools")
@@ -393,8 +536,7 @@ class MCPSSEIntegration:
                 "prompt_name": prompt_name,
                 "update_data": update_data,
                 "timestamp": datetime.now().isoformat()
-            },
-            id=str(uuid.uuid4())
+            }
         )
         
         await self._transport_manager.broadcast_event(event, "prompts")
@@ -409,7 +551,8 @@ class MCPSSEIntegration:
                 "task_data": task_data,
                 "timestamp": datetime.now().isoformat()
             },
-            id=str(uuid.uuid4())
+            # Only the latest in-flight state matters; terminal updates are never replaced
+            coalesce_key=None if task_status in TERMINAL_TASK_STATUSES else f"a2a_task:{task_id}"
         )
         
         await self._transport_manager.broadcast_event(event, "a2a_tasks")
@@ -423,8 +566,7 @@ class MCPSSEIntegration:
                 "payment_status": payment_status,
                 "payment_data": payment_data,
                 "timestamp": datetime.now().isoformat()
-            },
-            id=str(uuid.uuid4())
+            }
         )
         
         await self._transport_manager.broadcast_event(event, "ap2_payments")
@@ -471,10 +613,10 @@ def create_mcp_sse_routes(app: FastAPI, transport_manager: MCPSSETransportManage
         """Broadcast event to all subscribed clients (admin endpoint)"""
         event = MCPSSEEvent(
             event_type=event_type,
-            data=data,
-            id=str(uuid.uuid4())
+            data=data
         )
         
+        # Assigns the event's sequence id
         await transport_manager.broadcast_event(event, subscription_type)
         
         return {
@@ -494,7 +636,7 @@ def get_sse_transport_manager() -> MCPSSETransportManager:
     """Get global SSE transport manager instance"""
     global _sse_transport_manager
     if _sse_transport_manager is None:
-        _sse_transport_manager = MCPSSETransportManager()
+        _sse_transport_manager = MCPSSETransportManager(backplane=get_event_backplane())
     return _sse_transport_manager
 
 
@@ -530,8 +672,7 @@ if __name__ == "__main__":
         # Broadcast test event
         await manager.broadcast_event(MCPSSEEvent(
             event_type="test",
-            data={"message": "Hello from MCP SSE!"},
-            id=str(uuid.uuid4())
+            data={"message": "Hello from MCP SSE!"}
         ))
         
         # Wait a bit then stop
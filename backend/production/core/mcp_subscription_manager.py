@@ -1,6 +1,11 @@
 """
 MCP Subscription Manager
 Manages real-time subscriptions for MCP protocol following best practices
+
+Filters are compiled and indexed per subscription type (see
+subscription_matcher), so publishing an event costs roughly the number of
+matching subscriptions; notifications are then delivered concurrently with a
+bound on in-flight deliveries.
 """
 
 import asyncio
@@ -13,6 +18,9 @@ import uuid
 import json
 from collections import defaultdict
 
+from .subscription_matcher import CompiledFilter, SubscriptionMatcher
+from .webhook_delivery import WebhookDelivery, WebhookDispatcher, get_webhook_dispatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +47,10 @@ class SubscriptionStatus(Enum):
 class SubscriptionFilter:
     """Filter criteria for subscriptions"""
     resource_uris: Optional[List[str]] = None
+    resource_uri_prefixes: Optional[List[str]] = None  # e.g. "availability://hotel-"
+    resource_uri_patterns: Optional[List[str]] = None  # regexes, matched against the whole URI
     resource_types: Optional[List[str]] = None
+    business_ids: Optional[List[str]] = None
     tool_names: Optional[List[str]] = None
     prompt_names: Optional[List[str]] = None
     event_types: Optional[List[str]] = None
@@ -61,6 +72,7 @@ class MCPSubscription:
     notification_count: int = 0
     error_count: int = 0
     metadata: Dict[str, Any] = field(default_factory=dict)
+    _compiled: Optional[CompiledFilter] = field(default=None, init=False, repr=False, compare=False)
     
     def is_active(self) -> bool:
         """Check if subscription is active"""
@@ -84,48 +96,18 @@ class MCPSubscription:
         # Apply filter criteria
         return self._matches_filters(event_data)
     
+    def compiled_filter(self) -> CompiledFilter:
+        """Filter criteria compiled on first use"""
+        if self._compiled is None:
+            self._compiled = CompiledFilter(self.filter_criteria)
+        return self._compiled
+    
     def _matches_filters(self, event_data: Dict[str, Any]) -> bool:
-        """Check if event matches subscription filters"""
-        filters = self.filter_criteria
-        
-        # Check resource URI filter
-        if filters.resource_uris:
-            event_uri = event_data.get("resource_uri")
-            if event_uri and event_uri not in filters.resource_uris:
-                return False
-        
-        # Check resource type filter
-        if filters.resource_types:
-            event_type = event_data.get("resource_type")
-            if event_type and event_type not in filters.resource_types:
-                return False
-        
-        # Check tool name filter
-        if filters.tool_names:
-            tool_name = event_data.get("tool_name")
-            if tool_name and tool_name not in filters.tool_names:
-                return False
-        
-        # Check prompt name filter
-        if filters.prompt_names:
-            prompt_name = event_data.get("prompt_name")
-            if prompt_name and prompt_name not in filters.prompt_names:
-                return False
-        
-        # Check event type filter
-        if filters.event_types:
-            event_type = event_data.get("event_type")
-            if event_type and event_type not in filters.event_types:
-                return False
-        
-        # Check metadata filters
-        if filters.metadata_filters:
-            event_metadata = event_data.get("metadata", {})
-            for key, value in filters.metadata_filters.items():
-                if event_metadata.get(key) != value:
-                    return False
-        
-        return True
+        """
+        Check if event matches subscription filters. A list filter only rejects
+        events that carry the field; metadata filters require equality.
+        """
+        return self.compiled_filter().matches(event_data)
 
 
 @dataclass
@@ -142,16 +124,37 @@ class NotificationEvent:
 class MCPSubscriptionManager:
     """Manages MCP subscriptions following best practices"""
     
-    def __init__(self, max_subscriptions_per_client: int = None, default_expiry_hours: int = None):
+    def __init__(
+        self,
+        max_subscriptions_per_client: int = None,
+        default_expiry_hours: int = None,
+        max_concurrent_notifications: int = None,
+        webhook_dispatcher: Optional[WebhookDispatcher] = None
+    ):
         from .constants import MCPLimits
         self._max_subscriptions_per_client = max_subscriptions_per_client or MCPLimits.MAX_SUBSCRIPTIONS_PER_CLIENT
         self._default_expiry_hours = default_expiry_hours or MCPLimits.DEFAULT_SUBSCRIPTION_EXPIRY_HOURS
+        self._max_concurrent_notifications = (max_concurrent_notifications
+                                              or MCPLimits.MAX_CONCURRENT_NOTIFICATIONS)
         self._subscriptions: Dict[str, MCPSubscription] = {}
         self._client_subscriptions: Dict[str, Set[str]] = defaultdict(set)
         self._type_subscriptions: Dict[SubscriptionType, Set[str]] = defaultdict(set)
+        self._matchers: Dict[SubscriptionType, SubscriptionMatcher] = defaultdict(SubscriptionMatcher)
+        self._delivery_slots = asyncio.Semaphore(self._max_concurrent_notifications)
         self._notification_callbacks: List[Callable] = []
         self._cleanup_task: Optional[asyncio.Task] = None
         self._notification_queue: asyncio.Queue = asyncio.Queue()
+        self._webhooks = webhook_dispatcher
+        if webhook_dispatcher is not None:
+            webhook_dispatcher.add_result_hook(self._on_webhook_result)
+    
+    @property
+    def webhooks(self) -> WebhookDispatcher:
+        """Dispatcher delivering callback_url notifications; the global one by default"""
+        if self._webhooks is None:
+            self._webhooks = get_webhook_dispatcher()
+            self._webhooks.add_result_hook(self._on_webhook_result)
+        return self._webhooks
     
     async def start(self):
         """Start the subscription manager"""
@@ -166,6 +169,10 @@ class MCPSubscriptionManager:
                 await self._cleanup_task
             except asyncio.CancelledError:
                 pass
+        # The dispatcher belongs to whoever created it (the caller, or the process
+        # for the global one); just stop listening to its results
+        if self._webhooks is not None:
+            self._webhooks.remove_result_hook(self._on_webhook_result)
         
         logger.info("MCP Subscription Manager stopped")
     
@@ -198,11 +205,14 @@ class MCPSubscriptionManager:
                 callback_url=callback_url,
                 expires_at=expires_at
             )
+            # Compile first: an invalid filter must not leave a half-indexed subscription behind
+            compiled = subscription.compiled_filter()
             
             # Store subscription
             self._subscriptions[subscription.subscription_id] = subscription
             self._client_subscriptions[client_id].add(subscription.subscription_id)
             self._type_subscriptions[subscription_type].add(subscription.subscription_id)
+            self._matchers[subscription_type].add(subscription.subscription_id, compiled)
             
             logger.info(f"Created subscription {subscription.subscription_id} for client {client_id}")
             
@@ -223,8 +233,7 @@ class MCPSubscriptionManager:
             subscription.status = SubscriptionStatus.CANCELLED
             
             # Remove from indexes
-            self._client_subscriptions[subscription.client_id].discard(subscription_id)
-            self._type_subscriptions[subscription.subscription_type].discard(subscription_id)
+            self._unindex(subscription)
             
             logger.info(f"Cancelled subscription {subscription_id}")
             
@@ -282,27 +291,49 @@ class MCPSubscriptionManager:
         subscription_ids = self._type_subscriptions.get(subscription_type, set())
         return [self._subscriptions[sid] for sid in subscription_ids if sid in self._subscriptions]
     
-    async def publish_event(self, event: NotificationEvent):
-        """Publish an event to relevant subscriptions"""
+    def _unindex(self, subscription: MCPSubscription):
+        """Remove a subscription from the client, type and matcher indexes"""
+        subscription_id = subscription.subscription_id
+        self._client_subscriptions[subscription.client_id].discard(subscription_id)
+        self._type_subscriptions[subscription.subscription_type].discard(subscription_id)
+        self._matchers[subscription.subscription_type].remove(subscription_id)
+    
+    def match_subscriptions(self, event: NotificationEvent) -> List[MCPSubscription]:
+        """Active subscriptions whose filters match the event"""
+        matcher = self._matchers.get(event.subscription_type)
+        if matcher is None:
+            return []
+        subscriptions = self._subscriptions
+        return [subscriptions[subscription_id] for subscription_id in matcher.match(event.data)
+                if subscriptions[subscription_id].is_active()]
+    
+    async def publish_event(self, event: NotificationEvent) -> int:
+        """Publish an event to relevant subscriptions; returns how many matched"""
         try:
             # Find matching subscriptions
-            matching_subscriptions = []
+            matching_subscriptions = self.match_subscriptions(event)
             
-            # Get subscriptions by type
-            type_subs = await self.get_subscriptions_by_type(event.subscription_type)
-            
-            for subscription in type_subs:
-                if subscription.should_notify(event.data):
-                    matching_subscriptions.append(subscription)
-            
-            # Notify matching subscriptions
-            for subscription in matching_subscriptions:
-                await self._notify_subscription(subscription, event)
+            # Notify matching subscriptions concurrently, bounded
+            await self._dispatch(matching_subscriptions, event)
             
             logger.debug(f"Published event {event.event_id} to {len(matching_subscriptions)} subscriptions")
+            return len(matching_subscriptions)
             
         except Exception as e:
             logger.error(f"Failed to publish event {event.event_id}: {e}")
+            return 0
+    
+    async def _dispatch(self, subscriptions: List[MCPSubscription], event: NotificationEvent):
+        """Deliver to every subscription, at most max_concurrent_notifications at a time"""
+        if len(subscriptions) == 1:
+            await self._notify_subscription(subscriptions[0], event)
+            return
+        
+        async def deliver(subscription: MCPSubscription):
+            async with self._delivery_slots:
+                await self._notify_subscription(subscription, event)
+        
+        await asyncio.gather(*(deliver(subscription) for subscription in subscriptions))
     
     async def _notify_subscription(self, subscription: MCPSubscription, event: NotificationEvent):
         """Notify a specific subscription"""
@@ -337,23 +368,28 @@ class MCPSubscriptionManager:
             logger.error(f"Failed to notify subscription {subscription.subscription_id}: {e}")
     
     async def _send_http_notification(self, subscription: MCPSubscription, notification: Dict[str, Any]):
-        """Send HTTP notification to callback URL"""
+        """
+        Queue an HTTP notification for the callback URL. The webhook dispatcher
+        sends it in the background with retries; subscriptions with
+        metadata["batch_notifications"] receive {"notifications": [...]} batches.
+        """
         try:
-            import httpx
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    subscription.callback_url,
-                    json=notification,
-                    timeout=10.0
-                )
-                response.raise_for_status()
-                
-                logger.debug(f"HTTP notification sent to {subscription.callback_url}")
-                
+            await self.webhooks.submit(
+                subscription.callback_url,
+                notification,
+                batchable=bool(subscription.metadata.get("batch_notifications")),
+                context={"subscription_id": subscription.subscription_id}
+            )
         except Exception as e:
             subscription.error_count += 1
-            logger.error(f"Failed to send HTTP notification to {subscription.callback_url}: {e}")
+            logger.error(f"Failed to queue HTTP notification to {subscription.callback_url}: {e}")
+    
+    def _on_webhook_result(self, delivery: WebhookDelivery, delivered: bool, error: Optional[str]):
+        """Count failed callback attempts against their subscription"""
+        if not delivered:
+            subscription = self._subscriptions.get(delivery.context.get("subscription_id"))
+            if subscription is not None:
+                subscription.error_count += 1
     
     def add_notification_callback(self, callback: Callable):
         """Add a notification callback function"""
@@ -380,8 +416,7 @@ class MCPSubscriptionManager:
                     subscription.status = SubscriptionStatus.EXPIRED
                     
                     # Remove from indexes
-                    self._client_subscriptions[subscription.client_id].discard(subscription_id)
-                    self._type_subscriptions[subscription.subscription_type].discard(subscription_id)
+                    self._unindex(subscription)
                     
                     logger.info(f"Expired subscription {subscription_id}")
                 
@@ -409,7 +444,8 @@ class MCPSubscriptionManager:
             "subscriptions_by_type": type_counts,
             "subscriptions_by_client": client_counts,
             "total_clients": len(self._client_subscriptions),
-            "notification_callbacks": len(self._notification_callbacks)
+            "notification_callbacks": len(self._notification_callbacks),
+            "webhooks": self._webhooks.get_stats() if self._webhooks is not None else None
         }
 
 
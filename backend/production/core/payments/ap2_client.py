@@ -1,15 +1,17 @@
 from typing import Dict, Any, Optional, List
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import httpx
-import json
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives import serialization
 
 from .models import AP2Mandate, AP2Transaction, PaymentMethod, VerifiableCredential
 from .ap2_mandate_validator import AP2MandateValidator, AP2MandateValidationError
 from .cryptographic_mandate_validator import get_mandate_validator, CryptographicMandateValidator
+from .crypto_executor import get_crypto_executor
+from ..canonical_json import canonicalize
+from ..exceptions import ValidationError
 from ..connection_pool_manager import (
     get_connection_pool_manager, 
     AP2_POOL_CONFIG,
@@ -73,7 +75,7 @@ class AP2Client:
         }
         
         # Create cryptographically signed mandate
-        signed_mandate = self._crypto_validator.create_signed_mandate(mandate_data)
+        signed_mandate = await self._crypto_validator.create_signed_mandate_async(mandate_data)
         
         # Submit signed mandate to AP2 network
         response = await self._http_client.post(
@@ -103,7 +105,7 @@ class AP2Client:
         }
         
         # Create cryptographically signed mandate
-        signed_mandate = self._crypto_validator.create_signed_mandate(mandate_data)
+        signed_mandate = await self._crypto_validator.create_signed_mandate_async(mandate_data)
         
         response = await self._http_client.post(
             f"{self._config.base_url}/mandates/cart",
@@ -120,32 +122,26 @@ class AP2Client:
         payment_method: PaymentMethod
     ) -> AP2Transaction:
         """Execute payment using AP2 protocol"""
-        transaction_data = {
-            "cartMandateId": cart_mandate_id,
-            "paymentMethod": payment_method.to_dict(),
-            "timestamp": datetime.utcnow().isoformat()
-        }
-        
-        response = await self._http_client.post(
-            f"{self._config.base_url}/transactions",
-            json=transaction_data,
-            headers=self._get_auth_headers()
-        )
-        response.raise_for_status()
+        # A cart mandate pays once: its nonce is consumed when the transaction is accepted
+        async with self.redeem_mandate(cart_mandate_id):
+            transaction_data = {
+                "cartMandateId": cart_mandate_id,
+                "paymentMethod": payment_method.to_dict(),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            
+            response = await self._http_client.post(
+                f"{self._config.base_url}/transactions",
+                json=transaction_data,
+                headers=self._get_auth_headers()
+            )
+            response.raise_for_status()
         
         return AP2Transaction.from_dict(response.json())
     
-    def _sign_mandate(self, mandate_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Sign mandate with private key for cryptographic verification"""
-        mandate_json = json.dumps(mandate_data, sort_keys=True)
-        signature = self._private_key.sign(
-            mandate_json.encode(),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+    async def _sign_mandate(self, mandate_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Sign mandate with private key for cryptographic verification (off the event loop)"""
+        signature = await get_crypto_executor().sign(self._private_key, canonicalize(mandate_data))
         
         return {
             "mandate": mandate_data,
@@ -163,16 +159,10 @@ class AP2Client:
     async def get_mandate(self, mandate_id: str) -> Optional[AP2Mandate]:
         """Retrieve a mandate by ID from AP2 network"""
         try:
-            response = await self._http_client.get(
-                f"{self._config.base_url}/mandates/{mandate_id}",
-                headers=self._get_auth_headers()
-            )
-            response.raise_for_status()
-            mandate = AP2Mandate.from_dict(response.json())
+            mandate_data = await self._fetch_signed_mandate(mandate_id)
             
             # CRITICAL SECURITY: Validate mandate signature using cryptographic validator
-            mandate_data = response.json()
-            if not self._crypto_validator.verify_signed_mandate(mandate_data):
+            if not await self._crypto_validator.verify_signed_mandate_async(mandate_data):
                 raise AP2MandateValidationError(f"Invalid signature for mandate {mandate_id}")
             
             # Extract mandate from signed mandate structure
@@ -185,6 +175,39 @@ class AP2Client:
             print(f"SECURITY WARNING: Invalid mandate signature for {mandate_id}")
             return None
     
+    @asynccontextmanager
+    async def redeem_mandate(self, mandate_id: str):
+        """
+        Redeem a mandate around the request that acts on it (payment execution).
+        Its nonce is recorded only if the body completes; a failed request
+        releases it, so the payment can be retried with the same mandate.
+        
+        Raises:
+            ValueError if the mandate is not found, invalid or already redeemed
+        """
+        try:
+            mandate_data = await self._fetch_signed_mandate(mandate_id)
+        except httpx.HTTPStatusError:
+            raise ValueError(f"Cart mandate {mandate_id} not found, invalid or already redeemed")
+        redeeming = False
+        try:
+            async with self._crypto_validator.redemption(mandate_data) as mandate_dict:
+                redeeming = True
+                yield AP2Mandate.from_dict(mandate_dict)
+        except ValidationError:
+            if redeeming:
+                raise
+            print(f"SECURITY WARNING: Invalid or replayed mandate signature for {mandate_id}")
+            raise ValueError(f"Cart mandate {mandate_id} not found, invalid or already redeemed")
+    
+    async def _fetch_signed_mandate(self, mandate_id: str) -> Dict[str, Any]:
+        response = await self._http_client.get(
+            f"{self._config.base_url}/mandates/{mandate_id}",
+            headers=self._get_auth_headers()
+        )
+        response.raise_for_status()
+        return response.json()
+    
     async def revoke_mandate(self, mandate_id: str, reason: str = "user_requested") -> bool:
         """Revoke an active mandate"""
         try:
@@ -254,7 +277,7 @@ class AP2Client:
             "expiresAt": (datetime.utcnow() + timedelta(hours=expiry_hours)).isoformat()
         }
         
-        signed_mandate = self._sign_mandate(mandate_data)
+        signed_mandate = await self._sign_mandate(mandate_data)
         
         response = await self._http_client.post(
             f"{self._config.base_url}/mandates/intent",
@@ -309,7 +332,7 @@ class AP2Client:
             "businessValidation": validate_with_business
         }
         
-        signed_mandate = self._sign_mandate(mandate_data)
+        signed_mandate = await self._sign_mandate(mandate_data)
         
         response = await self._http_client.post(
             f"{self._config.base_url}/mandates/cart",
@@ -337,28 +360,25 @@ class AP2Client:
         Returns:
             AP2Transaction result
         """
-        # Validate cart mandate
-        cart_mandate = await self.get_mandate(cart_mandate_id)
-        if not cart_mandate:
-            raise ValueError(f"Cart mandate {cart_mandate_id} not found")
-        
-        if cart_mandate.status != "active":
-            raise ValueError(f"Cart mandate {cart_mandate_id} is not active")
-        
-        transaction_data = {
-            "cartMandateId": cart_mandate_id,
-            "paymentMethod": payment_method.to_dict(),
-            "timestamp": datetime.utcnow().isoformat(),
-            "verificationRequired": verification_required,
-            "amount": cart_mandate.data.get("totalAmount"),
-            "currency": cart_mandate.data.get("currency")
-        }
-        
-        response = await self._http_client.post(
-            f"{self._config.base_url}/transactions",
-            json=transaction_data,
-            headers=self._get_auth_headers()
-        )
-        response.raise_for_status()
+        # Validate and redeem cart mandate; a failed transaction leaves it redeemable
+        async with self.redeem_mandate(cart_mandate_id) as cart_mandate:
+            if cart_mandate.status != "active":
+                raise ValueError(f"Cart mandate {cart_mandate_id} is not active")
+            
+            transaction_data = {
+                "cartMandateId": cart_mandate_id,
+                "paymentMethod": payment_method.to_dict(),
+                "timestamp": datetime.utcnow().isoformat(),
+                "verificationRequired": verification_required,
+                "amount": cart_mandate.data.get("totalAmount"),
+                "currency": cart_mandate.data.get("currency")
+            }
+            
+            response = await self._http_client.post(
+                f"{self._config.base_url}/transactions",
+                json=transaction_data,
+                headers=self._get_auth_headers()
+            )
+            response.raise_for_status()
         
         return AP2Transaction.from_dict(response.json())
@@ -6,16 +6,19 @@ This module addresses the critical security gap in mandate verification
 by implementing proper cryptographic signature validation.
 """
 
-import json
 import base64
 from typing import Dict, Any, Optional
 from datetime import datetime
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding, rsa
-from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
 
 from .models import AP2Mandate
+from .crypto_executor import CryptoExecutor, get_crypto_executor, rsa_pss_verify
+from ..canonical_json import canonicalize, legacy_json, legacy_signatures_accepted, record_legacy_fallback
+
+# Label for signatures accepted under the pre-RFC 8785 encoding
+LEGACY_VERIFIER = "ap2_mandate_validator"
 
 
 class AP2MandateValidationError(Exception):
@@ -31,15 +34,23 @@ class AP2MandateValidator:
     using RSA-PSS with SHA-256 as specified in the AP2 protocol.
     """
     
-    def __init__(self, public_key_pem: str):
+    def __init__(self, public_key_pem: str, crypto_executor: Optional[CryptoExecutor] = None):
         """
         Initialize validator with public key
         
         Args:
             public_key_pem: PEM-formatted public key for signature verification
+            crypto_executor: Worker pool and key cache (the global one if not provided)
         """
+        self._crypto_executor = crypto_executor
         self.public_key = self._load_public_key(public_key_pem)
     
+    @property
+    def crypto(self) -> CryptoExecutor:
+        if self._crypto_executor is None:
+            self._crypto_executor = get_crypto_executor()
+        return self._crypto_executor
+    
     def verify_mandate(self, mandate: AP2Mandate) -> bool:
         """
         Verify mandate cryptographic signature
@@ -81,6 +92,28 @@ class AP2MandateValidator:
         except Exception as e:
             raise AP2MandateValidationError(f"Mandate validation failed: {str(e)}")
     
+    async def verify_mandate_async(self, mandate: AP2Mandate) -> bool:
+        """verify_mandate with the RSA operation run on the crypto executor"""
+        return await self.verify_mandate_from_dict_async(mandate.data, mandate.signature)
+    
+    async def verify_mandate_from_dict_async(self, mandate_data: Dict[str, Any], signature: str,
+                                             public_key: Optional[str] = None) -> bool:
+        """verify_mandate_from_dict with the RSA operation run on the crypto executor"""
+        try:
+            pk = self._load_public_key(public_key) if public_key else self.public_key
+            message, signature_bytes = self._verification_input(mandate_data, signature)
+            if await self.crypto.verify(pk, signature_bytes, message):
+                return True
+            legacy_message = self._legacy_message(mandate_data)
+            if legacy_message is None or not await self.crypto.verify(pk, signature_bytes, legacy_message):
+                return False
+            record_legacy_fallback(LEGACY_VERIFIER)
+            return True
+        except AP2MandateValidationError:
+            raise
+        except Exception as e:
+            raise AP2MandateValidationError(f"Mandate validation failed: {str(e)}")
+    
     def _verify_signature(self, mandate_data: Dict[str, Any], signature: str) -> bool:
         """Verify signature using instance public key"""
         return self._verify_signature_with_key(mandate_data, signature, self.public_key)
@@ -98,42 +131,46 @@ class AP2MandateValidator:
             True if signature is valid, False otherwise
         """
         try:
-            # Remove signature from data if present to avoid circular verification
-            data_for_verification = mandate_data.copy()
-            if 'signature' in data_for_verification:
-                del data_for_verification['signature']
-            
-            # Create canonical JSON representation
-            message = json.dumps(data_for_verification, sort_keys=True, separators=(',', ':')).encode('utf-8')
-            
-            # Decode signature from base64
-            signature_bytes = base64.b64decode(signature)
+            message, signature_bytes = self._verification_input(mandate_data, signature)
             
             # Verify signature using RSA-PSS with SHA-256
-            public_key.verify(
-                signature_bytes,
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            
+            if rsa_pss_verify(public_key, signature_bytes, message):
+                return True
+            legacy_message = self._legacy_message(mandate_data)
+            if legacy_message is None or not rsa_pss_verify(public_key, signature_bytes, legacy_message):
+                return False
+            record_legacy_fallback(LEGACY_VERIFIER)
             return True
             
-        except InvalidSignature:
-            return False
         except Exception as e:
             raise AP2MandateValidationError(f"Signature verification error: {str(e)}")
     
+    @staticmethod
+    def _verification_input(mandate_data: Dict[str, Any], signature: str):
+        """Canonical signed message and decoded signature bytes"""
+        # Remove signature from data if present to avoid circular verification
+        data_for_verification = mandate_data.copy()
+        if 'signature' in data_for_verification:
+            del data_for_verification['signature']
+        
+        # RFC 8785 canonical JSON representation
+        message = canonicalize(data_for_verification)
+        
+        # Decode signature from base64
+        return message, base64.b64decode(signature)
+    
+    @staticmethod
+    def _legacy_message(mandate_data: Dict[str, Any]) -> Optional[bytes]:
+        """The pre-RFC 8785 compact json.dumps form, while the transition window is open"""
+        if not legacy_signatures_accepted():
+            return None
+        data_for_verification = {key: value for key, value in mandate_data.items() if key != 'signature'}
+        return legacy_json(data_for_verification, separators=(',', ':'))
+    
     def _load_public_key(self, public_key_pem: str):
-        """Load public key from PEM format"""
+        """Load public key from PEM format (parsed once per distinct PEM)"""
         try:
-            return serialization.load_pem_public_key(
-                public_key_pem.encode('utf-8'),
-                backend=default_backend()
-            )
+            return self.crypto.keys.load_pem(public_key_pem)
         except Exception as e:
             raise AP2MandateValidationError(f"Failed to load public key: {str(e)}")
     
@@ -205,6 +242,28 @@ class AP2MandateValidator:
             results['is_valid'] = False
             results['errors'].append(f'Signature verification failed: {str(e)}')
         
+        return self._validate_non_signature(mandate, results)
+    
+    async def comprehensive_validate_async(self, mandate: AP2Mandate) -> Dict[str, Any]:
+        """comprehensive_validate with signature verification run on the crypto executor"""
+        results = {
+            'is_valid': True,
+            'errors': [],
+            'warnings': []
+        }
+        
+        try:
+            if not await self.verify_mandate_async(mandate):
+                results['is_valid'] = False
+                results['errors'].append('Invalid cryptographic signature')
+        except AP2MandateValidationError as e:
+            results['is_valid'] = False
+            results['errors'].append(f'Signature verification failed: {str(e)}')
+        
+        return self._validate_non_signature(mandate, results)
+    
+    def _validate_non_signature(self, mandate: AP2Mandate, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Expiry, structure and status checks shared by both validation paths"""
         # Check expiry
         if not self.validate_mandate_expiry(mandate):
             results['is_valid'] = False
@@ -282,7 +341,7 @@ class AP2MandateValidationMiddleware:
         Raises:
             AP2MandateValidationError: If validation fails
         """
-        validation_result = self.validator.comprehensive_validate(
+        validation_result = await self.validator.comprehensive_validate_async(
             AP2Mandate(
                 id=mandate_data.get('id', 'unknown'),
                 type=mandate_data.get('type', 'unknown'),
@@ -156,7 +156,7 @@ class AP2PaymentWorkflow:
         )
         
         # Validate the created mandate
-        if not self.validator.verify_mandate(intent_mandate):
+        if not await self.validator.verify_mandate_async(intent_mandate):
             raise AP2MandateValidationError("Invalid intent mandate signature")
         
         workflow_result.intent_mandate_id = intent_mandate.id
@@ -189,7 +189,7 @@ class AP2PaymentWorkflow:
         )
         
         # Validate the created mandate
-        if not self.validator.verify_mandate(cart_mandate):
+        if not await self.validator.verify_mandate_async(cart_mandate):
             raise AP2MandateValidationError("Invalid cart mandate signature")
         
         workflow_result.cart_mandate_id = cart_mandate.id
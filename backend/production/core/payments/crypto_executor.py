@@ -0,0 +1,322 @@
+"""
+AP2 Crypto Execution Service
+Runs mandate signing and verification (RS256, ES256, EdDSA) on a worker pool
+and caches parsed public keys, so payment bursts do not stall the event loop
+"""
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+
+from ..constants import AP2Limits
+
+# Signature algorithm identifiers (JOSE names) carried in MandateSignature.algorithm
+RS256: str = "RS256"  # RSA-PSS with SHA-256 (the original AP2 scheme)
+ES256: str = "ES256"  # ECDSA P-256 with SHA-256, raw 64-byte r||s signatures
+EDDSA: str = "EdDSA"  # Ed25519, 64-byte signatures
+_ALGORITHM_ALIASES = {"ED25519": EDDSA, "EDDSA": EDDSA, "ES256": ES256, "RS256": RS256, "PS256": RS256}
+
+
+def rsa_pss_sign(private_key, message: bytes) -> bytes:
+    """RSA-PSS with SHA-256, the AP2 mandate signature scheme"""
+    return private_key.sign(
+        message,
+        padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.MAX_LENGTH
+        ),
+        hashes.SHA256()
+    )
+
+
+def rsa_pss_verify(public_key, signature: bytes, message: bytes) -> bool:
+    """True if signature is a valid RSA-PSS/SHA-256 signature of message"""
+    try:
+        public_key.verify(
+            signature,
+            message,
+            padding.PSS(
+                mgf=padding.MGF1(hashes.SHA256()),
+                salt_length=padding.PSS.MAX_LENGTH
+            ),
+            hashes.SHA256()
+        )
+        return True
+    except InvalidSignature:
+        return False
+
+
+def ecdsa_p256_sign(private_key, message: bytes) -> bytes:
+    """ECDSA P-256/SHA-256 signature in the fixed-size JOSE r||s form"""
+    r, s = decode_dss_signature(private_key.sign(message, ec.ECDSA(hashes.SHA256())))
+    return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+
+def ecdsa_p256_verify(public_key, signature: bytes, message: bytes) -> bool:
+    """True if signature is a valid r||s ECDSA P-256/SHA-256 signature of message"""
+    if len(signature) != 64:
+        return False
+    der = encode_dss_signature(int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big"))
+    try:
+        public_key.verify(der, message, ec.ECDSA(hashes.SHA256()))
+        return True
+    except InvalidSignature:
+        return False
+
+
+def ed25519_sign(private_key, message: bytes) -> bytes:
+    return private_key.sign(message)
+
+
+def ed25519_verify(public_key, signature: bytes, message: bytes) -> bool:
+    try:
+        public_key.verify(signature, message)
+        return True
+    except InvalidSignature:
+        return False
+
+
+SIGNATURE_SUITES = {
+    RS256: (rsa_pss_sign, rsa_pss_verify),
+    ES256: (ecdsa_p256_sign, ecdsa_p256_verify),
+    EDDSA: (ed25519_sign, ed25519_verify),
+}
+
+
+def normalize_algorithm(algorithm: str) -> str:
+    """Canonical suite name for an algorithm identifier (raises ValueError if unsupported)"""
+    normalized = _ALGORITHM_ALIASES.get(str(algorithm).upper())
+    if normalized is None:
+        raise ValueError(f"Unsupported signature algorithm: {algorithm}")
+    return normalized
+
+
+def algorithm_for_key(key) -> str:
+    """Signature suite of a private or public key object (raises ValueError for other key types)"""
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return RS256
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return EDDSA
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and isinstance(key.curve, ec.SECP256R1):
+        return ES256
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+
+def generate_private_key(algorithm: str = RS256, rsa_key_size: int = 2048):
+    """New private key for a signature suite"""
+    algorithm = normalize_algorithm(algorithm)
+    if algorithm == EDDSA:
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm == ES256:
+        return ec.generate_private_key(ec.SECP256R1())
+    return rsa.generate_private_key(public_exponent=65537, key_size=rsa_key_size)
+
+
+def sign_message(private_key, message: bytes, algorithm: Optional[str] = None) -> bytes:
+    """Sign with the given suite (inferred from the key if not given)"""
+    key_algorithm = algorithm_for_key(private_key)
+    if algorithm is not None and normalize_algorithm(algorithm) != key_algorithm:
+        raise ValueError(f"{algorithm} signature requested with a {key_algorithm} key")
+    return SIGNATURE_SUITES[key_algorithm][0](private_key, message)
+
+
+def verify_message(public_key, signature: bytes, message: bytes, algorithm: Optional[str] = None) -> bool:
+    """
+    Verify with the given suite (inferred from the key if not given). A
+    signature claiming a different suite than the key's is invalid.
+    """
+    key_algorithm = algorithm_for_key(public_key)
+    if algorithm is not None and normalize_algorithm(algorithm) != key_algorithm:
+        return False
+    return SIGNATURE_SUITES[key_algorithm][1](public_key, signature, message)
+
+
+def _verify_job(job: Tuple) -> bool:
+    try:
+        return verify_message(*job)
+    except ValueError:  # key of an unsupported type
+        return False
+
+
+def _verify_chunk(jobs: Sequence[Tuple]) -> List[bool]:
+    return [_verify_job(job) for job in jobs]
+
+
+class PublicKeyCache:
+    """
+    LRU of parsed public keys. PEM text is keyed by its SHA-256 so a header
+    or request carrying the same key is parsed once.
+    """
+
+    def __init__(self, max_size: int = AP2Limits.PUBLIC_KEY_CACHE_SIZE):
+        self._max_size = max_size
+        self._keys: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def pem_fingerprint(public_key_pem: Union[str, bytes]) -> str:
+        if isinstance(public_key_pem, str):
+            public_key_pem = public_key_pem.encode("utf-8")
+        return "sha256:" + hashlib.sha256(public_key_pem.strip()).hexdigest()
+
+    def _get(self, cache_key: str) -> Optional[Any]:
+        with self._lock:
+            key = self._keys.get(cache_key)
+            if key is None:
+                self.misses += 1
+                return None
+            self._keys.move_to_end(cache_key)
+            self.hits += 1
+            return key
+
+    def _put(self, cache_key: str, key: Any) -> None:
+        with self._lock:
+            self._keys[cache_key] = key
+            self._keys.move_to_end(cache_key)
+            while len(self._keys) > self._max_size:
+                self._keys.popitem(last=False)
+
+    def load_pem(self, public_key_pem: Union[str, bytes]):
+        """Parsed public key for a PEM, parsing it only on a miss (raises ValueError if invalid)"""
+        cache_key = self.pem_fingerprint(public_key_pem)
+        key = self._get(cache_key)
+        if key is None:
+            pem_bytes = public_key_pem.encode("utf-8") if isinstance(public_key_pem, str) else public_key_pem
+            key = serialization.load_pem_public_key(pem_bytes)
+            self._put(cache_key, key)
+        return key
+
+    def register(self, key_id: str, public_key) -> None:
+        """Cache an already parsed key under a key id"""
+        self._put(f"kid:{key_id}", public_key)
+
+    def get(self, key_id: str) -> Optional[Any]:
+        return self._get(f"kid:{key_id}")
+
+    def evict(self, key_id: str) -> None:
+        with self._lock:
+            self._keys.pop(f"kid:{key_id}", None)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"size": len(self._keys), "max_size": self._max_size, "hits": self.hits, "misses": self.misses}
+
+
+class CryptoExecutor:
+    """
+    Async sign/verify on a thread pool. OpenSSL releases the GIL for RSA
+    operations, so the event loop keeps serving other requests meanwhile.
+    """
+
+    def __init__(self, max_workers: int = AP2Limits.CRYPTO_WORKER_THREADS,
+                 key_cache: Optional[PublicKeyCache] = None):
+        self._max_workers = max_workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self.keys = key_cache or PublicKeyCache()
+        self.signed = 0
+        self.verified = 0
+        self.rejected = 0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="ap2-crypto")
+        return self._pool
+
+    async def run(self, fn, *args):
+        """Run a CPU-bound callable on the crypto pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor(), fn, *args)
+
+    async def sign(self, private_key, message: bytes, algorithm: Optional[str] = None) -> bytes:
+        """Signature of message (suite inferred from the key if not given), computed off the event loop"""
+        signature = await self.run(sign_message, private_key, message, algorithm)
+        self.signed += 1
+        return signature
+
+    async def verify(self, public_key, signature: bytes, message: bytes, algorithm: Optional[str] = None) -> bool:
+        """
+        Verify a signature off the event loop. public_key may be a parsed key
+        or PEM text, which goes through the key cache.
+        """
+        if isinstance(public_key, (str, bytes)):
+            public_key = self.keys.load_pem(public_key)
+        valid = await self.run(verify_message, public_key, signature, message, algorithm)
+        if valid:
+            self.verified += 1
+        else:
+            self.rejected += 1
+        return valid
+
+    async def verify_many(self, jobs: Sequence[Tuple]) -> List[bool]:
+        """
+        Verify (public_key, signature, message[, algorithm]) jobs, results in order.
+        Jobs run in a few chunks per worker so thousands of verifications
+        do not mean thousands of executor round trips. A job whose key cannot
+        be parsed or used is False; it never fails the batch.
+        """
+        if not jobs:
+            return []
+        results = [False] * len(jobs)
+        positions: List[int] = []
+        parsed: List[Tuple] = []
+        for position, job in enumerate(jobs):
+            public_key = job[0]
+            if isinstance(public_key, (str, bytes)):
+                try:
+                    public_key = self.keys.load_pem(public_key)
+                except Exception:  # a malformed PEM fails only its own job
+                    continue
+            positions.append(position)
+            parsed.append((public_key,) + tuple(job[1:]))
+        
+        chunk_size = max(1, -(-len(parsed) // (self._max_workers * 4)))
+        chunks = await asyncio.gather(*(
+            self.run(_verify_chunk, parsed[start:start + chunk_size]) for start in range(0, len(parsed), chunk_size)
+        ))
+        for position, valid in zip(positions, (valid for chunk in chunks for valid in chunk)):
+            results[position] = valid
+        valid_count = sum(results)
+        self.verified += valid_count
+        self.rejected += len(results) - valid_count
+        return results
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self._max_workers,
+            "signed": self.signed,
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "key_cache": self.keys.get_stats(),
+        }
+
+
+# Global crypto executor instance
+_crypto_executor: Optional[CryptoExecutor] = None
+
+
+def get_crypto_executor() -> CryptoExecutor:
+    """Get the global crypto executor instance"""
+    global _crypto_executor
+    if _crypto_executor is None:
+        _crypto_executor = CryptoExecutor()
+    return _crypto_executor
@@ -3,31 +3,53 @@ AP2 Cryptographic Mandate Validator - Complete Implementation
 Implements proper cryptographic signing and verification for AP2 mandates
 """
 
-import json
 import base64
-import hashlib
-from typing import Dict, Any, Optional, List
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Sequence, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.exceptions import InvalidSignature, InvalidKey
+from cryptography.exceptions import InvalidKey
 import secrets
 
 from .models import AP2Mandate
+from .crypto_executor import (
+    RS256,
+    CryptoExecutor,
+    algorithm_for_key,
+    generate_private_key,
+    get_crypto_executor,
+    normalize_algorithm,
+    sign_message,
+    verify_message,
+)
+from .replay_store import MANDATE_NONCE_NAMESPACE, ReplayStore, get_replay_store
+from ..canonical_json import (
+    canonical_sha256, canonicalize, legacy_json, legacy_signatures_accepted, record_legacy_fallback
+)
+from ..constants import AP2Limits
 from ..exceptions import ValidationError, AuthenticationError
 
 
+# Label for signatures accepted under the pre-RFC 8785 encoding
+LEGACY_VERIFIER = "cryptographic_mandate_validator"
+
+PrivateKey = Union[rsa.RSAPrivateKey, ec.EllipticCurvePrivateKey, ed25519.Ed25519PrivateKey]
+PublicKey = Union[rsa.RSAPublicKey, ec.EllipticCurvePublicKey, ed25519.Ed25519PublicKey]
+
+
 @dataclass
 class CryptographicKeyPair:
     """Cryptographic key pair for AP2 mandates"""
-    private_key: rsa.RSAPrivateKey
-    public_key: rsa.RSAPublicKey
+    private_key: Optional[PrivateKey]
+    public_key: PublicKey
     key_id: str
     created_at: datetime
     expires_at: Optional[datetime] = None
+    algorithm: str = RS256  # Signature suite: RS256, ES256 or EdDSA
 
 
 @dataclass
@@ -47,17 +69,18 @@ class KeyManager:
         self._key_pairs: Dict[str, CryptographicKeyPair] = {}
         self._current_key_id: Optional[str] = None
     
-    def generate_key_pair(self, key_id: str = None, key_size: int = 2048) -> CryptographicKeyPair:
-        """Generate a new RSA key pair for mandate signing"""
+    def generate_key_pair(self, key_id: str = None, key_size: int = 2048,
+                          algorithm: str = RS256) -> CryptographicKeyPair:
+        """Generate a new key pair for mandate signing (RS256 by default, or ES256 / EdDSA)"""
         if not key_id:
             key_id = f"key_{secrets.token_hex(8)}"
         
-        # Generate private key
-        private_key = rsa.generate_private_key(
-            public_exponent=65537,
-            key_size=key_size,
-            backend=None
-        )
+        # Generate private key (key_size applies to RSA only)
+        try:
+            algorithm = normalize_algorithm(algorithm)
+        except ValueError as e:
+            raise ValidationError(str(e))
+        private_key = generate_private_key(algorithm, rsa_key_size=key_size)
         
         # Get public key
         public_key = private_key.public_key()
@@ -68,7 +91,8 @@ class KeyManager:
             public_key=public_key,
             key_id=key_id,
             created_at=datetime.utcnow(),
-            expires_at=datetime.utcnow() + timedelta(days=365)  # 1 year expiry
+            expires_at=datetime.utcnow() + timedelta(days=365),  # 1 year expiry
+            algorithm=algorithm
         )
         
         # Store key pair
@@ -90,6 +114,14 @@ class KeyManager:
             return self._key_pairs.get(self._current_key_id)
         return None
     
+    def get_signing_key_pair(self, algorithm: Optional[str] = None) -> Optional[CryptographicKeyPair]:
+        """Current key, or the newest key with a private key for the requested algorithm"""
+        current = self.get_current_key_pair()
+        if algorithm is None or (current and current.algorithm == algorithm):
+            return current
+        candidates = [kp for kp in self._key_pairs.values() if kp.algorithm == algorithm and kp.private_key]
+        return max(candidates, key=lambda kp: kp.created_at) if candidates else None
+    
     def set_current_key(self, key_id: str) -> bool:
         """Set current active key"""
         if key_id in self._key_pairs:
@@ -137,7 +169,8 @@ class KeyManager:
                 private_key=None,  # No private key for imported public key
                 public_key=public_key,
                 key_id=key_id,
-                created_at=datetime.utcnow()
+                created_at=datetime.utcnow(),
+                algorithm=algorithm_for_key(public_key)
             )
             
             self._key_pairs[key_id] = key_pair
@@ -161,7 +194,8 @@ class KeyManager:
                 private_key=private_key,
                 public_key=public_key,
                 key_id=key_id,
-                created_at=datetime.utcnow()
+                created_at=datetime.utcnow(),
+                algorithm=algorithm_for_key(private_key)
             )
             
             self._key_pairs[key_id] = key_pair
@@ -190,35 +224,71 @@ class CryptographicMandateValidator:
     Follows best practices with proper separation of concerns.
     """
     
-    def __init__(self, key_manager: KeyManager):
+    def __init__(self, key_manager: KeyManager, crypto_executor: Optional[CryptoExecutor] = None,
+                 nonce_store: Optional[ReplayStore] = None):
         self._key_manager = key_manager
+        self._crypto_executor = crypto_executor
+        self._nonce_store = nonce_store
+    
+    @property
+    def crypto(self) -> CryptoExecutor:
+        if self._crypto_executor is None:
+            self._crypto_executor = get_crypto_executor()
+        return self._crypto_executor
+    
+    @property
+    def nonces(self) -> ReplayStore:
+        """Redeemed mandate nonces, remembered for the signature max age"""
+        if self._nonce_store is None:
+            self._nonce_store = get_replay_store(MANDATE_NONCE_NAMESPACE)
+        return self._nonce_store
     
     def sign_mandate(self, 
                     mandate_data: Dict[str, Any], 
                     key_id: str = None,
-                    algorithm: str = "RS256") -> MandateSignature:
+                    algorithm: Optional[str] = None) -> MandateSignature:
         """
         Sign mandate data with cryptographic signature.
         
         Args:
             mandate_data: The mandate data to sign
             key_id: Key ID to use for signing (uses current key if not provided)
-            algorithm: Signing algorithm (currently supports RS256)
+            algorithm: Signing algorithm: RS256, ES256 or EdDSA (the key's own if not provided)
             
         Returns:
             MandateSignature object with signature and metadata
         """
-        if algorithm != "RS256":
-            raise ValidationError(f"Unsupported signing algorithm: {algorithm}")
+        key_pair, message, nonce, timestamp = self._prepare_signing(mandate_data, key_id, algorithm)
+        signature = sign_message(key_pair.private_key, message, key_pair.algorithm)
+        return self._mandate_signature(signature, key_pair, nonce, timestamp)
+    
+    async def sign_mandate_async(self,
+                                 mandate_data: Dict[str, Any],
+                                 key_id: str = None,
+                                 algorithm: Optional[str] = None) -> MandateSignature:
+        """sign_mandate with the signing operation run on the crypto executor"""
+        key_pair, message, nonce, timestamp = self._prepare_signing(mandate_data, key_id, algorithm)
+        signature = await self.crypto.sign(key_pair.private_key, message, key_pair.algorithm)
+        return self._mandate_signature(signature, key_pair, nonce, timestamp)
+    
+    def _prepare_signing(self, mandate_data: Dict[str, Any], key_id: Optional[str], algorithm: Optional[str]):
+        """Resolve the signing key and build the message to sign"""
+        if algorithm is not None:
+            try:
+                algorithm = normalize_algorithm(algorithm)
+            except ValueError:
+                raise ValidationError(f"Unsupported signing algorithm: {algorithm}")
         
         # Get key pair for signing
         if key_id:
             key_pair = self._key_manager.get_key_pair(key_id)
         else:
-            key_pair = self._key_manager.get_current_key_pair()
+            key_pair = self._key_manager.get_signing_key_pair(algorithm)
         
         if not key_pair or not key_pair.private_key:
             raise ValidationError("No valid private key available for signing")
+        if algorithm and key_pair.algorithm != algorithm:
+            raise ValidationError(f"Key {key_pair.key_id} is a {key_pair.algorithm} key, not {algorithm}")
         
         # Prepare data for signing (canonical JSON)
         canonical_data = self._canonicalize_mandate_data(mandate_data)
@@ -226,35 +296,22 @@ class CryptographicMandateValidator:
         # Generate nonce for replay protection
         nonce = secrets.token_hex(16)
         
-        # Create message to sign (data + nonce + timestamp)
-        timestamp = datetime.utcnow().isoformat()
-        message_data = {
-            "mandate_data": canonical_data,
-            "nonce": nonce,
-            "timestamp": timestamp,
-            "algorithm": algorithm
-        }
-        
-        message = json.dumps(message_data, sort_keys=True).encode('utf-8')
-        
-        # Sign the message
-        signature = key_pair.private_key.sign(
-            message,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
-        
+        # Create message to sign (data + nonce + timestamp); the signature
+        # carries the same timestamp so verification rebuilds this message
+        timestamp = datetime.utcnow()
+        message = self._signing_message(canonical_data, nonce, timestamp.isoformat(), key_pair.algorithm)
+        return key_pair, message, nonce, timestamp
+    
+    def _mandate_signature(self, signature: bytes, key_pair: CryptographicKeyPair,
+                           nonce: str, timestamp: datetime) -> MandateSignature:
         # Encode signature as base64
         signature_b64 = base64.b64encode(signature).decode('utf-8')
         
         return MandateSignature(
             signature=signature_b64,
-            algorithm=algorithm,
+            algorithm=key_pair.algorithm,
             key_id=key_pair.key_id,
-            timestamp=datetime.utcnow(),
+            timestamp=timestamp,
             nonce=nonce
         )
     
@@ -272,54 +329,65 @@ class CryptographicMandateValidator:
             True if signature is valid, False otherwise
         """
         try:
-            # Get public key for verification
-            key_pair = self._key_manager.get_key_pair(signature.key_id)
-            if not key_pair or not key_pair.public_key:
-                raise ValidationError(f"Public key not found for key_id: {signature.key_id}")
-            
-            # Check key expiration
-            if key_pair.expires_at and datetime.utcnow() > key_pair.expires_at:
-                raise ValidationError(f"Key {signature.key_id} has expired")
-            
-            # Check signature age (prevent replay attacks)
-            max_age = timedelta(hours=24)
-            if datetime.utcnow() - signature.timestamp > max_age:
-                raise ValidationError("Signature is too old")
-            
-            # Prepare data for verification (same as signing)
-            canonical_data = self._canonicalize_mandate_data(mandate_data)
-            
-            # Recreate message
-            message_data = {
-                "mandate_data": canonical_data,
-                "nonce": signature.nonce,
-                "timestamp": signature.timestamp.isoformat(),
-                "algorithm": signature.algorithm
-            }
-            
-            message = json.dumps(message_data, sort_keys=True).encode('utf-8')
-            
-            # Decode signature
-            signature_bytes = base64.b64decode(signature.signature)
-            
-            # Verify signature
-            key_pair.public_key.verify(
-                signature_bytes,
-                message,
-                padding.PSS(
-                    mgf=padding.MGF1(hashes.SHA256()),
-                    salt_length=padding.PSS.MAX_LENGTH
-                ),
-                hashes.SHA256()
-            )
-            
+            public_key, message, signature_bytes = self._prepare_verification(mandate_data, signature)
+            if verify_message(public_key, signature_bytes, message, signature.algorithm):
+                return True
+            legacy_message = self._legacy_signing_message(mandate_data, signature)
+            if legacy_message is None or not verify_message(public_key, signature_bytes, legacy_message,
+                                                            signature.algorithm):
+                return False
+            record_legacy_fallback(LEGACY_VERIFIER)
+            return True
+        except Exception as e:
+            raise ValidationError(f"Signature verification failed: {str(e)}")
+    
+    async def verify_mandate_async(self,
+                                   mandate_data: Dict[str, Any],
+                                   signature: MandateSignature) -> bool:
+        """verify_mandate with the verification run on the crypto executor"""
+        try:
+            public_key, message, signature_bytes = self._prepare_verification(mandate_data, signature)
+            if await self.crypto.verify(public_key, signature_bytes, message, signature.algorithm):
+                return True
+            legacy_message = self._legacy_signing_message(mandate_data, signature)
+            if legacy_message is None or not await self.crypto.verify(public_key, signature_bytes, legacy_message,
+                                                                      signature.algorithm):
+                return False
+            record_legacy_fallback(LEGACY_VERIFIER)
             return True
-            
-        except InvalidSignature:
-            return False
         except Exception as e:
             raise ValidationError(f"Signature verification failed: {str(e)}")
     
+    def _prepare_verification(self, mandate_data: Dict[str, Any], signature: MandateSignature):
+        """
+        Check key and signature age, then rebuild the signed message. The
+        signature's algorithm must match the key's suite when verified.
+        """
+        # Get public key for verification
+        key_pair = self._key_manager.get_key_pair(signature.key_id)
+        if not key_pair or not key_pair.public_key:
+            raise ValidationError(f"Public key not found for key_id: {signature.key_id}")
+        
+        # Check key expiration
+        if key_pair.expires_at and datetime.utcnow() > key_pair.expires_at:
+            raise ValidationError(f"Key {signature.key_id} has expired")
+        
+        # Check signature age (prevent replay attacks)
+        max_age = timedelta(seconds=AP2Limits.MANDATE_SIGNATURE_MAX_AGE_SECONDS)
+        if datetime.utcnow() - signature.timestamp > max_age:
+            raise ValidationError("Signature is too old")
+        
+        # Prepare data for verification (same as signing)
+        canonical_data = self._canonicalize_mandate_data(mandate_data)
+        
+        # Recreate message
+        message = self._signing_message(canonical_data, signature.nonce,
+                                        signature.timestamp.isoformat(), signature.algorithm)
+        
+        # Decode signature
+        signature_bytes = base64.b64decode(signature.signature)
+        return key_pair.public_key, message, signature_bytes
+    
     def create_signed_mandate(self, 
                             mandate_data: Dict[str, Any],
                             key_id: str = None) -> Dict[str, Any]:
@@ -334,14 +402,29 @@ class CryptographicMandateValidator:
             Complete mandate with embedded signature
         """
         # Add metadata
+        self._add_signature_metadata(mandate_data)
+        
+        # Sign the mandate
+        signature = self.sign_mandate(mandate_data, key_id)
+        return self._signed_mandate(mandate_data, signature)
+    
+    async def create_signed_mandate_async(self,
+                                          mandate_data: Dict[str, Any],
+                                          key_id: str = None) -> Dict[str, Any]:
+        """create_signed_mandate with signing run on the crypto executor"""
+        self._add_signature_metadata(mandate_data)
+        signature = await self.sign_mandate_async(mandate_data, key_id)
+        return self._signed_mandate(mandate_data, signature)
+    
+    @staticmethod
+    def _add_signature_metadata(mandate_data: Dict[str, Any]) -> None:
         mandate_data["signature_metadata"] = {
             "created_at": datetime.utcnow().isoformat(),
             "version": "1.0"
         }
-        
-        # Sign the mandate
-        signature = self.sign_mandate(mandate_data, key_id)
-        
+    
+    @staticmethod
+    def _signed_mandate(mandate_data: Dict[str, Any], signature: MandateSignature) -> Dict[str, Any]:
         # Create complete signed mandate
         signed_mandate = {
             "mandate": mandate_data,
@@ -367,21 +450,7 @@ class CryptographicMandateValidator:
             True if mandate is valid, False otherwise
         """
         try:
-            # Extract mandate data and signature
-            mandate_data = signed_mandate.get("mandate")
-            signature_data = signed_mandate.get("signature")
-            
-            if not mandate_data or not signature_data:
-                raise ValidationError("Invalid signed mandate structure")
-            
-            # Create signature object
-            signature = MandateSignature(
-                signature=signature_data["signature"],
-                algorithm=signature_data["algorithm"],
-                key_id=signature_data["key_id"],
-                timestamp=datetime.fromisoformat(signature_data["timestamp"]),
-                nonce=signature_data["nonce"]
-            )
+            mandate_data, signature = self._parse_signed_mandate(signed_mandate)
             
             # Verify the signature
             return self.verify_mandate(mandate_data, signature)
@@ -389,33 +458,177 @@ class CryptographicMandateValidator:
         except Exception as e:
             raise ValidationError(f"Signed mandate verification failed: {str(e)}")
     
+    async def verify_signed_mandate_async(self, signed_mandate: Dict[str, Any]) -> bool:
+        """verify_signed_mandate with verification run on the crypto executor"""
+        try:
+            mandate_data, signature = self._parse_signed_mandate(signed_mandate)
+            return await self.verify_mandate_async(mandate_data, signature)
+        except Exception as e:
+            raise ValidationError(f"Signed mandate verification failed: {str(e)}")
+    
+    async def redeem_mandate_async(self,
+                                   mandate_data: Dict[str, Any],
+                                   signature: MandateSignature) -> bool:
+        """
+        Verify a mandate and consume its nonce, for paths that act on it.
+        
+        Returns:
+            True only for the first presentation of a valid signature; a
+            nonce seen again within the signature max age is a replay
+        """
+        if not await self.verify_mandate_async(mandate_data, signature):
+            return False
+        return not await self.nonces.check_and_record(f"{signature.key_id}:{signature.nonce}")
+    
+    async def redeem_signed_mandate_async(self, signed_mandate: Dict[str, Any]) -> bool:
+        """redeem_mandate_async for a complete signed mandate"""
+        try:
+            mandate_data, signature = self._parse_signed_mandate(signed_mandate)
+        except Exception as e:
+            raise ValidationError(f"Signed mandate verification failed: {str(e)}")
+        return await self.redeem_mandate_async(mandate_data, signature)
+    
+    @asynccontextmanager
+    async def redemption(self, signed_mandate: Dict[str, Any]):
+        """
+        Redeem a signed mandate around the action it authorizes. The nonce is
+        claimed on entry, recorded for the signature max age only if the body
+        completes, and released if it raises so the action can be retried.
+        
+        Raises:
+            ValidationError if the signature is invalid or the mandate was
+            already redeemed (or is being redeemed)
+        """
+        try:
+            mandate_data, signature = self._parse_signed_mandate(signed_mandate)
+        except Exception as e:
+            raise ValidationError(f"Signed mandate verification failed: {str(e)}")
+        if not await self.verify_mandate_async(mandate_data, signature):
+            raise ValidationError("Invalid mandate signature")
+        
+        nonce_key = f"{signature.key_id}:{signature.nonce}"
+        if not await self.nonces.claim(nonce_key):
+            raise ValidationError("Mandate already redeemed")
+        try:
+            yield mandate_data
+        except BaseException:
+            await self.nonces.release(nonce_key)
+            raise
+        await self.nonces.commit(nonce_key)
+    
+    async def verify_many(
+        self,
+        mandates: Sequence[Union[Dict[str, Any], Tuple[Dict[str, Any], MandateSignature]]]
+    ) -> List[bool]:
+        """
+        Verify a batch of mandates, results in input order.
+        
+        Args:
+            mandates: Signed mandate dicts ({"mandate", "signature"}) or
+                (mandate_data, MandateSignature) pairs
+            
+        Returns:
+            One bool per mandate. Unlike verify_mandate, a mandate that cannot
+            be checked (unknown or expired key, stale or malformed signature)
+            is reported as False instead of raising.
+        """
+        results = [False] * len(mandates)
+        job_index: Dict[Tuple[str, str, bytes, bytes], int] = {}
+        jobs: List[Tuple[Any, bytes, bytes, str]] = []
+        legacy_messages: List[Optional[bytes]] = []
+        positions: List[List[int]] = []
+        
+        for position, item in enumerate(mandates):
+            try:
+                if isinstance(item, dict):
+                    mandate_data, signature = self._parse_signed_mandate(item)
+                else:
+                    mandate_data, signature = item
+                public_key, message, signature_bytes = self._prepare_verification(mandate_data, signature)
+            except Exception:
+                continue
+            
+            # Identical (key, payload, signature) triples are verified once
+            dedupe_key = (signature.key_id, signature.algorithm, message, signature_bytes)
+            job = job_index.get(dedupe_key)
+            if job is None:
+                job = job_index[dedupe_key] = len(jobs)
+                jobs.append((public_key, signature_bytes, message, signature.algorithm))
+                legacy_messages.append(self._legacy_signing_message(mandate_data, signature))
+                positions.append([])
+            positions[job].append(position)
+        
+        valid_jobs = await self.crypto.verify_many(jobs)
+        # Failures get one more pass under the legacy encoding during the transition
+        retry = [job for job, valid in enumerate(valid_jobs) if not valid and legacy_messages[job] is not None]
+        if retry:
+            legacy_jobs = [(*jobs[job][:2], legacy_messages[job], jobs[job][3]) for job in retry]
+            for job, valid in zip(retry, await self.crypto.verify_many(legacy_jobs)):
+                if valid:
+                    valid_jobs[job] = True
+                    record_legacy_fallback(LEGACY_VERIFIER)
+        
+        for job, valid in enumerate(valid_jobs):
+            for position in positions[job]:
+                results[position] = valid
+        return results
+    
+    @staticmethod
+    def _parse_signed_mandate(signed_mandate: Dict[str, Any]):
+        """Split a signed mandate into its data and MandateSignature"""
+        # Extract mandate data and signature
+        mandate_data = signed_mandate.get("mandate")
+        signature_data = signed_mandate.get("signature")
+        
+        if not mandate_data or not signature_data:
+            raise ValidationError("Invalid signed mandate structure")
+        
+        # Create signature object
+        signature = MandateSignature(
+            signature=signature_data["signature"],
+            algorithm=signature_data["algorithm"],
+            key_id=signature_data["key_id"],
+            timestamp=datetime.fromisoformat(signature_data["timestamp"]),
+            nonce=signature_data["nonce"]
+        )
+        return mandate_data, signature
+    
     def _canonicalize_mandate_data(self, mandate_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Canonicalize mandate data for consistent signing/verification.
-        Removes signature fields and sorts keys.
+        Removes signature fields; key order is fixed when encoding.
         """
         canonical = mandate_data.copy()
         
         # Remove signature-related fields
         canonical.pop("signature", None)
         canonical.pop("signature_metadata", None)
-        
-        # Recursively sort nested dictionaries
-        def sort_dict_recursively(obj):
-            if isinstance(obj, dict):
-                return {k: sort_dict_recursively(v) for k, v in sorted(obj.items())}
-            elif isinstance(obj, list):
-                return [sort_dict_recursively(item) for item in obj]
-            else:
-                return obj
-        
-        return sort_dict_recursively(canonical)
+        return canonical
+    
+    @staticmethod
+    def _signing_message(canonical_data: Dict[str, Any], nonce: str, timestamp: str, algorithm: str) -> bytes:
+        """The RFC 8785 bytes a mandate signature covers: data + nonce + timestamp + algorithm"""
+        return canonicalize({
+            "mandate_data": canonical_data,
+            "nonce": nonce,
+            "timestamp": timestamp,
+            "algorithm": algorithm
+        })
+    
+    def _legacy_signing_message(self, mandate_data: Dict[str, Any], signature: MandateSignature) -> Optional[bytes]:
+        """The pre-RFC 8785 json.dumps form of _signing_message, while the transition window is open"""
+        if not legacy_signatures_accepted():
+            return None
+        return legacy_json({
+            "mandate_data": self._canonicalize_mandate_data(mandate_data),
+            "nonce": signature.nonce,
+            "timestamp": signature.timestamp.isoformat(),
+            "algorithm": signature.algorithm
+        })
     
     def get_mandate_hash(self, mandate_data: Dict[str, Any]) -> str:
         """Get SHA-256 hash of mandate data for integrity checking"""
-        canonical_data = self._canonicalize_mandate_data(mandate_data)
-        data_json = json.dumps(canonical_data, sort_keys=True).encode('utf-8')
-        return hashlib.sha256(data_json).hexdigest()
+        return canonical_sha256(self._canonicalize_mandate_data(mandate_data))
 
 
 # Global key manager instance
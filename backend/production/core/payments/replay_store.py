@@ -0,0 +1,310 @@
+"""
+AP2 Replay Protection Store
+Remembers webhook IDs and mandate nonces for a fixed time window
+
+BloomReplayStore keeps one Bloom filter per time bucket and rotates them, so
+memory stays fixed whatever the traffic and a check is a handful of bit
+probes. A key is remembered for at least window_seconds (at most one bucket
+longer). False positives are possible, at the configured rate, once a
+bucket holds its full capacity; there are never false negatives inside the window.
+
+RedisReplayStore uses SET NX EX, so every worker shares one window. If Redis
+is unreachable it falls back to a local Bloom store rather than accepting
+every replay.
+
+Keys that should only count once their handling succeeds (webhooks) go through
+claim / commit / release: a claim blocks concurrent duplicates, commit records
+the key for the window, release lets the sender's retry through.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from ..constants import AP2Limits
+
+logger = logging.getLogger(__name__)
+
+REPLAY_KEY_PREFIX = "bais:replay:"
+
+# Namespaces and how long each remembers a key
+WEBHOOK_NAMESPACE = "webhooks"
+MANDATE_NONCE_NAMESPACE = "mandate-nonces"
+REPLAY_WINDOWS = {
+    WEBHOOK_NAMESPACE: AP2Limits.WEBHOOK_REPLAY_WINDOW_SECONDS,
+    MANDATE_NONCE_NAMESPACE: AP2Limits.MANDATE_SIGNATURE_MAX_AGE_SECONDS,
+}
+
+
+class ReplayStore:
+    """Time-windowed set of seen keys"""
+
+    window_seconds: int
+
+    async def check_and_record(self, key: str) -> bool:
+        """Record key; True if it was already recorded within the window (a replay)"""
+        raise NotImplementedError
+
+    async def claim(self, key: str) -> bool:
+        """Reserve key for processing; False if it is recorded or already claimed (a replay)"""
+        raise NotImplementedError
+
+    async def commit(self, key: str) -> None:
+        """Record a claimed key for the full window"""
+        raise NotImplementedError
+
+    async def release(self, key: str) -> None:
+        """Drop a claim whose processing failed, so a retry is accepted"""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class _BloomFilter:
+    __slots__ = ("bits", "count")
+
+    def __init__(self, size_bytes: int):
+        self.bits = bytearray(size_bytes)
+        self.count = 0
+
+    def contains(self, positions: List[int]) -> bool:
+        bits = self.bits
+        for position in positions:
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, positions: List[int]) -> None:
+        bits = self.bits
+        for position in positions:
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+
+class BloomReplayStore(ReplayStore):
+    """
+    In-process store: buckets rotating Bloom filters, each covering
+    window_seconds / (buckets - 1), checked newest first.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = AP2Limits.WEBHOOK_REPLAY_WINDOW_SECONDS,
+        capacity: int = AP2Limits.REPLAY_WINDOW_CAPACITY,
+        false_positive_rate: float = AP2Limits.REPLAY_FALSE_POSITIVE_RATE,
+        buckets: int = AP2Limits.REPLAY_BUCKETS,
+        clock: Callable[[], float] = time.time
+    ):
+        if buckets < 2:
+            raise ValueError("BloomReplayStore needs at least 2 buckets")
+        self.window_seconds = window_seconds
+        self._bucket_count = buckets
+        self._bucket_seconds = window_seconds / (buckets - 1)
+        self._bucket_capacity = max(1, math.ceil(capacity / (buckets - 1)))
+        # Standard sizing: m = -n ln p / (ln 2)^2 bits, k = (m / n) ln 2 probes
+        bits = math.ceil(-self._bucket_capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self._size_bytes = (bits + 7) // 8
+        self._size_bits = self._size_bytes * 8
+        self._hash_count = max(1, round(self._size_bits / self._bucket_capacity * math.log(2)))
+        self._buckets: Deque[Tuple[int, _BloomFilter]] = deque()
+        self._claims: Set[str] = set()  # Claimed, not yet committed (bounded by in-flight requests)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.replays = 0
+        self.saturated_buckets = 0
+
+    def _positions(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        size = self._size_bits
+        return [(first + i * step) % size for i in range(self._hash_count)]
+
+    def _current_bucket(self) -> _BloomFilter:
+        index = int(self._clock() // self._bucket_seconds)
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= index - self._bucket_count:
+            buckets.popleft()
+        if not buckets or buckets[-1][0] != index:
+            buckets.append((index, _BloomFilter(self._size_bytes)))
+        return buckets[-1][1]
+
+    def _recorded(self, key: str, positions: List[int]) -> bool:
+        self._current_bucket()
+        if key in self._claims or any(bloom.contains(positions) for _, bloom in reversed(self._buckets)):
+            self.replays += 1
+            return True
+        return False
+
+    def _record(self, positions: List[int]) -> None:
+        current = self._current_bucket()
+        current.add(positions)
+        if current.count == self._bucket_capacity + 1:
+            self.saturated_buckets += 1
+            logger.warning(
+                f"⚠️ Replay store bucket over capacity ({self._bucket_capacity}); "
+                f"false positive rate is rising"
+            )
+
+    def seen(self, key: str) -> bool:
+        """Synchronous check_and_record"""
+        positions = self._positions(key)
+        with self._lock:
+            self.checks += 1
+            if self._recorded(key, positions):
+                return True
+            self._record(positions)
+            return False
+
+    async def check_and_record(self, key: str) -> bool:
+        return self.seen(key)
+
+    async def claim(self, key: str) -> bool:
+        positions = self._positions(key)
+        with self._lock:
+            self.checks += 1
+            if self._recorded(key, positions):
+                return False
+            self._claims.add(key)
+            return True
+
+    async def commit(self, key: str) -> None:
+        positions = self._positions(key)
+        with self._lock:
+            self._claims.discard(key)
+            self._record(positions)
+
+    async def release(self, key: str) -> None:
+        with self._lock:
+            self._claims.discard(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "bloom",
+            "window_seconds": self.window_seconds,
+            "buckets": len(self._buckets),
+            "bucket_capacity": self._bucket_capacity,
+            "hash_count": self._hash_count,
+            "memory_bytes": self._size_bytes * len(self._buckets),
+            "claims": len(self._claims),
+            "checks": self.checks,
+            "replays": self.replays,
+            "saturated_buckets": self.saturated_buckets,
+        }
+
+
+class RedisReplayStore(ReplayStore):
+    """Shared store: one SET NX EX per key, so the first worker to record a key wins"""
+
+    def __init__(
+        self,
+        redis_client=None,
+        redis_url: Optional[str] = None,
+        namespace: str = WEBHOOK_NAMESPACE,
+        window_seconds: int = AP2Limits.WEBHOOK_REPLAY_WINDOW_SECONDS,
+        key_prefix: str = REPLAY_KEY_PREFIX,
+        fallback: Optional[ReplayStore] = None,
+        claim_lease_seconds: int = AP2Limits.REPLAY_CLAIM_LEASE_SECONDS
+    ):
+        if redis_client is None:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.redis_client = redis_client
+        self.window_seconds = window_seconds
+        self._key_prefix = f"{key_prefix}{namespace}:"
+        self._fallback = fallback or BloomReplayStore(window_seconds=window_seconds)
+        self._fallback_claims: Set[str] = set()  # Claims taken on the fallback while Redis was down
+        self.claim_lease_seconds = claim_lease_seconds
+        self.checks = 0
+        self.replays = 0
+        self.fallbacks = 0
+
+    async def check_and_record(self, key: str) -> bool:
+        self.checks += 1
+        try:
+            recorded = await self.redis_client.set(self._key_prefix + key, 1, nx=True, ex=self.window_seconds)
+        except Exception as e:
+            self.fallbacks += 1
+            logger.warning(f"⚠️ Replay store Redis unavailable, using local window: {e}")
+            replay = await self._fallback.check_and_record(key)
+        else:
+            replay = not recorded
+        if replay:
+            self.replays += 1
+        return replay
+
+    async def claim(self, key: str) -> bool:
+        """SET NX with a short lease, so a worker that dies mid-processing does not block retries for the window"""
+        self.checks += 1
+        try:
+            claimed = bool(await self.redis_client.set(
+                self._key_prefix + key, "claimed", nx=True, ex=self.claim_lease_seconds
+            ))
+        except Exception as e:
+            self.fallbacks += 1
+            logger.warning(f"⚠️ Replay store Redis unavailable, using local window: {e}")
+            claimed = await self._fallback.claim(key)
+            if claimed:
+                self._fallback_claims.add(key)
+        if not claimed:
+            self.replays += 1
+        return claimed
+
+    async def commit(self, key: str) -> None:
+        if key in self._fallback_claims:
+            self._fallback_claims.discard(key)
+            await self._fallback.commit(key)
+            return
+        try:
+            await self.redis_client.set(self._key_prefix + key, "done", ex=self.window_seconds)
+        except Exception as e:
+            logger.warning(f"⚠️ Replay store commit failed, claim lapses after {self.claim_lease_seconds}s: {e}")
+
+    async def release(self, key: str) -> None:
+        if key in self._fallback_claims:
+            self._fallback_claims.discard(key)
+            await self._fallback.release(key)
+            return
+        try:
+            await self.redis_client.delete(self._key_prefix + key)
+        except Exception as e:
+            logger.warning(f"⚠️ Replay store release failed, claim lapses after {self.claim_lease_seconds}s: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "window_seconds": self.window_seconds,
+            "checks": self.checks,
+            "replays": self.replays,
+            "fallbacks": self.fallbacks,
+        }
+
+
+_replay_stores: Dict[str, ReplayStore] = {}
+
+
+def get_replay_store(namespace: str = WEBHOOK_NAMESPACE) -> ReplayStore:
+    """
+    Process-wide store for a namespace: Redis when REDIS_URL is set, otherwise
+    in-process. BAIS_REPLAY_STORE=memory|redis overrides.
+    """
+    store = _replay_stores.get(namespace)
+    if store is None:
+        window_seconds = REPLAY_WINDOWS.get(namespace, AP2Limits.WEBHOOK_REPLAY_WINDOW_SECONDS)
+        backend = os.getenv("BAIS_REPLAY_STORE", "").lower()
+        redis_url = os.getenv("REDIS_URL")
+        if backend == "redis" or (backend != "memory" and redis_url):
+            logger.info(f"✅ Replay store ({namespace}): Redis")
+            store = RedisReplayStore(redis_url=redis_url, namespace=namespace, window_seconds=window_seconds)
+        else:
+            logger.info(f"Replay store ({namespace}): in-process (single worker)")
+            store = BloomReplayStore(window_seconds=window_seconds)
+        _replay_stores[namespace] = store
+    return store
@@ -3,15 +3,15 @@ Verifiable Digital Credentials (VDC) Implementation
 Complete AP2 VDC structure with cryptographic proof and chain of trust
 """
 
-import json
-import hashlib
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import uuid
 
+from .crypto_executor import EDDSA, ES256, RS256
 from .cryptographic_mandate_validator import CryptographicMandateValidator, MandateSignature
+from ..canonical_json import canonical_sha256
 
 
 class VCType(Enum):
@@ -27,9 +27,19 @@ class ProofType(Enum):
     """Cryptographic proof types"""
     RSA_SIGNATURE = "RsaSignature2018"
     ECDSA_SIGNATURE = "EcdsaSignature2019"
+    ED25519_SIGNATURE = "Ed25519Signature2020"
     JWT_PROOF = "JwtProof2020"
 
 
+# Signature suite behind each proof type, and back
+PROOF_TYPE_ALGORITHMS = {
+    ProofType.RSA_SIGNATURE: RS256,
+    ProofType.ECDSA_SIGNATURE: ES256,
+    ProofType.ED25519_SIGNATURE: EDDSA,
+}
+ALGORITHM_PROOF_TYPES = {algorithm: proof_type for proof_type, algorithm in PROOF_TYPE_ALGORITHMS.items()}
+
+
 @dataclass
 class CryptographicProof:
     """Cryptographic proof for verifiable credentials"""
@@ -195,8 +205,7 @@ class VerifiableCredential:
         credential_data = self.to_dict()
         credential_data.pop("proof", None)
         
-        canonical_json = json.dumps(credential_data, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(canonical_json.encode('utf-8')).hexdigest()
+        return canonical_sha256(credential_data)
 
 
 class VDCManager:
@@ -380,36 +389,61 @@ class VDCManager:
     def verify_credential(self, credential: VerifiableCredential) -> bool:
         """Verify a verifiable credential"""
         try:
-            # Check if credential is expired
-            if credential.is_expired():
-                return False
-            
-            # Check if credential is revoked
-            if credential.id in self._revoked_credentials:
-                return False
-            
-            # Verify cryptographic proof
-            if not credential.proof:
+            signed = self._signed_content(credential)
+            if signed is None:
                 return False
             
             # Verify signature using cryptographic validator
-            credential_data = credential.to_dict()
-            proof_data = credential_data.pop("proof")
-            
-            # Create signature object for verification
-            signature = MandateSignature(
-                signature=proof_data["proofValue"] or proof_data["jws"],
-                algorithm="RS256",  # Assuming RSA signature
-                key_id=proof_data["verificationMethod"],
-                timestamp=datetime.fromisoformat(proof_data["created"]),
-                nonce=proof_data.get("nonce")
-            )
-            
-            return self._crypto_validator.verify_mandate(credential_data, signature)
+            return self._crypto_validator.verify_mandate(*signed)
             
         except Exception:
             return False
     
+    async def verify_many(self, credentials: List[VerifiableCredential]) -> List[bool]:
+        """Verify a batch of credentials in one fan-out, results in input order"""
+        results = [False] * len(credentials)
+        positions = []
+        batch = []
+        for position, credential in enumerate(credentials):
+            try:
+                signed = self._signed_content(credential)
+            except Exception:
+                continue
+            if signed is not None:
+                positions.append(position)
+                batch.append(signed)
+        
+        for position, valid in zip(positions, await self._crypto_validator.verify_many(batch)):
+            results[position] = valid
+        return results
+    
+    def _signed_content(self, credential: VerifiableCredential) -> Optional[Tuple[Dict[str, Any], MandateSignature]]:
+        """The signed credential data and its signature, or None if it cannot be valid"""
+        # Check if credential is expired
+        if credential.is_expired():
+            return None
+        
+        # Check if credential is revoked
+        if credential.id in self._revoked_credentials:
+            return None
+        
+        # Verify cryptographic proof
+        if not credential.proof:
+            return None
+        
+        credential_data = credential.to_dict()
+        proof_data = credential_data.pop("proof")
+        
+        # Create signature object for verification; the proof type names the suite
+        signature = MandateSignature(
+            signature=proof_data["proofValue"] or proof_data["jws"],
+            algorithm=PROOF_TYPE_ALGORITHMS.get(credential.proof.type, RS256),
+            key_id=proof_data["verificationMethod"],
+            timestamp=datetime.fromisoformat(proof_data["created"]),
+            nonce=proof_data.get("nonce")
+        )
+        return credential_data, signature
+    
     def revoke_credential(self, credential_id: str) -> bool:
         """Revoke a verifiable credential"""
         if credential_id in self._issued_credentials:
@@ -449,7 +483,7 @@ class VDCManager:
         
         # Create cryptographic proof
         proof = CryptographicProof(
-            type=ProofType.RSA_SIGNATURE,
+            type=ALGORITHM_PROOF_TYPES[signature.algorithm],
             created=signature.timestamp,
             verification_method=signature.key_id,
             proof_purpose="assertionMethod",
@@ -466,13 +500,11 @@ class VDCManager:
     
     def _get_mandate_hash(self, mandate_data: Dict[str, Any]) -> str:
         """Get hash of mandate data"""
-        canonical_data = json.dumps(mandate_data, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(canonical_data.encode('utf-8')).hexdigest()
+        return canonical_sha256(mandate_data)
     
     def _get_transaction_hash(self, transaction_data: Dict[str, Any]) -> str:
         """Get hash of transaction data"""
-        canonical_data = json.dumps(transaction_data, sort_keys=True, separators=(',', ':'))
-        return hashlib.sha256(canonical_data.encode('utf-8')).hexdigest()
+        return canonical_sha256(transaction_data)
 
 
 # Global VDC manager instance
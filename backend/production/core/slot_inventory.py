@@ -0,0 +1,532 @@
+"""
+BAIS Slot Inventory
+Bitmap availability and atomic slot reservation for appointment bookings
+
+Each (business, service, date) day is one integer bitmap over the day's slot
+grid (bit i set = slot i taken), so an availability lookup costs O(slots in
+that day) regardless of how many bookings exist elsewhere. reserve() is a
+compare-and-set on that bitmap under a lock: of several concurrent requests
+for the same slot exactly one wins.
+
+With a DatabaseSlotStore the Booking table is the system of record and the
+bitmaps are a per-process copy of it. A day is loaded on first use and re-read
+once it is older than AVAILABILITY_REFRESH_SECONDS, so bookings and
+cancellations made by other workers show up. A slot that looks taken locally
+is re-read before a reservation is refused. Each reservation inserts its
+Booking row, and the partial unique index on (business_id, service_id,
+service_date) over non-cancelled bookings settles races between processes: a
+losing insert marks the slot taken locally and reports it unavailable.
+
+search_range() answers service set x date range x time window in one call:
+the window is a bitmask, so each (service, day) summary is an AND-NOT of two
+integers, and with a store the whole range is loaded in one query.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date as date_type, datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from .constants import BusinessConstants
+
+logger = logging.getLogger(__name__)
+
+DayKey = Tuple[str, str, str]  # (business_id, service_id, YYYY-MM-DD)
+
+WEEKDAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def parse_weekdays(weekdays: Optional[Iterable[Any]]) -> Optional[FrozenSet[int]]:
+    """Weekday filter from names ("sat", "Saturday") or numbers (0 = Monday)"""
+    if not weekdays:
+        return None
+    parsed = set()
+    for weekday in weekdays:
+        if isinstance(weekday, int) and 0 <= weekday < 7:
+            parsed.add(weekday)
+        elif isinstance(weekday, str) and weekday[:3].lower() in WEEKDAY_NAMES:
+            parsed.add(WEEKDAY_NAMES.index(weekday[:3].lower()))
+        else:
+            raise ValueError(f"Invalid weekday: {weekday!r}")
+    return frozenset(parsed)
+
+
+def requested_slot(params: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """(YYYY-MM-DD, HH:MM) a booking request asks for, or None if it names no slot"""
+    day = params.get("date") or params.get("start_date") or params.get("check_in")
+    time_str = params.get("time") or params.get("start_time")
+    if not day or not time_str:
+        return None
+    return date_type.fromisoformat(str(day)[:10]).isoformat(), str(time_str)
+
+
+def date_range(start_date: str, end_date: str, weekdays: Optional[FrozenSet[int]] = None,
+               max_days: int = BusinessConstants.MAX_AVAILABILITY_RANGE_DAYS) -> List[str]:
+    """YYYY-MM-DD days from start_date to end_date inclusive, optionally only some weekdays"""
+    start, end = date_type.fromisoformat(start_date), date_type.fromisoformat(end_date)
+    if end < start:
+        raise ValueError("end_date is before start_date")
+    span = (end - start).days + 1
+    if span > max_days:
+        raise ValueError(f"Date range covers {span} days; the maximum is {max_days}")
+    days = (start + timedelta(days=offset) for offset in range(span))
+    return [day.isoformat() for day in days if weekdays is None or day.weekday() in weekdays]
+
+
+@dataclass(frozen=True)
+class SlotSchedule:
+    """A day's slot grid: fixed-length slots from opening until closing"""
+    opening_minute: int = BusinessConstants.DEFAULT_OPENING_MINUTE
+    closing_minute: int = BusinessConstants.DEFAULT_CLOSING_MINUTE
+    slot_minutes: int = BusinessConstants.DEFAULT_SLOT_MINUTES
+
+    @property
+    def slot_count(self) -> int:
+        return (self.closing_minute - self.opening_minute) // self.slot_minutes
+
+    def time_of(self, index: int) -> str:
+        minute = self.opening_minute + index * self.slot_minutes
+        return f"{minute // 60:02d}:{minute % 60:02d}"
+
+    def index_of(self, time_str: str) -> Optional[int]:
+        """Slot index for an HH:MM start time, or None if it is not on the grid"""
+        try:
+            hours, minutes = time_str.split(":")
+            minute = int(hours) * 60 + int(minutes)
+        except (AttributeError, ValueError):
+            return None
+        offset = minute - self.opening_minute
+        if offset < 0 or offset % self.slot_minutes:
+            return None
+        index = offset // self.slot_minutes
+        return index if index < self.slot_count else None
+
+    @lru_cache(maxsize=256)
+    def window_mask(self, start_time: Optional[str] = None, end_time: Optional[str] = None) -> int:
+        """Bits of the slots starting at or after start_time and before end_time"""
+        mask = 0
+        for index in range(self.slot_count):
+            time_str = self.time_of(index)  # zero-padded HH:MM compares correctly as text
+            if (start_time is None or time_str >= start_time) and (end_time is None or time_str < end_time):
+                mask |= 1 << index
+        return mask
+
+
+class SlotInventory:
+    """Per-day slot bitmaps with compare-and-set reserve/release"""
+
+    def __init__(self, schedule: Optional[SlotSchedule] = None):
+        self.schedule = schedule or SlotSchedule()
+        self._days: Dict[DayKey, int] = {}
+        self._holders: Dict[Tuple[DayKey, int], Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._times = [self.schedule.time_of(i) for i in range(self.schedule.slot_count)]
+
+    def bitmap(self, key: DayKey) -> int:
+        return self._days.get(key, 0)
+
+    def available_times(self, key: DayKey) -> List[str]:
+        booked = self._days.get(key, 0)
+        if not booked:
+            return list(self._times)
+        return [time_str for index, time_str in enumerate(self._times) if not booked >> index & 1]
+
+    def is_available(self, key: DayKey, time_str: str) -> bool:
+        index = self.schedule.index_of(time_str)
+        return index is not None and not self._days.get(key, 0) >> index & 1
+
+    def free_mask(self, key: DayKey, window: int) -> int:
+        return window & ~self._days.get(key, 0)
+
+    def times_of(self, mask: int) -> List[str]:
+        times = self._times
+        return [times[index] for index in range(len(times)) if mask >> index & 1]
+
+    def reserve(self, key: DayKey, time_str: str, holder: Optional[str] = None) -> bool:
+        """Take the slot if it is free; False if taken or not on the grid"""
+        index = self.schedule.index_of(time_str)
+        if index is None:
+            return False
+        bit = 1 << index
+        with self._lock:
+            booked = self._days.get(key, 0)
+            if booked & bit:
+                return False
+            self._days[key] = booked | bit
+            self._holders[(key, index)] = holder
+        return True
+
+    def release(self, key: DayKey, time_str: str, holder: Optional[str] = None) -> bool:
+        """Free the slot; with holder given, only if that holder has it"""
+        index = self.schedule.index_of(time_str)
+        if index is None:
+            return False
+        bit = 1 << index
+        with self._lock:
+            booked = self._days.get(key, 0)
+            if not booked & bit:
+                return False
+            if holder is not None and self._holders.get((key, index)) != holder:
+                return False
+            booked &= ~bit
+            if booked:
+                self._days[key] = booked
+            else:
+                del self._days[key]
+            self._holders.pop((key, index), None)
+        return True
+
+    def mark_taken(self, key: DayKey, holders: Dict[str, Optional[str]]) -> None:
+        """Record slots booked elsewhere, e.g. loaded from the database (time -> holder)"""
+        with self._lock:
+            booked = self._days.get(key, 0)
+            for time_str, holder in holders.items():
+                index = self.schedule.index_of(time_str)
+                if index is not None and not booked >> index & 1:
+                    booked |= 1 << index
+                    self._holders[(key, index)] = holder
+            if booked:
+                self._days[key] = booked
+
+    def replace_day(self, key: DayKey, holders: Dict[str, Optional[str]]) -> None:
+        """Set the day to exactly these taken slots (time -> holder), e.g. a fresh database read"""
+        with self._lock:
+            self._days.pop(key, None)
+            for index in range(self.schedule.slot_count):
+                self._holders.pop((key, index), None)
+            booked = 0
+            for time_str, holder in holders.items():
+                index = self.schedule.index_of(time_str)
+                if index is not None:
+                    booked |= 1 << index
+                    self._holders[(key, index)] = holder
+            if booked:
+                self._days[key] = booked
+
+    def holder_of(self, key: DayKey, time_str: str) -> Optional[str]:
+        index = self.schedule.index_of(time_str)
+        return self._holders.get((key, index)) if index is not None else None
+
+    def drop_day(self, key: DayKey) -> None:
+        with self._lock:
+            self._days.pop(key, None)
+            for index in range(self.schedule.slot_count):
+                self._holders.pop((key, index), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "days_tracked": len(self._days),
+            "slots_per_day": self.schedule.slot_count,
+            "slots_booked": sum(bin(booked).count("1") for booked in self._days.values()),
+        }
+
+
+class DatabaseSlotStore:
+    """Booking-table persistence for AvailabilityEngine (AsyncDatabaseManager sessions)"""
+
+    def __init__(self, db_manager):
+        from sqlalchemy import and_, select
+        from sqlalchemy.exc import IntegrityError
+        from .database_models import Booking
+        self.db_manager = db_manager
+        self._Booking = Booking
+        self._select = select
+        self._and = and_
+        self._IntegrityError = IntegrityError
+
+    async def booked_slots(self, key: DayKey) -> Dict[str, str]:
+        """HH:MM -> booking id for the day's non-cancelled bookings"""
+        business_id, service_id, day = key
+        booked = await self.booked_slots_range(business_id, [service_id], day, day)
+        return booked.get(key, {})
+
+    async def booked_slots_range(
+        self, business_id: str, service_ids: Sequence[str], start_day: str, end_day: str
+    ) -> Dict[DayKey, Dict[str, str]]:
+        """Non-cancelled bookings of several services over a date range, in one query"""
+        start = datetime.combine(date_type.fromisoformat(start_day), datetime.min.time())
+        end = datetime.combine(date_type.fromisoformat(end_day), datetime.min.time()) + timedelta(days=1)
+        Booking = self._Booking
+        query = self._select(Booking.service_id, Booking.service_date, Booking.id).where(self._and(
+            Booking.business_id == business_id,
+            Booking.service_id.in_(list(service_ids)),
+            Booking.service_date >= start,
+            Booking.service_date < end,
+            Booking.status != "cancelled",
+        ))
+        async with self.db_manager.get_session() as session:
+            rows = (await session.execute(query)).all()
+        booked: Dict[DayKey, Dict[str, str]] = {}
+        for service_id, service_date, booking_id in rows:
+            key = (business_id, str(service_id), service_date.date().isoformat())
+            booked.setdefault(key, {})[service_date.strftime("%H:%M")] = booking_id
+        return booked
+
+    async def insert(self, booking_fields: Dict[str, Any]) -> bool:
+        """Insert the Booking row; False if the unique slot index rejects it"""
+        async with self.db_manager.get_session() as session:
+            session.add(self._Booking(**booking_fields))
+            try:
+                await session.commit()
+                return True
+            except self._IntegrityError as e:
+                await session.rollback()
+                message = str(e.orig)
+                if "uq_booking_active_slot" in message or "bookings.service_date" in message:
+                    return False
+                raise
+
+    async def cancel(self, booking_id: str) -> bool:
+        """Cancel the Booking row; False if there is no live booking with that id"""
+        async with self.db_manager.get_session() as session:
+            booking = await session.get(self._Booking, booking_id)
+            if booking is None or booking.status == "cancelled":
+                return False
+            booking.status = "cancelled"
+            booking.cancelled_at = datetime.utcnow()
+            await session.commit()
+            return True
+
+
+class AvailabilityEngine:
+    """
+    Availability queries and atomic booking over a SlotInventory, optionally
+    persisted through a DatabaseSlotStore.
+    """
+
+    def __init__(
+        self,
+        schedule: Optional[SlotSchedule] = None,
+        store: Optional[DatabaseSlotStore] = None,
+        refresh_seconds: float = BusinessConstants.AVAILABILITY_REFRESH_SECONDS
+    ):
+        self.inventory = SlotInventory(schedule)
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self._loaded: Dict[DayKey, float] = {}  # day -> monotonic time it was read from the store
+        self._changes: Dict[DayKey, int] = {}  # local reserve/release count per day
+        self._pending: Dict[DayKey, Dict[str, str]] = {}  # reservations whose insert is in flight
+        self._load_lock = asyncio.Lock()
+        self.reservations = 0
+        self.conflicts = 0
+
+    @staticmethod
+    def day_key(business_id: str, service_id: str, day: str) -> DayKey:
+        return (business_id, service_id, day)
+
+    def _is_fresh(self, key: DayKey, since: float) -> bool:
+        loaded_at = self._loaded.get(key)
+        return loaded_at is not None and loaded_at >= since
+
+    async def _ensure_loaded(self, key: DayKey) -> None:
+        if self.store is not None and not self._is_fresh(key, time.monotonic() - self.refresh_seconds):
+            await self._ensure_loaded_range(key[0], [key[1]], [key[2]])
+
+    async def _ensure_loaded_range(
+        self, business_id: str, service_ids: Sequence[str], days: Sequence[str], refresh: bool = False
+    ) -> None:
+        """
+        Read the days not loaded recently from the store, one query for the lot.
+        refresh=True re-reads them unless another caller did so after this call began.
+        """
+        if self.store is None or not days:
+            return
+        since = time.monotonic() if refresh else time.monotonic() - self.refresh_seconds
+        keys = [(business_id, service_id, day) for service_id in service_ids for day in days]
+        if all(self._is_fresh(key, since) for key in keys):
+            return
+        async with self._load_lock:
+            missing = [key for key in keys if not self._is_fresh(key, since)]
+            if not missing:
+                return
+            changes = {key: self._changes.get(key, 0) for key in missing}
+            loaded_at = time.monotonic()
+            missing_days = sorted({key[2] for key in missing})
+            booked = await self.store.booked_slots_range(
+                business_id, sorted({key[1] for key in missing}), missing_days[0], missing_days[-1]
+            )
+            for key in missing:
+                holders = dict(booked.get(key, {}))
+                holders.update(self._pending.get(key, {}))
+                if self._changes.get(key, 0) == changes[key]:
+                    self.inventory.replace_day(key, holders)
+                else:
+                    # Reserved or released here while the query ran: the read may predate it
+                    self.inventory.mark_taken(key, holders)
+                self._loaded[key] = loaded_at
+
+    def _record_change(self, key: DayKey) -> None:
+        self._changes[key] = self._changes.get(key, 0) + 1
+
+    async def available_times(self, business_id: str, service_id: str, day: str) -> List[str]:
+        key = self.day_key(business_id, service_id, day)
+        await self._ensure_loaded(key)
+        return self.inventory.available_times(key)
+
+    async def is_available(self, business_id: str, service_id: str, day: str, time_str: str) -> bool:
+        key = self.day_key(business_id, service_id, day)
+        await self._ensure_loaded(key)
+        return self.inventory.is_available(key, time_str)
+
+    async def reserve(
+        self,
+        business_id: str,
+        service_id: str,
+        day: str,
+        time_str: str,
+        booking_id: str,
+        booking_fields: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Atomically take a slot for booking_id. With a store, booking_fields are
+        the Booking row columns (id and service_date are filled in here).
+        """
+        key = self.day_key(business_id, service_id, day)
+        await self._ensure_loaded(key)
+        if (
+            self.store is not None
+            and self.inventory.schedule.index_of(time_str) is not None
+            and not self.inventory.is_available(key, time_str)
+            and time_str not in self._pending.get(key, {})
+        ):
+            # The local copy may predate a cancellation on another worker; the database decides
+            await self._ensure_loaded_range(business_id, [service_id], [day], refresh=True)
+        if not self.inventory.reserve(key, time_str, booking_id):
+            self.conflicts += 1
+            return False
+        self._record_change(key)
+
+        if self.store is not None:
+            fields = dict(booking_fields or {})
+            fields.update(
+                id=booking_id,
+                business_id=business_id,
+                service_id=service_id,
+                service_date=datetime.strptime(f"{day} {time_str}", "%Y-%m-%d %H:%M"),
+            )
+            self._pending.setdefault(key, {})[time_str] = booking_id
+            try:
+                inserted = await self.store.insert(fields)
+            except Exception:
+                self.inventory.release(key, time_str, booking_id)
+                raise
+            finally:
+                pending = self._pending.get(key)
+                if pending is not None:
+                    pending.pop(time_str, None)
+                    if not pending:
+                        del self._pending[key]
+            if not inserted:
+                # Another process booked it first; keep the slot marked taken
+                self.inventory.release(key, time_str, booking_id)
+                self.inventory.mark_taken(key, {time_str: None})
+                self.conflicts += 1
+                return False
+
+        self.reservations += 1
+        return True
+
+    async def search_range(
+        self,
+        business_id: str,
+        service_ids: Sequence[str],
+        start_date: str,
+        end_date: str,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        weekdays: Optional[Iterable[Any]] = None,
+        include_times: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Free slots for each service on each day of [start_date, end_date] whose
+        start falls in [start_time, end_time), optionally only on some weekdays.
+        Days without a free slot are left out.
+        """
+        weekday_filter = parse_weekdays(weekdays)
+        days = date_range(start_date, end_date, weekday_filter)
+        await self._ensure_loaded_range(business_id, service_ids, days)
+
+        inventory = self.inventory
+        window = inventory.schedule.window_mask(start_time, end_time)
+        first_available: Optional[Dict[str, str]] = None
+        services = []
+        for service_id in service_ids:
+            summaries = []
+            total_free = 0
+            for day in days:
+                free = inventory.free_mask((business_id, service_id, day), window)
+                if not free:
+                    continue
+                if not summaries:  # this service's earliest free slot
+                    earliest = inventory.times_of(free & -free)[0]
+                    if first_available is None or (day, earliest) < (first_available["date"], first_available["time"]):
+                        first_available = {"service_id": service_id, "date": day, "time": earliest}
+                count = free.bit_count()
+                total_free += count
+                summary = {"date": day, "free_slots": count}
+                if include_times:
+                    summary["times"] = inventory.times_of(free)
+                summaries.append(summary)
+            services.append({"service_id": service_id, "total_free_slots": total_free, "days": summaries})
+
+        return {
+            "business_id": business_id,
+            "start_date": start_date,
+            "end_date": end_date,
+            "time_window": {"start_time": start_time, "end_time": end_time},
+            "weekdays": [WEEKDAY_NAMES[day] for day in sorted(weekday_filter)] if weekday_filter else None,
+            "days_searched": len(days),
+            "first_available": first_available,
+            "services": services,
+        }
+
+    async def release(self, business_id: str, service_id: str, day: str, time_str: str, booking_id: str) -> bool:
+        """Free a slot held by booking_id (cancels its Booking row with a store)"""
+        key = self.day_key(business_id, service_id, day)
+        released = self.inventory.release(key, time_str, booking_id)
+        if released:
+            self._record_change(key)
+        if self.store is None:
+            return released
+        # The booking may have been made on another worker, unknown to this copy
+        cancelled = await self.store.cancel(booking_id)
+        if cancelled and not released:
+            self._loaded.pop(key, None)
+        return released or cancelled
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.inventory.get_stats()
+        stats.update(reservations=self.reservations, conflicts=self.conflicts, persistent=self.store is not None)
+        return stats
+
+
+_availability_engines: Dict[Tuple[Optional[str], SlotSchedule], AvailabilityEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_availability_engine(db_manager=None, schedule: Optional[SlotSchedule] = None) -> AvailabilityEngine:
+    """
+    Get the process-wide availability engine for a slot schedule: in-memory,
+    or persisted through db_manager's database, one per engine URL. A sync
+    DatabaseManager is swapped for the shared async manager of its database.
+    """
+    schedule = schedule or SlotSchedule()
+    if db_manager is not None and not getattr(db_manager, "is_async", False):
+        from .database_models import get_request_database_manager
+        db_manager = get_request_database_manager(db_manager.engine.url.render_as_string(hide_password=False))
+        if not getattr(db_manager, "is_async", False):
+            logger.warning("⚠️ No async database driver; bookings are held in memory only")
+            db_manager = None
+    key = (str(db_manager.engine.url) if db_manager is not None else None, schedule)
+    engine = _availability_engines.get(key)
+    if engine is None:
+        with _engines_lock:
+            engine = _availability_engines.get(key)
+            if engine is None:
+                store = DatabaseSlotStore(db_manager) if db_manager is not None else None
+                engine = _availability_engines[key] = AvailabilityEngine(schedule, store=store)
+    return engine
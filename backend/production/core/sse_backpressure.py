@@ -0,0 +1,162 @@
+"""
+BAIS SSE Backpressure
+Bounded per-connection event queues with a slow-consumer policy
+
+A client that reads slower than events are produced eventually fills its
+queue. What happens next is the connection's BackpressurePolicy:
+
+- DROP_NEWEST: refuse the new event (the original behaviour)
+- DROP_OLDEST: evict the oldest pending event to make room
+- COALESCE: an event with a coalesce key (e.g. progress for one task)
+  replaces the pending event with the same key, so a slow consumer gets the
+  latest state rather than a backlog; when still full, evict the oldest
+- DISCONNECT: refuse, and close the connection after max_drops refusals so
+  the client reconnects and resumes from Last-Event-ID
+
+The queue also tracks depth, peak depth and lag (age of the oldest pending
+event) for per-client metrics.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Dict, Hashable, Optional
+
+from .constants import SSEConnectionLimits
+
+logger = logging.getLogger(__name__)
+
+# Slot layout: [coalesce key, item, enqueued at (monotonic), live]
+_KEY, _ITEM, _ENQUEUED, _LIVE = range(4)
+
+
+class BackpressurePolicy(Enum):
+    """What a full client queue does with the next event"""
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+
+class ClientEventQueue(asyncio.Queue):
+    """
+    asyncio.Queue applying a BackpressurePolicy on offer(). Consumers use the
+    ordinary get()/get_nowait(); None is the end-of-stream sentinel.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = SSEConnectionLimits.MAX_QUEUE_SIZE,
+        policy: BackpressurePolicy = BackpressurePolicy.COALESCE,
+        max_drops: int = SSEConnectionLimits.MAX_DROPS_BEFORE_DISCONNECT
+    ):
+        super().__init__(maxsize)
+        self.policy = BackpressurePolicy(policy)
+        self.max_drops = max_drops
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.closed = False
+
+    # asyncio.Queue storage hooks
+
+    def _init(self, maxsize):
+        self._queue = deque()
+        self._pending: Dict[Hashable, list] = {}  # coalesce key -> live slot
+        self._live = 0
+        self._offer_key: Optional[Hashable] = None
+
+    def qsize(self) -> int:
+        # The deque also holds coalesced (dead) slots
+        return self._live
+
+    def empty(self) -> bool:
+        return self._live == 0
+
+    def _put(self, item):
+        key, self._offer_key = self._offer_key, None
+        slot = [key, item, time.monotonic(), True]
+        self._queue.append(slot)
+        if key is not None:
+            self._pending[key] = slot
+        self._live += 1
+        self.max_depth = max(self.max_depth, self._live)
+
+    def _get(self):
+        return self._pop_live()[_ITEM]
+
+    def _pop_live(self) -> list:
+        slot = self._queue.popleft()
+        while not slot[_LIVE]:
+            slot = self._queue.popleft()
+        self._live -= 1
+        if slot[_KEY] is not None and self._pending.get(slot[_KEY]) is slot:
+            del self._pending[slot[_KEY]]
+        return slot
+
+    # Producer side
+
+    def offer(self, item: Any, coalesce_key: Optional[Hashable] = None) -> bool:
+        """Enqueue without waiting, applying the policy. True if item was queued."""
+        if self.closed:
+            return False
+        if coalesce_key is not None and self.policy is BackpressurePolicy.COALESCE:
+            stale = self._pending.pop(coalesce_key, None)
+            if stale is not None:
+                stale[_LIVE] = False
+                self._live -= 1
+                self.coalesced += 1
+                self._compact()
+        if self.full():
+            if self.policy in (BackpressurePolicy.DROP_OLDEST, BackpressurePolicy.COALESCE):
+                self._pop_live()
+                self.dropped += 1
+            else:
+                self.dropped += 1
+                if self.policy is BackpressurePolicy.DISCONNECT and self.dropped >= self.max_drops:
+                    logger.warning(f"Slow SSE consumer dropped {self.dropped} events, disconnecting")
+                    self.close(discard_pending=True)
+                return False
+        self._offer_key = coalesce_key
+        self.put_nowait(item)
+        return True
+
+    def close(self, discard_pending: bool = False) -> None:
+        """End the stream: queue the None sentinel, making room for it if needed"""
+        if discard_pending:
+            self._queue.clear()
+            self._pending.clear()
+            self._live = 0
+        elif self.full():
+            self._pop_live()
+            self.dropped += 1
+        self.closed = True
+        self.put_nowait(None)
+
+    def _compact(self) -> None:
+        """Drop coalesced slots once they outnumber live ones"""
+        if len(self._queue) > 2 * max(self._live, self.maxsize):
+            self._queue = deque(slot for slot in self._queue if slot[_LIVE])
+
+    # Metrics
+
+    def lag_seconds(self) -> float:
+        """How long the oldest pending event has waited"""
+        for slot in self._queue:
+            if slot[_LIVE]:
+                return time.monotonic() - slot[_ENQUEUED]
+        return 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy.value,
+            "depth": self._live,
+            "max_depth": self.max_depth,
+            "capacity": self.maxsize,
+            "lag_seconds": round(self.lag_seconds(), 3),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "closed": self.closed,
+        }
@@ -0,0 +1,232 @@
+"""
+BAIS SSE Fan-out Engine
+Encode-once event delivery to many Server-Sent Events client queues
+
+An event is serialized to wire bytes once and the same immutable buffer is
+handed to every matching queue. A subscription-type -> client index finds the
+matching clients without scanning every connection. Delivery never awaits, so
+on the event loop it needs no lock; only membership changes are serialized by
+the owning transport manager.
+
+A full queue is handled by its BackpressurePolicy when it is a
+ClientEventQueue; a plain asyncio.Queue refuses the event.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set
+
+from .sse_backpressure import ClientEventQueue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SSESubscriber:
+    """One connected client queue and its delivery counters"""
+    client_id: str
+    queue: asyncio.Queue
+    subscriptions: Set[str] = field(default_factory=set)
+    last_delivery: float = field(default_factory=time.monotonic)
+    delivered: int = 0
+    dropped: int = 0
+
+
+class SSEFanout:
+    """Subscription index plus non-blocking delivery of pre-encoded events"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, SSESubscriber] = {}
+        self._by_subscription: Dict[str, Set[str]] = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.disconnected = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def __contains__(self, client_id: str) -> bool:
+        return client_id in self._subscribers
+
+    # Membership
+
+    def register(self, client_id: str, queue: asyncio.Queue) -> SSESubscriber:
+        """Add (or replace) a client queue"""
+        self.unregister(client_id)
+        subscriber = SSESubscriber(client_id=client_id, queue=queue)
+        self._subscribers[client_id] = subscriber
+        return subscriber
+
+    def unregister(self, client_id: str) -> Optional[SSESubscriber]:
+        subscriber = self._subscribers.pop(client_id, None)
+        if subscriber is not None:
+            for subscription_type in subscriber.subscriptions:
+                self._discard(subscription_type, client_id)
+        return subscriber
+
+    def subscribe(self, client_id: str, subscription_type: str) -> bool:
+        subscriber = self._subscribers.get(client_id)
+        if subscriber is None:
+            return False
+        subscriber.subscriptions.add(subscription_type)
+        self._by_subscription[subscription_type].add(client_id)
+        return True
+
+    def unsubscribe(self, client_id: str, subscription_type: str) -> bool:
+        subscriber = self._subscribers.get(client_id)
+        if subscriber is None:
+            return False
+        subscriber.subscriptions.discard(subscription_type)
+        self._discard(subscription_type, client_id)
+        return True
+
+    def _discard(self, subscription_type: str, client_id: str) -> None:
+        members = self._by_subscription.get(subscription_type)
+        if members is not None:
+            members.discard(client_id)
+            if not members:
+                del self._by_subscription[subscription_type]
+
+    def subscriber(self, client_id: str) -> Optional[SSESubscriber]:
+        return self._subscribers.get(client_id)
+
+    def subscriber_count(self, subscription_type: Optional[str] = None) -> int:
+        if subscription_type is None:
+            return len(self._subscribers)
+        return len(self._by_subscription.get(subscription_type, ()))
+
+    def idle_clients(self, idle_seconds: float) -> List[str]:
+        """Clients that have not been delivered anything for idle_seconds"""
+        cutoff = time.monotonic() - idle_seconds
+        return [client_id for client_id, subscriber in self._subscribers.items()
+                if subscriber.last_delivery < cutoff]
+
+    # Delivery
+
+    def publish(
+        self,
+        payload: bytes,
+        subscription_type: Optional[str] = None,
+        coalesce_key: Optional[Hashable] = None,
+        extra_clients: Iterable[str] = ()
+    ) -> int:
+        """
+        Hand one encoded event to every client subscribed to subscription_type
+        (every client when None) plus extra_clients, each client once.
+        Returns how many queues accepted it.
+        """
+        self.published += 1
+        subscribers = self._subscribers
+        if subscription_type is None:
+            targets: Iterable[SSESubscriber] = list(subscribers.values())
+        else:
+            members = self._by_subscription.get(subscription_type, ())
+            if extra_clients:
+                client_ids = set(members).union(extra_clients)
+                targets = [subscribers[client_id] for client_id in client_ids if client_id in subscribers]
+            elif members:
+                targets = [subscribers[client_id] for client_id in members]
+            else:
+                return 0
+
+        now = time.monotonic()
+        accepted = 0
+        for subscriber in targets:
+            if self._deliver(subscriber, payload, now, coalesce_key):
+                accepted += 1
+        return accepted
+
+    def send(self, client_id: str, payload: bytes, coalesce_key: Optional[Hashable] = None) -> bool:
+        """Hand one encoded event to a single client"""
+        subscriber = self._subscribers.get(client_id)
+        if subscriber is None:
+            return False
+        return self._deliver(subscriber, payload, time.monotonic(), coalesce_key)
+
+    def send_many(
+        self,
+        client_ids: Iterable[str],
+        payload: bytes,
+        skip_subscription: Optional[str] = None
+    ) -> int:
+        """
+        Hand one encoded event to each listed client held here, skipping
+        clients subscribed to skip_subscription (they receive it that way).
+        """
+        skip = self._by_subscription.get(skip_subscription, ()) if skip_subscription else ()
+        subscribers = self._subscribers
+        now = time.monotonic()
+        accepted = 0
+        for client_id in client_ids:
+            subscriber = subscribers.get(client_id)
+            if subscriber is not None and client_id not in skip and self._deliver(subscriber, payload, now):
+                accepted += 1
+        return accepted
+
+    def _deliver(
+        self,
+        subscriber: SSESubscriber,
+        payload: bytes,
+        now: float,
+        coalesce_key: Optional[Hashable] = None
+    ) -> bool:
+        queue = subscriber.queue
+        if isinstance(queue, ClientEventQueue):
+            dropped_before = queue.dropped
+            accepted = queue.offer(payload, coalesce_key)
+            dropped = queue.dropped - dropped_before
+            subscriber.dropped += dropped
+            self.dropped += dropped
+            if queue.closed:
+                # Slow consumer cut off; its stream sees the sentinel and ends
+                self.unregister(subscriber.client_id)
+                self.disconnected += 1
+                logger.warning(f"Client {subscriber.client_id} too slow, disconnecting")
+                return False
+        else:
+            try:
+                queue.put_nowait(payload)
+                accepted = True
+            except asyncio.QueueFull:
+                subscriber.dropped += 1
+                self.dropped += 1
+                accepted = False
+        if not accepted:
+            logger.warning(f"Client {subscriber.client_id} queue full, dropping event")
+            return False
+        subscriber.delivered += 1
+        subscriber.last_delivery = now
+        self.delivered += 1
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "clients": len(self._subscribers),
+            "subscription_types": len(self._by_subscription),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "disconnected": self.disconnected,
+        }
+
+    def client_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-client delivery counters, queue depth and lag"""
+        now = time.monotonic()
+        metrics = {}
+        for client_id, subscriber in self._subscribers.items():
+            queue = subscriber.queue
+            if isinstance(queue, ClientEventQueue):
+                entry = queue.metrics()
+            else:
+                entry = {"depth": queue.qsize(), "capacity": queue.maxsize}
+            entry.update(
+                delivered=subscriber.delivered,
+                dropped=subscriber.dropped,
+                idle_seconds=round(now - subscriber.last_delivery, 3)
+            )
+            metrics[client_id] = entry
+        return metrics
@@ -0,0 +1,140 @@
+"""
+BAIS SSE Replay Buffer
+Last-Event-ID resumption for Server-Sent Events streams
+
+Every published event gets a monotonic sequence id and is kept in a bounded
+ring buffer for its topic (subscription type or task). A client reconnecting
+with Last-Event-ID receives only the events after that id. If the buffer no
+longer reaches back that far, the caller is told there is a gap and falls back
+to sending current state.
+
+Sequence ids are milliseconds * 1000 plus a counter, never going backwards
+(a hybrid logical clock). With a backplane, ids come from a counter shared by
+every worker, so they are ordered across workers: an event relayed from another
+worker cannot carry an id below one a client has already seen from this worker
+merely because that worker's clock lags. The local clock is the fallback when
+there is no backplane or its counter is unreachable.
+"""
+
+import bisect
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple, Union
+
+from .constants import SSEConnectionLimits
+
+ReplayEntry = Tuple[int, Any]
+
+
+class SequenceClock:
+    """Monotonic event ids; ordered across workers when drawn through a backplane"""
+
+    def __init__(self):
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            self._last = max(self._last + 1, int(time.time() * 1000) * 1000)
+            return self._last
+
+    def observe(self, sequence: int) -> None:
+        """Advance past an id produced elsewhere"""
+        with self._lock:
+            self._last = max(self._last, sequence)
+
+    async def next_shared(self, backplane: Optional[Any], name: str) -> int:
+        """Next id from the backplane's shared counter for name, or a local one without it"""
+        if backplane is not None:
+            sequence = await backplane.next_sequence(name, int(time.time() * 1000) * 1000)
+            if sequence is not None:
+                self.observe(sequence)
+                return sequence
+        return self.next()
+
+
+def parse_event_id(value: Any) -> Optional[int]:
+    """Sequence from a Last-Event-ID header (or event id); None if absent or foreign"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return int(value) if value.isdigit() else None
+
+
+def payload_sequence(payload: bytes) -> Optional[int]:
+    """Sequence from the id: line of an encoded SSE event"""
+    if not payload.startswith(b"id: "):
+        return None
+    return parse_event_id(payload[4:payload.find(b"\n")].decode("ascii", "ignore"))
+
+
+def _sequence(entry: ReplayEntry) -> int:
+    return entry[0]
+
+
+class EventReplayBuffer:
+    """Per-topic bounded ring buffers of (sequence, event), ordered by sequence"""
+
+    def __init__(self, capacity: int = SSEConnectionLimits.REPLAY_BUFFER_SIZE):
+        self.capacity = capacity
+        self._rings: Dict[str, Deque[ReplayEntry]] = {}
+        self._evicted: Dict[str, int] = {}  # topic -> newest sequence pushed out
+        # Ids below this predate the buffer (e.g. a restart), so they may have gaps
+        self.horizon = int(time.time() * 1000) * 1000
+        self._lock = threading.Lock()
+
+    def append(self, topic: str, sequence: int, event: Any) -> None:
+        with self._lock:
+            ring = self._rings.setdefault(topic, deque())
+            if len(ring) >= self.capacity:
+                evicted_sequence, _ = ring.popleft()
+                self._evicted[topic] = max(self._evicted.get(topic, 0), evicted_sequence)
+            if not ring or sequence >= ring[-1][0]:
+                ring.append((sequence, event))
+            else:
+                # Relayed from a worker whose clock is slightly behind
+                bisect.insort(ring, (sequence, event), key=_sequence)
+
+    def since(
+        self,
+        topics: Union[str, Iterable[str]],
+        last_sequence: Optional[int]
+    ) -> Optional[List[ReplayEntry]]:
+        """
+        Events after last_sequence across topics, in sequence order (all retained
+        events when last_sequence is None). None when some may have been lost.
+        """
+        if isinstance(topics, str):
+            topics = [topics]
+        with self._lock:
+            # A client that saw horizon - 1 only needs ids this buffer has received
+            if last_sequence is not None and last_sequence < self.horizon - 1:
+                return None
+            streams = []
+            for topic in dict.fromkeys(topics):
+                ring = self._rings.get(topic)
+                if last_sequence is not None and last_sequence < self._evicted.get(topic, 0):
+                    return None
+                if not ring:
+                    continue
+                start = 0 if last_sequence is None else bisect.bisect_right(ring, last_sequence, key=_sequence)
+                streams.append(list(itertools.islice(ring, start, None)))
+        if len(streams) == 1:
+            return streams[0]
+        return list(heapq.merge(*streams, key=_sequence))
+
+    def drop(self, topic: str) -> None:
+        with self._lock:
+            self._rings.pop(topic, None)
+            self._evicted.pop(topic, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "topics": len(self._rings),
+                "buffered_events": sum(len(ring) for ring in self._rings.values()),
+                "capacity_per_topic": self.capacity,
+            }
@@ -0,0 +1,79 @@
+"""
+BAIS Subscription Index
+Bidirectional topic <-> client index for routing streamed events
+
+Topics are any hashable value, e.g. ("task", task_id) or ("agent", agent_id).
+Both directions are sets, so subscribing, unsubscribing and removing a client
+cost O(topics of that client) rather than a scan of every topic, and the
+clients matching several topics come out deduplicated.
+"""
+
+from collections import defaultdict
+from typing import Dict, FrozenSet, Hashable, Iterable, Set
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+
+class SubscriptionIndex:
+    """topic -> clients and client -> topics, kept in step"""
+
+    def __init__(self):
+        self._clients_by_topic: Dict[Hashable, Set[str]] = defaultdict(set)
+        self._topics_by_client: Dict[str, Set[Hashable]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._topics_by_client)
+
+    def __contains__(self, client_id: str) -> bool:
+        return client_id in self._topics_by_client
+
+    def subscribe(self, client_id: str, topic: Hashable) -> bool:
+        """Returns False if the client was already subscribed"""
+        topics = self._topics_by_client[client_id]
+        if topic in topics:
+            return False
+        topics.add(topic)
+        self._clients_by_topic[topic].add(client_id)
+        return True
+
+    def unsubscribe(self, client_id: str, topic: Hashable) -> bool:
+        topics = self._topics_by_client.get(client_id)
+        if not topics or topic not in topics:
+            return False
+        topics.discard(topic)
+        if not topics:
+            del self._topics_by_client[client_id]
+        self._discard(topic, client_id)
+        return True
+
+    def remove_client(self, client_id: str) -> Set[Hashable]:
+        """Drop every subscription of a client; returns the topics it had"""
+        topics = self._topics_by_client.pop(client_id, set())
+        for topic in topics:
+            self._discard(topic, client_id)
+        return topics
+
+    def _discard(self, topic: Hashable, client_id: str) -> None:
+        clients = self._clients_by_topic.get(topic)
+        if clients is not None:
+            clients.discard(client_id)
+            if not clients:
+                del self._clients_by_topic[topic]
+
+    def clients(self, topic: Hashable) -> FrozenSet[str]:
+        return frozenset(self._clients_by_topic.get(topic, _EMPTY))
+
+    def match(self, topics: Iterable[Hashable]) -> Set[str]:
+        """Clients subscribed to any of topics, each once"""
+        matched: Set[str] = set()
+        for topic in topics:
+            clients = self._clients_by_topic.get(topic)
+            if clients:
+                matched |= clients
+        return matched
+
+    def topics_of(self, client_id: str) -> FrozenSet[Hashable]:
+        return frozenset(self._topics_by_client.get(client_id, _EMPTY))
+
+    def topic_counts(self) -> Dict[Hashable, int]:
+        return {topic: len(clients) for topic, clients in self._clients_by_topic.items()}
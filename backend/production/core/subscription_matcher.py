@@ -0,0 +1,291 @@
+"""
+MCP Subscription Matcher
+Compiled, indexed filter matching for MCPSubscriptionManager.publish_event
+
+Each subscription's SubscriptionFilter is compiled once: lists become frozensets,
+URI prefixes and regexes are prepared up front. The subscription is then
+indexed under one of its constraints (resource URI exact/prefix/pattern,
+else an equality field such as business_id or tool_name, else a metadata
+equality), so an event only looks at subscriptions that can match it:
+
+- exact URIs and equality fields: hash lookups
+- URI prefixes: a character trie walked once along the event's URI
+- URI patterns: one fullmatch per distinct pattern
+
+Candidates are then verified against their full compiled filter. Filters keep
+their original semantics: a constraint on a field the event does not carry
+does not exclude the event, while metadata filters require equality.
+"""
+
+import re
+from collections import defaultdict
+from typing import Any, Dict, Hashable, List, Set, Tuple
+
+from .constants import MCPLimits
+
+# (filter attribute, event_data key) equality constraints, in order of preference
+# for the index a subscription is placed in
+EQUALITY_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("business_ids", "business_id"),
+    ("tool_names", "tool_name"),
+    ("prompt_names", "prompt_name"),
+    ("resource_types", "resource_type"),
+    ("event_types", "event_type"),
+)
+
+_VALUES = None  # Trie node key holding the values stored at that prefix
+
+
+def _contains(allowed: frozenset, value: Any) -> bool:
+    try:
+        return value in allowed
+    except TypeError:  # unhashable event value never equals a string filter
+        return False
+
+
+def _compile_pattern(pattern: str) -> re.Pattern:
+    if len(pattern) > MCPLimits.MAX_URI_PATTERN_LENGTH:
+        raise ValueError(f"Resource URI pattern longer than {MCPLimits.MAX_URI_PATTERN_LENGTH} characters")
+    try:
+        return re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"Invalid resource URI pattern {pattern!r}: {e}") from e
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+
+class CompiledFilter:
+    """A SubscriptionFilter prepared for repeated matching"""
+
+    __slots__ = ("uri_exact", "uri_prefixes", "uri_patterns", "fields", "metadata")
+
+    def __init__(self, criteria):
+        self.uri_exact = frozenset(criteria.resource_uris or ())
+        self.uri_prefixes = tuple(getattr(criteria, "resource_uri_prefixes", None) or ())
+        patterns = getattr(criteria, "resource_uri_patterns", None) or ()
+        if len(patterns) > MCPLimits.MAX_SUBSCRIPTION_URI_PATTERNS:
+            raise ValueError(f"At most {MCPLimits.MAX_SUBSCRIPTION_URI_PATTERNS} resource URI patterns per filter")
+        self.uri_patterns = tuple(_compile_pattern(pattern) for pattern in patterns)
+        self.fields = tuple(
+            (event_key, frozenset(values))
+            for attribute, event_key in EQUALITY_FIELDS
+            if (values := getattr(criteria, attribute, None))
+        )
+        self.metadata = tuple((criteria.metadata_filters or {}).items())
+
+    @property
+    def constrains_uri(self) -> bool:
+        return bool(self.uri_exact or self.uri_prefixes or self.uri_patterns)
+
+    @property
+    def unconstrained(self) -> bool:
+        return not (self.constrains_uri or self.fields or self.metadata)
+
+    def uri_matches(self, uri: Any) -> bool:
+        if not isinstance(uri, str):
+            return False
+        return (uri in self.uri_exact
+                or uri.startswith(self.uri_prefixes)
+                or any(pattern.fullmatch(uri) for pattern in self.uri_patterns))
+
+    def matches(self, event_data: Dict[str, Any]) -> bool:
+        if self.constrains_uri:
+            uri = event_data.get("resource_uri")
+            if uri and not self.uri_matches(uri):
+                return False
+
+        for event_key, allowed in self.fields:
+            value = event_data.get(event_key)
+            if value and not _contains(allowed, value):
+                return False
+
+        if self.metadata:
+            event_metadata = event_data.get("metadata")
+            if not isinstance(event_metadata, dict):
+                event_metadata = {}
+            for key, value in self.metadata:
+                if event_metadata.get(key) != value:
+                    return False
+
+        return True
+
+
+class PrefixTrie:
+    """Character trie returning the values of every stored prefix of a string"""
+
+    def __init__(self):
+        self._root: Dict[Any, Any] = {}
+
+    def add(self, prefix: str, value: Hashable) -> None:
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(_VALUES, set()).add(value)
+
+    def remove(self, prefix: str, value: Hashable) -> None:
+        path = [self._root]
+        for char in prefix:
+            node = path[-1].get(char)
+            if node is None:
+                return
+            path.append(node)
+        values = path[-1].get(_VALUES)
+        if values is None:
+            return
+        values.discard(value)
+        if not values:
+            del path[-1][_VALUES]
+        # Prune branches left empty
+        for depth in range(len(prefix), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][prefix[depth - 1]]
+
+    def matches(self, text: str) -> Set[Hashable]:
+        found: Set[Hashable] = set()
+        node = self._root
+        if _VALUES in node:
+            found |= node[_VALUES]
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                break
+            if _VALUES in node:
+                found |= node[_VALUES]
+        return found
+
+
+class SubscriptionMatcher:
+    """Indexes the compiled filters of one subscription type"""
+
+    def __init__(self):
+        self._filters: Dict[str, CompiledFilter] = {}
+        self._placement: Dict[str, Tuple[Any, ...]] = {}
+        self._unfiltered: Set[str] = set()
+        self._scan: Set[str] = set()  # nothing indexable, e.g. only unhashable metadata values
+        self._uri_indexed: Set[str] = set()
+        self._uri_exact: Dict[str, Set[str]] = defaultdict(set)
+        self._uri_prefixes = PrefixTrie()
+        self._uri_patterns: Dict[str, Tuple[re.Pattern, Set[str]]] = {}
+        self._equality: Dict[str, Dict[Hashable, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self._equality_members: Dict[str, Set[str]] = defaultdict(set)
+        self._metadata: Dict[Tuple[str, Hashable], Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def add(self, subscription_id: str, compiled: CompiledFilter) -> None:
+        self.remove(subscription_id)
+        self._filters[subscription_id] = compiled
+
+        if compiled.constrains_uri:
+            for uri in compiled.uri_exact:
+                self._uri_exact[uri].add(subscription_id)
+            for prefix in compiled.uri_prefixes:
+                self._uri_prefixes.add(prefix, subscription_id)
+            for pattern in compiled.uri_patterns:
+                self._uri_patterns.setdefault(pattern.pattern, (pattern, set()))[1].add(subscription_id)
+            self._uri_indexed.add(subscription_id)
+            self._placement[subscription_id] = ("uri",)
+            return
+
+        if compiled.fields:
+            event_key, allowed = compiled.fields[0]
+            for value in allowed:
+                self._equality[event_key][value].add(subscription_id)
+            self._equality_members[event_key].add(subscription_id)
+            self._placement[subscription_id] = ("field", event_key)
+            return
+
+        for key, value in compiled.metadata:
+            if value is not None and _hashable(value):
+                self._metadata[(key, value)].add(subscription_id)
+                self._placement[subscription_id] = ("metadata", (key, value))
+                return
+
+        bucket = self._unfiltered if compiled.unconstrained else self._scan
+        bucket.add(subscription_id)
+        self._placement[subscription_id] = ("unfiltered" if compiled.unconstrained else "scan",)
+
+    def remove(self, subscription_id: str) -> None:
+        compiled = self._filters.pop(subscription_id, None)
+        placement = self._placement.pop(subscription_id, None)
+        if compiled is None or placement is None:
+            return
+        kind = placement[0]
+        if kind == "uri":
+            for uri in compiled.uri_exact:
+                _discard(self._uri_exact, uri, subscription_id)
+            for prefix in compiled.uri_prefixes:
+                self._uri_prefixes.remove(prefix, subscription_id)
+            for pattern in compiled.uri_patterns:
+                entry = self._uri_patterns.get(pattern.pattern)
+                if entry is not None:
+                    entry[1].discard(subscription_id)
+                    if not entry[1]:
+                        del self._uri_patterns[pattern.pattern]
+            self._uri_indexed.discard(subscription_id)
+        elif kind == "field":
+            event_key = placement[1]
+            by_value = self._equality[event_key]
+            for value in compiled.fields[0][1]:
+                _discard(by_value, value, subscription_id)
+            _discard(self._equality_members, event_key, subscription_id)
+            if not by_value:
+                del self._equality[event_key]
+        elif kind == "metadata":
+            _discard(self._metadata, placement[1], subscription_id)
+        else:
+            self._unfiltered.discard(subscription_id)
+            self._scan.discard(subscription_id)
+
+    def candidates(self, event_data: Dict[str, Any]) -> Set[str]:
+        """Subscriptions whose indexed constraint admits the event"""
+        found = self._unfiltered | self._scan
+
+        if self._uri_indexed:
+            uri = event_data.get("resource_uri")
+            if not uri:
+                found |= self._uri_indexed
+            elif isinstance(uri, str):
+                found |= self._uri_exact.get(uri, set())
+                found |= self._uri_prefixes.matches(uri)
+                for pattern, subscription_ids in self._uri_patterns.values():
+                    if pattern.fullmatch(uri):
+                        found |= subscription_ids
+
+        for event_key, by_value in self._equality.items():
+            value = event_data.get(event_key)
+            if not value:
+                found |= self._equality_members[event_key]
+            elif _hashable(value):
+                found |= by_value.get(value, set())
+
+        if self._metadata:
+            event_metadata = event_data.get("metadata")
+            if isinstance(event_metadata, dict):
+                for item in event_metadata.items():
+                    if _hashable(item[1]):
+                        found |= self._metadata.get(item, set())
+
+        return found
+
+    def match(self, event_data: Dict[str, Any]) -> List[str]:
+        """Subscriptions whose full filter matches the event"""
+        filters = self._filters
+        return [subscription_id for subscription_id in self.candidates(event_data)
+                if filters[subscription_id].matches(event_data)]
+
+
+def _discard(index: Dict[Any, Set[str]], key: Any, subscription_id: str) -> None:
+    members = index.get(key)
+    if members is not None:
+        members.discard(subscription_id)
+        if not members:
+            del index[key]
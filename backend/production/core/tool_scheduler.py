@@ -0,0 +1,206 @@
+"""
+BAIS Tool Call Scheduler
+Runs the tool calls of one LLM turn concurrently
+
+Independent calls (searches, service lookups) run in parallel under a
+concurrency bound, each with its own timeout. Identical read-only calls within
+a turn run once and share the result. Calls to side-effecting tools run one at
+a time, in the order the model issued them, and are never merged: two identical
+bookings are two bookings. Once started they are not cancelled, neither by
+their timeout (the model is told the outcome is pending, not that it failed)
+nor by the client going away. Results are returned in request order. Each
+turn records its wall time next to the summed tool time, so the gain from
+overlapping is visible.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, FrozenSet, List, Optional, Set
+
+from .constants import ToolExecutionLimits
+
+logger = logging.getLogger(__name__)
+
+
+ToolExecutor = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+# Bookings mutate business state, so they never overlap one another
+SEQUENTIAL_TOOLS: FrozenSet[str] = frozenset({"bais_execute_service"})
+
+# Side-effecting calls still running after their turn gave up waiting on them
+_detached_calls: Set[asyncio.Task] = set()
+
+TOOL_TIMEOUTS: Dict[str, float] = {
+    "bais_execute_service": ToolExecutionLimits.EXECUTE_SERVICE_TIMEOUT_SECONDS,
+}
+
+
+@dataclass
+class ToolCall:
+    """One tool_use block from a model response"""
+    id: str
+    name: str
+    input: Dict[str, Any]
+
+    @property
+    def dedupe_key(self) -> str:
+        return f"{self.name}:{json.dumps(self.input, sort_keys=True, default=str)}"
+
+
+@dataclass
+class ToolCallResult:
+    """Outcome of one tool call"""
+    call: ToolCall
+    index: int
+    result: Any
+    duration_seconds: float
+    timed_out: bool = False
+    deduplicated: bool = False
+
+
+@dataclass
+class ToolTurn:
+    """All tool results of one model turn, in request order, with timing"""
+    results: List[ToolCallResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+
+    @property
+    def tool_seconds(self) -> float:
+        """Sequential cost: summed duration of the calls actually executed"""
+        return sum(r.duration_seconds for r in self.results if not r.deduplicated)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": len(self.results),
+            "deduplicated": sum(1 for r in self.results if r.deduplicated),
+            "timed_out": sum(1 for r in self.results if r.timed_out),
+            "wall_ms": round(self.wall_seconds * 1000, 1),
+            "tool_ms": round(self.tool_seconds * 1000, 1),
+            "speedup": round(self.tool_seconds / self.wall_seconds, 2) if self.wall_seconds else 1.0,
+        }
+
+
+class ToolScheduler:
+    """Bounded-concurrency executor for the tool calls of a model turn"""
+
+    def __init__(
+        self,
+        executor: ToolExecutor,
+        max_concurrency: int = ToolExecutionLimits.MAX_CONCURRENT_TOOL_CALLS,
+        default_timeout_seconds: float = ToolExecutionLimits.DEFAULT_TOOL_TIMEOUT_SECONDS,
+        timeouts: Optional[Dict[str, float]] = None,
+        sequential_tools: FrozenSet[str] = SEQUENTIAL_TOOLS
+    ):
+        self.executor = executor
+        self.max_concurrency = max(1, max_concurrency)
+        self.default_timeout_seconds = default_timeout_seconds
+        self.timeouts = TOOL_TIMEOUTS if timeouts is None else timeouts
+        self.sequential_tools = sequential_tools
+
+    def timeout_for(self, tool_name: str) -> float:
+        return self.timeouts.get(tool_name, self.default_timeout_seconds)
+
+    async def run(self, calls: List[ToolCall]) -> ToolTurn:
+        """Execute a turn and return its results in request order"""
+        turn = ToolTurn()
+        async for _ in self.iter_completed(calls, turn):
+            pass
+        return turn
+
+    async def iter_completed(self, calls: List[ToolCall],
+                             turn: Optional[ToolTurn] = None) -> AsyncIterator[ToolCallResult]:
+        """
+        Execute a turn, yielding each result as soon as it is available.
+        When `turn` is given it is filled with the ordered results and timing.
+        """
+        turn = turn if turn is not None else ToolTurn()
+        if not calls:
+            return
+
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        sequential_lock = asyncio.Lock()
+        queue: "asyncio.Queue[ToolCallResult]" = asyncio.Queue()
+
+        # Identical read-only calls share one execution; every call still gets its own result
+        groups: Dict[str, List[int]] = {}
+        for index, call in enumerate(calls):
+            key = f"#{index}" if call.name in self.sequential_tools else call.dedupe_key
+            groups.setdefault(key, []).append(index)
+
+        async def run_group(indexes: List[int]):
+            primary = calls[indexes[0]]
+            if primary.name in self.sequential_tools:
+                # Waiting in issue order on the lock keeps bookings in model order
+                async with sequential_lock:
+                    result, duration, timed_out = await self._execute(primary, semaphore)
+            else:
+                result, duration, timed_out = await self._execute(primary, semaphore)
+            for position, index in enumerate(indexes):
+                queue.put_nowait(ToolCallResult(
+                    call=calls[index], index=index, result=result, duration_seconds=duration,
+                    timed_out=timed_out, deduplicated=position > 0
+                ))
+
+        tasks = [asyncio.create_task(run_group(indexes)) for indexes in groups.values()]
+        try:
+            for _ in range(len(calls)):
+                result = await queue.get()
+                turn.results.append(result)
+                yield result
+            turn.results.sort(key=lambda r: r.index)
+            turn.wall_seconds = time.perf_counter() - started
+            self._log_turn(turn)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _execute(self, call: ToolCall, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            timeout = self.timeout_for(call.name)
+            started = time.perf_counter()
+            side_effecting = call.name in self.sequential_tools
+            try:
+                if side_effecting:
+                    result = await asyncio.wait_for(asyncio.shield(self._start_detached(call)), timeout)
+                else:
+                    result = await asyncio.wait_for(self.executor(call.name, call.input), timeout)
+                return result, time.perf_counter() - started, False
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️ Tool {call.name} timed out after {timeout}s")
+                if side_effecting:
+                    # The call may already have committed (e.g. a Booking row); it keeps running
+                    return {
+                        "status": "pending",
+                        "message": f"{call.name} is still running after {timeout}s and may yet succeed. "
+                                   f"Do not repeat it; check its outcome before retrying.",
+                    }, time.perf_counter() - started, True
+                return {"error": f"Tool {call.name} timed out after {timeout}s"}, time.perf_counter() - started, True
+            except Exception as e:
+                logger.error(f"Error calling tool {call.name}: {e}", exc_info=True)
+                return {"error": str(e)}, time.perf_counter() - started, False
+
+    def _start_detached(self, call: ToolCall) -> asyncio.Task:
+        """Run a side-effecting call as its own task, which timeouts and cancellation only stop waiting on"""
+        task = asyncio.ensure_future(self.executor(call.name, call.input))
+        _detached_calls.add(task)
+
+        def finished(done: asyncio.Task) -> None:
+            _detached_calls.discard(done)
+            if not done.cancelled() and done.exception() is not None:
+                logger.error(f"Tool {call.name} ({call.id}) failed: {done.exception()}")
+
+        task.add_done_callback(finished)
+        return task
+
+    @staticmethod
+    def _log_turn(turn: ToolTurn) -> None:
+        stats = turn.to_dict()
+        logger.info(
+            f"⚡ Tool turn: {stats['calls']} calls ({stats['deduplicated']} deduplicated) "
+            f"in {stats['wall_ms']}ms wall vs {stats['tool_ms']}ms summed ({stats['speedup']}x)"
+        )
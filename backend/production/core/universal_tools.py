@@ -6,13 +6,33 @@ This architecture enables ANY consumer to buy from ANY BAIS business
 through Claude, ChatGPT, or Gemini with NO per-business setup required.
 """
 
-from typing import Dict, Any, List, Optional
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel
 from enum import Enum
 import logging
 import os
 import sys
 
+from .business_search_index import (
+    apply_postgres_search,
+    cached_postgres_search_capabilities,
+    get_database_search_index,
+    postgres_search_capabilities,
+    postgres_search_clause,
+)
+from .business_store import business_id_variants, compact_business_id
+from .catalog_cache import get_catalog_cache
+from .constants import BusinessConstants, SearchLimits
+from .geo_index import (
+    Coordinates,
+    apply_postgres_geo,
+    haversine_km,
+    parse_coordinates,
+    postgres_geo_capabilities,
+)
+from .slot_inventory import get_availability_engine, requested_slot
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +76,19 @@ class BAISUniversalTool:
                             "location": {
                                 "type": "string",
                                 "description": "City or address to search near"
+                            },
+                            "near": {
+                                "type": "object",
+                                "description": "Coordinates to search around; results are ordered nearest first",
+                                "properties": {
+                                    "latitude": {"type": "number"},
+                                    "longitude": {"type": "number"}
+                                },
+                                "required": ["latitude", "longitude"]
+                            },
+                            "radius_km": {
+                                "type": "number",
+                                "description": "Only return businesses within this many kilometres of `near`"
                             }
                         },
                         "required": ["query"]
@@ -76,6 +109,48 @@ class BAISUniversalTool:
                         "required": ["business_id"]
                     }
                 },
+                {
+                    "name": "bais_check_availability",
+                    "description": """Check free booking slots for one or more services of a business
+                    over a date range, optionally within a time-of-day window and on chosen weekdays.
+                    Returns free slots per service and day plus the earliest available slot.""",
+                    "input_schema": {
+                        "type": "object",
+                        "properties": {
+                            "business_id": {
+                                "type": "string",
+                                "description": "Business identifier from search results"
+                            },
+                            "service_ids": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Service identifiers from business services"
+                            },
+                            "start_date": {
+                                "type": "string",
+                                "description": "First day to search (YYYY-MM-DD), defaults to today"
+                            },
+                            "end_date": {
+                                "type": "string",
+                                "description": "Last day to search (YYYY-MM-DD), defaults to a week after start_date"
+                            },
+                            "start_time": {
+                                "type": "string",
+                                "description": "Earliest slot start (HH:MM), e.g. '17:00' for evenings"
+                            },
+                            "end_time": {
+                                "type": "string",
+                                "description": "Slots must start before this time (HH:MM)"
+                            },
+                            "weekdays": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Only these days, e.g. ['sat', 'sun']"
+                            }
+                        },
+                        "required": ["business_id", "service_ids"]
+                    }
+                },
                 {
                     "name": "bais_execute_service",
                     "description": """Execute a business service (booking, purchase, reservation, etc.).
@@ -121,7 +196,15 @@ class BAISUniversalTool:
                                 "type": "string",
                                 "enum": ["restaurant", "hotel", "retail", "service", "healthcare"]
                             },
-                            "location": {"type": "string"}
+                            "location": {"type": "string"},
+                            "near": {
+                                "type": "object",
+                                "properties": {
+                                    "latitude": {"type": "number"},
+                                    "longitude": {"type": "number"}
+                                }
+                            },
+                            "radius_km": {"type": "number"}
                         },
                         "required": ["query"]
                     }
@@ -137,6 +220,23 @@ class BAISUniversalTool:
                         "required": ["business_id"]
                     }
                 },
+                {
+                    "name": "bais_check_availability",
+                    "description": "Check free booking slots for services over a date range and time window",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "business_id": {"type": "string"},
+                            "service_ids": {"type": "array", "items": {"type": "string"}},
+                            "start_date": {"type": "string", "description": "YYYY-MM-DD"},
+                            "end_date": {"type": "string", "description": "YYYY-MM-DD"},
+                            "start_time": {"type": "string", "description": "HH:MM"},
+                            "end_time": {"type": "string", "description": "HH:MM"},
+                            "weekdays": {"type": "array", "items": {"type": "string"}}
+                        },
+                        "required": ["business_id", "service_ids"]
+                    }
+                },
                 {
                     "name": "bais_execute_service",
                     "description": "Execute a business service (booking, purchase, etc.)",
@@ -168,7 +268,15 @@ class BAISUniversalTool:
                         "properties": {
                             "query": {"type": "string"},
                             "category": {"type": "string"},
-                            "location": {"type": "string"}
+                            "location": {"type": "string"},
+                            "near": {
+                                "type": "object",
+                                "properties": {
+                                    "latitude": {"type": "number"},
+                                    "longitude": {"type": "number"}
+                                }
+                            },
+                            "radius_km": {"type": "number"}
                         },
                         "required": ["query"]
                     }
@@ -184,6 +292,23 @@ class BAISUniversalTool:
                         "required": ["business_id"]
                     }
                 },
+                {
+                    "name": "bais_check_availability",
+                    "description": "Check service availability over a date range",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "business_id": {"type": "string"},
+                            "service_ids": {"type": "array", "items": {"type": "string"}},
+                            "start_date": {"type": "string"},
+                            "end_date": {"type": "string"},
+                            "start_time": {"type": "string"},
+                            "end_time": {"type": "string"},
+                            "weekdays": {"type": "array", "items": {"type": "string"}}
+                        },
+                        "required": ["business_id", "service_ids"]
+                    }
+                },
                 {
                     "name": "bais_execute_service",
                     "description": "Execute a business service",
@@ -202,6 +327,34 @@ class BAISUniversalTool:
         }
 
 
+def _search_diagnostics_enabled() -> bool:
+    """Full-table diagnostic reads in search are opt-in via BAIS_SEARCH_DEBUG"""
+    return os.getenv("BAIS_SEARCH_DEBUG", "").lower() in ("true", "1", "yes")
+
+
+def _get_shared_storage():
+    """Import the shared_storage module under whichever path this process uses"""
+    try:
+        import shared_storage
+        return shared_storage
+    except ImportError:
+        pass
+    try:
+        from .. import shared_storage
+        return shared_storage
+    except ImportError:
+        pass
+    parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    if parent_dir not in sys.path:
+        sys.path.insert(0, parent_dir)
+    try:
+        from backend.production import shared_storage
+        return shared_storage
+    except Exception as import_err:
+        logger.debug(f"Could not import shared_storage: {import_err}")
+        return None
+
+
 class BAISUniversalToolHandler:
     """
     Handles execution of universal BAIS tools.
@@ -212,16 +365,57 @@ class BAISUniversalToolHandler:
         """Initialize with database manager for business operations"""
         self.db_manager = db_manager
     
+    def _catalog_scope(self) -> str:
+        """Which catalog a cached result came from (handler database, env database or store)"""
+        if self.db_manager is not None:
+            return str(self.db_manager.engine.url)
+        return os.getenv("DATABASE_URL") or "store"
+    
+    def _availability_engine(self):
+        """Slot engine persisted through the handler's database, else the in-memory one"""
+        return get_availability_engine(self.db_manager)
+    
     async def search_businesses(
         self,
         query: str,
         category: Optional[str] = None,
-        location: Optional[str] = None
+        location: Optional[str] = None,
+        near: Optional[Any] = None,
+        radius_km: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
         Search for businesses across the entire BAIS platform.
         Returns list of matching businesses with their services.
+        With `near` coordinates, results are ordered nearest first (optionally
+        within radius_km) and carry distance_km; `location` is then ignored.
+        Non-empty results are served from the catalog cache until a business write.
         """
+        coordinates = parse_coordinates(near)
+        if coordinates:
+            location = None
+        cache_location = location
+        if coordinates:
+            cache_location = f"near:{coordinates[0]:.5f},{coordinates[1]:.5f}:{radius_km}"
+        
+        catalog_cache = get_catalog_cache()
+        scope = self._catalog_scope()
+        cached = await catalog_cache.get_search(scope, query, category, cache_location)
+        if cached is not None:
+            return cached
+        
+        businesses = await self._search_businesses_uncached(query, category, location, coordinates, radius_km)
+        if businesses and not any("error" in business for business in businesses):
+            await catalog_cache.set_search(scope, query, category, cache_location, businesses)
+        return businesses
+    
+    async def _search_businesses_uncached(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        coordinates: Optional[Coordinates] = None,
+        radius_km: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
         try:
             # Search businesses - check database first, then fallback to mock data
             businesses = []
@@ -230,14 +424,12 @@ class BAISUniversalToolHandler:
             db_checked = False
             try:
                 try:
-                    from core.database_models import DatabaseManager, Business, BusinessService
+                    from core.database_models import get_request_database_manager
                 except ImportError:
                     try:
-                        from backend.production.core.database_models import DatabaseManager, Business, BusinessService
+                        from backend.production.core.database_models import get_request_database_manager
                     except ImportError:
-                        DatabaseManager = None
-                        Business = None
-                        BusinessService = None
+                        get_request_database_manager = None
                 
                 # Use db_manager from handler if available, otherwise create new one
                 if self.db_manager:
@@ -246,140 +438,22 @@ class BAISUniversalToolHandler:
                 else:
                     # Get database URL from environment
                     database_url = os.getenv("DATABASE_URL")
-                    if not database_url or database_url == "not_set":
+                    if not database_url or database_url == "not_set" or not get_request_database_manager:
                         logger.debug("No DATABASE_URL and no db_manager in handler, skipping database query")
                         db_manager = None
                     else:
-                        logger.info(f"Creating new database manager for search")
-                        db_manager = DatabaseManager(database_url)
+                        logger.info(f"Using shared database manager for search")
+                        db_manager = get_request_database_manager(database_url)
                 
                 if db_manager:
                     logger.info(f"Searching database for query='{query}', location='{location}', category='{category}'")
-                    with db_manager.get_session() as session:
-                        # First, check total count of active businesses
-                        total_active = session.query(Business).filter(Business.status == "active").count()
-                        logger.info(f"Total active businesses in database: {total_active}")
-                        
-                        query_obj = session.query(Business).filter(Business.status == "active")
-                        db_checked = True
-                        
-                        # Apply search filters
-                        if query:
-                            # Normalize query for better matching (handle "med spa" -> "medspa", etc.)
-                            query_lower = query.lower().strip()
-                            query_normalized = query_lower.replace(" ", "").replace("-", "")
-                            query_words = query_lower.split()
-                            
-                            # Build flexible search conditions
-                            search_conditions = []
-                            
-                            # Exact and partial matches
-                            search_conditions.append(Business.name.ilike(f"%{query_lower}%"))
-                            search_conditions.append(Business.description.ilike(f"%{query_lower}%"))
-                            
-                            # Normalized matches (handles "med spa" matching "medspa" in name)
-                            if query_normalized:
-                                search_conditions.append(
-                                    Business.name.ilike(f"%{query_normalized}%")
-                                )
-                                search_conditions.append(
-                                    Business.description.ilike(f"%{query_normalized}%")
-                                )
-                            
-                            # Word-by-word matching for multi-word queries (very lenient)
-                            for word in query_words:
-                                if len(word) > 2:
-                                    search_conditions.append(Business.name.ilike(f"%{word}%"))
-                                    search_conditions.append(Business.description.ilike(f"%{word}%"))
-                            
-                            # Very lenient: if query is "med spa", match if name contains "med" OR "spa"
-                            # This ensures "New Life New Image Med Spa" matches "med spa" query
-                            if len(query_words) >= 2:
-                                # Match if all significant words appear somewhere in name or description
-                                for word in query_words:
-                                    if len(word) > 2:
-                                        search_conditions.append(Business.name.ilike(f"%{word}%"))
-                                        search_conditions.append(Business.description.ilike(f"%{word}%"))
-                            
-                            # Also search in service names through relationships
-                            search_conditions.append(
-                                Business.services.any(
-                                    BusinessService.name.ilike(f"%{query_lower}%")
-                                )
-                            )
-                            
-                            from sqlalchemy import or_
-                            query_obj = query_obj.filter(or_(*search_conditions))
-                        
-                        if category:
-                            query_obj = query_obj.filter(Business.business_type == category)
-                        
-                        if location:
-                            location_lower = location.lower().strip()
-                            location_normalized = location_lower.replace(",", " ").replace(".", "").strip()
-                            location_words = location_normalized.split()
-                            
-                            location_conditions = []
-                            location_conditions.append(Business.city.ilike(f"%{location_lower}%"))
-                            location_conditions.append(Business.state.ilike(f"%{location_lower}%"))
-                            
-                            # Handle "Las Vegas" variations
-                            if "vegas" in location_lower or "las vegas" in location_lower:
-                                location_conditions.append(Business.city.ilike("%las vegas%"))
-                                location_conditions.append(Business.city.ilike("%vegas%"))
-                            
-                            # Word-by-word matching
-                            for word in location_words:
-                                if len(word) > 2:
-                                    location_conditions.append(Business.city.ilike(f"%{word}%"))
-                                    location_conditions.append(Business.state.ilike(f"%{word}%"))
-                            
-                            from sqlalchemy import or_
-                            query_obj = query_obj.filter(or_(*location_conditions))
-                        
-                        # Get matching businesses
-                        db_businesses = query_obj.limit(10).all()
-                        logger.info(f"Database query returned {len(db_businesses)} matching businesses")
-                        
-                        if len(db_businesses) == 0 and total_active > 0:
-                            # If we have businesses but no matches, log all business names for debugging
-                            all_businesses = session.query(Business).filter(Business.status == "active").all()
-                            logger.warning(f"No matches found, but {len(all_businesses)} active businesses exist:")
-                            for biz in all_businesses[:5]:  # Log first 5
-                                logger.warning(f"  - {biz.name} (type: {biz.business_type}, city: {biz.city}, state: {biz.state})")
-                        
-                        for biz in db_businesses:
-                            # Get services for this business
-                            services = session.query(BusinessService).filter(
-                                BusinessService.business_id == biz.id
-                            ).all()
-                            
-                            # Use external_id as business_id for consistency with API
-                            business_data = {
-                                "business_id": biz.external_id or str(biz.id),
-                                "name": biz.name,
-                                "description": biz.description or "",
-                                "category": biz.business_type,
-                                "location": {
-                                    "city": biz.city or "",
-                                    "state": biz.state or "",
-                                    "address": f"{biz.address or ''}, {biz.city or ''}, {biz.state or ''}"
-                                },
-                                "phone": biz.phone or "",
-                                "website": biz.website or "",
-                                "rating": 4.5,  # Default rating, can be enhanced with metrics
-                                "services": [
-                                    {
-                                        "id": svc.service_id or str(svc.id),
-                                        "name": svc.name,
-                                        "description": svc.description or ""
-                                    }
-                                    for svc in services[:5]  # Limit services in search results
-                                ]
-                            }
-                            businesses.append(business_data)
-                        
-                        logger.info(f"Found {len(businesses)} businesses from database")
+                    await self._prepare_search_index(db_manager)
+                    businesses = await self._run_in_session(
+                        db_manager, self._search_database, db_manager, query, category, location,
+                        coordinates, radius_km
+                    )
+                    db_checked = True
+                    logger.info(f"Found {len(businesses)} businesses from database")
                 else:
                     logger.debug("No database manager available, skipping database query")
                     
@@ -392,183 +466,46 @@ class BAISUniversalToolHandler:
             # Database is the source of truth - in-memory is only a fallback
             # ALWAYS check in-memory if no database results (even if db_checked is True but returned 0 results)
             if not db_checked or len(businesses) == 0:
-                logger.info(f"Checking in-memory store: db_checked={db_checked}, businesses_found={len(businesses)}")
+                logger.debug(f"Checking in-memory store: db_checked={db_checked}, businesses_found={len(businesses)}")
                 # Only use in-memory store if we don't have database access
                 try:
-                    # Try multiple import paths for shared_storage
-                    simple_store = None
-                    try:
-                        from shared_storage import BUSINESS_STORE as simple_store
-                    except ImportError:
-                        try:
-                            from ..shared_storage import BUSINESS_STORE as simple_store
-                        except ImportError:
-                            try:
-                                from backend.production.shared_storage import BUSINESS_STORE as simple_store
-                            except ImportError:
-                                # Try importing the module and accessing the attribute
-                                # Add parent directory to path if needed
-                                parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                                if parent_dir not in sys.path:
-                                    sys.path.insert(0, parent_dir)
-                                try:
-                                    from backend.production import shared_storage
-                                    simple_store = getattr(shared_storage, 'BUSINESS_STORE', None)
-                                except Exception as import_err:
-                                    logger.debug(f"Could not import shared_storage: {import_err}")
-                                    pass
+                    shared_storage = _get_shared_storage()
+                    simple_store = getattr(shared_storage, 'BUSINESS_STORE', None) if shared_storage else None
                     
                     if simple_store and len(simple_store) > 0:
-                        logger.info(f"✅ Checking in-memory BUSINESS_STORE (fallback only) with {len(simple_store)} businesses")
-                        logger.info(f"✅ Business IDs in store: {list(simple_store.keys())}")
-                        logger.warning("Using in-memory store as fallback - database should be primary source")
-                        for business_id, business_data in simple_store.items():
-                            logger.info(f"🔍 Processing business from store: {business_data.get('business_name', 'Unknown')} (ID: {business_id})")
-                            logger.info(f"Checking business: {business_data.get('business_name', 'Unknown')} (ID: {business_id})")
-                            # Skip if already in results
-                            if any(b.get("business_id") == business_id for b in businesses):
+                        logger.debug(f"Checking in-memory BUSINESS_STORE (fallback only) with {len(simple_store)} businesses")
+                        
+                        if coordinates:
+                            # Nearest first through the store's grid index
+                            ranked = shared_storage.search_nearby(
+                                coordinates[0],
+                                coordinates[1],
+                                radius_km=radius_km,
+                                query=query,
+                                category=category,
+                                limit=SearchLimits.DEFAULT_RESULT_LIMIT
+                            )
+                        else:
+                            # Relevance-ranked lookup through the store's inverted index
+                            ranked = shared_storage.search_businesses(
+                                query,
+                                category=category,
+                                location=location,
+                                limit=SearchLimits.DEFAULT_RESULT_LIMIT
+                            )
+                        known_ids = {b.get("business_id") for b in businesses}
+                        store_matches = 0
+                        for business_id, score in ranked:
+                            business_data = simple_store.get(business_id)
+                            if business_id in known_ids or not business_data:
                                 continue
-                            
-                            # Apply search filters
-                            matches = True
-                            business_name = business_data.get("business_name", "").lower()
-                            business_desc = business_data.get("business_info", {}).get("description", "").lower()
-                            business_type = business_data.get("business_type", "").lower()
-                            business_city = business_data.get("location", {}).get("city", "").lower()
-                            business_state = business_data.get("location", {}).get("state", "").lower()
-                            
-                            # Normalize location strings (remove punctuation, extra spaces)
-                            def normalize_location(loc_str):
-                                if not loc_str:
-                                    return ""
-                                return " ".join(loc_str.lower().replace(",", " ").split())
-                            
-                            # Check query match - more flexible matching
-                            if query:
-                                query_lower = query.lower().strip()
-                                query_words = query_lower.split()
-                                
-                                # Normalize query terms (handle "med spa" -> "medspa", "med-spa", etc.)
-                                normalized_query = query_lower.replace(" ", "").replace("-", "")
-                                normalized_name = business_name.replace(" ", "").replace("-", "")
-                                
-                                # Check name, description, and service names
-                                service_names = " ".join([
-                                    svc.get("name", "").lower() 
-                                    for svc in business_data.get("services_config", [])
-                                ])
-                                
-                                # Enhanced matching: check normalized strings, partial matches, and keyword matching
-                                query_matches = (
-                                    query_lower in business_name or
-                                    business_name in query_lower or
-                                    normalized_query in normalized_name or
-                                    normalized_name in normalized_query or
-                                    any(word in business_name for word in query_words if len(word) > 2) or
-                                    query_lower in business_desc or
-                                    any(word in business_desc for word in query_words if len(word) > 2) or
-                                    query_lower in service_names or
-                                    any(word in service_names for word in query_words if len(word) > 2)
-                                )
-                                
-                                # Very lenient matching: if ANY query word appears in name/description/services, it's a match
-                                # This ensures "med spa" matches "New Life New Image Med Spa"
-                                matches_query = (
-                                    query_lower in business_name or
-                                    query_lower in business_desc or
-                                    query_lower in service_names or
-                                    any(word in business_name for word in query_words if len(word) > 2) or
-                                    any(word in business_desc for word in query_words if len(word) > 2) or
-                                    any(word in service_names for word in query_words if len(word) > 2) or
-                                    # Very lenient: if normalized query appears anywhere
-                                    normalized_query in normalized_name or
-                                    normalized_name in normalized_query
-                                )
-                                
-                                if not matches_query:
-                                    matches = False
-                                    logger.debug(f"Business '{business_data.get('business_name', 'Unknown')}' didn't match query '{query_lower}'")
-                                else:
-                                    logger.info(f"✓ Business '{business_data.get('business_name', 'Unknown')}' MATCHED query '{query_lower}'")
-                            
-                            # Check category match
-                            if category and category.lower() != business_type:
-                                matches = False
-                            
-                            # Check location match - more flexible
-                            if location:
-                                location_lower = normalize_location(location)
-                                business_city_norm = normalize_location(business_city)
-                                business_state_norm = normalize_location(business_state)
-                                
-                                # Handle state abbreviations and full names
-                                state_mappings = {
-                                    "nv": "nevada", "nevada": "nv",
-                                    "ca": "california", "california": "ca",
-                                    "ny": "new york", "new york": "ny"
-                                }
-                                
-                                location_normalized = location_lower
-                                for abbrev, full in state_mappings.items():
-                                    if abbrev in location_normalized:
-                                        location_normalized = location_normalized.replace(abbrev, full)
-                                    if full in location_normalized:
-                                        location_normalized = location_normalized.replace(full, abbrev)
-                                
-                                # Match if location is in city, state, or contains key words
-                                location_words = location_lower.split()
-                                matches_location = (
-                                    location_lower in business_city_norm or
-                                    location_lower in business_state_norm or
-                                    business_city_norm in location_lower or
-                                    any(word in business_city_norm for word in location_words if len(word) > 2) or
-                                    any(word in business_state_norm for word in location_words if len(word) > 2) or
-                                    # Handle "Las Vegas" matching
-                                    ("vegas" in location_lower and "vegas" in business_city_norm) or
-                                    ("las vegas" in location_lower and "las vegas" in business_city_norm)
-                                )
-                                
-                                if not matches_location:
-                                    matches = False
-                                    logger.debug(f"Business '{business_data.get('business_name', 'Unknown')}' in {business_city_norm}, {business_state_norm} didn't match location '{location_lower}'")
-                                else:
-                                    logger.info(f"✓ Business '{business_data.get('business_name', 'Unknown')}' matched location '{location_lower}'")
-                            
-                            if matches:
-                                logger.info(f"✅ Business '{business_data.get('business_name', 'Unknown')}' MATCHED all criteria - adding to results")
-                                # Get services
-                                # Include all services, not just first 5, so LLM has full context
-                                services = [
-                                    {
-                                        "id": svc.get("id", ""),
-                                        "name": svc.get("name", ""),
-                                        "description": svc.get("description", ""),
-                                        "category": svc.get("category", "")
-                                    }
-                                    for svc in business_data.get("services_config", [])  # Include all services
-                                ]
-                                
-                                business_result = {
-                                    "business_id": business_id,
-                                    "name": business_data.get("business_name", ""),
-                                    "description": business_data.get("business_info", {}).get("description", ""),
-                                    "category": business_type,
-                                    "location": {
-                                        "city": business_data.get("location", {}).get("city", ""),
-                                        "state": business_data.get("location", {}).get("state", ""),
-                                        "address": business_data.get("location", {}).get("address", "")
-                                    },
-                                    "phone": business_data.get("contact_info", {}).get("phone", ""),
-                                    "website": business_data.get("contact_info", {}).get("website", ""),
-                                    "rating": 4.5,
-                                    "services": services
-                                }
-                                businesses.append(business_result)
-                                logger.info(f"✅ Added business from in-memory store: {business_data.get('business_name')} (ID: {business_id})")
-                            else:
-                                logger.debug(f"❌ Business '{business_data.get('business_name', 'Unknown')}' did NOT match criteria")
-                    
-                        logger.info(f"Found {len([b for b in businesses if b.get('business_id') in simple_store])} businesses from in-memory store")
+                            business = self._format_store_business(business_id, business_data)
+                            if coordinates:
+                                business["distance_km"] = round(score, 2)
+                            businesses.append(business)
+                            store_matches += 1
+                        
+                        logger.info(f"Found {store_matches} businesses from in-memory store")
                     else:
                         logger.debug("BUSINESS_STORE not found or empty")
                 except Exception as store_error:
@@ -677,63 +614,28 @@ class BAISUniversalToolHandler:
             # The database query includes ALL active businesses that match the search criteria
             # This makes BAIS truly universal - any business registered will be discoverable
             
-            # If still no results, try returning ALL active businesses (very lenient fallback)
-            if len(businesses) == 0:
+            # If still no results, try returning ALL active businesses (very lenient fallback).
+            # This is a full-table diagnostic read, so it only runs when BAIS_SEARCH_DEBUG is set.
+            if len(businesses) == 0 and _search_diagnostics_enabled():
                 logger.warning("No businesses found with any search criteria, trying to return all active businesses")
                 try:
                     # Use handler's db_manager if available, otherwise create new one
                     fallback_db_manager = self.db_manager
                     if not fallback_db_manager:
                         try:
-                            from core.database_models import DatabaseManager
+                            from core.database_models import get_request_database_manager
                         except ImportError:
-                            from backend.production.core.database_models import DatabaseManager
+                            from backend.production.core.database_models import get_request_database_manager
                         database_url = os.getenv("DATABASE_URL")
                         if database_url and database_url != "not_set":
-                            fallback_db_manager = DatabaseManager(database_url)
+                            fallback_db_manager = get_request_database_manager(database_url)
                     
                     if fallback_db_manager:
-                        try:
-                            from core.database_models import Business, BusinessService
-                        except ImportError:
-                            from backend.production.core.database_models import Business, BusinessService
-                        with fallback_db_manager.get_session() as session:
-                            all_businesses = session.query(Business).filter(
-                                Business.status == "active"
-                            ).limit(10).all()
-                            
-                            logger.info(f"Found {len(all_businesses)} active businesses in database")
-                            
-                            for biz in all_businesses:
-                                services = session.query(BusinessService).filter(
-                                    BusinessService.business_id == biz.id
-                                ).all()
-                                
-                                business_data = {
-                                    "business_id": biz.external_id or str(biz.id),
-                                    "name": biz.name,
-                                    "description": biz.description or "",
-                                    "category": biz.business_type,
-                                    "location": {
-                                        "city": biz.city or "",
-                                        "state": biz.state or "",
-                                        "address": f"{biz.address or ''}, {biz.city or ''}, {biz.state or ''}"
-                                    },
-                                    "phone": biz.phone or "",
-                                    "website": biz.website or "",
-                                    "rating": 4.5,
-                                    "services": [
-                                        {
-                                            "id": svc.service_id or str(svc.id),
-                                            "name": svc.name,
-                                            "description": svc.description or ""
-                                        }
-                                        for svc in services[:5]
-                                    ]
-                                }
-                                businesses.append(business_data)
-                            
-                            logger.info(f"Fallback: Returning {len(businesses)} total active businesses")
+                        all_businesses = await self._run_in_session(fallback_db_manager, self._list_active_businesses)
+                        logger.info(f"Found {len(all_businesses)} active businesses in database")
+                        businesses.extend(all_businesses)
+                        
+                        logger.info(f"Fallback: Returning {len(businesses)} total active businesses")
                     else:
                         logger.debug("No database manager available, cannot do fallback search")
                 except Exception as e:
@@ -768,122 +670,53 @@ class BAISUniversalToolHandler:
     ) -> Dict[str, Any]:
         """
         Get detailed service information for a specific business.
-        Checks database first, then in-memory store.
+        Checks the catalog cache, then database, then in-memory store.
         """
+        if not business_id:
+            return await self._get_business_services_uncached(business_id)
+        
+        catalog_cache = get_catalog_cache()
+        scope = self._catalog_scope()
+        cached = await catalog_cache.get_services(scope, business_id)
+        if cached is not None:
+            return cached
+        
+        result = await self._get_business_services_uncached(business_id)
+        if "error" not in result and result.get("services"):
+            await catalog_cache.set_services(scope, business_id, result)
+        return result
+    
+    async def _get_business_services_uncached(
+        self,
+        business_id: str
+    ) -> Dict[str, Any]:
         try:
-            # Normalize business_id to handle various formats (hyphens, underscores, no separators)
-            # Try multiple normalization strategies
             if not business_id:
                 return {"error": "business_id is required", "business_id": business_id, "services": []}
             
-            # Original format
-            original_id = business_id.strip().lower()
-            # Normalize: replace underscores with hyphens
-            normalized_id_1 = original_id.replace('_', '-')
-            # Normalize: if no hyphens/underscores, try inserting them based on common patterns
-            normalized_id_2 = original_id.replace('newlife', 'new-life').replace('newimage', 'new-image').replace('medspa', 'med-spa')
-            # Try with underscores
-            normalized_id_3 = original_id.replace('-', '_')
-            # Handle case like "newlife_newimage_medspa" -> convert underscores to hyphens first, then fix spacing
-            normalized_id_4 = original_id.replace('_', '-').replace('newlife', 'new-life').replace('newimage', 'new-image').replace('medspa', 'med-spa')
-            # Try with all variations
-            all_variants = [
-                'new-life-new-image-med-spa',  # The actual correct format - try this FIRST
-                normalized_id_1,  # Underscores -> hyphens
-                normalized_id_4,  # Combined normalization
-                normalized_id_2,  # Insert hyphens
-                normalized_id_3,  # Hyphens -> underscores
-                original_id,  # Original as-is
-                'new_life_new_image_med_spa',  # All underscores
-            ]
-            # Remove duplicates while preserving order
-            all_variants = list(dict.fromkeys(all_variants))
-            
-            logger.info(f"🔍 Looking up business services with ID: '{business_id}' (trying variants: {all_variants[:3]}...)")
+            # Spellings of the ID a stored external_id may use (case, hyphens, underscores)
+            all_variants = business_id_variants(business_id)
+            logger.info(f"🔍 Looking up business services with ID: '{business_id}'")
             
             # Try database first if available
             if self.db_manager:
                 try:
-                    try:
-                        from core.database_models import Business, BusinessService
-                    except ImportError:
-                        from backend.production.core.database_models import Business, BusinessService
-                    with self.db_manager.get_session() as session:
-                        # Find business by external_id or id (try both original and normalized)
-                        business = session.query(Business).filter(
-                            (Business.external_id == business_id) | 
-                            (Business.external_id == normalized_business_id) |
-                            (Business.id == business_id) |
-                            (Business.id == normalized_business_id)
-                        ).first()
-                        
-                        if business:
-                            services = session.query(BusinessService).filter(
-                                BusinessService.business_id == business.id
-                            ).all()
-                            
-                            service_list = []
-                            for svc in services:
-                                service_data = {
-                                    "service_id": svc.service_id or str(svc.id),
-                                    "name": svc.name,
-                                    "description": svc.description or "",
-                                    "category": svc.category or "",
-                                }
-                                # Add pricing if available
-                                if svc.pricing:
-                                    if isinstance(svc.pricing, dict):
-                                        service_data["pricing"] = svc.pricing
-                                    else:
-                                        service_data["pricing"] = {"base_price": svc.pricing}
-                                # Add parameters if available
-                                if svc.parameters:
-                                    if isinstance(svc.parameters, dict):
-                                        service_data["parameters"] = svc.parameters
-                                
-                                service_list.append(service_data)
-                            
-                            return {
-                                "business_id": business.external_id or str(business.id),
-                                "business_name": business.name,
-                                "services": service_list
-                            }
+                    db_result = await self._run_in_session(
+                        self.db_manager, self._load_business_services, business_id, all_variants
+                    )
+                    if db_result:
+                        return db_result
                 except Exception as db_error:
                     logger.debug(f"Database query failed, trying in-memory store: {db_error}")
             
-            # Fall back to in-memory store
+            # Fall back to in-memory store (resolves any spelling of the ID in O(1))
             try:
-                # Try multiple import paths for shared_storage
-                simple_store = None
-                try:
-                    from shared_storage import BUSINESS_STORE as simple_store
-                except ImportError:
-                    try:
-                        from ..shared_storage import BUSINESS_STORE as simple_store
-                    except ImportError:
-                        try:
-                            from backend.production.shared_storage import BUSINESS_STORE as simple_store
-                        except ImportError:
-                            import sys
-                            import os
-                            parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                            if parent_dir not in sys.path:
-                                sys.path.insert(0, parent_dir)
-                            try:
-                                from backend.production import shared_storage
-                                simple_store = getattr(shared_storage, 'BUSINESS_STORE', None)
-                            except Exception as import_err:
-                                logger.debug(f"Could not import shared_storage: {import_err}")
-                                pass
-                
-                # Try all variants to find the business
+                shared_storage = _get_shared_storage()
+                found = shared_storage.BUSINESS_STORE.lookup(business_id) if shared_storage else None
                 business_data = None
-                if simple_store:
-                    for variant in all_variants:
-                        if variant in simple_store:
-                            business_data = simple_store[variant]
-                            logger.info(f"✅ Found business in store using variant: '{variant}'")
-                            break
+                if found:
+                    business_id, business_data = found
+                    logger.info(f"✅ Found business in store: '{business_id}'")
                 
                 if business_data:
                     services_config = business_data.get("services_config", [])
@@ -943,6 +776,38 @@ class BAISUniversalToolHandler:
                 "business_id": business_id
             }
     
+    async def check_availability(
+        self,
+        business_id: str,
+        service_ids: List[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_time: Optional[str] = None,
+        weekdays: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Free slots per service and day over a date range, from the same
+        availability engine execute_service books on (one range load, then
+        bitmap summaries per day).
+        """
+        if not business_id or not service_ids:
+            return {"error": "business_id and service_ids are required"}
+        if isinstance(service_ids, str):
+            service_ids = [service_ids]
+        
+        try:
+            start_date = start_date or date.today().isoformat()
+            if not end_date:
+                horizon = BusinessConstants.DEFAULT_AVAILABILITY_DAYS - 1
+                end_date = (date.fromisoformat(start_date) + timedelta(days=horizon)).isoformat()
+            return await self._availability_engine().search_range(
+                business_id, service_ids, start_date, end_date,
+                start_time=start_time, end_time=end_time, weekdays=weekdays
+            )
+        except ValueError as e:
+            return {"error": f"Invalid availability query: {str(e)}"}
+    
     async def execute_service(
         self,
         business_id: str,
@@ -953,7 +818,8 @@ class BAISUniversalToolHandler:
         """
         Execute a service for any business on the platform.
         Handles booking, payment, and confirmation.
-        Checks database first, then in-memory store.
+        Checks database first, then in-memory store. A request naming a date
+        and time reserves that slot, so it stops showing in check_availability.
         """
         try:
             from datetime import datetime
@@ -967,58 +833,22 @@ class BAISUniversalToolHandler:
             # Try database first if available
             if self.db_manager:
                 try:
-                    try:
-                        from core.database_models import Business, BusinessService
-                    except ImportError:
-                        from backend.production.core.database_models import Business, BusinessService
-                    with self.db_manager.get_session() as session:
-                        business = session.query(Business).filter(
-                            (Business.external_id == business_id) | (Business.id == business_id)
-                        ).first()
-                        
-                        if business:
-                            business_name = business.name
-                            business_phone = business.phone
-                            business_email = business.email
-                            
-                            # Find the service
-                            service = session.query(BusinessService).filter(
-                                BusinessService.business_id == business.id,
-                                (BusinessService.service_id == service_id) | (BusinessService.id == service_id)
-                            ).first()
-                            
-                            if service:
-                                service_name = service.name
+                    db_details = await self._run_in_session(
+                        self.db_manager, self._load_service_details, business_id, service_id
+                    )
+                    if db_details:
+                        business_name, business_phone, business_email, service_name = db_details
                 except Exception as db_error:
                     logger.debug(f"Database query failed for execute_service, trying in-memory store: {db_error}")
             
             # Fall back to in-memory store
             if not business_name:
                 try:
-                    # Try multiple import paths for shared_storage
-                    simple_store = None
-                    try:
-                        from shared_storage import BUSINESS_STORE as simple_store
-                    except ImportError:
-                        try:
-                            from ..shared_storage import BUSINESS_STORE as simple_store
-                        except ImportError:
-                            try:
-                                from backend.production.shared_storage import BUSINESS_STORE as simple_store
-                            except ImportError:
-                                import sys
-                                import os
-                                parent_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                                if parent_dir not in sys.path:
-                                    sys.path.insert(0, parent_dir)
-                                try:
-                                    from backend.production import shared_storage
-                                    simple_store = getattr(shared_storage, 'BUSINESS_STORE', None)
-                                except Exception:
-                                    pass
+                    shared_storage = _get_shared_storage()
+                    found = shared_storage.BUSINESS_STORE.lookup(business_id) if shared_storage else None
                     
-                    if simple_store and business_id in simple_store:
-                        business_data = simple_store[business_id]
+                    if found:
+                        business_data = found[1]
                         business_name = business_data.get("business_name", "Unknown Business")
                         contact_info = business_data.get("contact_info", {})
                         business_phone = contact_info.get("phone", "")
@@ -1043,6 +873,29 @@ class BAISUniversalToolHandler:
             if not business_name:
                 business_name = business_id.replace("-", " ").title()
             
+            slot = requested_slot(parameters or {})
+            if slot:
+                engine = self._availability_engine()
+                booking_fields = None
+                if engine.store is not None:
+                    booking_fields = {
+                        "confirmation_number": f"BAIS-{confirmation_id}",
+                        "agent_id": parameters.get("agent_id") or "bais-universal",
+                        "customer_name": customer_info.get("name", ""),
+                        "customer_email": customer_info.get("email", ""),
+                        "customer_phone": customer_info.get("phone"),
+                        "booking_data": parameters,
+                        "total_amount": float(parameters.get("total_amount") or 0),
+                    }
+                if not await engine.reserve(business_id, service_id, slot[0], slot[1],
+                                            str(uuid.uuid4()), booking_fields):
+                    return {
+                        "success": False,
+                        "error": f"{service_name} is not available on {slot[0]} at {slot[1]}",
+                        "business_id": business_id,
+                        "service_id": service_id
+                    }
+            
             # Build execution result
             executed_at = datetime.utcnow().isoformat()
             
@@ -1086,6 +939,322 @@ class BAISUniversalToolHandler:
                 "service_id": service_id
             }
     
+    def _format_db_business(self, biz) -> Dict[str, Any]:
+        """Build a search result from a Business row with its services already loaded"""
+        # Use external_id as business_id for consistency with API
+        return {
+            "business_id": biz.external_id or str(biz.id),
+            "name": biz.name,
+            "description": biz.description or "",
+            "category": biz.business_type,
+            "location": {
+                "city": biz.city or "",
+                "state": biz.state or "",
+                "address": f"{biz.address or ''}, {biz.city or ''}, {biz.state or ''}"
+            },
+            "phone": biz.phone or "",
+            "website": biz.website or "",
+            "rating": 4.5,  # Default rating, can be enhanced with metrics
+            "services": [
+                {
+                    "id": svc.service_id or str(svc.id),
+                    "name": svc.name,
+                    "description": svc.description or ""
+                }
+                for svc in biz.services[:SearchLimits.MAX_SERVICES_PER_RESULT]  # Limit services in search results
+            ]
+        }
+    
+    def _format_store_business(self, business_id: str, business_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a search result from a BUSINESS_STORE entry"""
+        location = business_data.get("location", {})
+        contact_info = business_data.get("contact_info", {})
+        return {
+            "business_id": business_id,
+            "name": business_data.get("business_name", ""),
+            "description": business_data.get("business_info", {}).get("description", ""),
+            "category": business_data.get("business_type", "").lower(),
+            "location": {
+                "city": location.get("city", ""),
+                "state": location.get("state", ""),
+                "address": location.get("address", "")
+            },
+            "phone": contact_info.get("phone", ""),
+            "website": contact_info.get("website", ""),
+            "rating": 4.5,
+            # Include all services, not just first 5, so LLM has full context
+            "services": [
+                {
+                    "id": svc.get("id", ""),
+                    "name": svc.get("name", ""),
+                    "description": svc.get("description", ""),
+                    "category": svc.get("category", "")
+                }
+                for svc in business_data.get("services_config", [])
+            ]
+        }
+    
+    async def _prepare_search_index(self, db_manager) -> None:
+        """Have concurrent first searches share one build of the in-process mirror"""
+        if not getattr(db_manager, "is_async", False):
+            return  # sync sessions run one search at a time
+        if db_manager.engine.dialect.name == "postgresql":
+            capabilities = cached_postgres_search_capabilities(db_manager.engine)
+            if capabilities is None:
+                capabilities = await db_manager.run_sync(
+                    lambda session: postgres_search_capabilities(session.get_bind())
+                )
+            if capabilities.full_text or capabilities.trigram:
+                return  # ranked by the PostgreSQL indexes, not the mirror
+        await get_database_search_index(db_manager).prepare(db_manager)
+    
+    async def _run_in_session(self, db_manager, fn, *args):
+        """
+        Run sync ORM work ``fn(session, *args)`` against a database manager.
+        An AsyncDatabaseManager awaits the driver, keeping the event loop free.
+        """
+        if getattr(db_manager, "is_async", False):
+            return await db_manager.run_sync(fn, *args)
+        with db_manager.get_session() as session:
+            return fn(session, *args)
+    
+    def _search_database(
+        self,
+        session,
+        db_manager,
+        query: Optional[str],
+        category: Optional[str],
+        location: Optional[str],
+        coordinates: Optional[Coordinates] = None,
+        radius_km: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Formatted database matches for search_businesses"""
+        from .database_models import Business
+        
+        if coordinates:
+            nearby = self._nearby_database_search(session, db_manager, coordinates, radius_km, query, category)
+            logger.info(f"Database geo query returned {len(nearby)} businesses")
+            results = []
+            for biz, distance_km in nearby:
+                business = self._format_db_business(biz)
+                business["distance_km"] = round(distance_km, 2)
+                results.append(business)
+            return results
+        
+        # Ranked full-text search when there is a query; plain filtering otherwise.
+        # Services are batch-loaded with the businesses (selectinload), so the
+        # statement count is constant regardless of how many businesses match.
+        if query:
+            db_businesses = self._ranked_database_search(session, db_manager, query, category, location)
+        else:
+            query_obj = self._filtered_business_query(session, category, location)
+            db_businesses = query_obj.limit(SearchLimits.DEFAULT_RESULT_LIMIT).all()
+        logger.info(f"Database query returned {len(db_businesses)} matching businesses")
+        
+        if len(db_businesses) == 0 and _search_diagnostics_enabled():
+            # Full-table diagnostic read - only when BAIS_SEARCH_DEBUG is set
+            total_active = session.query(Business).filter(Business.status == "active").count()
+            logger.warning(f"No matches found, but {total_active} active businesses exist:")
+            sample = session.query(Business).filter(Business.status == "active").limit(5).all()
+            for biz in sample:
+                logger.warning(f"  - {biz.name} (type: {biz.business_type}, city: {biz.city}, state: {biz.state})")
+        
+        return [self._format_db_business(biz) for biz in db_businesses]
+    
+    def _load_business_services(self, session, business_id: str, id_variants: List[str]) -> Optional[Dict[str, Any]]:
+        """Business and service details for get_business_services, or None if not in the database"""
+        from sqlalchemy import func
+        from sqlalchemy.orm import selectinload
+        from .database_models import Business
+        
+        # Find business by external_id (any normalized variant) or primary key
+        business = session.query(Business).options(
+            selectinload(Business.services)
+        ).filter(
+            Business.external_id.in_(id_variants) | (Business.id == business_id)
+        ).first()
+        compact_id = compact_business_id(business_id)
+        if not business and compact_id:
+            # Separator-free spellings ("newlifenewimagemedspa"); only reached on a miss
+            business = session.query(Business).options(
+                selectinload(Business.services)
+            ).filter(
+                func.replace(func.replace(func.lower(Business.external_id), "-", ""), "_", "") == compact_id
+            ).first()
+        if not business:
+            return None
+        
+        service_list = []
+        for svc in business.services:
+            service_data = {
+                "service_id": svc.service_id or str(svc.id),
+                "name": svc.name,
+                "description": svc.description or "",
+                "category": svc.category or "",
+            }
+            # Add parameters if available
+            if isinstance(svc.parameters_schema, dict) and svc.parameters_schema:
+                service_data["parameters"] = svc.parameters_schema
+            
+            service_list.append(service_data)
+        
+        return {
+            "business_id": business.external_id or str(business.id),
+            "business_name": business.name,
+            "services": service_list
+        }
+    
+    def _load_service_details(self, session, business_id: str, service_id: str):
+        """(business_name, phone, email, service_name) for execute_service, or None"""
+        from .database_models import Business, BusinessService
+        
+        business = session.query(Business).filter(
+            (Business.external_id == business_id) | (Business.id == business_id)
+        ).first()
+        if not business:
+            return None
+        
+        # Find the service
+        service = session.query(BusinessService).filter(
+            BusinessService.business_id == business.id,
+            (BusinessService.service_id == service_id) | (BusinessService.id == service_id)
+        ).first()
+        
+        return business.name, business.phone, business.email, service.name if service else None
+    
+    def _list_active_businesses(self, session) -> List[Dict[str, Any]]:
+        """Formatted active businesses, unranked"""
+        all_businesses = self._filtered_business_query(session, None, None).limit(
+            SearchLimits.DEFAULT_RESULT_LIMIT
+        ).all()
+        return [self._format_db_business(biz) for biz in all_businesses]
+    
+    def _ranked_database_search(
+        self,
+        session,
+        db_manager,
+        query: str,
+        category: Optional[str],
+        location: Optional[str]
+    ) -> List[Any]:
+        """
+        Relevance-ranked database search.
+        PostgreSQL uses its tsvector/trigram GIN indexes; other databases (or a
+        PostgreSQL without search privileges) use the in-process inverted index.
+        """
+        from sqlalchemy.orm import selectinload
+        from .database_models import Business
+        
+        if db_manager.engine.dialect.name == "postgresql":
+            # session.get_bind() is the sync engine for both sync and async managers
+            capabilities = postgres_search_capabilities(session.get_bind())
+            query_obj = self._filtered_business_query(session, category, location)
+            ranked_query = apply_postgres_search(query_obj, query, capabilities)
+            if ranked_query is not None:
+                return ranked_query.limit(SearchLimits.DEFAULT_RESULT_LIMIT).all()
+        
+        ranked = get_database_search_index(db_manager).search(
+            session, query, category=category, location=location
+        )
+        if not ranked:
+            return []
+        
+        ranked_ids = [business_id for business_id, _ in ranked]
+        rows = {
+            biz.id: biz
+            for biz in session.query(Business).options(
+                selectinload(Business.services)
+            ).filter(Business.id.in_(ranked_ids)).all()
+        }
+        return [rows[business_id] for business_id in ranked_ids if business_id in rows]
+    
+    def _nearby_database_search(
+        self,
+        session,
+        db_manager,
+        coordinates: Coordinates,
+        radius_km: Optional[float],
+        query: Optional[str],
+        category: Optional[str]
+    ) -> List[Tuple[Any, float]]:
+        """
+        (Business, distance_km) pairs, nearest first.
+        PostgreSQL uses its PostGIS or earthdistance GiST index; other databases
+        (or a PostgreSQL without either) use the in-process grid index.
+        """
+        from sqlalchemy.orm import selectinload
+        from .database_models import Business
+        
+        latitude, longitude = coordinates
+        if db_manager.engine.dialect.name == "postgresql":
+            bind = session.get_bind()
+            query_obj = self._filtered_business_query(session, category, None)
+            match = None
+            if query:
+                match, _rank = postgres_search_clause(query, postgres_search_capabilities(bind))
+            if match is not None or not query:
+                if match is not None:
+                    query_obj = query_obj.filter(match)
+                geo_query = apply_postgres_geo(
+                    query_obj, latitude, longitude, radius_km, postgres_geo_capabilities(bind)
+                )
+                if geo_query is not None:
+                    return [
+                        (biz, haversine_km(latitude, longitude, biz.latitude, biz.longitude))
+                        for biz in geo_query.limit(SearchLimits.DEFAULT_RESULT_LIMIT).all()
+                    ]
+        
+        nearest = get_database_search_index(db_manager).nearby(
+            session, latitude, longitude, radius_km=radius_km, query=query, category=category
+        )
+        if not nearest:
+            return []
+        
+        rows = {
+            biz.id: biz
+            for biz in session.query(Business).options(
+                selectinload(Business.services)
+            ).filter(Business.id.in_([business_id for business_id, _ in nearest])).all()
+        }
+        return [(rows[business_id], distance) for business_id, distance in nearest if business_id in rows]
+    
+    def _filtered_business_query(self, session, category: Optional[str], location: Optional[str]):
+        """Active-business query with category and city/state filters applied"""
+        from sqlalchemy import or_
+        from sqlalchemy.orm import selectinload
+        from .database_models import Business
+        
+        query_obj = session.query(Business).options(
+            selectinload(Business.services)
+        ).filter(Business.status == "active")
+        
+        if category:
+            query_obj = query_obj.filter(Business.business_type == category)
+        
+        if location:
+            location_lower = location.lower().strip()
+            location_normalized = location_lower.replace(",", " ").replace(".", "").strip()
+            location_words = location_normalized.split()
+            
+            location_conditions = []
+            location_conditions.append(Business.city.ilike(f"%{location_lower}%"))
+            location_conditions.append(Business.state.ilike(f"%{location_lower}%"))
+            
+            # Handle "Las Vegas" variations
+            if "vegas" in location_lower or "las vegas" in location_lower:
+                location_conditions.append(Business.city.ilike("%las vegas%"))
+                location_conditions.append(Business.city.ilike("%vegas%"))
+            
+            # Word-by-word matching
+            for word in location_words:
+                if len(word) > 2:
+                    location_conditions.append(Business.city.ilike(f"%{word}%"))
+                    location_conditions.append(Business.state.ilike(f"%{word}%"))
+            
+            query_obj = query_obj.filter(or_(*location_conditions))
+        
+        return query_obj
+    
     def _get_timestamp(self) -> str:
         from datetime import datetime
         return datetime.utcnow().isoformat()
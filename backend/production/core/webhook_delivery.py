@@ -0,0 +1,543 @@
+"""
+BAIS Webhook Delivery
+Queued, pooled, optionally batched delivery of subscription HTTP callbacks
+
+Publishing a notification only enqueues it in an outbox. A background worker
+claims due deliveries and POSTs them through one keep-alive pool per
+destination (scheme + host) from ConnectionPoolManager, with a concurrency
+cap per destination so a slow subscriber only holds up its own deliveries:
+deliveries to a destination already at its cap are left queued rather than
+claimed, so they cannot fill the worker's in-flight slots.
+
+Failures are retried with exponential backoff and jitter. A delivery is
+dead-lettered after max_attempts, or at once on a 4xx other than 408/429.
+Deliveries marked batchable are grouped per callback URL and sent as
+{"notifications": [...]} in one POST.
+
+RedisWebhookOutbox is used when REDIS_URL is configured: queued deliveries
+survive a restart, and claims are leased so several workers can share the
+outbox and a crashed worker's claims are retried. The lease is renewed when a
+delivery's POST starts. Start the process-wide dispatcher at application
+startup so a durable outbox is drained without waiting for new traffic.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+
+from .constants import WebhookLimits
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_KEY_PREFIX = "bais:webhooks:"
+
+# Client errors that are worth retrying
+RETRYABLE_CLIENT_STATUSES = frozenset({408, 429})
+
+# hook(delivery, delivered, error)
+DeliveryResultHook = Callable[["WebhookDelivery", bool, Optional[str]], Any]
+
+# accept(delivery) -> False leaves a due delivery queued
+ClaimFilter = Callable[["WebhookDelivery"], bool]
+
+
+@dataclass
+class WebhookDelivery:
+    """One queued POST to a callback URL"""
+    url: str
+    payload: Dict[str, Any]
+    batchable: bool = False
+    delivery_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    attempts: int = 0
+    next_attempt_at: float = field(default_factory=time.time)
+    last_error: Optional[str] = None
+    context: Dict[str, Any] = field(default_factory=dict)  # e.g. subscription_id, for result hooks
+
+    @property
+    def destination(self) -> str:
+        parts = urlsplit(self.url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), default=str)
+
+    @classmethod
+    def from_json(cls, data: Any) -> "WebhookDelivery":
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        return cls(**json.loads(data))
+
+
+class WebhookOutbox:
+    """Queue of pending deliveries; claimed deliveries are completed, rescheduled or dead-lettered"""
+
+    async def enqueue(self, delivery: WebhookDelivery) -> None:
+        raise NotImplementedError
+
+    async def claim(self, limit: int, now: float, accept: Optional[ClaimFilter] = None) -> List[WebhookDelivery]:
+        """Take up to limit due deliveries, oldest first, skipping those accept() rejects"""
+        raise NotImplementedError
+
+    async def renew(self, deliveries: List[WebhookDelivery], now: float) -> None:
+        """Extend the claim on deliveries about to be sent"""
+
+    async def complete(self, delivery: WebhookDelivery) -> None:
+        raise NotImplementedError
+
+    async def reschedule(self, delivery: WebhookDelivery) -> None:
+        """Return a claimed delivery to the queue, due at delivery.next_attempt_at"""
+        raise NotImplementedError
+
+    async def dead_letter(self, delivery: WebhookDelivery) -> None:
+        raise NotImplementedError
+
+    async def next_due_at(self) -> Optional[float]:
+        raise NotImplementedError
+
+    async def pending_count(self) -> int:
+        raise NotImplementedError
+
+    async def dead_letters(self, limit: int = 100) -> List[WebhookDelivery]:
+        raise NotImplementedError
+
+
+class InMemoryWebhookOutbox(WebhookOutbox):
+    """Process-local outbox; queued deliveries are lost on restart"""
+
+    def __init__(self, dead_letter_max: int = WebhookLimits.DEAD_LETTER_MAX):
+        self._due: Dict[str, WebhookDelivery] = {}
+        self._claimed: Dict[str, WebhookDelivery] = {}
+        self._dead: deque = deque(maxlen=dead_letter_max)
+
+    async def enqueue(self, delivery: WebhookDelivery) -> None:
+        self._due[delivery.delivery_id] = delivery
+
+    async def claim(self, limit: int, now: float, accept: Optional[ClaimFilter] = None) -> List[WebhookDelivery]:
+        ready = sorted((d for d in self._due.values() if d.next_attempt_at <= now),
+                       key=lambda d: d.next_attempt_at)
+        claimed = []
+        for delivery in ready:
+            if len(claimed) >= limit:
+                break
+            if accept is not None and not accept(delivery):
+                continue
+            del self._due[delivery.delivery_id]
+            self._claimed[delivery.delivery_id] = delivery
+            claimed.append(delivery)
+        return claimed
+
+    async def complete(self, delivery: WebhookDelivery) -> None:
+        self._claimed.pop(delivery.delivery_id, None)
+
+    async def reschedule(self, delivery: WebhookDelivery) -> None:
+        self._claimed.pop(delivery.delivery_id, None)
+        self._due[delivery.delivery_id] = delivery
+
+    async def dead_letter(self, delivery: WebhookDelivery) -> None:
+        self._claimed.pop(delivery.delivery_id, None)
+        self._dead.append(delivery)
+
+    async def next_due_at(self) -> Optional[float]:
+        return min((d.next_attempt_at for d in self._due.values()), default=None)
+
+    async def pending_count(self) -> int:
+        return len(self._due) + len(self._claimed)
+
+    async def dead_letters(self, limit: int = 100) -> List[WebhookDelivery]:
+        return list(self._dead)[-limit:][::-1]
+
+
+class RedisWebhookOutbox(WebhookOutbox):
+    """
+    Durable outbox: delivery bodies in a hash, a due zset scored by next attempt
+    time, and an inflight zset scored by lease expiry. Claiming moves ids from
+    due to inflight with ZREM, so only one worker wins each delivery.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        redis_url: Optional[str] = None,
+        key_prefix: str = WEBHOOK_KEY_PREFIX,
+        lease_seconds: int = WebhookLimits.CLAIM_LEASE_SECONDS,
+        dead_letter_max: int = WebhookLimits.DEAD_LETTER_MAX,
+        scan_max: int = WebhookLimits.CLAIM_SCAN_MAX
+    ):
+        if redis_client is None:
+            import redis.asyncio as aioredis
+            redis_client = aioredis.from_url(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.redis_client = redis_client
+        self.lease_seconds = lease_seconds
+        self.dead_letter_max = dead_letter_max
+        self.scan_max = scan_max
+        self._deliveries_key = f"{key_prefix}deliveries"
+        self._due_key = f"{key_prefix}due"
+        self._inflight_key = f"{key_prefix}inflight"
+        self._dead_key = f"{key_prefix}dead"
+
+    async def enqueue(self, delivery: WebhookDelivery) -> None:
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._deliveries_key, delivery.delivery_id, delivery.to_json())
+            pipe.zadd(self._due_key, {delivery.delivery_id: delivery.next_attempt_at})
+            await pipe.execute()
+
+    async def claim(self, limit: int, now: float, accept: Optional[ClaimFilter] = None) -> List[WebhookDelivery]:
+        # Claims whose lease ran out belong to a worker that stopped mid-delivery
+        for delivery_id in await self.redis_client.zrangebyscore(self._inflight_key, "-inf", now):
+            if await self.redis_client.zrem(self._inflight_key, delivery_id):
+                await self.redis_client.zadd(self._due_key, {delivery_id: now})
+
+        # Bodies are read before claiming so accept() can leave some queued;
+        # ids are still taken with ZREM, so only one worker wins each delivery
+        claimed: List[WebhookDelivery] = []
+        offset = 0
+        page_size = max(limit, 1)
+        while len(claimed) < limit and offset < self.scan_max:
+            ids = await self.redis_client.zrangebyscore(self._due_key, "-inf", now, start=offset, num=page_size)
+            if not ids:
+                break
+            offset += len(ids)
+            for delivery_id, data in zip(ids, await self.redis_client.hmget(self._deliveries_key, ids)):
+                if len(claimed) >= limit:
+                    break
+                if data is None:  # completed elsewhere after its lease expired
+                    if await self.redis_client.zrem(self._due_key, delivery_id):
+                        offset -= 1
+                    continue
+                delivery = WebhookDelivery.from_json(data)
+                if accept is not None and not accept(delivery):
+                    continue
+                if await self.redis_client.zrem(self._due_key, delivery_id):
+                    await self.redis_client.zadd(self._inflight_key, {delivery_id: now + self.lease_seconds})
+                    offset -= 1  # the id left the due set, shifting later pages
+                    claimed.append(delivery)
+        return claimed
+
+    async def renew(self, deliveries: List[WebhookDelivery], now: float) -> None:
+        await self.redis_client.zadd(
+            self._inflight_key, {d.delivery_id: now + self.lease_seconds for d in deliveries}, xx=True
+        )
+
+    async def complete(self, delivery: WebhookDelivery) -> None:
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hdel(self._deliveries_key, delivery.delivery_id)
+            pipe.zrem(self._inflight_key, delivery.delivery_id)
+            await pipe.execute()
+
+    async def reschedule(self, delivery: WebhookDelivery) -> None:
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._deliveries_key, delivery.delivery_id, delivery.to_json())
+            pipe.zrem(self._inflight_key, delivery.delivery_id)
+            pipe.zadd(self._due_key, {delivery.delivery_id: delivery.next_attempt_at})
+            await pipe.execute()
+
+    async def dead_letter(self, delivery: WebhookDelivery) -> None:
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.hdel(self._deliveries_key, delivery.delivery_id)
+            pipe.zrem(self._inflight_key, delivery.delivery_id)
+            pipe.lpush(self._dead_key, delivery.to_json())
+            pipe.ltrim(self._dead_key, 0, self.dead_letter_max - 1)
+            await pipe.execute()
+
+    async def next_due_at(self) -> Optional[float]:
+        head = await self.redis_client.zrange(self._due_key, 0, 0, withscores=True)
+        return float(head[0][1]) if head else None
+
+    async def pending_count(self) -> int:
+        return await self.redis_client.zcard(self._due_key) + await self.redis_client.zcard(self._inflight_key)
+
+    async def dead_letters(self, limit: int = 100) -> List[WebhookDelivery]:
+        return [WebhookDelivery.from_json(data)
+                for data in await self.redis_client.lrange(self._dead_key, 0, limit - 1)]
+
+
+class WebhookDispatcher:
+    """Background worker draining a WebhookOutbox over pooled HTTP connections"""
+
+    def __init__(
+        self,
+        outbox: Optional[WebhookOutbox] = None,
+        pool_manager=None,
+        max_attempts: int = WebhookLimits.MAX_ATTEMPTS,
+        base_backoff_seconds: float = WebhookLimits.BASE_BACKOFF_SECONDS,
+        max_backoff_seconds: float = WebhookLimits.MAX_BACKOFF_SECONDS,
+        max_in_flight: int = WebhookLimits.MAX_IN_FLIGHT,
+        max_per_destination: int = WebhookLimits.MAX_CONCURRENT_PER_DESTINATION,
+        max_batch_size: int = WebhookLimits.MAX_BATCH_SIZE,
+        request_timeout: float = WebhookLimits.REQUEST_TIMEOUT_SECONDS,
+        poll_interval: float = WebhookLimits.POLL_INTERVAL_SECONDS
+    ):
+        self.outbox = outbox or InMemoryWebhookOutbox()
+        self._pool_manager = pool_manager
+        self.max_attempts = max_attempts
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.max_in_flight = max_in_flight
+        self.max_per_destination = max_per_destination
+        self.max_batch_size = max_batch_size
+        self.request_timeout = request_timeout
+        self.poll_interval = poll_interval
+
+        self._destination_slots: Dict[str, asyncio.Semaphore] = {}
+        self._destination_load: Dict[str, float] = defaultdict(float)  # POSTs claimed per destination
+        self._result_hooks: List[DeliveryResultHook] = []
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._wakeup = asyncio.Event()
+        self._worker: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.submitted = 0
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+        self.batches_sent = 0
+
+    def add_result_hook(self, hook: DeliveryResultHook) -> None:
+        if hook not in self._result_hooks:
+            self._result_hooks.append(hook)
+
+    def remove_result_hook(self, hook: DeliveryResultHook) -> None:
+        if hook in self._result_hooks:
+            self._result_hooks.remove(hook)
+
+    async def submit(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        batchable: bool = False,
+        context: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Queue a POST of payload to url; returns the delivery id"""
+        delivery = WebhookDelivery(url=url, payload=payload, batchable=batchable, context=context or {})
+        await self.outbox.enqueue(delivery)
+        self.submitted += 1
+        await self.start()
+        self._wakeup.set()
+        return delivery.delivery_id
+
+    async def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._stopping = False
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop claiming and wait for deliveries already being sent"""
+        if self._worker is not None:
+            # wait_for() can swallow a cancel that races its inner wait, so also flag the loop
+            self._stopping = True
+            self._wakeup.set()
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def drain(self, timeout: float = 10.0) -> bool:
+        """Wait until nothing is queued or in flight; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while await self.outbox.pending_count():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return True
+
+    def backoff_seconds(self, attempts: int) -> float:
+        """Exponential delay before retry number attempts, with jitter over its upper half"""
+        delay = min(self.max_backoff_seconds, self.base_backoff_seconds * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    # Worker
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                # Clear before claiming so a submit racing the claim is not missed
+                self._wakeup.clear()
+                capacity = self.max_in_flight - self._in_flight
+                claimed = await self.outbox.claim(capacity, time.time(), self._claim_filter()) if capacity > 0 else []
+                if claimed:
+                    for group in self._group(claimed):
+                        self._spawn(group)
+                    await asyncio.sleep(0)
+                    continue
+
+                timeout = self.poll_interval
+                next_due = await self.outbox.next_due_at() if capacity > 0 else None
+                # Deliveries already due were left for busy destinations; a finished
+                # delivery sets the wakeup, so only future due times shorten the wait
+                if next_due is not None and next_due > time.time():
+                    timeout = min(timeout, next_due - time.time())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Webhook worker failed: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    def _claim_weight(self, delivery: WebhookDelivery) -> float:
+        """Share of a POST a delivery takes: batchable ones ride max_batch_size to a POST"""
+        return 1.0 / self.max_batch_size if delivery.batchable else 1.0
+
+    def _claim_filter(self) -> ClaimFilter:
+        """Accept deliveries only while their destination is under its concurrency cap"""
+        load = dict(self._destination_load)
+
+        def accept(delivery: WebhookDelivery) -> bool:
+            destination = delivery.destination
+            weight = self._claim_weight(delivery)
+            if load.get(destination, 0.0) + weight > self.max_per_destination + 1e-9:
+                return False
+            load[destination] = load.get(destination, 0.0) + weight
+            return True
+
+        return accept
+
+    def _group(self, deliveries: List[WebhookDelivery]) -> List[List[WebhookDelivery]]:
+        """Batchable deliveries to the same URL share a POST; the rest go alone"""
+        groups: List[List[WebhookDelivery]] = []
+        batches: Dict[str, List[WebhookDelivery]] = defaultdict(list)
+        for delivery in deliveries:
+            if delivery.batchable:
+                batches[delivery.url].append(delivery)
+            else:
+                groups.append([delivery])
+        for batch in batches.values():
+            for start in range(0, len(batch), self.max_batch_size):
+                groups.append(batch[start:start + self.max_batch_size])
+        return groups
+
+    def _spawn(self, group: List[WebhookDelivery]) -> None:
+        self._in_flight += len(group)
+        self._destination_load[group[0].destination] += sum(self._claim_weight(d) for d in group)
+        task = asyncio.create_task(self._deliver(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(self, group: List[WebhookDelivery]) -> None:
+        destination = group[0].destination
+        slots = self._destination_slots.get(destination)
+        if slots is None:
+            slots = self._destination_slots[destination] = asyncio.Semaphore(self.max_per_destination)
+        try:
+            async with slots:
+                try:
+                    # The lease runs from the POST, not from the claim
+                    await self.outbox.renew(group, time.time())
+                    delivered, error, retryable = await self._post(group)
+                except Exception as e:
+                    delivered, error, retryable = False, f"{type(e).__name__}: {e}", True
+            for delivery in group:
+                await self._settle(delivery, delivered, error, retryable)
+        finally:
+            self._in_flight -= len(group)
+            load = self._destination_load[destination] - sum(self._claim_weight(d) for d in group)
+            if load > 1e-9:
+                self._destination_load[destination] = load
+            else:
+                del self._destination_load[destination]
+            self._wakeup.set()
+
+    async def _post(self, group: List[WebhookDelivery]):
+        first = group[0]
+        body = {"notifications": [d.payload for d in group]} if first.batchable else first.payload
+        response = await self._client_for(first.destination).post(
+            first.url, json=body, timeout=self.request_timeout
+        )
+        if len(group) > 1:
+            self.batches_sent += 1
+        status = response.status_code
+        if status < 300:
+            return True, None, True
+        return False, f"HTTP {status}", status >= 500 or status in RETRYABLE_CLIENT_STATUSES
+
+    def _client_for(self, destination: str):
+        if self._pool_manager is None:
+            from .connection_pool_manager import get_connection_pool_manager
+            self._pool_manager = get_connection_pool_manager()
+        from .connection_pool_manager import WEBHOOK_POOL_CONFIG
+        return self._pool_manager.get_or_create_pool(f"webhook:{destination}", destination, WEBHOOK_POOL_CONFIG)
+
+    async def _settle(self, delivery: WebhookDelivery, delivered: bool, error: Optional[str], retryable: bool) -> None:
+        try:
+            if delivered:
+                await self.outbox.complete(delivery)
+                self.delivered += 1
+            else:
+                delivery.attempts += 1
+                delivery.last_error = error
+                self.failed_attempts += 1
+                if not retryable or delivery.attempts >= self.max_attempts:
+                    await self.outbox.dead_letter(delivery)
+                    self.dead_lettered += 1
+                    logger.warning(f"⚠️ Webhook to {delivery.url} dead-lettered after "
+                                   f"{delivery.attempts} attempt(s): {error}")
+                else:
+                    delivery.next_attempt_at = time.time() + self.backoff_seconds(delivery.attempts)
+                    await self.outbox.reschedule(delivery)
+                    logger.debug(f"Webhook to {delivery.url} failed ({error}), retry {delivery.attempts}")
+        except Exception as e:
+            logger.error(f"❌ Failed to record webhook result for {delivery.delivery_id}: {e}")
+
+        for hook in list(self._result_hooks):
+            try:
+                result = hook(delivery, delivered, error)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Error in webhook result hook: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "failed_attempts": self.failed_attempts,
+            "dead_lettered": self.dead_lettered,
+            "batches_sent": self.batches_sent,
+            "in_flight": self._in_flight,
+            "destinations": len(self._destination_slots),
+            "outbox": type(self.outbox).__name__,
+        }
+
+
+_webhook_dispatcher: Optional[WebhookDispatcher] = None
+
+
+def get_webhook_outbox() -> WebhookOutbox:
+    """Redis when REDIS_URL is set, otherwise in-memory. BAIS_WEBHOOK_OUTBOX=memory|redis overrides."""
+    backend = os.getenv("BAIS_WEBHOOK_OUTBOX", "").lower()
+    redis_url = os.getenv("REDIS_URL")
+    if backend == "redis" or (backend != "memory" and redis_url):
+        logger.info("✅ Webhook outbox: Redis")
+        return RedisWebhookOutbox(redis_url=redis_url)
+    logger.info("Webhook outbox: in-memory (not durable)")
+    return InMemoryWebhookOutbox()
+
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    """Get the process-wide webhook dispatcher"""
+    global _webhook_dispatcher
+    if _webhook_dispatcher is None:
+        _webhook_dispatcher = WebhookDispatcher(outbox=get_webhook_outbox())
+    return _webhook_dispatcher
+
+
+async def stop_webhook_dispatcher() -> None:
+    """Stop the process-wide dispatcher if it was created (application shutdown)"""
+    if _webhook_dispatcher is not None:
+        await _webhook_dispatcher.stop()
@@ -1,16 +1,30 @@
 """
 Workflow Event Bus - Observer Pattern Implementation
 Manages event-driven architecture for workflow status updates and notifications
+
+publish() records the event and enqueues it for each interested listener, then
+returns. Every listener has its own bounded queue drained by its own worker
+task, so a slow listener (audit I/O, notification senders) delays only itself
+and events reach each listener in publish order.
+
+A listener's overflow_policy decides what happens when its queue is full:
+BLOCK (default) makes publish() wait for room, SPILL queues past the bound so
+nothing is lost or delayed, DROP_OLDEST discards the oldest queued event and
+is only for listeners that can afford to lose events (metrics).
 """
 
 import asyncio
 import logging
-from typing import Dict, List, Callable, Any, Optional
+import time
+from collections import deque
+from typing import Dict, List, Callable, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from abc import ABC, abstractmethod
 
+from .constants import WorkflowLimits
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,9 +55,18 @@ class WorkflowEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class ListenerOverflowPolicy(Enum):
+    """What a full listener queue does with the next event"""
+    BLOCK = "block"
+    SPILL = "spill"
+    DROP_OLDEST = "drop_oldest"
+
+
 class WorkflowEventListener(ABC):
     """Abstract base class for workflow event listeners"""
     
+    overflow_policy: ListenerOverflowPolicy = ListenerOverflowPolicy.BLOCK
+    
     @abstractmethod
     async def handle_event(self, event: WorkflowEvent) -> None:
         """Handle a workflow event"""
@@ -55,19 +78,135 @@ class WorkflowEventListener(ABC):
         pass
 
 
+class _ListenerWorker:
+    """Bounded queue and worker task delivering events to one listener"""
+    
+    def __init__(self, listener: WorkflowEventListener, queue_size: int):
+        self.listener = listener
+        self.name = listener.__class__.__name__
+        self.policy = ListenerOverflowPolicy(getattr(listener, "overflow_policy", ListenerOverflowPolicy.BLOCK))
+        self.capacity = queue_size
+        # Unbounded; capacity is applied by the overflow policy in offer()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.closing = False
+        self._room = asyncio.Event()
+        self._put_lock = asyncio.Lock()  # FIFO, so blocked publishers keep publish order
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.blocked = 0
+        self.max_depth = 0
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+    
+    async def offer(self, item: Tuple[WorkflowEvent, float]) -> None:
+        """Enqueue an event, applying the listener's overflow policy if the queue is full"""
+        if self.policy is ListenerOverflowPolicy.BLOCK and (self.queue.qsize() >= self.capacity or self._put_lock.locked()):
+            self.blocked += 1
+            async with self._put_lock:
+                while self.queue.qsize() >= self.capacity:
+                    self._room.clear()
+                    self._ensure_running()
+                    await self._room.wait()
+                self._put(item)
+            return
+        if self.queue.qsize() >= self.capacity:
+            if self.policy is ListenerOverflowPolicy.DROP_OLDEST:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    logger.warning(f"⚠️ Listener {self.name} is falling behind, dropped {self.dropped} events")
+            else:
+                self.spilled += 1
+                if self.spilled == 1 or self.spilled % 100 == 0:
+                    logger.warning(f"⚠️ Listener {self.name} is falling behind, {self.queue.qsize()} events queued")
+        self._put(item)
+    
+    def close(self) -> None:
+        """Stop once every queued event (including blocked publishes) is handled"""
+        self.closing = True
+        if self.task is not None and not self.task.done():
+            self.queue.put_nowait(None)  # wakes the worker to check
+    
+    def _put(self, item: Tuple[WorkflowEvent, float]) -> None:
+        self.queue.put_nowait(item)
+        if self.closing:
+            self.queue.put_nowait(None)
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        self._ensure_running()
+    
+    def _ensure_running(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+    
+    async def _run(self) -> None:
+        while True:
+            item = await self.queue.get()
+            self._room.set()
+            try:
+                if item is None:
+                    if self.closing and self.queue.empty() and not self._put_lock.locked():
+                        return
+                    continue
+                event, enqueued_at = item
+                self.last_lag_seconds = time.monotonic() - enqueued_at
+                self.max_lag_seconds = max(self.max_lag_seconds, self.last_lag_seconds)
+                try:
+                    await self.listener.handle_event(event)
+                    self.processed += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"Error notifying listener {self.name}: {e}")
+            finally:
+                self.queue.task_done()
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "listener": self.name,
+            "overflow_policy": self.policy.value,
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "capacity": self.capacity,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "blocked": self.blocked,
+            "last_lag_ms": round(self.last_lag_seconds * 1000, 3),
+            "max_lag_ms": round(self.max_lag_seconds * 1000, 3),
+        }
+
+
 class WorkflowEventBus:
     """
     Event bus for workflow events using Observer pattern.
     
     This class manages event subscriptions and notifications,
     allowing components to react to workflow state changes.
+    Publishing waits only for room in a full BLOCK listener's queue, never for
+    handling; use drain() to wait for delivery.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_history_size: int = WorkflowLimits.EVENT_HISTORY_SIZE,
+        listener_queue_size: int = WorkflowLimits.LISTENER_QUEUE_SIZE
+    ):
         self._listeners: Dict[WorkflowEventType, List[WorkflowEventListener]] = {}
-        self._event_history: List[WorkflowEvent] = []
-        self._max_history_size = 1000
-        self._lock = asyncio.Lock()
+        self._event_history: deque = deque(maxlen=max_history_size)
+        self._max_history_size = max_history_size
+        self._listener_queue_size = listener_queue_size
+        self._workers: Dict[int, _ListenerWorker] = {}
+        # Unsubscribed workers still handling their queued events
+        self._retiring: Set[_ListenerWorker] = set()
+        
+        # Publish metrics
+        self._published = 0
+        self._publish_seconds_total = 0.0
+        self._publish_seconds_max = 0.0
     
     def subscribe(self, event_type: WorkflowEventType, listener: WorkflowEventListener) -> None:
         """
@@ -82,6 +221,8 @@ class WorkflowEventBus:
         
         if listener not in self._listeners[event_type]:
             self._listeners[event_type].append(listener)
+            if id(listener) not in self._workers:
+                self._workers[id(listener)] = _ListenerWorker(listener, self._listener_queue_size)
             logger.info(f"Subscribed listener {listener.__class__.__name__} to {event_type.value}")
     
     def unsubscribe(self, event_type: WorkflowEventType, listener: WorkflowEventListener) -> None:
@@ -94,43 +235,69 @@ class WorkflowEventBus:
         """
         if event_type in self._listeners and listener in self._listeners[event_type]:
             self._listeners[event_type].remove(listener)
+            if not any(listener in listeners for listeners in self._listeners.values()):
+                worker = self._workers.pop(id(listener), None)
+                if worker is not None and worker.task is not None and not worker.task.done():
+                    # Stop after the events already queued; drain() and stop() still wait for them
+                    self._retiring.add(worker)
+                    worker.task.add_done_callback(lambda _task, worker=worker: self._retiring.discard(worker))
+                    worker.close()
             logger.info(f"Unsubscribed listener {listener.__class__.__name__} from {event_type.value}")
     
     async def publish(self, event: WorkflowEvent) -> None:
         """
-        Publish an event to all subscribed listeners.
+        Publish an event to all subscribed listeners. Returns once the event is
+        queued for each listener, without waiting for them to handle it (a full
+        BLOCK listener queue makes this wait for room).
         
         Args:
             event: The event to publish
         """
-        async with self._lock:
-            # Add to event history
-            self._event_history.append(event)
-            if len(self._event_history) > self._max_history_size:
-                self._event_history.pop(0)
-            
-            # Notify listeners
-            listeners = self._listeners.get(event.event_type, [])
-            if not listeners:
-                logger.debug(f"No listeners for event type {event.event_type.value}")
-                return
-            
-            # Notify all listeners concurrently
-            tasks = []
-            for listener in listeners:
-                if event.event_type in listener.get_supported_events():
-                    tasks.append(self._notify_listener(listener, event))
-            
-            if tasks:
-                await asyncio.gather(*tasks, return_exceptions=True)
-                logger.info(f"Published event {event.event_type.value} to {len(tasks)} listeners")
+        started = time.perf_counter()
+        self._event_history.append(event)
+        
+        listeners = self._listeners.get(event.event_type, [])
+        if not listeners:
+            logger.debug(f"No listeners for event type {event.event_type.value}")
+        
+        queued = 0
+        enqueued_at = time.monotonic()
+        for listener in listeners:
+            if event.event_type in listener.get_supported_events():
+                await self._workers[id(listener)].offer((event, enqueued_at))
+                queued += 1
+        
+        elapsed = time.perf_counter() - started
+        self._published += 1
+        self._publish_seconds_total += elapsed
+        self._publish_seconds_max = max(self._publish_seconds_max, elapsed)
+        if queued:
+            logger.debug(f"Queued event {event.event_type.value} for {queued} listeners")
     
-    async def _notify_listener(self, listener: WorkflowEventListener, event: WorkflowEvent) -> None:
-        """Notify a single listener of an event"""
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every listener has handled its queued events; False on timeout"""
+        joins = [worker.queue.join() for worker in self._all_workers()]
+        if not joins:
+            return True
         try:
-            await listener.handle_event(event)
-        except Exception as e:
-            logger.error(f"Error notifying listener {listener.__class__.__name__}: {e}")
+            await asyncio.wait_for(asyncio.gather(*joins), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Deliver what is queued (up to timeout), then stop the listener workers"""
+        await self.drain(timeout)
+        for worker in self._all_workers():
+            if worker.task is not None and not worker.task.done():
+                worker.task.cancel()
+                try:
+                    await worker.task
+                except asyncio.CancelledError:
+                    pass
+    
+    def _all_workers(self) -> List[_ListenerWorker]:
+        return [*self._workers.values(), *self._retiring]
     
     def get_event_history(self, event_type: Optional[WorkflowEventType] = None, limit: int = 100) -> List[WorkflowEvent]:
         """
@@ -143,7 +310,7 @@ class WorkflowEventBus:
         Returns:
             List of recent events
         """
-        history = self._event_history.copy()
+        history = list(self._event_history)
         
         if event_type:
             history = [e for e in history if e.event_type == event_type]
@@ -157,6 +324,18 @@ class WorkflowEventBus:
     def get_subscribed_events(self) -> List[WorkflowEventType]:
         """Get all event types that have listeners"""
         return list(self._listeners.keys())
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Publish latency plus per-listener queue depth, lag and drops"""
+        return {
+            "published": self._published,
+            "publish_latency_ms": {
+                "avg": round(self._publish_seconds_total * 1000 / self._published, 4) if self._published else 0.0,
+                "max": round(self._publish_seconds_max * 1000, 4),
+            },
+            "history_size": len(self._event_history),
+            "listeners": [worker.get_metrics() for worker in self._workers.values()],
+        }
 
 
 # Concrete event listeners for common use cases
@@ -185,6 +364,9 @@ class PaymentNotificationListener(WorkflowEventListener):
 class AuditLogListener(WorkflowEventListener):
     """Listener for audit logging of all workflow events"""
     
+    # The audit trail must be complete, and payments must not wait on audit I/O
+    overflow_policy = ListenerOverflowPolicy.SPILL
+    
     def __init__(self, audit_logger: Any):
         self.audit_logger = audit_logger
     
@@ -206,6 +388,8 @@ class AuditLogListener(WorkflowEventListener):
 class MetricsListener(WorkflowEventListener):
     """Listener for workflow metrics collection"""
     
+    overflow_policy = ListenerOverflowPolicy.DROP_OLDEST
+    
     def __init__(self, metrics_collector: Any):
         self.metrics_collector = metrics_collector
     
@@ -83,12 +83,68 @@ system_info = get_system_info()
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+
+
+def _configured_database_url():
+    """DATABASE_URL, or the alternative names Railway might use"""
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url or database_url == "not_set":
+        database_url = os.getenv("POSTGRES_URL") or os.getenv("PGDATABASE_URL")
+    if not database_url or not database_url.strip() or database_url == "not_set":
+        return None
+    return database_url
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Warm the shared database pools and start the webhook dispatcher on startup;
+    stop and dispose of them on shutdown
+    """
+    database_url = _configured_database_url()
+    if database_url:
+        try:
+            # Same module the chat endpoint uses, so requests find the warmed pool
+            from backend.production.core.database_models import warmup_database_managers
+            await warmup_database_managers(database_url)
+        except Exception as e:
+            # Never block startup - requests create the pool lazily instead
+            logger.warning(f"⚠️ Database pool warmup failed: {e}")
+    
+    try:
+        # Drain webhook deliveries a durable outbox kept across the restart
+        from backend.production.core.webhook_delivery import get_webhook_dispatcher
+        await get_webhook_dispatcher().start()
+    except Exception as e:
+        logger.warning(f"⚠️ Webhook dispatcher failed to start: {e}")
+    
+    yield
+    
+    # Modules can be loaded under both names (core.* and backend.production.core.*)
+    for module_name in ("core.webhook_delivery", "backend.production.core.webhook_delivery"):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            try:
+                await module.stop_webhook_dispatcher()
+            except Exception as e:
+                logger.warning(f"⚠️ Webhook dispatcher shutdown failed ({module_name}): {e}")
+    
+    for module_name in ("core.database_models", "backend.production.core.database_models"):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            try:
+                await module.dispose_database_managers()
+            except Exception as e:
+                logger.warning(f"⚠️ Database pool disposal failed ({module_name}): {e}")
+
 
 # Create the FastAPI app immediately
 app = FastAPI(
     title="BAIS Production Server",
     description="Business-Agent Integration Standard Production Implementation - Complete Backend",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Track app readiness
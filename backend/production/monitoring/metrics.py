@@ -92,6 +92,12 @@ ap2_webhook_signature_failures = Counter(
     'Total number of AP2 webhook signature validation failures'
 )
 
+ap2_legacy_signature_fallbacks = Counter(
+    'bais_ap2_legacy_signature_fallbacks_total',
+    'Signatures accepted only under the pre-RFC 8785 json.dumps encoding',
+    ['verifier']
+)
+
 # Business Metrics
 active_businesses = Gauge(
     'bais_active_businesses_total',
@@ -4,7 +4,7 @@ from typing import Dict, Any, Optional
 from .services.business_service import BusinessService
 from .services.agent_service import AgentService
 from .api_models import *
-from .core.database_models import DatabaseManager
+from .core.database_models import DatabaseManager, get_request_database_manager
 from .core.mcp_server_generator import BusinessSystemAdapter
 from .config.settings import get_settings, get_database_url
 from .core.exceptions import ConfigurationError
@@ -66,12 +66,18 @@ def get_business_config() -> Dict[str, Any]:
     }
 
 
+def get_request_db_manager():
+    """Get the shared request database manager (async when its driver is installed)"""
+    return get_request_database_manager(get_database_url())
+
+
 def get_agent_service(
-    business_config: Dict[str, Any] = Depends(get_business_config)
+    business_config: Dict[str, Any] = Depends(get_business_config),
+    db_manager=Depends(get_request_db_manager)
 ) -> AgentService:
     """Get agent service dependency with proper configuration"""
     try:
-        adapter = BusinessSystemAdapter(business_config=business_config)
+        adapter = BusinessSystemAdapter(business_config=business_config, db_manager=db_manager)
         return AgentService(business_adapter=adapter)
     except Exception as e:
         raise ConfigurationError(
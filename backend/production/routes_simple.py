@@ -33,6 +33,15 @@ except ImportError:
         def store_business(business_id: str, business_data: Dict[str, Any]) -> None:
             BUSINESS_STORE[business_id] = business_data
 
+# Catalog cache for the universal tools - registration publishes invalidations
+try:
+    from .core.catalog_cache import invalidate_catalog_cache, get_catalog_cache_stats
+except ImportError:
+    try:
+        from core.catalog_cache import invalidate_catalog_cache, get_catalog_cache_stats
+    except ImportError:
+        from backend.production.core.catalog_cache import invalidate_catalog_cache, get_catalog_cache_stats
+
 
 def generate_business_id(business_name: str) -> str:
     """Generate a URL-friendly business ID"""
@@ -71,26 +80,32 @@ def register_business_to_database(request: BusinessRegistrationRequest, database
         business_id = generate_business_id(request.business_name)
         
         # Try multiple import paths for database models
-        DatabaseManager = None
+        get_database_manager = None
         Business = None
         BusinessService = None
         
         try:
-            from ..core.database_models import DatabaseManager, Business, BusinessService
+            from ..core.database_models import get_database_manager, Business, BusinessService
+            from ..core.business_search_index import invalidate_search_indexes
+            from ..core.geo_index import location_coordinates
         except (ImportError, NameError):
             try:
-                from core.database_models import DatabaseManager, Business, BusinessService
+                from core.database_models import get_database_manager, Business, BusinessService
+                from core.business_search_index import invalidate_search_indexes
+                from core.geo_index import location_coordinates
             except (ImportError, NameError):
                 try:
-                    from backend.production.core.database_models import DatabaseManager, Business, BusinessService
+                    from backend.production.core.database_models import get_database_manager, Business, BusinessService
+                    from backend.production.core.business_search_index import invalidate_search_indexes
+                    from backend.production.core.geo_index import location_coordinates
                 except (ImportError, NameError):
                     logger.warning("Could not import database models")
                     return (False, None)
         
-        if not DatabaseManager or not Business or not BusinessService:
+        if not get_database_manager or not Business or not BusinessService:
             return (False, None)
         
-        db_manager = DatabaseManager(database_url)
+        db_manager = get_database_manager(database_url)
         with db_manager.get_session() as session:
             # Check if business already exists (idempotent)
             existing = session.query(Business).filter(
@@ -109,6 +124,9 @@ def register_business_to_database(request: BusinessRegistrationRequest, database
                 except:
                     pass
             
+            # Coordinates make the business reachable by "near me" search
+            latitude, longitude = location_coordinates(request.location) or (None, None)
+            
             # Create business in database
             business_id_str = str(uuid.uuid4())
             business = Business(
@@ -123,6 +141,8 @@ def register_business_to_database(request: BusinessRegistrationRequest, database
                 postal_code=request.location.get("postal_code", ""),
                 country=request.location.get("country", "US"),
                 timezone=request.location.get("timezone", "UTC"),
+                latitude=latitude,
+                longitude=longitude,
                 website=request.contact_info.get("website", ""),
                 phone=request.contact_info.get("phone", ""),
                 email=request.contact_info.get("email", ""),
@@ -163,6 +183,9 @@ def register_business_to_database(request: BusinessRegistrationRequest, database
                 session.add(service)
             
             session.commit()
+            # Rebuild the search mirrors now (in the background) rather than at the next refresh
+            invalidate_search_indexes()
+            invalidate_catalog_cache(business_id)
             logger.info(f"✅ Business saved to database: {request.business_name} (ID: {business_id})")
             return (True, business_id)
             
@@ -399,6 +422,11 @@ async def get_system_status():
         "ready_for_customers": True
     }
 
+@api_router.get("/status/catalog-cache", tags=["System Status"])
+async def get_catalog_cache_status():
+    """Business catalog cache counters (hits, misses, evictions) for sizing"""
+    return get_catalog_cache_stats()
+
 @api_router.get("/businesses/debug/list", tags=["Business Management"])
 async def list_all_businesses_debug():
     """Debug endpoint to list all businesses in database and memory"""
@@ -436,16 +464,16 @@ async def list_all_businesses_debug():
             }
         
         # Try multiple import paths
-        DatabaseManager = None
+        get_database_manager = None
         Business = None
         try:
-            from core.database_models import DatabaseManager, Business
+            from core.database_models import get_database_manager, Business
         except ImportError:
             try:
-                from .core.database_models import DatabaseManager, Business
+                from .core.database_models import get_database_manager, Business
             except ImportError:
                 try:
-                    from backend.production.core.database_models import DatabaseManager, Business
+                    from backend.production.core.database_models import get_database_manager, Business
                 except ImportError:
                     return {
                         "database_configured": True,
@@ -453,14 +481,14 @@ async def list_all_businesses_debug():
                         "businesses": []
                     }
         
-        if not DatabaseManager or not Business:
+        if not get_database_manager or not Business:
             return {
                 "database_configured": True,
                 "error": "Database models not available",
                 "businesses": []
             }
         
-        db_manager = DatabaseManager(database_url)
+        db_manager = get_database_manager(database_url)
         with db_manager.get_session() as session:
             all_businesses = session.query(Business).all()
             businesses_list = []
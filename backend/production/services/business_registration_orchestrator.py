@@ -255,7 +255,7 @@ class BusinessServiceFactory:
         # Create components
         validator = BusinessValidator()
         repository = BusinessRepository(db_manager)
-        server_orchestrator = BusinessServerOrchestrator()
+        server_orchestrator = BusinessServerOrchestrator(db_manager)
         
         # Create orchestrator
         return BusinessRegistrationOrchestrator(
@@ -276,6 +276,6 @@ class BusinessServiceFactory:
         return BusinessRepository(db_manager)
     
     @staticmethod
-    def create_server_orchestrator() -> BusinessServerOrchestrator:
+    def create_server_orchestrator(db_manager: Any = None) -> BusinessServerOrchestrator:
         """Create server orchestrator"""
-        return BusinessServerOrchestrator()
+        return BusinessServerOrchestrator(db_manager)
@@ -21,8 +21,9 @@ class MCPServerFactory:
     Single Responsibility: Only handles MCP server creation
     """
     
-    def __init__(self):
+    def __init__(self, db_manager: Any = None):
         self.created_servers: Dict[str, BAISMCPServer] = {}
+        self.db_manager = db_manager
     
     def create_server(
         self, 
@@ -40,7 +41,7 @@ class MCPServerFactory:
             Created MCP server
         """
         # Create business system adapter
-        business_adapter = BusinessSystemAdapter(business_config)
+        business_adapter = BusinessSystemAdapter(business_config, db_manager=self.db_manager)
         
         # Create MCP server
         mcp_server = BAISMCPServer(business_schema, business_adapter)
@@ -133,20 +134,21 @@ class BusinessSystemAdapterFactory:
     """
     
     @staticmethod
-    def create_adapter(business_config: Dict[str, Any]) -> BusinessSystemAdapter:
+    def create_adapter(business_config: Dict[str, Any], db_manager: Any = None) -> BusinessSystemAdapter:
         """
         Create business system adapter
         
         Args:
             business_config: Business configuration
+            db_manager: Database whose Booking table holds the adapter's bookings
             
         Returns:
             Created business system adapter
         """
-        return BusinessSystemAdapter(business_config)
+        return BusinessSystemAdapter(business_config, db_manager=db_manager)
     
     @staticmethod
-    def create_hospitality_adapter(hotel_config: Dict[str, Any]) -> BusinessSystemAdapter:
+    def create_hospitality_adapter(hotel_config: Dict[str, Any], db_manager: Any = None) -> BusinessSystemAdapter:
         """Create adapter for hospitality businesses"""
         # Add hospitality-specific configuration
         hospitality_config = {
@@ -156,10 +158,10 @@ class BusinessSystemAdapterFactory:
             "supported_operations": ["booking", "availability", "pricing", "guest_management"]
         }
         
-        return BusinessSystemAdapter(hospitality_config)
+        return BusinessSystemAdapter(hospitality_config, db_manager=db_manager)
     
     @staticmethod
-    def create_restaurant_adapter(restaurant_config: Dict[str, Any]) -> BusinessSystemAdapter:
+    def create_restaurant_adapter(restaurant_config: Dict[str, Any], db_manager: Any = None) -> BusinessSystemAdapter:
         """Create adapter for restaurant businesses"""
         # Add restaurant-specific configuration
         restaurant_config = {
@@ -169,10 +171,10 @@ class BusinessSystemAdapterFactory:
             "supported_operations": ["reservation", "menu", "ordering", "payment"]
         }
         
-        return BusinessSystemAdapter(restaurant_config)
+        return BusinessSystemAdapter(restaurant_config, db_manager=db_manager)
     
     @staticmethod
-    def create_retail_adapter(retail_config: Dict[str, Any]) -> BusinessSystemAdapter:
+    def create_retail_adapter(retail_config: Dict[str, Any], db_manager: Any = None) -> BusinessSystemAdapter:
         """Create adapter for retail businesses"""
         # Add retail-specific configuration
         retail_config = {
@@ -182,7 +184,7 @@ class BusinessSystemAdapterFactory:
             "supported_operations": ["inventory", "ordering", "payment", "shipping"]
         }
         
-        return BusinessSystemAdapter(retail_config)
+        return BusinessSystemAdapter(retail_config, db_manager=db_manager)
 
 
 class BusinessServerOrchestrator:
@@ -192,8 +194,8 @@ class BusinessServerOrchestrator:
     Single Responsibility: Coordinates server creation without doing the work itself
     """
     
-    def __init__(self):
-        self.mcp_factory = MCPServerFactory()
+    def __init__(self, db_manager: Any = None):
+        self.mcp_factory = MCPServerFactory(db_manager)
         self.a2a_factory = A2AServerFactory()
         self.adapter_factory = BusinessSystemAdapterFactory()
     
@@ -22,6 +22,7 @@ from pydantic import BaseModel, Field, validator
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from ...core.canonical_json import canonicalize
 from ...core.database_models import Business, BusinessService, Booking
 from ...core.bais_schema_validator import BAISBusinessSchema, PaymentConfig
 
@@ -599,10 +600,10 @@ class AcpIntegrationService:
         if not event.signature:
             return False
         
-        # Simple signature verification (in production, use proper HMAC)
+        # HMAC over the RFC 8785 form of the event, excluding the signature itself
         expected_signature = hmac.new(
             self.webhook_secret.encode(),
-            event.json().encode(),
+            canonicalize(event.model_dump(mode="json", exclude={"signature"})),
             hashlib.sha256
         ).hexdigest()
         
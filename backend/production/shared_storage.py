@@ -2,23 +2,70 @@
 Shared in-memory storage for BAIS businesses
 This ensures BUSINESS_STORE is accessible across all modules
 """
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+try:
+    from .core.business_store import IndexedBusinessStore
+    from .core.catalog_cache import invalidate_catalog_cache
+except ImportError:
+    from core.business_store import IndexedBusinessStore
+    from core.catalog_cache import invalidate_catalog_cache
 
 # Global in-memory storage for businesses
 # This is shared across all BAIS modules (routes_simple, universal_tools, etc.)
-BUSINESS_STORE: Dict[str, Dict[str, Any]] = {}
+# Dict-compatible; writes keep the ID aliases and secondary indexes in step
+BUSINESS_STORE = IndexedBusinessStore()
+
+# Inverted index over BUSINESS_STORE (owned by the store)
+BUSINESS_SEARCH_INDEX = BUSINESS_STORE.search_index
 
-def get_business_store() -> Dict[str, Dict[str, Any]]:
+def get_business_store() -> IndexedBusinessStore:
     """Get the shared business store"""
     return BUSINESS_STORE
 
 def register_business(business_id: str, business_data: Dict[str, Any]) -> None:
     """Register a business in the shared store"""
     BUSINESS_STORE[business_id] = business_data
+    invalidate_catalog_cache(business_id)
+
+def resolve_business_id(business_id: str) -> Optional[str]:
+    """Stored business_id for any spelling of it (case, hyphens, underscores), or None"""
+    return BUSINESS_STORE.resolve(business_id)
 
 def get_business(business_id: str) -> Dict[str, Any]:
-    """Get a business from the shared store"""
-    return BUSINESS_STORE.get(business_id)
+    """Get a business from the shared store (any spelling of its ID)"""
+    found = BUSINESS_STORE.lookup(business_id)
+    return found[1] if found else None
+
+def find_business_ids(
+    category: Optional[str] = None,
+    city: Optional[str] = None,
+    state: Optional[str] = None,
+    service: Optional[str] = None
+) -> Set[str]:
+    """Business IDs matching every given attribute"""
+    return BUSINESS_STORE.find_ids(category=category, city=city, state=state, service=service)
+
+def search_businesses(
+    query: Optional[str],
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    limit: int = 10
+) -> List[Tuple[str, float]]:
+    """Relevance-ranked (business_id, score) pairs from the shared store"""
+    return BUSINESS_STORE.search(query, category=category, location=location, limit=limit)
+
+def search_nearby(
+    latitude: float,
+    longitude: float,
+    radius_km: Optional[float] = None,
+    query: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 10
+) -> List[Tuple[str, float]]:
+    """(business_id, distance_km) pairs from the shared store, nearest first"""
+    return BUSINESS_STORE.nearby(latitude, longitude, radius_km=radius_km, query=query,
+                                 category=category, limit=limit)
 
 def list_businesses() -> Dict[str, Dict[str, Any]]:
     """List all businesses in the shared store"""
@@ -27,8 +74,8 @@ def list_businesses() -> Dict[str, Dict[str, Any]]:
 def clear_business_store() -> None:
     """Clear all businesses (for testing)"""
     BUSINESS_STORE.clear()
+    invalidate_catalog_cache()
 
 def count_businesses() -> int:
     """Get the count of registered businesses"""
     return len(BUSINESS_STORE)
-
@@ -131,7 +131,7 @@ class TestAP2CryptographicCompliance:
         
         # Test unsupported algorithm
         with pytest.raises(Exception):  # Should raise ValidationError
-            crypto_validator.sign_mandate(mandate_data, algorithm="ES256")
+            crypto_validator.sign_mandate(mandate_data, algorithm="HS256")
     
     def test_mandate_canonicalization(self, crypto_validator):
         """Test mandate data canonicalization for consistent signing"""
@@ -0,0 +1,160 @@
+"""
+Async Cache Manager Test Suite
+Tests batching, SCAN/tag invalidation, single-flight and early expiry
+"""
+
+import asyncio
+import time
+import pytest
+
+from ..core import cache_manager
+from ..core.cache_manager import AsyncCacheManager, JSONSerializer, get_serializer
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def cache():
+    return AsyncCacheManager(redis_client=fakeredis.FakeAsyncRedis(), serializer=get_serializer())
+
+
+class TestSerializers:
+    """Test suite for pluggable serializers"""
+
+    def test_default_prefers_orjson(self):
+        """orjson is used when installed, json otherwise"""
+        try:
+            import orjson  # noqa: F401
+            expected = "orjson"
+        except ImportError:
+            expected = "json"
+        assert get_serializer().name == expected
+
+    def test_round_trip(self):
+        """Every available serializer round-trips cache envelopes"""
+        for name in ("json", "orjson", "msgpack"):
+            try:
+                serializer = get_serializer(name)
+            except ValueError:
+                continue
+            envelope = [{"business_id": "med-spa", "services": [1, 2]}, 0.01, 1700000000.0]
+            assert serializer.loads(serializer.dumps(envelope)) == envelope
+
+    def test_unknown_serializer_rejected(self):
+        with pytest.raises(ValueError):
+            get_serializer("pickle")
+
+
+class TestAsyncCacheManager:
+    """Test suite for AsyncCacheManager"""
+
+    @pytest.mark.asyncio
+    async def test_batched_set_and_get(self, cache):
+        """set_many pipelines the writes; get_many is a single MGET"""
+        await cache.set_many({"a": 1, "b": {"x": [1, 2]}}, ttl=60)
+
+        assert await cache.get_many(["a", "b", "missing"]) == {"a": 1, "b": {"x": [1, 2]}}
+        assert await cache.get("b") == {"x": [1, 2]}
+        assert 0 < await cache.redis_client.ttl("a") <= 60
+
+    @pytest.mark.asyncio
+    async def test_scan_invalidation(self, cache):
+        """Pattern invalidation walks the keyspace in batches"""
+        await cache.set_many({f"search:{i}": i for i in range(25)})
+        await cache.set("services:1", "keep")
+
+        deleted = await cache.invalidate_pattern("search:*", batch_size=10)
+
+        assert deleted == 25
+        assert await cache.get_many([f"search:{i}" for i in range(25)]) == {}
+        assert await cache.get("services:1") == "keep"
+
+    @pytest.mark.asyncio
+    async def test_tag_invalidation(self, cache):
+        """Keys registered under a tag are dropped without scanning"""
+        await cache.set("services:med-spa", [1], tags=["business:med-spa"])
+        await cache.set("search:spa", [1], tags=["business:med-spa", "search"])
+        await cache.set("search:brewery", [2], tags=["search"])
+
+        await cache.invalidate_tags("business:med-spa")
+
+        assert await cache.get_many(["services:med-spa", "search:spa", "search:brewery"]) == {
+            "search:brewery": [2]
+        }
+
+    @pytest.mark.asyncio
+    async def test_tag_ttl_tracks_longest_member_before_redis_7(self):
+        """Tag sets outlive every member without EXPIRE NX/GT"""
+        pytest.importorskip("lupa")
+        cache = AsyncCacheManager(redis_client=fakeredis.FakeAsyncRedis(version=6), serializer=get_serializer())
+
+        await cache.set("search:spa", [1], ttl=100, tags=["search"])
+        await cache.set("search:brewery", [2], ttl=600, tags=["search"])
+        await cache.set("search:cafe", [3], ttl=50, tags=["search"])
+
+        assert 590 < await cache.redis_client.ttl(cache.tag_key("search")) <= 600
+        assert await cache.redis_client.scard(cache.tag_key("search")) == 3
+
+    @pytest.mark.asyncio
+    async def test_single_flight_coalesces_misses(self, cache):
+        """Concurrent misses on one key run the loader once"""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"value": calls}
+
+        results = await asyncio.gather(*(cache.get_or_set("hot", loader, ttl=60) for _ in range(20)))
+
+        assert calls == 1
+        assert all(result == {"value": 1} for result in results)
+        assert await cache.get_or_set("hot", loader, ttl=60) == {"value": 1}
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_load(self, cache):
+        """One caller timing out leaves the shared load running for the others"""
+        async def loader():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        impatient = asyncio.ensure_future(cache.get_or_set("slow", loader))
+        patient = asyncio.ensure_future(cache.get_or_set("slow", loader))
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+
+        assert await patient == "done"
+
+    @pytest.mark.asyncio
+    async def test_early_expiry_refreshes_near_deadline(self, cache, monkeypatch):
+        """Entries close to expiry with a slow recompute are refreshed ahead of time"""
+        # Median XFetch draw (jitter = ln 2) instead of an unseeded random one
+        monkeypatch.setattr(cache_manager.random, "random", lambda: 0.5)
+        serializer = JSONSerializer()
+        cache.serializer = serializer
+        # Expires in 1s, but took 10s to compute: refreshed for any draw above ~0.1
+        await cache.redis_client.set("near", serializer.dumps(["old", 10.0, time.time() + 1]), ex=60)
+        # Expires in an hour and computed instantly: never refreshed early
+        await cache.redis_client.set("far", serializer.dumps(["old", 0.0, time.time() + 3600]), ex=3600)
+
+        async def loader():
+            return "new"
+
+        assert await cache.get_or_set("near", loader) == "new"
+        assert await cache.get_or_set("far", loader) == "old"
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_fall_through_to_loader(self):
+        """An unreachable Redis degrades to calling the loader"""
+        cache = AsyncCacheManager("redis://127.0.0.1:1/0")
+
+        async def loader():
+            return 42
+
+        try:
+            assert await cache.get("anything") is None
+            assert await cache.get_or_set("anything", loader) == 42
+        finally:
+            await cache.close()
@@ -0,0 +1,223 @@
+"""
+Async Database Layer Test Suite
+Tests AsyncDatabaseManager, the universal tool handlers running on it,
+and the dashboard queries, plus a concurrent-load latency benchmark
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+import pytest
+from sqlalchemy import event
+
+from ..core.catalog_cache import get_catalog_cache
+from ..core.database_models import AsyncDatabaseManager, DatabaseManager, to_async_database_url
+from ..core.universal_tools import BAISUniversalToolHandler
+from .test_business_search_index import _seed_database
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    db_manager = DatabaseManager(url)
+    db_manager.create_tables()
+    _seed_database(db_manager, [
+        ("brewery", "Red Canyon Brewing", "Brewery with a spa-inspired patio", "Springdale", ["Tasting"]),
+        ("med-spa", "New Life New Image Med Spa", "Aesthetic treatments", "Las Vegas", ["HydraFacial", "Botox"]),
+    ])
+    db_manager.close()
+    return url
+
+
+class TestAsyncDatabaseManager:
+    """Test suite for AsyncDatabaseManager"""
+
+    def test_async_driver_mapping(self):
+        """Sync URLs map onto asyncpg / aiosqlite"""
+        url, connect_args = to_async_database_url("postgres://user:secret@db:5432/bais?sslmode=require")
+        assert url.drivername == "postgresql+asyncpg"
+        assert "sslmode" not in url.query
+        assert connect_args["ssl"] == "require"
+
+        url, _ = to_async_database_url("sqlite:///bais.db")
+        assert url.drivername == "sqlite+aiosqlite"
+
+    @pytest.mark.asyncio
+    async def test_dashboard_methods(self, database_url):
+        """Dashboard queries match the sync DatabaseManager"""
+        db = AsyncDatabaseManager(database_url)
+        try:
+            businesses = await db.get_all_businesses()
+            assert {b["name"] for b in businesses} == {"Red Canyon Brewing", "New Life New Image Med Spa"}
+
+            med_spa = next(b for b in businesses if b["name"].endswith("Med Spa"))
+            assert await db.get_business_by_id(med_spa["id"]) == med_spa
+            assert await db.get_business_by_id("missing") is None
+
+            services = await db.get_business_services(med_spa["id"])
+            assert sorted(s["name"] for s in services) == ["Botox", "HydraFacial"]
+        finally:
+            await db.close()
+
+    @pytest.mark.asyncio
+    async def test_platform_dashboard(self, database_url):
+        """The dashboard router aggregates over the async manager"""
+        from ..api.v1.dashboard_router import get_platform_dashboard_data
+
+        db = AsyncDatabaseManager(database_url)
+        try:
+            data = await get_platform_dashboard_data(db)
+            assert data["metrics"]["total_businesses"] == 2
+            assert data["metrics"]["total_transactions"] == 0
+        finally:
+            await db.close()
+
+
+class TestAsyncToolHandlers:
+    """Test suite for BAISUniversalToolHandler on AsyncDatabaseManager"""
+
+    @pytest.mark.asyncio
+    async def test_search_businesses(self, database_url):
+        """Ranked search runs through the async session"""
+        db = AsyncDatabaseManager(database_url)
+        try:
+            handler = BAISUniversalToolHandler(db_manager=db)
+
+            results = await handler.search_businesses(query="med spa")
+
+            assert results[0]["business_id"] == "med-spa"
+            assert {svc["name"] for svc in results[0]["services"]} == {"HydraFacial", "Botox"}
+        finally:
+            await db.close()
+
+    @pytest.mark.asyncio
+    async def test_get_business_services_and_execute(self, database_url):
+        """Service lookups resolve normalized IDs against the database"""
+        db = AsyncDatabaseManager(database_url)
+        try:
+            handler = BAISUniversalToolHandler(db_manager=db)
+
+            services = await handler.get_business_services("med_spa")
+            assert services["business_name"] == "New Life New Image Med Spa"
+            assert {svc["service_id"] for svc in services["services"]} == {"hydrafacial", "botox"}
+
+            result = await handler.execute_service("med-spa", "botox", {}, {"name": "Test"})
+            assert "New Life New Image Med Spa" in str(result)
+        finally:
+            await db.close()
+
+
+def _p99_ms(samples):
+    return statistics.quantiles(samples, n=100)[98] * 1000
+
+
+async def _measure_under_load(db_manager, concurrency: int):
+    """p99 request latency and event-loop stall while `concurrency` searches run at once"""
+    handler = BAISUniversalToolHandler(db_manager=db_manager)
+    await handler.search_businesses(query="biz")  # warm the search index and pool
+    # Measure the database, not the catalog cache: start cold, one query per request
+    get_catalog_cache().clear()
+
+    stalls = []
+    running = True
+
+    async def heartbeat():
+        # Stand-in for an SSE stream: how late does a 1ms tick fire?
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stalls.append(time.perf_counter() - started - 0.001)
+
+    ticker = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+
+    latencies = []
+    arrived = time.perf_counter()
+
+    async def request(n):
+        await handler.search_businesses(query=f"biz {n}")
+        latencies.append(time.perf_counter() - arrived)
+
+    await asyncio.gather(*(request(n) for n in range(concurrency)))
+    running = False
+    await ticker
+    return _p99_ms(latencies), max(stalls) * 1000
+
+
+@pytest.mark.slow
+@pytest.mark.asyncio
+async def test_concurrent_search_latency_benchmark(tmp_path):
+    """
+    50 concurrent searches against a database with 5ms per statement:
+    the sync manager serializes them on the event loop, the async one overlaps them.
+    """
+    url = f"sqlite:///{tmp_path / 'bench.db'}"
+    statement_latency = 0.005
+
+    def slow_round_trip(statement):
+        time.sleep(statement_latency)
+
+    sync_db = DatabaseManager(url)
+    sync_db.create_tables()
+    _seed_database(sync_db, [(f"biz-{i}", f"Biz {i}", "Benchmark", "Reno", ["Visit", "Call"]) for i in range(200)])
+    sync_db.engine.dispose()
+    event.listen(sync_db.engine, "connect",
+                 lambda dbapi_connection, record: dbapi_connection.set_trace_callback(slow_round_trip))
+
+    async_db = AsyncDatabaseManager(url)
+    event.listen(async_db.engine.sync_engine, "connect",
+                 lambda dbapi_connection, record: dbapi_connection.await_(
+                     dbapi_connection._connection.set_trace_callback(slow_round_trip)))
+
+    logging.disable(logging.INFO)
+    try:
+        sync_p99, sync_stall = await _measure_under_load(sync_db, concurrency=50)
+        async_p99, async_stall = await _measure_under_load(async_db, concurrency=50)
+    finally:
+        logging.disable(logging.NOTSET)
+        sync_db.close()
+        await async_db.close()
+
+    print(f"\nDatabaseManager:      p99 {sync_p99:.0f}ms, max loop stall {sync_stall:.0f}ms")
+    print(f"AsyncDatabaseManager: p99 {async_p99:.0f}ms, max loop stall {async_stall:.0f}ms")
+    assert async_p99 < sync_p99
+    assert async_stall < sync_stall
+
+
+class TestEngineRegistry:
+    """Test suite for the process-wide engine registry"""
+
+    @pytest.mark.asyncio
+    async def test_one_manager_per_url(self, database_url):
+        """Repeated lookups share one engine; disposal empties the registry"""
+        from ..core import database_models
+
+        try:
+            first = database_models.get_request_database_manager(database_url)
+            assert database_models.get_request_database_manager(database_url) is first
+            assert first.is_async
+            assert database_models.get_database_manager(database_url) is database_models.get_database_manager(database_url)
+
+            await database_models.warmup_database_managers(database_url)
+            assert first.engine.sync_engine.pool.checkedin() == 1
+        finally:
+            await database_models.dispose_database_managers()
+
+        assert database_models.get_request_database_manager(database_url) is not first
+        await database_models.dispose_database_managers()
+
+    def test_falls_back_to_sync_without_async_driver(self, monkeypatch, database_url):
+        """A missing asyncpg/aiosqlite driver yields the shared sync manager"""
+        from ..core import database_models
+
+        def missing_driver(database_url):
+            raise ModuleNotFoundError("No module named 'asyncpg'")
+
+        monkeypatch.setattr(database_models, "get_async_database_manager", missing_driver)
+        manager = database_models.get_request_database_manager(database_url)
+        try:
+            assert isinstance(manager, DatabaseManager)
+            assert database_models.get_request_database_manager(database_url) is manager
+        finally:
+            asyncio.run(database_models.dispose_database_managers())
@@ -0,0 +1,235 @@
+"""
+Availability Search Test Suite
+Tests multi-day range queries over the slot bitmaps, their single-query
+database load, and the MCP availability:// resource built on them
+"""
+
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+
+from ..core.database_models import AsyncDatabaseManager
+from ..core.mcp_server_generator import BAISMCPServer, BusinessSystemAdapter
+from ..core.slot_inventory import AvailabilityEngine, DatabaseSlotStore, SlotSchedule, date_range
+from ..core.universal_tools import BAISUniversalToolHandler
+
+BUSINESS = "biz-1"
+
+
+class CountingStore(DatabaseSlotStore):
+    """DatabaseSlotStore that counts range loads"""
+
+    def __init__(self, db_manager):
+        super().__init__(db_manager)
+        self.range_queries = 0
+
+    async def booked_slots_range(self, *args, **kwargs):
+        self.range_queries += 1
+        return await super().booked_slots_range(*args, **kwargs)
+
+
+def _booking_fields(n):
+    return {
+        "confirmation_number": f"BK{n:08d}",
+        "agent_id": "agent-1",
+        "customer_name": f"Customer {n}",
+        "customer_email": f"c{n}@example.com",
+        "booking_data": {},
+        "total_amount": 100.0,
+    }
+
+
+class TestDateRange:
+    """Test suite for range and weekday parsing"""
+
+    def test_weekday_filter_and_limits(self):
+        # 2026-03-02 is a Monday
+        assert date_range("2026-03-02", "2026-03-08", frozenset({5, 6})) == ["2026-03-07", "2026-03-08"]
+        with pytest.raises(ValueError):
+            date_range("2026-03-08", "2026-03-02")
+        with pytest.raises(ValueError):
+            date_range("2026-01-01", "2026-12-31")
+
+
+class TestSearchRange:
+    """Test suite for in-memory range queries"""
+
+    @pytest.mark.asyncio
+    async def test_time_window_weekdays_and_first_available(self):
+        engine = AvailabilityEngine()
+        for time_str in ("12:00", "12:30", "13:00", "13:30"):
+            engine.inventory.reserve((BUSINESS, "svc-1", "2026-03-07"), time_str, "taken")
+        engine.inventory.reserve((BUSINESS, "svc-2", "2026-03-07"), "12:30", "taken")
+
+        result = await engine.search_range(BUSINESS, ["svc-1", "svc-2"], "2026-03-02", "2026-03-15",
+                                           start_time="12:00", end_time="14:00", weekdays=["sat", "sun"])
+
+        svc_1, svc_2 = result["services"]
+        assert result["days_searched"] == 4
+        assert [day["date"] for day in svc_1["days"]] == ["2026-03-08", "2026-03-14", "2026-03-15"]
+        assert svc_2["days"][0] == {"date": "2026-03-07", "free_slots": 3, "times": ["12:00", "13:00", "13:30"]}
+        assert svc_1["total_free_slots"] == 12 and svc_2["total_free_slots"] == 15
+        assert result["first_available"] == {"service_id": "svc-2", "date": "2026-03-07", "time": "12:00"}
+
+    @pytest.mark.asyncio
+    async def test_invalid_window_is_rejected(self):
+        with pytest.raises(ValueError):
+            await AvailabilityEngine().search_range(BUSINESS, ["svc-1"], "2026-03-02", "2026-03-03",
+                                                    weekdays=["someday"])
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_thirty_day_search_over_ten_services_is_fast(self):
+        """Benchmark: 30 days x 10 services, a third of slots booked"""
+        engine = AvailabilityEngine()
+        services = [f"svc-{n}" for n in range(10)]
+        days = date_range("2026-03-01", "2026-03-30")
+        for service_id in services:
+            for n, day in enumerate(days):
+                for index in range(n % 3, engine.inventory.schedule.slot_count, 3):
+                    engine.inventory.reserve((BUSINESS, service_id, day), engine.inventory.schedule.time_of(index))
+
+        rounds = 100
+        started = time.perf_counter()
+        for _ in range(rounds):
+            result = await engine.search_range(BUSINESS, services, "2026-03-01", "2026-03-30",
+                                               start_time="12:00", end_time="17:00")
+        search_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        assert len(result["services"]) == 10 and result["days_searched"] == 30
+        print(f"\n30-day search over 10 services: {search_ms:.3f}ms")
+        assert search_ms < 10
+
+
+class TestDatabaseRangeLoad:
+    """Test suite for loading a range from the Booking table"""
+
+    @pytest.mark.asyncio
+    async def test_range_is_loaded_in_one_query(self, tmp_path):
+        database = AsyncDatabaseManager(f"sqlite:///{tmp_path / 'slots.db'}")
+        await database.create_tables()
+        try:
+            writer = AvailabilityEngine(store=DatabaseSlotStore(database))
+            assert await writer.reserve(BUSINESS, "svc-1", "2026-03-03", "09:00", "booking-a", _booking_fields(1))
+            assert await writer.reserve(BUSINESS, "svc-2", "2026-03-10", "16:30", "booking-b", _booking_fields(2))
+            assert await writer.reserve("biz-2", "svc-1", "2026-03-03", "10:00", "booking-c", _booking_fields(3))
+
+            store = CountingStore(database)
+            reader = AvailabilityEngine(store=store)
+            result = await reader.search_range(BUSINESS, ["svc-1", "svc-2"], "2026-03-01", "2026-03-31")
+            await reader.search_range(BUSINESS, ["svc-1"], "2026-03-05", "2026-03-20")
+            assert store.range_queries == 1
+
+            svc_1, svc_2 = result["services"]
+            march_3 = next(day for day in svc_1["days"] if day["date"] == "2026-03-03")
+            assert "09:00" not in march_3["times"] and "10:00" in march_3["times"]
+            assert svc_1["total_free_slots"] == svc_2["total_free_slots"] == 31 * 16 - 1
+        finally:
+            await database.close()
+
+
+class TestAvailabilityResource:
+    """Test suite for the MCP availability:// resource"""
+
+    @staticmethod
+    def _server():
+        services = [
+            SimpleNamespace(id=service_id, name=service_id.title(), enabled=enabled,
+                            availability=SimpleNamespace(cache_timeout_seconds=timeout))
+            for service_id, enabled, timeout in (("spa", True, 60), ("dinner", True, 30), ("closed", False, 60))
+        ]
+        schema = SimpleNamespace(business_info=SimpleNamespace(name="Test Resort"), services=services)
+        adapter = BusinessSystemAdapter({"business_id": BUSINESS}, AvailabilityEngine(SlotSchedule(540, 600, 30)))
+        return BAISMCPServer(schema, adapter)
+
+    @pytest.mark.asyncio
+    async def test_single_service_defaults_to_a_week_ahead(self):
+        server = self._server()
+        content = await server._get_availability_resource("spa")
+
+        slots = content["availability"]["available_slots"]
+        assert [slot["date"] for slot in slots] == date_range(
+            date.today().isoformat(), (date.today() + timedelta(days=6)).isoformat())
+        assert slots[0]["times"] == ["09:00", "09:30"] and slots[0]["inventory"] == 2
+
+    @pytest.mark.asyncio
+    async def test_range_query_over_all_enabled_services(self):
+        server = self._server()
+        server.business_adapter.availability.inventory.reserve((BUSINESS, "dinner", "2026-03-07"), "09:00", "b")
+
+        content = await server._get_availability_resource(
+            "*?from=2026-03-02&to=2026-03-08&start_time=09:00&end_time=09:30&weekdays=sat")
+        availability = content["availability"]
+
+        assert [s["service_name"] for s in availability["services"]] == ["Spa", "Dinner"]
+        assert availability["services"][1]["days"] == []
+        assert availability["first_available"] == {"service_id": "spa", "date": "2026-03-07", "time": "09:00"}
+        assert content["cache_timeout"] == 30
+
+    @pytest.mark.asyncio
+    async def test_unknown_services_and_bad_ranges_are_rejected(self):
+        server = self._server()
+        with pytest.raises(HTTPException) as missing:
+            await server._get_availability_resource("spa,nope")
+        with pytest.raises(HTTPException) as invalid:
+            await server._get_availability_resource("spa?from=2026-03-08&to=2026-03-01")
+        assert (missing.value.status_code, invalid.value.status_code) == (404, 400)
+
+
+class TestBookingReservesSlots:
+    """Test suite for bookings taking their slot on the engine availability is read from"""
+
+    @pytest.mark.asyncio
+    async def test_adapter_booking_takes_the_slot(self):
+        adapter = BusinessSystemAdapter({"business_id": BUSINESS}, AvailabilityEngine(SlotSchedule(540, 600, 30)))
+        booking = {"date": "2026-03-07", "time": "09:00"}
+
+        assert (await adapter.create_booking("spa", booking))["status"] == "confirmed"
+        with pytest.raises(ValueError):
+            await adapter.create_booking("spa", booking)
+
+        search = await adapter.search_availability("spa", {"date": "2026-03-07"})
+        assert search["results"][0]["times"] == ["09:30"]
+
+    @pytest.mark.asyncio
+    async def test_universal_booking_is_persisted_and_hidden_from_availability(self, tmp_path):
+        database = AsyncDatabaseManager(f"sqlite:///{tmp_path / 'universal.db'}")
+        await database.create_tables()
+        try:
+            handler = BAISUniversalToolHandler(database)
+            params = {"date": "2026-03-07", "time": "09:00", "total_amount": 80}
+            customer = {"name": "Ada", "email": "ada@example.com"}
+
+            assert (await handler.execute_service(BUSINESS, "svc-1", params, customer))["success"]
+            assert not (await handler.execute_service(BUSINESS, "svc-1", params, customer))["success"]
+
+            availability = await handler.check_availability(BUSINESS, ["svc-1"], "2026-03-07", "2026-03-07")
+            assert "09:00" not in availability["services"][0]["days"][0]["times"]
+
+            reader = AvailabilityEngine(store=DatabaseSlotStore(database))
+            assert not await reader.is_available(BUSINESS, "svc-1", "2026-03-07", "09:00")
+        finally:
+            await database.close()
+
+    @pytest.mark.asyncio
+    async def test_adapters_and_universal_tools_share_one_engine(self, tmp_path):
+        database = AsyncDatabaseManager(f"sqlite:///{tmp_path / 'shared.db'}")
+        await database.create_tables()
+        try:
+            # One adapter per request, as routes.get_agent_service builds them
+            first = BusinessSystemAdapter({"business_id": BUSINESS}, db_manager=database)
+            second = BusinessSystemAdapter({"business_id": BUSINESS}, db_manager=database)
+            handler = BAISUniversalToolHandler(database)
+            assert first.availability is second.availability is handler._availability_engine()
+
+            booking = {"date": "2026-03-07", "time": "09:00"}
+            assert (await first.create_booking("svc-1", booking))["status"] == "confirmed"
+            with pytest.raises(ValueError):
+                await second.create_booking("svc-1", booking)
+
+            availability = await handler.check_availability(BUSINESS, ["svc-1"], "2026-03-07", "2026-03-07")
+            assert "09:00" not in availability["services"][0]["days"][0]["times"]
+        finally:
+            await database.close()
@@ -0,0 +1,434 @@
+"""
+Business Search Index Test Suite
+Tests relevance ranking for bais_search_businesses across the in-process index,
+the in-memory store fallback and the SQLite database path
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from contextlib import contextmanager
+
+from ..core.business_search_index import InvertedBusinessIndex, tokenize, location_terms
+from ..core.universal_tools import BAISUniversalToolHandler
+
+
+def _seed_database(db_manager, businesses) -> None:
+    from ..core.database_models import Business, BusinessService
+
+    with db_manager.get_session() as session:
+        for external_id, name, description, city, services in businesses:
+            business = Business(
+                external_id=external_id, name=name, business_type="service",
+                description=description, address="1 Main St", city=city, state="NV",
+                mcp_endpoint="/mcp", a2a_endpoint="/a2a", status="active"
+            )
+            session.add(business)
+            session.flush()
+            for service_name in services:
+                session.add(BusinessService(
+                    business_id=business.id, service_id=service_name.lower().replace(" ", "-"),
+                    name=service_name, description=service_name, category="general",
+                    workflow_pattern="booking", workflow_steps=[], parameters_schema={},
+                    availability_endpoint="/availability", cancellation_policy={}, payment_config={}
+                ))
+        session.commit()
+
+
+@contextmanager
+def _count_statements(engine):
+    from sqlalchemy import event
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _seed_index(index: InvertedBusinessIndex) -> None:
+    index.add("med-spa", name="New Life New Image Med Spa",
+              description="Aesthetic treatments and skin care",
+              service_names=["HydraFacial", "Laser Hair Removal", "Botox"],
+              category="healthcare", city="Las Vegas", state="NV")
+    index.add("day-spa", name="Desert Day Spa",
+              description="Massage and relaxation",
+              service_names=["Swedish Massage"],
+              category="service", city="Henderson", state="NV")
+    index.add("brewery", name="Red Canyon Brewing",
+              description="Local brewery with a spa-inspired patio",
+              service_names=["Table Reservation"],
+              category="restaurant", city="Springdale", state="UT")
+
+
+class TestInvertedBusinessIndex:
+    """Test suite for the in-process inverted index"""
+
+    def test_tokenize_drops_short_words(self):
+        """Short words are not indexed"""
+        assert tokenize("A Med-Spa in LV") == ["med", "spa"]
+
+    def test_location_terms_include_state_aliases(self):
+        """State abbreviations and full names resolve to each other"""
+        assert "nevada" in location_terms("NV")
+        assert "nv" in location_terms("Nevada")
+        assert "lasvegas" in location_terms("Las Vegas, NV")
+
+    def test_name_match_outranks_description_match(self):
+        """Hits in the business name rank above hits in the description"""
+        index = InvertedBusinessIndex()
+        _seed_index(index)
+
+        results = [business_id for business_id, _ in index.search("spa")]
+
+        assert results.index("med-spa") < results.index("brewery")
+        assert results.index("day-spa") < results.index("brewery")
+
+    def test_compound_query_matches_spaced_name(self):
+        """'medspa' finds a business named '... Med Spa'"""
+        index = InvertedBusinessIndex()
+        _seed_index(index)
+
+        results = index.search("medspa")
+
+        assert results[0][0] == "med-spa"
+
+    def test_service_name_and_prefix_match(self):
+        """Service names are searchable and partial words expand to indexed terms"""
+        index = InvertedBusinessIndex()
+        _seed_index(index)
+
+        assert index.search("hydrafacial")[0][0] == "med-spa"
+        assert index.search("massa")[0][0] == "day-spa"
+
+    def test_category_and_location_filters(self):
+        """Category and location restrict the candidate set"""
+        index = InvertedBusinessIndex()
+        _seed_index(index)
+
+        assert [b for b, _ in index.search("spa", category="service")] == ["day-spa"]
+        assert [b for b, _ in index.search("spa", location="Las Vegas")] == ["med-spa"]
+        assert {b for b, _ in index.search("spa", location="Nevada")} == {"med-spa", "day-spa"}
+
+    def test_reindex_and_remove(self):
+        """Re-adding replaces old terms; removal drops the business"""
+        index = InvertedBusinessIndex()
+        _seed_index(index)
+
+        index.add("brewery", name="Red Canyon Taproom", category="restaurant")
+        assert index.search("brewing") == []
+        assert index.search("taproom")[0][0] == "brewery"
+
+        index.remove("brewery")
+        assert "brewery" not in index
+        assert index.search("taproom") == []
+
+    @pytest.mark.slow
+    def test_search_latency_stays_flat_with_index_size(self):
+        """Selective queries do not slow down as unrelated businesses are added"""
+        index = InvertedBusinessIndex()
+        _seed_index(index)
+        for i in range(100000):
+            index.add(f"biz-{i}", name=f"Business {i} Plumbing", description="Pipes and drains",
+                      service_names=["Repair"], category="service", city="Reno", state="NV")
+
+        started = time.perf_counter()
+        for _ in range(100):
+            results = index.search("hydrafacial")
+        elapsed_ms = (time.perf_counter() - started) * 1000 / 100
+
+        assert results[0][0] == "med-spa"
+        assert elapsed_ms < 5
+
+
+class TestUniversalSearchRanking:
+    """Test suite for ranked search through BAISUniversalToolHandler"""
+
+    @pytest.fixture
+    def sqlite_db_manager(self, tmp_path):
+        from ..core.database_models import DatabaseManager
+
+        db_manager = DatabaseManager(f"sqlite:///{tmp_path / 'search.db'}")
+        db_manager.create_tables()
+        _seed_database(db_manager, [
+            ("brewery", "Red Canyon Brewing", "Brewery with a spa-inspired patio", "Springdale", ["Tasting"]),
+            ("med-spa", "New Life New Image Med Spa", "Aesthetic treatments", "Las Vegas", ["HydraFacial", "Botox"]),
+        ])
+        yield db_manager
+        db_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_search_is_relevance_ranked(self, sqlite_db_manager):
+        """Database results come back best match first"""
+        handler = BAISUniversalToolHandler(db_manager=sqlite_db_manager)
+
+        results = await handler.search_businesses(query="med spa")
+
+        assert results[0]["business_id"] == "med-spa"
+        assert {svc["name"] for svc in results[0]["services"]} == {"HydraFacial", "Botox"}
+
+    @pytest.mark.asyncio
+    async def test_sqlite_search_matches_service_names(self, sqlite_db_manager):
+        """Service names are part of the searchable text"""
+        handler = BAISUniversalToolHandler(db_manager=sqlite_db_manager)
+
+        results = await handler.search_businesses(query="hydrafacial")
+
+        assert [b["business_id"] for b in results] == ["med-spa"]
+
+    @pytest.mark.asyncio
+    async def test_store_fallback_is_relevance_ranked(self, monkeypatch):
+        """The BUSINESS_STORE fallback ranks through its inverted index"""
+        from .. import shared_storage
+        from ..core import universal_tools
+
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        monkeypatch.setattr(universal_tools, "_get_shared_storage", lambda: shared_storage)
+        shared_storage.clear_business_store()
+        try:
+            shared_storage.register_business("brewery", {
+                "business_name": "Red Canyon Brewing", "business_type": "restaurant",
+                "business_info": {"description": "Brewery with a spa-inspired patio"},
+                "location": {"city": "Springdale", "state": "UT"}, "services_config": []
+            })
+            shared_storage.register_business("med-spa", {
+                "business_name": "New Life New Image Med Spa", "business_type": "healthcare",
+                "business_info": {"description": "Aesthetic treatments"},
+                "location": {"city": "Las Vegas", "state": "NV"},
+                "services_config": [{"id": "hydrafacial", "name": "HydraFacial"}]
+            })
+
+            results = await BAISUniversalToolHandler().search_businesses(query="spa")
+
+            assert [b["business_id"] for b in results] == ["med-spa", "brewery"]
+        finally:
+            shared_storage.clear_business_store()
+
+
+class TestColdStartBuild:
+    """Test suite for the first build of the database mirror"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_first_searches_share_one_build(self, tmp_path, monkeypatch):
+        from ..core import business_search_index
+        from ..core.database_models import AsyncDatabaseManager, DatabaseManager
+
+        url = f"sqlite:///{tmp_path / 'cold.db'}"
+        seed = DatabaseManager(url)
+        seed.create_tables()
+        _seed_database(seed, [(f"spa-{i}", f"Day Spa {i}", "Relaxation", "Reno", ["Massage"]) for i in range(20)])
+        seed.close()
+
+        builds = []
+        rebuild = business_search_index.DatabaseSearchIndex._rebuild
+        monkeypatch.setattr(business_search_index.DatabaseSearchIndex, "_rebuild",
+                            lambda index, session: (builds.append(1), rebuild(index, session)))
+
+        database = AsyncDatabaseManager(url)
+        try:
+            handler = BAISUniversalToolHandler(db_manager=database)
+            queries = ["spa", "day spa", "massage", "relaxation", "day massage", "spa massage", "day", "reno spa"]
+            results = await asyncio.gather(*(handler.search_businesses(query=query) for query in queries))
+        finally:
+            await database.close()
+
+        assert len(builds) == 1
+        assert all(results)
+
+
+class TestBackgroundRefresh:
+    """Test suite for refreshing a built mirror off the request path"""
+
+    @staticmethod
+    def _track_rebuilds(monkeypatch):
+        from ..core import business_search_index
+
+        rebuild_threads = []
+        rebuild = business_search_index.DatabaseSearchIndex._rebuild
+
+        def tracked(index, session):
+            rebuild_threads.append(threading.get_ident())
+            rebuild(index, session)
+
+        monkeypatch.setattr(business_search_index.DatabaseSearchIndex, "_rebuild", tracked)
+        return rebuild_threads
+
+    def test_sync_manager_serves_previous_build_while_thread_rebuilds(self, tmp_path, monkeypatch):
+        from ..core.business_search_index import get_database_search_index
+        from ..core.database_models import DatabaseManager
+
+        db_manager = DatabaseManager(f"sqlite:///{tmp_path / 'refresh.db'}")
+        db_manager.create_tables()
+        _seed_database(db_manager, [("day-spa", "Desert Day Spa", "Massage", "Henderson", [])])
+        index = get_database_search_index(db_manager)
+        rebuild_threads = self._track_rebuilds(monkeypatch)
+        try:
+            with db_manager.get_session() as session:
+                assert [b for b, _ in index.search(session, "spa")] != []
+
+            _seed_database(db_manager, [("med-spa", "Med Spa", "Skin care", "Las Vegas", [])])
+            index.invalidate()
+            with db_manager.get_session() as session:
+                assert len(index.search(session, "spa")) == 1  # previous build, no inline reload
+            index._refresh.join(timeout=5)
+            with db_manager.get_session() as session:
+                assert len(index.search(session, "spa")) == 2
+        finally:
+            db_manager.close()
+
+        assert len(rebuild_threads) == 2
+        assert rebuild_threads[1] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_async_manager_rebuilds_in_a_task(self, tmp_path, monkeypatch):
+        from ..core.business_search_index import get_database_search_index
+        from ..core.catalog_cache import invalidate_catalog_cache
+        from ..core.database_models import AsyncDatabaseManager, DatabaseManager
+
+        url = f"sqlite:///{tmp_path / 'refresh_async.db'}"
+        seed = DatabaseManager(url)
+        seed.create_tables()
+        _seed_database(seed, [("day-spa", "Desert Day Spa", "Massage", "Henderson", [])])
+
+        database = AsyncDatabaseManager(url)
+        handler = BAISUniversalToolHandler(db_manager=database)
+        index = get_database_search_index(database)
+        rebuilds = self._track_rebuilds(monkeypatch)
+        try:
+            assert len(await handler.search_businesses(query="spa")) == 1
+
+            _seed_database(seed, [("med-spa", "Med Spa", "Skin care", "Las Vegas", [])])
+            index.invalidate()
+            invalidate_catalog_cache()
+            assert len(await handler.search_businesses(query="spa")) == 1  # previous build
+            assert isinstance(index._refresh, asyncio.Task)
+            await index._refresh
+            invalidate_catalog_cache()
+            assert len(await handler.search_businesses(query="spa")) == 2
+        finally:
+            await database.close()
+            seed.close()
+
+        assert len(rebuilds) == 2
+
+
+class TestSearchQueryCount:
+    """Regression tests: search issues a constant number of SQL statements"""
+
+    @pytest.fixture
+    def db_manager(self, tmp_path):
+        from ..core.database_models import DatabaseManager
+
+        db_manager = DatabaseManager(f"sqlite:///{tmp_path / 'query_count.db'}")
+        db_manager.create_tables()
+        businesses = [("solo-spa", "Solo Day Spa", "Relaxation", "Reno", ["Massage", "Facial"])]
+        businesses += [
+            (f"clinic-{i}", f"Clinic {i}", "Aesthetic clinic", "Las Vegas",
+             [f"Treatment {j}" for j in range(8)])
+            for i in range(9)
+        ]
+        _seed_database(db_manager, businesses)
+        yield db_manager
+        db_manager.close()
+
+    async def _statements_for(self, handler, db_manager, **search):
+        with _count_statements(db_manager.engine) as statements:
+            results = await handler.search_businesses(**search)
+        return results, statements
+
+    @pytest.mark.asyncio
+    async def test_statement_count_independent_of_result_size(self, db_manager, monkeypatch):
+        """One match and nine matches cost the same number of statements"""
+        monkeypatch.delenv("BAIS_SEARCH_DEBUG", raising=False)
+        handler = BAISUniversalToolHandler(db_manager=db_manager)
+        await handler.search_businesses(query="warmup")  # builds the in-process index
+
+        one, one_statements = await self._statements_for(handler, db_manager, query="solo")
+        many, many_statements = await self._statements_for(handler, db_manager, query="clinic")
+
+        assert len(one) == 1
+        assert len(many) == 9
+        assert all(len(b["services"]) == 5 for b in many)
+        assert len(one_statements) == len(many_statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_unfiltered_listing_batches_services(self, db_manager, monkeypatch):
+        """An empty query lists businesses without a per-business service query"""
+        monkeypatch.delenv("BAIS_SEARCH_DEBUG", raising=False)
+        handler = BAISUniversalToolHandler(db_manager=db_manager)
+
+        results, statements = await self._statements_for(handler, db_manager, query="")
+
+        assert len(results) == 10
+        assert len(statements) == 2
+
+    @pytest.mark.asyncio
+    async def test_misses_skip_full_table_reads_unless_debugging(self, db_manager, monkeypatch):
+        """COUNT(*) and the all-businesses fallback only run with BAIS_SEARCH_DEBUG"""
+        handler = BAISUniversalToolHandler(db_manager=db_manager)
+        await handler.search_businesses(query="warmup")
+
+        monkeypatch.delenv("BAIS_SEARCH_DEBUG", raising=False)
+        quiet, quiet_statements = await self._statements_for(handler, db_manager, query="zzzunknown")
+        assert not any("count(" in statement.lower() for statement in quiet_statements)
+
+        monkeypatch.setenv("BAIS_SEARCH_DEBUG", "true")
+        _, debug_statements = await self._statements_for(handler, db_manager, query="zzzunknown")
+        assert any("count(" in statement.lower() for statement in debug_statements)
+
+
+class TestPostgresSearchPlan:
+    """Regression tests: PostgreSQL matching stays on the search indexes"""
+
+    @staticmethod
+    def _search_sql(dialect, capabilities):
+        from sqlalchemy.orm import Query
+        from ..core.business_search_index import apply_postgres_search
+        from ..core.database_models import Business
+
+        query_obj = apply_postgres_search(Query(Business), "facial", capabilities)
+        return str(query_obj.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+    def test_matchers_are_unioned_not_ored_with_exists(self):
+        """An OR with a correlated EXISTS forces a sequential scan of businesses"""
+        from sqlalchemy.dialects import postgresql
+        from ..core.business_search_index import PostgresSearchCapabilities
+
+        sql = self._search_sql(postgresql.dialect(), PostgresSearchCapabilities(full_text=True, trigram=True))
+
+        assert "EXISTS" not in sql.upper()
+        assert "= ANY (array((SELECT" in sql
+        assert sql.count("UNION") == 2
+
+    def test_explain_uses_indexes(self):
+        """Set BAIS_TEST_POSTGRES_URL (a scratch database) to check the live plan"""
+        import os
+        from sqlalchemy import text
+        from sqlalchemy.orm import Session
+        from ..core.business_search_index import ensure_postgres_search_index
+        from ..core.database_models import DatabaseManager
+
+        database_url = os.getenv("BAIS_TEST_POSTGRES_URL")
+        if not database_url:
+            pytest.skip("BAIS_TEST_POSTGRES_URL not set")
+        db_manager = DatabaseManager(database_url)
+        try:
+            db_manager.create_tables()
+            capabilities = ensure_postgres_search_index(db_manager.engine)
+            with Session(db_manager.engine) as session:
+                # A near-empty table makes any scan cheapest; the OR-with-EXISTS
+                # form had no index path at all and would still scan businesses
+                session.execute(text("SET enable_seqscan = off"))
+                plan = "\n".join(row[0] for row in session.execute(
+                    text("EXPLAIN " + self._search_sql(db_manager.engine.dialect, capabilities))
+                ))
+            assert "Seq Scan on businesses" not in plan
+            assert "Index Scan using businesses_pkey" in plan
+        finally:
+            db_manager.close()
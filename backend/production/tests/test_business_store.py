@@ -0,0 +1,186 @@
+"""
+Indexed Business Store Test Suite
+Tests ID aliasing, secondary indexes and fallback search over BUSINESS_STORE
+"""
+
+import time
+import pytest
+
+from ..core.business_store import (
+    IndexedBusinessStore, business_id_variants, canonical_business_id, compact_business_id
+)
+from ..core.universal_tools import BAISUniversalToolHandler
+
+
+def _business(name, business_type="healthcare", city="Las Vegas", state="NV", services=()):
+    return {
+        "business_name": name, "business_type": business_type,
+        "business_info": {"description": f"{name} description"},
+        "location": {"city": city, "state": state},
+        "services_config": [{"id": s.lower().replace(" ", "-"), "name": s} for s in services],
+    }
+
+
+@pytest.fixture
+def store():
+    store = IndexedBusinessStore()
+    store["new-life-new-image-med-spa"] = _business(
+        "New Life New Image Med Spa", services=["HydraFacial", "Botox"])
+    store["red-canyon-brewing"] = _business(
+        "Red Canyon Brewing", "restaurant", "Springdale", "UT", services=["Table Reservation"])
+    return store
+
+
+class TestBusinessIdNormalization:
+    """Test suite for the canonical-ID helpers"""
+
+    def test_canonical_and_compact_forms(self):
+        assert canonical_business_id("  New_Life  New-Image__Med_Spa ") == "new-life-new-image-med-spa"
+        assert compact_business_id("newlife_newimage-medspa") == "newlifenewimagemedspa"
+
+    def test_variants_cover_separator_spellings(self):
+        assert business_id_variants("Med_Spa") == ["Med_Spa", "med_spa", "med-spa"]
+
+
+class TestIndexedBusinessStore:
+    """Test suite for IndexedBusinessStore"""
+
+    @pytest.mark.parametrize("spelling", [
+        "new-life-new-image-med-spa", "New_Life_New_Image_Med_Spa",
+        "newlife_newimage_medspa", "newlifenewimagemedspa", "new life new image med spa",
+    ])
+    def test_id_spellings_resolve(self, store, spelling):
+        """Every spelling of the ID reaches the same entry"""
+        assert store.resolve(spelling) == "new-life-new-image-med-spa"
+
+    def test_unknown_id_does_not_resolve(self, store):
+        """Unknown IDs miss instead of falling back to some other business"""
+        assert store.resolve("unknown-business") is None
+        assert store.lookup("unknown-business") is None
+
+    def test_secondary_indexes(self, store):
+        assert store.find_ids(category="Healthcare") == {"new-life-new-image-med-spa"}
+        assert store.find_ids(state="ut") == {"red-canyon-brewing"}
+        assert store.find_ids(service="hydrafacial", city="las vegas") == {"new-life-new-image-med-spa"}
+        assert store.find_ids(service="hydrafacial", state="UT") == set()
+
+    def test_reregistration_and_removal_update_indexes(self, store):
+        """Writes keep aliases, secondary indexes and postings in step"""
+        store["red-canyon-brewing"] = _business("Red Canyon Taproom", "restaurant", "Moab", "UT")
+        assert store.find_ids(city="springdale") == set()
+        assert store.find_ids(city="moab") == {"red-canyon-brewing"}
+        assert store.search("brewing") == []
+
+        del store["red-canyon-brewing"]
+        assert store.resolve("red_canyon_brewing") is None
+        assert store.find_ids(state="UT") == set()
+        assert store.search("taproom") == []
+
+    def test_shared_alias_passes_to_remaining_business(self, store):
+        """Deleting the business that owns an alias re-points it to another that spells it"""
+        store["Med_Spa"] = _business("Med Spa", "healthcare", "Reno", "NV")
+        store["med-spa"] = _business("Med Spa Two", "healthcare", "Reno", "NV")
+        store["medspa"] = _business("Med Spa Three", "healthcare", "Reno", "NV")
+        assert store.resolve("MED SPA") == "Med_Spa"  # first registration wins
+
+        store["Med_Spa"] = _business("Med Spa Renamed", "healthcare", "Reno", "NV")
+        assert store.resolve("MED SPA") == "Med_Spa"  # re-registration keeps it
+
+        del store["Med_Spa"]
+        assert store.resolve("MED SPA") == "med-spa"
+        assert store.resolve("med_spa") == "med-spa"
+        del store["med-spa"]
+        assert store.resolve("MED SPA") == "medspa"  # only the compact spelling is left
+        del store["medspa"]
+        assert store.resolve("MED SPA") is None
+
+    def test_mapping_compatibility(self, store):
+        """Existing dict-style callers keep working"""
+        assert len(store) == 2
+        assert "red-canyon-brewing" in store
+        assert set(store.copy()) == {"new-life-new-image-med-spa", "red-canyon-brewing"}
+        store.clear()
+        assert len(store) == 0
+        assert store.search("spa") == []
+
+    @pytest.mark.slow
+    def test_fallback_search_stays_sub_millisecond(self):
+        """Ranked, filtered search and ID resolution at 100k entries"""
+        store = IndexedBusinessStore()
+        for i in range(100000):
+            store[f"biz-{i}"] = _business(f"Business {i} Plumbing", "service", "Reno", "NV", services=["Repair"])
+        store["new-life-new-image-med-spa"] = _business(
+            "New Life New Image Med Spa", "service", services=["HydraFacial"])
+        store.search("warmup")
+
+        searches = [
+            lambda: store.search("hydrafacial"),
+            lambda: store.search("med spa", location="Nevada"),
+            lambda: store.search("med spa", category="service", location="NV"),
+        ]
+        for search in searches:
+            started = time.perf_counter()
+            for _ in range(100):
+                results = search()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / 100
+            assert results[0][0] == "new-life-new-image-med-spa"
+            assert elapsed_ms < 1
+
+        assert store.resolve("newlife_newimage_medspa") == "new-life-new-image-med-spa"
+
+
+class TestStoreBackedToolHandlers:
+    """Test suite for the BUSINESS_STORE fallback in the universal tool handlers"""
+
+    @pytest.fixture
+    def shared_store(self, monkeypatch):
+        from .. import shared_storage
+        from ..core import universal_tools
+
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        monkeypatch.setattr(universal_tools, "_get_shared_storage", lambda: shared_storage)
+        shared_storage.clear_business_store()
+        shared_storage.register_business("new-life-new-image-med-spa", _business(
+            "New Life New Image Med Spa", services=["HydraFacial", "Botox"]))
+        yield shared_storage
+        shared_storage.clear_business_store()
+
+    @pytest.mark.asyncio
+    async def test_services_resolve_id_variants(self, shared_store):
+        result = await BAISUniversalToolHandler().get_business_services("NewLife_NewImage_MedSpa")
+
+        assert result["business_id"] == "new-life-new-image-med-spa"
+        assert [s["service_id"] for s in result["services"]] == ["hydrafacial", "botox"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_business_is_not_found(self, shared_store):
+        with pytest.raises(ValueError):
+            await BAISUniversalToolHandler().get_business_services("some-other-spa")
+
+    @pytest.mark.asyncio
+    async def test_execute_service_resolves_id_variants(self, shared_store):
+        result = await BAISUniversalToolHandler().execute_service(
+            "new_life_new_image_med_spa", "botox", {}, {"name": "Test"})
+
+        assert result["business_name"] == "New Life New Image Med Spa"
+        assert result["service_name"] == "Botox"
+
+    @pytest.mark.asyncio
+    async def test_database_lookup_accepts_compact_ids(self, tmp_path):
+        """Separator-free IDs resolve against database external_ids too"""
+        from ..core.database_models import DatabaseManager
+        from .test_business_search_index import _seed_database
+
+        db_manager = DatabaseManager(f"sqlite:///{tmp_path / 'store.db'}")
+        db_manager.create_tables()
+        _seed_database(db_manager, [
+            ("new-life-new-image-med-spa", "New Life New Image Med Spa", "Aesthetics", "Las Vegas", ["Botox"]),
+            ("red-canyon-brewing", "Red Canyon Brewing", "Brewery", "Springdale", ["Tasting"]),
+        ])
+        try:
+            handler = BAISUniversalToolHandler(db_manager=db_manager)
+            assert (await handler.get_business_services("redcanyonbrewing"))["business_name"] == "Red Canyon Brewing"
+            assert (await handler.get_business_services("New_Life_New_Image_Med_Spa"))["business_id"] == \
+                "new-life-new-image-med-spa"
+        finally:
+            db_manager.close()
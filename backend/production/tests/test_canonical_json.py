@@ -0,0 +1,273 @@
+"""
+Canonical JSON Test Suite
+Tests the RFC 8785 encoder against the RFC's golden vectors, agreement
+between the orjson and reference backends, the signing/hashing call sites,
+and an encoder throughput benchmark
+"""
+
+import base64
+import json
+import random
+import struct
+import time
+from datetime import datetime, timezone
+import pytest
+
+from ..core.canonical_json import (
+    JCS_CUTOVER,
+    CanonicalJSONError,
+    backend,
+    canonical_sha256,
+    canonical_str,
+    canonicalize,
+    format_number,
+    get_legacy_fallback_stats,
+    legacy_json,
+    legacy_signatures_accepted,
+)
+from ..api.middleware.ap2_auth import AP2AuthMiddleware
+from ..core.payments.ap2_mandate_validator import AP2MandateValidator
+from ..core.payments.crypto_executor import rsa_pss_sign, sign_message
+from ..core.payments.cryptographic_mandate_validator import CryptographicMandateValidator, KeyManager
+
+# RFC 8785 Appendix B: IEEE-754 bit patterns and their canonical text
+NUMBER_VECTORS = [
+    (0x0000000000000000, "0"),
+    (0x8000000000000000, "0"),
+    (0x0000000000000001, "5e-324"),
+    (0x8000000000000001, "-5e-324"),
+    (0x7fefffffffffffff, "1.7976931348623157e+308"),
+    (0xffefffffffffffff, "-1.7976931348623157e+308"),
+    (0x4340000000000000, "9007199254740992"),
+    (0xc340000000000000, "-9007199254740992"),
+    (0x4430000000000000, "295147905179352830000"),
+    (0x44b52d02c7e14af5, "9.999999999999997e+22"),
+    (0x44b52d02c7e14af6, "1e+23"),
+    (0x44b52d02c7e14af7, "1.0000000000000001e+23"),
+    (0x444b1ae4d6e2ef4e, "999999999999999700000"),
+    (0x444b1ae4d6e2ef4f, "999999999999999900000"),
+    (0x444b1ae4d6e2ef50, "1e+21"),
+    (0x3eb0c6f7a0b5ed8c, "9.999999999999997e-7"),
+    (0x3eb0c6f7a0b5ed8d, "0.000001"),
+    (0x41b3de4355555553, "333333333.3333332"),
+    (0x41b3de4355555554, "333333333.33333325"),
+    (0x41b3de4355555555, "333333333.3333333"),
+    (0x41b3de4355555556, "333333333.3333334"),
+    (0x41b3de4355555557, "333333333.33333343"),
+    (0xbecbf647612f3696, "-0.0000033333333333333333"),
+    (0x43143ff3c1cb0959, "1424953923781206.2"),
+]
+
+# RFC 8785 section 3.2.2 / 3.2.3 examples
+RFC_INPUT = {
+    "numbers": [333333333.33333329, 1E30, 4.50, 2e-3, 0.000000000000000000000000001],
+    "string": "€$\u000F\u000aA'B\"\\\\\"/",
+    "literals": [None, True, False],
+}
+RFC_OUTPUT = (
+    '{"literals":[null,true,false],"numbers":[333333333.3333333,1e+30,4.5,0.002,1e-27],'
+    '"string":"€$\\u000f\\nA\'B\\"\\\\\\\\\\"/"}'
+)
+SORTING_INPUT = {
+    "€": "Euro Sign",
+    "\r": "Carriage Return",
+    "דּ": "Hebrew Letter Dalet With Dagesh",
+    "1": "One",
+    "\U0001f600": "Emoji: Grinning Face",
+    "\u0080": "Control",
+    "ö": "Latin Small Letter O With Diaeresis",
+}
+SORTED_VALUES = [
+    "Carriage Return", "One", "Control", "Latin Small Letter O With Diaeresis",
+    "Euro Sign", "Emoji: Grinning Face", "Hebrew Letter Dalet With Dagesh",
+]
+
+MANDATE = {
+    "type": "cart",
+    "userId": "user-1",
+    "businessId": "biz-1",
+    "items": [
+        {"sku": f"room-{n}", "name": f"Room {n}", "quantity": 1, "price": {"currency": "USD", "amount": 120.5 + n}}
+        for n in range(10)
+    ],
+    "constraints": {"max_amount": 2500, "valid_until": "2026-12-01T00:00:00Z", "refundable": True},
+    "metadata": {"channel": "chatgpt", "note": None},
+}
+
+
+def _double(bits: int) -> float:
+    return struct.unpack(">d", struct.pack(">Q", bits))[0]
+
+
+class TestGoldenVectors:
+    """Test suite for RFC 8785 golden vectors"""
+
+    @pytest.mark.parametrize("bits,expected", NUMBER_VECTORS)
+    def test_number_serialization(self, bits, expected):
+        assert format_number(_double(bits)) == expected
+        assert canonical_str([_double(bits)]) == f"[{expected}]"
+
+    @pytest.mark.parametrize("accelerated", [True, False])
+    def test_rfc_example_object(self, accelerated):
+        assert canonicalize(RFC_INPUT, accelerated=accelerated) == RFC_OUTPUT.encode("utf-8")
+
+    @pytest.mark.parametrize("accelerated", [True, False])
+    def test_keys_sort_by_utf16_code_units(self, accelerated):
+        encoded = json.loads(canonicalize(SORTING_INPUT, accelerated=accelerated))
+        assert list(encoded.values()) == SORTED_VALUES
+
+    def test_integers_and_integral_floats(self):
+        assert canonical_str({"a": 120.0, "b": -0.0, "c": 1e16, "d": 2 ** 53, "e": 2 ** 64}) == \
+            '{"a":120,"b":0,"c":10000000000000000,"d":9007199254740992,"e":18446744073709552000}'
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+    def test_non_finite_numbers_are_rejected(self, value):
+        with pytest.raises(CanonicalJSONError):
+            canonicalize({"amount": value})
+
+    @pytest.mark.parametrize("value", [{1: "a"}, {"when": object()}, {"ids": {1, 2}}])
+    def test_non_json_values_are_rejected(self, value):
+        with pytest.raises(TypeError):
+            canonicalize(value)
+
+
+class TestBackends:
+    """Test suite for fast path / reference agreement"""
+
+    def test_backends_agree_on_random_documents(self):
+        rng = random.Random(8785)
+
+        def document(depth=0):
+            kind = rng.randrange(9 if depth < 3 else 6)
+            if kind == 0:
+                return rng.choice([None, True, False])
+            if kind == 1:
+                return rng.randrange(-2 ** 60, 2 ** 60) if rng.random() < 0.2 else rng.randrange(-1000, 1000)
+            if kind == 2:
+                return rng.choice([rng.uniform(-1e6, 1e6), round(rng.uniform(0, 500), 2), 10 ** rng.uniform(-9, 25)])
+            if kind in (3, 4, 5):
+                return "".join(rng.choice("ab\"\\\n\x01é€\U0001f600") for _ in range(rng.randrange(6)))
+            if kind in (6, 7):
+                return {document(3).__str__(): document(depth + 1) for _ in range(rng.randrange(5))}
+            return [document(depth + 1) for _ in range(rng.randrange(5))]
+
+        for _ in range(2000):
+            value = document()
+            fast = canonicalize(value)
+            assert fast == canonicalize(value, accelerated=False)
+            assert json.loads(fast, parse_int=float) == json.loads(json.dumps(value), parse_int=float)
+
+    def test_no_insignificant_whitespace_and_tuples_are_arrays(self):
+        assert canonicalize({"b": (1, 2), "a": {"y": "z"}}) == b'{"a":{"y":"z"},"b":[1,2]}'
+
+    def test_hash_is_independent_of_key_order(self):
+        reordered = dict(reversed(list(MANDATE.items())))
+        assert canonical_sha256(reordered) == canonical_sha256(MANDATE)
+
+
+class TestCallSites:
+    """Test suite for the signing and hashing paths built on the encoder"""
+
+    def test_mandate_signature_covers_canonical_bytes(self):
+        key_manager = KeyManager()
+        key_manager.generate_key_pair("issuer")
+        validator = CryptographicMandateValidator(key_manager)
+
+        message = validator._signing_message({"amount": 120.0, "b": 1}, "n", "t", "RS256")
+        assert message == b'{"algorithm":"RS256","mandate_data":{"amount":120,"b":1},"nonce":"n","timestamp":"t"}'
+
+        signature = validator.sign_mandate(dict(MANDATE))
+        assert validator.verify_mandate(dict(reversed(list(MANDATE.items()))), signature)
+        assert validator.get_mandate_hash({**MANDATE, "signature": "x"}) == canonical_sha256(MANDATE)
+
+
+# json.dumps writes 250.0 and ", " separators; RFC 8785 writes 250 and none
+LEGACY_MANDATE = {**MANDATE, "total": 250.0}
+
+
+def _fallbacks(verifier):
+    return get_legacy_fallback_stats()["fallbacks"].get(verifier, 0)
+
+
+class TestLegacySignatureTransition:
+    """Test suite for accepting json.dumps signatures for one signature max age"""
+
+    def test_window_is_one_signature_max_age_after_cutover(self, monkeypatch):
+        monkeypatch.setenv("BAIS_JCS_CUTOVER", "2026-10-01T00:00:00")
+        cutover = 1790812800  # 2026-10-01T00:00:00Z
+        assert legacy_signatures_accepted(now=cutover + 24 * 3600 - 1)
+        assert not legacy_signatures_accepted(now=cutover + 24 * 3600)
+
+    def test_window_does_not_reopen_on_restart(self, monkeypatch):
+        """Without the override the cutover is the committed constant, not the process start"""
+        monkeypatch.delenv("BAIS_JCS_CUTOVER", raising=False)
+        cutover = datetime.fromisoformat(JCS_CUTOVER).timestamp()
+        assert legacy_signatures_accepted(now=cutover + 24 * 3600 - 1)
+        assert not legacy_signatures_accepted(now=cutover + 24 * 3600)
+
+    @pytest.mark.asyncio
+    async def test_cryptographic_validator_falls_back_and_counts(self, monkeypatch):
+        monkeypatch.setenv("BAIS_JCS_CUTOVER", datetime.now(timezone.utc).isoformat())
+        key_manager = KeyManager()
+        key_pair = key_manager.generate_key_pair("issuer")
+        validator = CryptographicMandateValidator(key_manager)
+        signature = validator.sign_mandate(dict(LEGACY_MANDATE))
+        signature.signature = base64.b64encode(sign_message(key_pair.private_key, legacy_json({
+            "mandate_data": LEGACY_MANDATE,
+            "nonce": signature.nonce,
+            "timestamp": signature.timestamp.isoformat(),
+            "algorithm": signature.algorithm,
+        }))).decode("utf-8")
+        before = _fallbacks("cryptographic_mandate_validator")
+
+        assert validator.verify_mandate(dict(LEGACY_MANDATE), signature)
+        assert await validator.verify_mandate_async(dict(LEGACY_MANDATE), signature)
+        assert await validator.verify_many([(dict(LEGACY_MANDATE), signature)]) == [True]
+        assert _fallbacks("cryptographic_mandate_validator") == before + 3
+
+        monkeypatch.setenv("BAIS_JCS_CUTOVER", "2020-01-01T00:00:00")
+        assert not validator.verify_mandate(dict(LEGACY_MANDATE), signature)
+        assert await validator.verify_many([(dict(LEGACY_MANDATE), signature)]) == [False]
+
+    @pytest.mark.asyncio
+    async def test_ap2_validator_and_auth_middleware_fall_back(self, monkeypatch):
+        monkeypatch.setenv("BAIS_JCS_CUTOVER", datetime.now(timezone.utc).isoformat())
+        key_manager = KeyManager()
+        private_key = key_manager.generate_key_pair("issuer").private_key
+        pem = key_manager.export_public_key_pem("issuer")
+
+        compact = base64.b64encode(rsa_pss_sign(private_key, legacy_json(LEGACY_MANDATE, separators=(",", ":"))))
+        validator = AP2MandateValidator(pem)
+        before = _fallbacks("ap2_mandate_validator")
+        assert validator.verify_mandate_from_dict(LEGACY_MANDATE, compact.decode("utf-8"))
+        assert await validator.verify_mandate_from_dict_async(LEGACY_MANDATE, compact.decode("utf-8"))
+        assert _fallbacks("ap2_mandate_validator") == before + 2
+
+        middleware = AP2AuthMiddleware()
+        hex_signature = rsa_pss_sign(private_key, legacy_json(LEGACY_MANDATE)).hex()
+        assert await middleware.verify_mandate_signature(LEGACY_MANDATE, hex_signature, pem)
+        assert _fallbacks("ap2_auth_middleware") >= 1
+
+        monkeypatch.setenv("BAIS_JCS_CUTOVER", "2020-01-01T00:00:00")
+        assert not validator.verify_mandate_from_dict(LEGACY_MANDATE, compact.decode("utf-8"))
+        assert not await middleware.verify_mandate_signature(LEGACY_MANDATE, hex_signature, pem)
+
+
+class TestCanonicalJSONBenchmark:
+    """Throughput benchmark for the encoder backends"""
+
+    @pytest.mark.slow
+    def test_accelerated_backend_throughput(self):
+        rounds = 5000
+        results = {}
+        for accelerated in (False, True):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                canonicalize(MANDATE, accelerated=accelerated)
+            results[accelerated] = (time.perf_counter() - started) * 1e6 / rounds
+
+        size = len(canonicalize(MANDATE))
+        print(f"\ncanonical JSON ({size} bytes): reference {results[False]:.1f}us, "
+              f"{backend()} {results[True]:.1f}us per document")
+        if backend() == "orjson":
+            assert results[True] * 2 < results[False]
@@ -0,0 +1,245 @@
+"""
+Business Catalog Cache Test Suite
+Tests the two-tier catalog cache and its use by the universal tool handlers
+"""
+
+import threading
+import time
+import pytest
+
+from ..core.catalog_cache import (
+    BusinessCatalogCache, CatalogCacheStats, LRUTTLCache, get_catalog_cache,
+    get_catalog_cache_stats, invalidate_catalog_cache
+)
+from ..core.universal_tools import BAISUniversalToolHandler
+from .test_business_search_index import _count_statements, _seed_database
+
+
+class FakeRedisClient:
+    def __init__(self, store):
+        self.store = store
+        self.incr_threads = []
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def incr(self, key):
+        self.store[key] = str(int(self.store.get(key, "0")) + 1)
+        self.incr_threads.append(threading.get_ident())
+
+    def pipeline(self, transaction=True):
+        client = self
+
+        class Pipeline:
+            def __init__(self):
+                self.keys = []
+
+            def incr(self, key):
+                self.keys.append(key)
+
+            def execute(self):
+                return [client.incr(key) for key in self.keys]
+
+        return Pipeline()
+
+
+class FakeCacheManager:
+    """Dict-backed stand-in for CacheManager (same get/set/delete surface)"""
+
+    def __init__(self):
+        self.store = {}
+        self.redis_client = FakeRedisClient(self.store)
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ttl=None):
+        self.store[key] = value
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    from ..core.database_models import DatabaseManager
+
+    db_manager = DatabaseManager(f"sqlite:///{tmp_path / 'catalog.db'}")
+    db_manager.create_tables()
+    _seed_database(db_manager, [
+        ("med-spa", "New Life New Image Med Spa", "Aesthetic treatments", "Las Vegas", ["HydraFacial", "Botox"]),
+    ])
+    yield db_manager
+    db_manager.close()
+
+
+class TestLRUTTLCache:
+    """Test suite for the in-process tier"""
+
+    def test_lru_eviction_is_counted(self):
+        """The least recently used entry goes first once the bound is reached"""
+        stats = CatalogCacheStats()
+        cache = LRUTTLCache(max_entries=2, ttl_seconds=60, stats=stats)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert stats.evictions == 1
+
+    def test_ttl_expiry_is_counted(self):
+        """Entries past their TTL are dropped on read"""
+        stats = CatalogCacheStats()
+        cache = LRUTTLCache(max_entries=10, ttl_seconds=0.01, stats=stats)
+        cache.set("a", 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert stats.expirations == 1
+
+
+class TestBusinessCatalogCache:
+    """Test suite for the two-tier catalog cache"""
+
+    @pytest.mark.asyncio
+    async def test_search_keys_are_normalized(self):
+        """Case and spacing differences share one entry"""
+        cache = BusinessCatalogCache()
+        await cache.set_search("db", "Med  Spa", None, "Las Vegas", [{"business_id": "med-spa"}])
+
+        assert await cache.get_search("db", "med spa", None, "las vegas") == [{"business_id": "med-spa"}]
+        assert await cache.get_search("other-db", "med spa", None, "las vegas") is None
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_redis_tier_fills_local_tier(self):
+        """A second worker's miss is served from Redis, then locally"""
+        shared = FakeCacheManager()
+        writer = BusinessCatalogCache(cache_manager=shared)
+        reader = BusinessCatalogCache(cache_manager=shared)
+        await writer.set_services("db", "med-spa", {"business_id": "med-spa", "services": [{"name": "Botox"}]})
+
+        assert (await reader.get_services("db", "med-spa"))["business_id"] == "med-spa"
+        assert (await reader.get_services("db", "med-spa"))["business_id"] == "med-spa"
+        assert reader.stats.redis_hits == 1
+        assert reader.stats.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_bumps_redis_search_generation(self):
+        """Invalidation drops the services key and orphans every shared search entry"""
+        shared = FakeCacheManager()
+        writer = BusinessCatalogCache(cache_manager=shared)
+        reader = BusinessCatalogCache(cache_manager=shared)
+        await writer.set_search("db", "spa", None, None, [{"business_id": "med-spa"}])
+        await writer.set_services("db", "med-spa", {"business_id": "med-spa", "services": [{"name": "Botox"}]})
+
+        writer.invalidate_business("med-spa")
+
+        assert await reader.get_search("db", "spa", None, None) is None
+        assert await reader.get_services("db", "med-spa") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_scopes_the_writer_never_saw(self):
+        """Services cached by another worker, under another database scope, are invalidated too"""
+        shared = FakeCacheManager()
+        other_worker = BusinessCatalogCache(cache_manager=shared)
+        await other_worker.set_services("db-b", "med-spa", {"business_id": "med-spa", "services": []})
+        await other_worker.set_services("db-b", "brewery", {"business_id": "brewery", "services": []})
+
+        BusinessCatalogCache(cache_manager=shared).invalidate_business("Med_Spa")
+
+        reader = BusinessCatalogCache(cache_manager=shared)
+        assert await reader.get_services("db-b", "med-spa") is None
+        assert await reader.get_services("db-b", "brewery") is not None
+
+        BusinessCatalogCache(cache_manager=shared).invalidate_business()
+        assert await BusinessCatalogCache(cache_manager=shared).get_services("db-b", "brewery") is None
+
+
+    @pytest.mark.asyncio
+    async def test_invalidation_on_the_event_loop_incrs_in_a_thread(self):
+        """The generation INCRs leave the loop thread, and this worker's next read waits for them"""
+        shared = FakeCacheManager()
+        cache = BusinessCatalogCache(cache_manager=shared)
+        await cache.set_search("db", "spa", None, None, [{"business_id": "med-spa"}])
+        cache.local.clear()
+
+        cache.invalidate_business("med-spa")
+
+        assert await cache.get_search("db", "spa", None, None) is None
+        assert len(shared.redis_client.incr_threads) == 2
+        assert threading.get_ident() not in shared.redis_client.incr_threads
+
+    @pytest.mark.asyncio
+    async def test_aliases_are_bounded_and_only_for_variants(self):
+        """Garbage IDs from tool calls cannot grow the alias map without bound"""
+        cache = BusinessCatalogCache(max_entries=4)
+        await cache.set_services("db", "med-spa", {"business_id": "med-spa", "services": []})
+        assert len(cache._aliases) == 0
+
+        for i in range(10):
+            await cache.set_services("db", f"Med_Spa_{i}", {"business_id": "med-spa", "services": []})
+        assert len(cache._aliases) == 4
+        assert (await cache.get_services("db", "MED_SPA_9"))["business_id"] == "med-spa"
+
+
+class TestCachedToolHandlers:
+    """Test suite for cached bais_search_businesses / bais_get_business_services"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_search_skips_database(self, db_manager):
+        """The second identical tool call in a conversation issues no SQL"""
+        handler = BAISUniversalToolHandler(db_manager=db_manager)
+        first = await handler.search_businesses(query="med spa")
+
+        with _count_statements(db_manager.engine) as statements:
+            second = await handler.search_businesses(query="  Med Spa ")
+
+        assert second == first
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_services_cached_across_id_variants(self, db_manager):
+        """Lookups by an ID variant reuse the canonical entry"""
+        handler = BAISUniversalToolHandler(db_manager=db_manager)
+        await handler.get_business_services("med-spa")
+
+        with _count_statements(db_manager.engine) as statements:
+            result = await handler.get_business_services("MED_SPA")
+
+        assert result["business_name"] == "New Life New Image Med Spa"
+        assert statements == []
+
+    @pytest.mark.asyncio
+    async def test_update_business_invalidates(self, db_manager):
+        """BusinessRepository.update_business publishes an invalidation"""
+        from ..core.database_models import Business, BusinessRepository
+
+        handler = BAISUniversalToolHandler(db_manager=db_manager)
+        await handler.get_business_services("med-spa")
+        await handler.search_businesses(query="med spa")
+
+        with db_manager.get_session() as session:
+            business = session.query(Business).filter(Business.external_id == "med-spa").one()
+            BusinessRepository(session).update_business(business.id, {"name": "Renamed Med Spa"})
+
+        services = await handler.get_business_services("med-spa")
+        results = await handler.search_businesses(query="med spa")
+
+        assert services["business_name"] == "Renamed Med Spa"
+        assert results[0]["name"] == "Renamed Med Spa"
+
+    def test_stats_are_exposed(self):
+        """Counters are available for sizing"""
+        get_catalog_cache()
+        invalidate_catalog_cache()
+
+        stats = get_catalog_cache_stats()
+
+        assert stats["invalidations"] >= 1
+        assert {"hits", "misses", "evictions", "hit_rate", "local_entries"} <= set(stats)
@@ -0,0 +1,232 @@
+"""
+Chat Endpoint Test Suite
+Tests the async Claude tool loop and the SSE /chat/stream variant
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("requests")
+
+from ..api.v1 import chat_endpoint
+from ..api.v1.chat_endpoint import ChatMessage
+
+CALL_BAIS_TOOL = chat_endpoint.call_bais_tool  # the fake_claude fixture swaps in a canned tool
+
+
+def _text(text):
+    return SimpleNamespace(type="text", text=text)
+
+
+def _tool_use(tool_id, name, tool_input):
+    return SimpleNamespace(type="tool_use", id=tool_id, name=name, input=tool_input)
+
+
+class FakeStream:
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for block in self.response.content:
+            if block.type == "text":
+                for word in block.text.split(" "):
+                    await asyncio.sleep(0)
+                    yield SimpleNamespace(type="text", text=word)
+
+    async def get_final_message(self):
+        return self.response
+
+
+class FakeMessages:
+    """Replays scripted responses; create() sleeps like a network round trip"""
+
+    def __init__(self, responses, latency=0.0):
+        self.responses = list(responses)
+        self.latency = latency
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(json.loads(json.dumps(kwargs["messages"])))
+        await asyncio.sleep(self.latency)
+        return self.responses[min(len(self.requests), len(self.responses)) - 1]
+
+    def stream(self, **kwargs):
+        self.requests.append(json.loads(json.dumps(kwargs["messages"])))
+        return FakeStream(self.responses[min(len(self.requests), len(self.responses)) - 1])
+
+
+@pytest.fixture
+def fake_claude(monkeypatch):
+    def install(responses, latency=0.0):
+        messages = FakeMessages(responses, latency)
+        monkeypatch.setattr(chat_endpoint, "get_async_anthropic_client",
+                            lambda api_key: SimpleNamespace(messages=messages))
+        return messages
+
+    async def fake_tool(tool_name, tool_input, handler):
+        return [{"business_id": "med-spa", "name": "New Life New Image Med Spa"}]
+
+    monkeypatch.setattr(chat_endpoint, "get_bais_tool_handler", lambda: None)
+    monkeypatch.setattr(chat_endpoint, "call_bais_tool", fake_tool)
+    return install
+
+
+def _parse_sse(body):
+    events = []
+    for chunk in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in chunk.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+TOOL_TURN = SimpleNamespace(content=[
+    _text("Searching now."),
+    _tool_use("t1", "bais_search_businesses", {"query": "med spa"}),
+    _tool_use("t2", "bais_search_businesses", {"query": "spa", "location": "Las Vegas"}),
+])
+FINAL_TURN = SimpleNamespace(content=[_text("I found New Life New Image Med Spa")])
+
+
+class TestChatWithClaude:
+    """Test suite for the async Claude tool loop"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_conversations_overlap(self, fake_claude):
+        """Model latency no longer blocks the event loop"""
+        fake_claude([FINAL_TURN], latency=0.1)
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            chat_endpoint.chat_with_claude([ChatMessage(role="user", content="hi")], "key")
+            for _ in range(20)
+        ))
+        elapsed = time.perf_counter() - started
+
+        assert all(r.message == "I found New Life New Image Med Spa" for r in responses)
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_parallel_tool_uses_share_one_turn(self, fake_claude):
+        """All tool_use blocks of a response go back as one assistant turn plus one tool_result turn"""
+        messages = fake_claude([TOOL_TURN, FINAL_TURN])
+
+        response = await chat_endpoint.chat_with_claude([ChatMessage(role="user", content="find a spa")], "key")
+
+        assert [call["input"]["query"] for call in response.tool_calls] == ["med spa", "spa"]
+        follow_up = messages.requests[1]
+        assert [m["role"] for m in follow_up] == ["user", "assistant", "user"]
+        assert [b["type"] for b in follow_up[1]["content"]] == ["text", "tool_use", "tool_use"]
+        assert [b["tool_use_id"] for b in follow_up[2]["content"]] == ["t1", "t2"]
+
+    @pytest.mark.asyncio
+    async def test_availability_tool_is_routed_to_the_handler(self, fake_claude, monkeypatch):
+        calls = []
+
+        class FakeHandler:
+            async def check_availability(self, **kwargs):
+                calls.append(kwargs)
+                return {"business_id": kwargs["business_id"], "earliest": "2026-10-17T17:00"}
+
+        messages = fake_claude([
+            SimpleNamespace(content=[_tool_use("t1", "bais_check_availability", {
+                "business_id": "med-spa", "service_ids": ["facial"], "start_time": "17:00", "weekdays": ["sat"]
+            })]),
+            FINAL_TURN,
+        ])
+        monkeypatch.setattr(chat_endpoint, "get_bais_tool_handler", lambda: FakeHandler())
+        monkeypatch.setattr(chat_endpoint, "call_bais_tool", CALL_BAIS_TOOL)
+
+        await chat_endpoint.chat_with_claude([ChatMessage(role="user", content="free on saturday evening?")], "key")
+
+        assert "bais_check_availability" in {tool["name"] for tool in chat_endpoint.get_bais_tool_definitions()}
+        assert calls == [{
+            "business_id": "med-spa", "service_ids": ["facial"], "start_date": None, "end_date": None,
+            "start_time": "17:00", "end_time": None, "weekdays": ["sat"]
+        }]
+        result = json.loads(messages.requests[1][2]["content"][0]["content"])
+        assert result == {"business_id": "med-spa", "earliest": "2026-10-17T17:00"}
+
+
+class TestChatStream:
+    """Test suite for the SSE chat variant"""
+
+    @pytest.mark.asyncio
+    async def test_event_sequence(self, fake_claude):
+        """Tokens stream first, then every tool call, results as they finish, then the final answer"""
+        fake_claude([TOOL_TURN, FINAL_TURN])
+
+        body = "".join([event async for event in chat_endpoint.stream_chat_with_claude(
+            [ChatMessage(role="user", content="find a spa")], "key")])
+        events = _parse_sse(body)
+
+        assert [name for name, _ in events] == [
+            "token", "token", "tool_call", "tool_call", "tool_result", "tool_result", "tool_turn",
+            *["token"] * 8, "done"
+        ]
+        assert events[2][1] == {"id": "t1", "name": "bais_search_businesses", "input": {"query": "med spa"}}
+        assert events[-1][1]["message"] == "I found New Life New Image Med Spa"
+        assert len(events[-1][1]["tool_calls"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_streamed(self, monkeypatch):
+        """Failures end the stream with an error event rather than a broken connection"""
+        def broken_client(api_key):
+            raise RuntimeError("upstream unavailable")
+
+        monkeypatch.setattr(chat_endpoint, "get_async_anthropic_client", broken_client)
+
+        body = "".join([event async for event in chat_endpoint.stream_chat_with_claude(
+            [ChatMessage(role="user", content="hi")], "key")])
+
+        assert _parse_sse(body) == [("error", {"error": "upstream unavailable"})]
+
+    def test_stream_route(self, fake_claude):
+        """POST /api/v1/chat/stream responds with text/event-stream"""
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        fake_claude([FINAL_TURN])
+        app = FastAPI()
+        app.include_router(chat_endpoint.router)
+
+        response = TestClient(app).post("/api/v1/chat/stream", json={
+            "model": "claude", "api_key": "key", "messages": [{"role": "user", "content": "hi"}]
+        })
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert _parse_sse(response.text)[-1][0] == "done"
+
+
+class TestAnthropicClients:
+    """Test suite for Anthropic client reuse"""
+
+    @pytest.mark.asyncio
+    async def test_only_the_server_key_is_cached(self, monkeypatch):
+        """Caller-supplied keys get a per-request client that is closed, never retained"""
+        pytest.importorskip("anthropic")
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "server-key")
+        monkeypatch.setattr(chat_endpoint, "_shared_anthropic_client", None)
+
+        shared = chat_endpoint.get_async_anthropic_client("server-key")
+        assert chat_endpoint.get_async_anthropic_client("server-key") is shared
+        await chat_endpoint.release_async_anthropic_client(shared)
+        assert not shared.is_closed()
+
+        caller = chat_endpoint.get_async_anthropic_client("caller-key")
+        other = chat_endpoint.get_async_anthropic_client("caller-key")
+        assert caller is not other
+        for client in (caller, other):
+            await chat_endpoint.release_async_anthropic_client(client)
+            assert client.is_closed()
+        assert chat_endpoint._shared_anthropic_client[1] is shared
+        await shared.close()
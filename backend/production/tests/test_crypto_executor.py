@@ -0,0 +1,168 @@
+"""
+Crypto Executor Test Suite
+Tests the parsed public key LRU, off-loop RSA-PSS sign/verify, and the
+async mandate validator paths built on them
+"""
+
+import asyncio
+import base64
+import copy
+import gc
+import json
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from ..core.payments.ap2_mandate_validator import AP2MandateValidator
+from ..core.payments.crypto_executor import CryptoExecutor, PublicKeyCache, rsa_pss_sign
+from ..core.payments.cryptographic_mandate_validator import CryptographicMandateValidator, KeyManager
+
+MANDATE = {"type": "intent", "userId": "user-1", "businessId": "biz-1", "constraints": {"max_amount": 250}}
+
+
+@pytest.fixture(scope="module")
+def private_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _pem(key) -> str:
+    return key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode("utf-8")
+
+
+class TestPublicKeyCache:
+    """Test suite for the parsed key LRU"""
+
+    def test_pem_is_parsed_once_and_least_recent_is_evicted(self, private_key):
+        cache = PublicKeyCache(max_size=2)
+        pem = _pem(private_key)
+        first = cache.load_pem(pem)
+        assert cache.load_pem(pem + "\n") is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        cache.register("kid-a", first)
+        cache.register("kid-b", first)
+        assert cache.get("kid-a") is first
+        assert cache.load_pem(pem) is not first  # evicted by the two key ids
+        assert cache.get("kid-b") is None and len(cache) == 2
+
+    def test_invalid_pem_is_rejected(self):
+        with pytest.raises(ValueError):
+            PublicKeyCache().load_pem("-----BEGIN PUBLIC KEY-----\nnope\n-----END PUBLIC KEY-----")
+
+
+class TestCryptoExecutor:
+    """Test suite for off-loop sign/verify"""
+
+    @pytest.mark.asyncio
+    async def test_sign_and_verify_with_pem_or_key(self, private_key):
+        executor = CryptoExecutor(max_workers=2)
+        try:
+            signature = await executor.sign(private_key, b"mandate")
+            assert await executor.verify(_pem(private_key), signature, b"mandate")
+            assert await executor.verify(private_key.public_key(), signature, b"mandate")
+            assert not await executor.verify(_pem(private_key), signature, b"tampered")
+
+            stats = executor.get_stats()
+            assert (stats["signed"], stats["verified"], stats["rejected"]) == (1, 2, 1)
+            assert stats["key_cache"]["misses"] == 1
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_signing_burst_does_not_stall_the_event_loop(self, private_key):
+        async def loop_gaps(burst):
+            """Intervals between 1ms heartbeats while burst runs"""
+            gaps, done = [], asyncio.Event()
+
+            async def heartbeat():
+                last = time.perf_counter()
+                while not done.is_set():
+                    await asyncio.sleep(0.001)
+                    now = time.perf_counter()
+                    gaps.append(now - last)
+                    last = now
+
+            ticker = asyncio.create_task(heartbeat())
+            await asyncio.sleep(0.005)
+            gaps.clear()
+            await burst()
+            done.set()
+            await ticker
+            return sorted(gaps)
+
+        async def inline():
+            for n in range(200):
+                rsa_pss_sign(private_key, f"mandate-{n}".encode())
+
+        gc.collect()  # a collection pause left over from earlier tests is not a signing stall
+        executor = CryptoExecutor(max_workers=4)
+        try:
+            async def pooled():
+                await asyncio.gather(*(executor.sign(private_key, f"mandate-{n}".encode()) for n in range(200)))
+
+            blocked = await loop_gaps(inline)
+            offloaded = await loop_gaps(pooled)
+        finally:
+            executor.shutdown()
+
+        median = offloaded[len(offloaded) // 2]
+        print(f"\nevent loop during 200 signs: inline stalled {blocked[-1] * 1000:.1f}ms, "
+              f"executor {len(offloaded)} ticks, median gap {median * 1000:.2f}ms")
+        assert len(blocked) <= 2  # the loop never ran while signing inline
+        assert len(offloaded) >= 20 and median < 0.005
+        assert offloaded[-1] < blocked[-1]
+
+    @pytest.mark.asyncio
+    async def test_verify_many_isolates_malformed_keys(self, private_key):
+        executor = CryptoExecutor(max_workers=2)
+        try:
+            signature = rsa_pss_sign(private_key, b"mandate")
+            bad_pem = "-----BEGIN PUBLIC KEY-----\nnope\n-----END PUBLIC KEY-----"
+            results = await executor.verify_many([
+                (_pem(private_key), signature, b"mandate"),
+                (bad_pem, signature, b"mandate"),
+                (private_key.public_key(), signature, b"tampered"),
+                (private_key.public_key(), signature, b"mandate"),
+            ])
+            assert results == [True, False, False, True]
+            assert (executor.verified, executor.rejected) == (2, 2)
+        finally:
+            executor.shutdown()
+
+
+class TestAsyncMandateValidators:
+    """Test suite for the validators' executor-backed paths"""
+
+    @pytest.mark.asyncio
+    async def test_signed_mandate_round_trips_between_sync_and_async(self):
+        key_manager = KeyManager()
+        key_manager.generate_key_pair("signer")
+        validator = CryptographicMandateValidator(key_manager, CryptoExecutor(max_workers=2))
+
+        signed = await validator.create_signed_mandate_async(copy.deepcopy(MANDATE))
+        assert validator.verify_signed_mandate(signed)
+        assert await validator.verify_signed_mandate_async(signed)
+        assert await validator.verify_signed_mandate_async(validator.create_signed_mandate(copy.deepcopy(MANDATE)))
+
+        signed["mandate"]["constraints"]["max_amount"] = 25000
+        assert not await validator.verify_signed_mandate_async(signed)
+        validator.crypto.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_ap2_validator_reuses_parsed_keys(self, private_key):
+        executor = CryptoExecutor(max_workers=2)
+        pem = _pem(private_key)
+        message = json.dumps(MANDATE, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        signature = base64.b64encode(rsa_pss_sign(private_key, message)).decode("utf-8")
+
+        validator = AP2MandateValidator(pem, crypto_executor=executor)
+        for _ in range(3):
+            assert await validator.verify_mandate_from_dict_async(MANDATE, signature, public_key=pem)
+        assert validator.verify_mandate_from_dict(MANDATE, signature)
+        assert not await validator.verify_mandate_from_dict_async({**MANDATE, "userId": "user-2"}, signature)
+        assert executor.keys.get_stats()["misses"] == 1
+        executor.shutdown()
@@ -0,0 +1,289 @@
+"""
+Event Backplane Test Suite
+Tests cross-worker delivery for the SSE transport and A2A task streams,
+with several "workers" sharing one in-process hub or one Redis server
+"""
+
+import asyncio
+import json
+from datetime import timedelta
+import pytest
+
+from ..core.a2a_integration import A2ATaskRequest, A2ATaskResult
+from ..core.a2a_streaming_tasks import A2ATaskStreamManager
+from ..core.event_backplane import InProcessBackplane, InProcessBackplaneHub, RedisStreamsBackplane
+from ..core.mcp_sse_transport import MCPSSEEvent, MCPSSETransportManager
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.fixture
+def workers():
+    hub = InProcessBackplaneHub()
+    return [MCPSSETransportManager(backplane=InProcessBackplane(hub, worker_id=f"worker-{i}")) for i in range(3)]
+
+
+class TestInProcessBackplane:
+    """Test suite for the in-process backplane"""
+
+    @pytest.mark.asyncio
+    async def test_publish_reaches_other_members_only(self):
+        hub = InProcessBackplaneHub()
+        first, second = InProcessBackplane(hub), InProcessBackplane(hub)
+        received = {"first": [], "second": []}
+
+        async def on_first(message):
+            received["first"].append(message)
+
+        async def on_second(message):
+            received["second"].append(message)
+
+        await first.subscribe("events", on_first)
+        await second.subscribe("events", on_second)
+        assert await first.publish("events", {"n": 1})
+
+        assert received == {"first": [], "second": [{"n": 1}]}
+
+
+class TestTransportAcrossWorkers:
+    """Test suite for MCPSSETransportManager over a shared backplane"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_clients_on_every_worker_once(self, workers):
+        queues = []
+        for i, worker in enumerate(workers):
+            queue = await worker.connect_client(f"client-{i}", {})
+            await worker.subscribe_client(f"client-{i}", "resources")
+            _drain(queue)
+            queues.append(queue)
+
+        await workers[0].broadcast_event(MCPSSEEvent(event_type="resource_updated", data={"uri": "x"}), "resources")
+
+        payloads = [_drain(queue) for queue in queues]
+        assert all(len(received) == 1 for received in payloads)
+        # Same sequence id on every worker, so clients can resume anywhere
+        assert len({received[0] for received in payloads}) == 1
+        assert payloads[0][0].split(b"\n")[1] == b"event: resource_updated"
+
+    @pytest.mark.asyncio
+    async def test_event_ids_are_ordered_across_workers(self, workers):
+        """A worker whose clock lags still issues ids above those already seen elsewhere"""
+        await workers[2].connect_client("client", {})
+        workers[0]._clock.observe(workers[0]._clock.next() + 10 ** 9)  # first worker's clock runs ahead
+        first = MCPSSEEvent(event_type="resource_updated", data={"n": 1})
+        second = MCPSSEEvent(event_type="resource_updated", data={"n": 2})
+
+        await workers[0].broadcast_event(first, "resources")
+        await workers[1].broadcast_event(second, "resources")
+
+        assert int(second.id) > int(first.id)
+        assert [entry[0] for entry in workers[2].replay_events(["resources"], int(first.id) - 1)] == [
+            int(first.id), int(second.id)]
+
+    @pytest.mark.asyncio
+    async def test_send_to_client_on_another_worker(self, workers):
+        queue = await workers[2].connect_client("remote-client", {})
+        _drain(queue)
+
+        delivered_locally = await workers[0].send_to_client(
+            "remote-client", MCPSSEEvent(event_type="tool_executed", data={"tool": "search"}))
+
+        assert not delivered_locally
+        assert _drain(queue) == [b'event: tool_executed\ndata: {"tool": "search"}\n\n']
+
+    @pytest.mark.asyncio
+    async def test_stopped_worker_stops_receiving(self, workers):
+        queue = await workers[1].connect_client("client", {})
+        _drain(queue)
+        await workers[1].stop()
+
+        await workers[0].broadcast_event(MCPSSEEvent(event_type="ping", data={}))
+        assert _drain(queue) == [None]
+
+
+class TestTaskStreamAcrossWorkers:
+    """Test suite for A2ATaskStreamManager over a shared backplane"""
+
+    @staticmethod
+    async def _owned_task(owner, task_id="task-1"):
+        owner.create_task_stream(task_id, A2ATaskRequest(task_id=task_id, capability="booking", input={}))
+        await asyncio.sleep(0)  # owner record and task_created published
+
+    @pytest.mark.asyncio
+    async def test_task_streamed_from_another_worker(self):
+        hub = InProcessBackplaneHub()
+        owner = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        follower = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        await self._owned_task(owner)
+
+        stream = follower.get_task_stream("task-1")
+        first_chunk = await stream.__anext__()  # heartbeat; follower is now subscribed
+        assert '"heartbeat"' in first_chunk
+
+        await owner.update_task_progress("task-1", "searching", completed_steps=1, total_steps=2)
+        await owner.complete_task("task-1", A2ATaskResult(task_id="task-1", status="completed", output={"ok": 1}))
+
+        events = [json.loads(chunk.split("data: ", 1)[1]) async for chunk in stream]
+        assert [event["event_type"] for event in events] == ["task_progress", "task_completed"]
+        assert events[1]["data"]["result"]["output"] == {"ok": 1}
+        assert follower.task_metadata == {} and follower.active_streams == {}
+
+    @pytest.mark.asyncio
+    async def test_unknown_task_without_backplane_is_not_found(self):
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException):
+            await A2ATaskStreamManager().get_task_stream("missing").__anext__()
+
+    @pytest.mark.asyncio
+    async def test_unknown_task_with_backplane_is_not_found_and_leaves_nothing(self):
+        from fastapi import HTTPException
+
+        follower = A2ATaskStreamManager(backplane=InProcessBackplane(InProcessBackplaneHub()))
+        with pytest.raises(HTTPException) as missing:
+            await follower.get_task_stream("bogus").__anext__()
+        assert missing.value.status_code == 404
+        assert follower.task_metadata == {} and follower.active_streams == {}
+
+    @pytest.mark.asyncio
+    async def test_mirror_is_dropped_with_its_last_subscriber(self):
+        hub = InProcessBackplaneHub()
+        owner = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        follower = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        await self._owned_task(owner)
+
+        first, second = follower.get_task_stream("task-1"), follower.get_task_stream("task-1")
+        await first.__anext__()
+        await second.__anext__()
+        await first.aclose()
+        assert "task-1" in follower.task_metadata
+        await second.aclose()
+        assert follower.task_metadata == {} and follower.active_streams == {}
+
+    @pytest.mark.asyncio
+    async def test_mirror_stops_when_the_owner_record_goes(self):
+        hub = InProcessBackplaneHub()
+        owner = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        follower = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        follower.heartbeat_interval = timedelta(milliseconds=10)
+        await self._owned_task(owner)
+
+        stream = follower.get_task_stream("task-1")
+        await stream.__anext__()
+        await owner.backplane.clear_owner("a2a_task:task-1")  # owner worker gone, no terminal event
+
+        chunks = await asyncio.wait_for(_collect(stream), 1)
+        assert all('"heartbeat"' in chunk or '"task_progress"' in chunk for chunk in chunks)
+        assert follower.task_metadata == {}
+        assert not await follower.task_exists("task-1")
+
+    @pytest.mark.asyncio
+    async def test_finished_task_releases_its_owner_record(self):
+        hub = InProcessBackplaneHub()
+        owner = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        follower = A2ATaskStreamManager(backplane=InProcessBackplane(hub))
+        await self._owned_task(owner)
+        assert await follower.task_exists("task-1")
+
+        await owner.cancel_task("task-1")
+        assert not await follower.task_exists("task-1")
+
+
+class TestOwnerRecords:
+    """Test suite for backplane owner records"""
+
+    @pytest.mark.asyncio
+    async def test_in_process_records_expire(self):
+        hub = InProcessBackplaneHub()
+        first, second = InProcessBackplane(hub, worker_id="a"), InProcessBackplane(hub, worker_id="b")
+        assert await first.set_owner("task", 60)
+        assert await second.get_owner("task") == "a"
+
+        await second.clear_owner("task")  # not second's to clear
+        assert await second.get_owner("task") == "a"
+        await first.set_owner("task", 0)
+        assert await second.get_owner("task") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_records_are_shared(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        first = RedisStreamsBackplane(fakeredis.aioredis.FakeRedis(server=server), worker_id="a")
+        second = RedisStreamsBackplane(fakeredis.aioredis.FakeRedis(server=server), worker_id="b")
+
+        await first.set_owner("task", 60)
+        assert await second.get_owner("task") == "a"
+        assert 0 < await first.redis_client.ttl("bais:backplane-owner:task") <= 60
+        await first.clear_owner("task")
+        assert await second.get_owner("task") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_sequence_is_shared(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        server = fakeredis.FakeServer()
+        first = RedisStreamsBackplane(fakeredis.aioredis.FakeRedis(server=server), worker_id="a")
+        second = RedisStreamsBackplane(fakeredis.aioredis.FakeRedis(server=server), worker_id="b")
+        floor = 1_700_000_000_000_000
+
+        assert await first.next_sequence("events", floor) == floor
+        assert await second.next_sequence("events", floor - 5) == floor + 1
+        assert await first.next_sequence("events", floor + 100) == floor + 100
+
+
+class TestRedisStreamsBackplane:
+    """Test suite for the Redis Streams backplane"""
+
+    @pytest.mark.asyncio
+    async def test_messages_cross_workers_through_streams(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        first = RedisStreamsBackplane(fakeredis.aioredis.FakeRedis(server=server), worker_id="a", block_ms=10)
+        second = RedisStreamsBackplane(fakeredis.aioredis.FakeRedis(server=server), worker_id="b", block_ms=10)
+        received = {"a": [], "b": []}
+
+        async def on_first(message):
+            received["a"].append(message)
+
+        async def on_second(message):
+            received["b"].append(message)
+
+        await first.publish("events", {"n": 0})  # before anyone subscribed: not replayed
+        await first.subscribe("events", on_first)
+        await second.subscribe("events", on_second)
+        try:
+            await first.publish("events", {"n": 1})
+            await second.publish("events", {"n": 2})
+            for _ in range(100):
+                if received["a"] and received["b"]:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await first.stop()
+            await second.stop()
+
+        assert received == {"a": [{"n": 2}], "b": [{"n": 1}]}
+        assert first.get_stats()["published"] == 2
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_is_contained(self):
+        class DownRedis:
+            async def xadd(self, *args, **kwargs):
+                raise ConnectionError("redis down")
+
+        backplane = RedisStreamsBackplane(DownRedis())
+        manager = MCPSSETransportManager(backplane=backplane)
+        assert not await backplane.publish("events", {"n": 1})
+        event = MCPSSEEvent(event_type="ping", data={})
+        assert await manager.broadcast_event(event) == 0
+        assert backplane.publish_errors == 2
+        assert backplane.sequence_errors == 1 and int(event.id) > 0  # fell back to a local id
@@ -0,0 +1,247 @@
+"""
+Geospatial Search Test Suite
+Tests "near me" search for bais_search_businesses across the grid index,
+the in-memory store and the SQLite database path
+"""
+
+import random
+import pytest
+
+from ..core.business_store import IndexedBusinessStore
+from ..core.geo_index import GeoGridIndex, haversine_km, location_coordinates, parse_coordinates
+from ..core.universal_tools import BAISUniversalToolHandler
+
+LAS_VEGAS = (36.1699, -115.1398)
+HENDERSON = (36.0395, -114.9817)
+SPRINGDALE = (37.1889, -112.9986)
+
+
+def _business(name, coordinates, business_type="service", services=()):
+    latitude, longitude = coordinates
+    return {
+        "business_name": name, "business_type": business_type,
+        "business_info": {"description": f"{name} description"},
+        "location": {"city": "", "state": "", "latitude": latitude, "longitude": longitude},
+        "services_config": [{"id": s.lower().replace(" ", "-"), "name": s} for s in services],
+    }
+
+
+class TestCoordinateParsing:
+    """Test suite for the `near` input and registration location parsing"""
+
+    @pytest.mark.parametrize("near", [
+        {"latitude": 36.17, "longitude": -115.14},
+        {"lat": 36.17, "lng": -115.14},
+        [36.17, -115.14],
+        "36.17, -115.14",
+    ])
+    def test_accepted_forms(self, near):
+        assert parse_coordinates(near) == (36.17, -115.14)
+
+    @pytest.mark.parametrize("near", [None, {}, "Las Vegas", [91, 0], {"latitude": 0, "longitude": 181}])
+    def test_invalid_forms(self, near):
+        assert parse_coordinates(near) is None
+
+    def test_location_block(self):
+        assert location_coordinates({"latitude": "36.17", "longitude": "-115.14"}) == (36.17, -115.14)
+        assert location_coordinates({"coordinates": {"lat": 1, "lon": 2}}) == (1.0, 2.0)
+        assert location_coordinates({"city": "Las Vegas"}) is None
+
+
+class TestGeoGridIndex:
+    """Test suite for the in-process grid index"""
+
+    @pytest.fixture
+    def points(self):
+        rng = random.Random(7)
+        points = {f"biz-{i}": (rng.uniform(30, 45), rng.uniform(-125, -100)) for i in range(2000)}
+        # Near the poles and across the antimeridian
+        points.update({"arctic": (89.9, 10.0), "fiji-east": (-17.7, 179.9), "fiji-west": (-17.7, -179.9)})
+        return points
+
+    @pytest.fixture
+    def grid(self, points):
+        grid = GeoGridIndex()
+        for business_id, (latitude, longitude) in points.items():
+            grid.add(business_id, latitude, longitude)
+        return grid
+
+    def _brute_force(self, points, latitude, longitude, radius_km):
+        distances = sorted(
+            (haversine_km(latitude, longitude, lat, lon), business_id)
+            for business_id, (lat, lon) in points.items()
+        )
+        return [business_id for distance, business_id in distances if distance <= radius_km]
+
+    @pytest.mark.parametrize("origin", [LAS_VEGAS, SPRINGDALE, (40.0, -110.0)])
+    def test_nearest_matches_brute_force(self, grid, points, origin):
+        results = grid.nearest(*origin, limit=25)
+        assert [business_id for business_id, _ in results] == self._brute_force(points, *origin, 1e9)[:25]
+        distances = [distance for _, distance in results]
+        assert distances == sorted(distances)
+
+    def test_radius_returns_everything_inside(self, grid, points):
+        results = grid.nearest(*LAS_VEGAS, limit=None, radius_km=150)
+        assert [business_id for business_id, _ in results] == self._brute_force(points, *LAS_VEGAS, 150)
+
+    def test_antimeridian_neighbours(self, grid):
+        results = grid.nearest(-17.7, 179.95, limit=2)
+        assert {business_id for business_id, _ in results} == {"fiji-east", "fiji-west"}
+        assert all(distance < 20 for _, distance in results)
+
+    def test_predicate_and_removal(self, grid):
+        nearest_id = grid.nearest(*LAS_VEGAS, limit=1)[0][0]
+        assert grid.nearest(*LAS_VEGAS, limit=1, predicate=lambda business_id: business_id != nearest_id)[0][0] \
+            != nearest_id
+        grid.remove(nearest_id)
+        assert nearest_id not in grid
+        assert grid.nearest(*LAS_VEGAS, limit=1)[0][0] != nearest_id
+
+    def test_far_points_beyond_default_horizon_are_excluded(self, grid):
+        assert grid.nearest(0.0, 0.0, limit=5) == []
+
+    @pytest.mark.parametrize("radius_km", [None, 450])
+    @pytest.mark.parametrize("latitude", [60.0, 65.0, 70.0, -68.0])
+    def test_high_latitude_search_visits_bounded_cells(self, latitude, radius_km):
+        rng = random.Random(11)
+        points = {f"north-{i}": (latitude + rng.uniform(-4, 4), 20 + rng.uniform(-15, 15)) for i in range(40)}
+        grid = GeoGridIndex()
+        for business_id, (lat, lon) in points.items():
+            grid.add(business_id, lat, lon)
+
+        class CountingCells(dict):
+            lookups = 0
+
+            def get(self, key, default=None):
+                CountingCells.lookups += 1
+                return super().get(key, default)
+
+        grid._cells = CountingCells(grid._cells)
+        results = grid.nearest(latitude, 20.0, limit=100, radius_km=radius_km)
+
+        expected = self._brute_force(points, latitude, 20.0, radius_km or 500)
+        assert [business_id for business_id, _ in results] == expected
+        assert len(expected) < 100  # fewer hits than the limit, so the walk runs to the horizon
+        assert CountingCells.lookups < grid._rows * grid._columns // 100
+
+
+class TestStoreNearbySearch:
+    """Test suite for nearby search over BUSINESS_STORE"""
+
+    @pytest.fixture
+    def store(self):
+        store = IndexedBusinessStore()
+        store["vegas-spa"] = _business("Vegas Day Spa", LAS_VEGAS, "healthcare", ["Massage"])
+        store["henderson-spa"] = _business("Henderson Spa", HENDERSON, "healthcare", ["Massage"])
+        store["zion-brewing"] = _business("Zion Brewing", SPRINGDALE, "restaurant", ["Tasting"])
+        store["no-coordinates"] = {"business_name": "Somewhere Spa", "location": {"city": "Reno"}}
+        return store
+
+    def test_nearest_first_with_query_and_radius(self, store):
+        origin = (36.10, -115.05)
+        assert [business_id for business_id, _ in store.nearby(*origin, query="spa")] == \
+            ["henderson-spa", "vegas-spa"]
+        assert [business_id for business_id, _ in store.nearby(*origin, radius_km=500)] == \
+            ["henderson-spa", "vegas-spa", "zion-brewing"]
+        assert store.nearby(*origin, radius_km=1) == []
+        assert [business_id for business_id, _ in store.nearby(*origin, category="restaurant")] == ["zion-brewing"]
+
+    def test_moves_and_deletes_update_the_grid(self, store):
+        store["zion-brewing"] = _business("Zion Brewing", LAS_VEGAS, "restaurant")
+        assert store.nearby(*LAS_VEGAS, radius_km=1, category="restaurant")[0][0] == "zion-brewing"
+        del store["zion-brewing"]
+        assert store.nearby(*LAS_VEGAS, category="restaurant") == []
+
+
+class TestGeoToolHandler:
+    """Test suite for `near` / `radius_km` in BAISUniversalToolHandler.search_businesses"""
+
+    @pytest.fixture
+    def sqlite_db_manager(self, tmp_path):
+        from ..core.database_models import Business, DatabaseManager
+
+        db_manager = DatabaseManager(f"sqlite:///{tmp_path / 'geo.db'}")
+        db_manager.create_tables()
+        with db_manager.get_session() as session:
+            for external_id, name, (latitude, longitude) in [
+                ("vegas-spa", "Vegas Day Spa", LAS_VEGAS),
+                ("henderson-spa", "Henderson Spa", HENDERSON),
+                ("zion-brewing", "Zion Brewing", SPRINGDALE),
+            ]:
+                session.add(Business(
+                    external_id=external_id, name=name, business_type="service", description=name,
+                    address="1 Main St", city="", state="NV", latitude=latitude, longitude=longitude,
+                    mcp_endpoint="/mcp", a2a_endpoint="/a2a", status="active"
+                ))
+            session.commit()
+        yield db_manager
+        db_manager.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_results_ordered_by_distance(self, sqlite_db_manager):
+        handler = BAISUniversalToolHandler(db_manager=sqlite_db_manager)
+        results = await handler.search_businesses(
+            "spa", near={"latitude": 36.10, "longitude": -115.05}, radius_km=50
+        )
+
+        assert [b["business_id"] for b in results] == ["henderson-spa", "vegas-spa"]
+        assert results[0]["distance_km"] < results[1]["distance_km"] < 50
+
+    @pytest.mark.asyncio
+    async def test_near_overrides_location_text(self, sqlite_db_manager):
+        handler = BAISUniversalToolHandler(db_manager=sqlite_db_manager)
+        results = await handler.search_businesses(
+            "", location="Nowhere City", near=list(SPRINGDALE), radius_km=5
+        )
+
+        assert [b["business_id"] for b in results] == ["zion-brewing"]
+
+    @pytest.mark.asyncio
+    async def test_store_fallback_is_nearest_first(self, monkeypatch):
+        from .. import shared_storage
+        from ..core import universal_tools
+
+        monkeypatch.delenv("DATABASE_URL", raising=False)
+        monkeypatch.setattr(universal_tools, "_get_shared_storage", lambda: shared_storage)
+        shared_storage.clear_business_store()
+        shared_storage.register_business("vegas-spa", _business("Vegas Day Spa", LAS_VEGAS))
+        shared_storage.register_business("henderson-spa", _business("Henderson Spa", HENDERSON))
+        try:
+            results = await BAISUniversalToolHandler().search_businesses("spa", near="36.17,-115.14")
+        finally:
+            shared_storage.clear_business_store()
+
+        assert [b["business_id"] for b in results] == ["vegas-spa", "henderson-spa"]
+        assert results[0]["distance_km"] < 1
+
+
+class TestPostgresGeoCapabilities:
+    """Test suite for the spatial index lookup on the request path"""
+
+    def test_request_path_runs_no_ddl(self, monkeypatch):
+        """Set BAIS_TEST_POSTGRES_URL (a scratch database) to run against PostgreSQL"""
+        import os
+        from sqlalchemy import event
+        from ..core import geo_index
+        from ..core.database_models import DatabaseManager
+
+        database_url = os.getenv("BAIS_TEST_POSTGRES_URL")
+        if not database_url:
+            pytest.skip("BAIS_TEST_POSTGRES_URL not set")
+        db_manager = DatabaseManager(database_url)
+        try:
+            db_manager.create_tables()
+            startup = geo_index.ensure_postgres_geo_index(db_manager.engine)
+
+            # Another worker: nothing cached, so the catalog is read
+            monkeypatch.setattr(geo_index, "_postgres_geo_capabilities", {})
+            statements = []
+            event.listen(db_manager.engine, "before_cursor_execute",
+                         lambda conn, cursor, statement, *args: statements.append(statement))
+            assert geo_index.postgres_geo_capabilities(db_manager.engine) == startup
+            assert geo_index.postgres_geo_capabilities(db_manager.engine) == startup
+        finally:
+            db_manager.close()
+
+        assert statements and not any("CREATE" in statement.upper() for statement in statements)
+        assert len(statements) == 2  # one catalog read, then cached
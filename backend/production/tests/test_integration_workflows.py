@@ -208,6 +208,7 @@ class TestWorkflowEventBus:
         )
         
         await workflow_event_bus.publish(event)
+        await workflow_event_bus.drain()
         
         # Assert
         assert len(events_received) == 1
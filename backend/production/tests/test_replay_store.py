@@ -0,0 +1,288 @@
+"""
+Replay Store Test Suite
+Tests the rotating Bloom filter window, the Redis SET NX EX store and its
+fallback, mandate nonce redemption, and a check throughput benchmark
+"""
+
+import json
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from ..api.middleware import ap2_auth
+from ..core.canonical_json import canonicalize
+from ..core.payments import replay_store
+from ..core.payments.crypto_executor import rsa_pss_sign
+from ..core.payments.cryptographic_mandate_validator import CryptographicMandateValidator, KeyManager
+from ..core.payments.replay_store import (
+    MANDATE_NONCE_NAMESPACE,
+    WEBHOOK_NAMESPACE,
+    BloomReplayStore,
+    RedisReplayStore,
+    get_replay_store,
+)
+
+MANDATE = {"type": "cart", "userId": "user-1", "totalAmount": 120}
+
+
+class FakeRequest:
+    """Just enough of a Starlette request for AP2AuthMiddleware"""
+
+    method = "GET"
+
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestBloomReplayStore:
+    """Test suite for the in-process rotating Bloom filter store"""
+
+    @pytest.mark.asyncio
+    async def test_second_sighting_is_a_replay(self):
+        store = BloomReplayStore(window_seconds=300, capacity=1000)
+        assert not await store.check_and_record("webhook-1")
+        assert await store.check_and_record("webhook-1")
+        assert not await store.check_and_record("webhook-2")
+        assert (store.checks, store.replays) == (3, 1)
+
+    def test_key_lives_for_the_window_then_expires(self):
+        clock = FakeClock()
+        store = BloomReplayStore(window_seconds=300, capacity=1000, buckets=6, clock=clock)
+        assert not store.seen("nonce")
+
+        clock.now += 299
+        assert store.seen("nonce")
+        clock.now += 60 + 1  # past the window plus one bucket
+        assert not store.seen("nonce")
+
+    def test_memory_is_bounded_by_bucket_count(self):
+        clock = FakeClock()
+        store = BloomReplayStore(window_seconds=300, capacity=5000, buckets=4, clock=clock)
+        for n in range(10000):
+            clock.now += 0.5
+            store.seen(f"webhook-{n}")
+
+        stats = store.get_stats()
+        assert stats["buckets"] <= 4
+        assert stats["memory_bytes"] <= 4 * store._size_bytes
+        assert stats["replays"] == 0 and stats["saturated_buckets"] == 0
+
+    def test_no_false_positives_at_capacity(self):
+        store = BloomReplayStore(window_seconds=300, capacity=50000, buckets=2)
+        assert not any(store.seen(f"webhook-{n}") for n in range(50000))
+        assert all(store.seen(f"webhook-{n}") for n in range(0, 50000, 97))
+
+    def test_overflow_is_reported(self):
+        store = BloomReplayStore(window_seconds=300, capacity=10, buckets=2)
+        for n in range(12):
+            store.seen(f"webhook-{n}")
+        assert store.get_stats()["saturated_buckets"] == 1
+
+    @pytest.mark.asyncio
+    async def test_claim_is_recorded_only_on_commit(self):
+        store = BloomReplayStore(window_seconds=300, capacity=1000)
+        assert await store.claim("webhook-1")
+        assert not await store.claim("webhook-1")  # concurrent duplicate while processing
+        await store.release("webhook-1")  # processing failed
+        assert await store.claim("webhook-1")  # the provider's retry is accepted
+        await store.commit("webhook-1")
+        assert not await store.claim("webhook-1")
+        assert await store.check_and_record("webhook-1")
+        assert store.get_stats()["claims"] == 0
+
+    def test_needs_two_buckets(self):
+        with pytest.raises(ValueError):
+            BloomReplayStore(buckets=1)
+
+
+class TestRedisReplayStore:
+    """Test suite for the shared Redis store"""
+
+    @pytest.mark.asyncio
+    async def test_workers_share_one_window(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        first = RedisReplayStore(fakeredis.aioredis.FakeRedis(server=server), window_seconds=300)
+        second = RedisReplayStore(fakeredis.aioredis.FakeRedis(server=server), window_seconds=300)
+
+        assert not await first.check_and_record("webhook-1")
+        assert await second.check_and_record("webhook-1")
+        assert 0 < await first.redis_client.ttl("bais:replay:webhooks:webhook-1") <= 300
+
+        nonces = RedisReplayStore(first.redis_client, namespace=MANDATE_NONCE_NAMESPACE)
+        assert not await nonces.check_and_record("webhook-1")
+
+    @pytest.mark.asyncio
+    async def test_claim_leases_then_commit_holds_for_the_window(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.aioredis.FakeRedis()
+        store = RedisReplayStore(client, window_seconds=300, claim_lease_seconds=30)
+        key = "bais:replay:webhooks:webhook-1"
+
+        assert await store.claim("webhook-1")
+        assert not await RedisReplayStore(client, window_seconds=300).claim("webhook-1")
+        assert 0 < await client.ttl(key) <= 30
+        await store.release("webhook-1")
+        assert await client.get(key) is None
+
+        assert await store.claim("webhook-1")
+        await store.commit("webhook-1")
+        assert 30 < await client.ttl(key) <= 300
+        assert not await store.claim("webhook-1")
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_window_when_redis_fails(self):
+        class DownRedis:
+            async def set(self, *args, **kwargs):
+                raise ConnectionError("redis down")
+
+        store = RedisReplayStore(DownRedis(), window_seconds=300)
+        assert not await store.check_and_record("webhook-1")
+        assert await store.check_and_record("webhook-1")
+        assert store.get_stats()["fallbacks"] == 2
+
+        assert await store.claim("webhook-2")
+        await store.release("webhook-2")
+        assert await store.claim("webhook-2")
+        await store.commit("webhook-2")
+        assert not await store.claim("webhook-2")
+
+
+class TestGetReplayStore:
+    """Test suite for the per-namespace store factory"""
+
+    def test_one_store_per_namespace_with_its_window(self, monkeypatch):
+        monkeypatch.setenv("BAIS_REPLAY_STORE", "memory")
+        monkeypatch.setattr(replay_store, "_replay_stores", {})
+
+        webhooks = get_replay_store(WEBHOOK_NAMESPACE)
+        assert isinstance(webhooks, BloomReplayStore)
+        assert get_replay_store(WEBHOOK_NAMESPACE) is webhooks
+        assert get_replay_store(MANDATE_NONCE_NAMESPACE).window_seconds == 24 * 3600
+
+
+class TestMandateNonceRedemption:
+    """Test suite for single-use mandate nonces"""
+
+    @pytest.mark.asyncio
+    async def test_nonce_redeems_once(self):
+        key_manager = KeyManager()
+        key_manager.generate_key_pair("issuer")
+        validator = CryptographicMandateValidator(key_manager, nonce_store=BloomReplayStore(capacity=1000))
+
+        signed = await validator.create_signed_mandate_async(dict(MANDATE))
+        assert await validator.redeem_signed_mandate_async(signed)
+        assert not await validator.redeem_signed_mandate_async(signed)
+        assert await validator.verify_signed_mandate_async(signed)  # plain verification is repeatable
+
+        tampered = await validator.create_signed_mandate_async(dict(MANDATE))
+        tampered["mandate"]["totalAmount"] = 1
+        assert not await validator.redeem_signed_mandate_async(tampered)
+        tampered["mandate"]["totalAmount"] = 120
+        assert await validator.redeem_signed_mandate_async(tampered)  # a failed check does not burn the nonce
+
+    @pytest.mark.asyncio
+    async def test_failed_payment_leaves_cart_mandate_redeemable(self):
+        httpx = pytest.importorskip("httpx")
+        from ..core.payments.ap2_client import AP2Client, AP2ClientConfig
+        from ..core.payments.models import PaymentMethod, PaymentMethodType
+
+        key_manager = KeyManager()
+        key_manager.generate_key_pair("issuer")
+        validator = CryptographicMandateValidator(key_manager, nonce_store=BloomReplayStore(capacity=1000))
+        signed = await validator.create_signed_mandate_async({
+            **MANDATE, "id": "cart-1", "businessId": "biz-1", "signature": "detached",
+            "createdAt": "2026-10-16T12:00:00"
+        })
+        transaction = {
+            "id": "txn-1", "cartMandateId": "cart-1", "amount": 120, "currency": "USD", "status": "completed",
+            "paymentMethod": {"id": "pm-1", "type": "credit_card", "displayName": "Visa"},
+            "createdAt": "2026-10-16T12:01:00"
+        }
+        transaction_statuses = [503, 200]
+
+        def ap2_network(request):
+            if request.method == "GET":
+                return httpx.Response(200, json=signed)
+            return httpx.Response(transaction_statuses.pop(0), json=transaction)
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        client = AP2Client(AP2ClientConfig(
+            base_url="https://ap2.test", client_id="bais",
+            private_key=private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()
+            ).decode("utf-8"),
+            public_key=key_manager.export_public_key_pem("issuer")
+        ))
+        client._crypto_validator = validator
+        client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(ap2_network))
+        method = PaymentMethod(id="pm-1", type=PaymentMethodType.CREDIT_CARD, display_name="Visa")
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.execute_payment("cart-1", method)  # transient processor failure
+        assert (await client.execute_payment("cart-1", method)).id == "txn-1"
+        with pytest.raises(ValueError, match="already redeemed"):
+            await client.execute_payment("cart-1", method)
+        await client._http_client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_auth_middleware_redeems_cart_mandates(self, monkeypatch):
+        monkeypatch.setenv("BAIS_REPLAY_STORE", "memory")
+        monkeypatch.setattr(replay_store, "_replay_stores", {})
+        monkeypatch.setattr(ap2_auth, "is_ap2_enabled", lambda: True)
+        middleware = ap2_auth.AP2AuthMiddleware()
+
+        signed = await ap2_auth.get_mandate_validator().create_signed_mandate_async(dict(MANDATE))
+        request = FakeRequest({"X-AP2-Mandate": json.dumps(signed)})
+        assert (await middleware.authenticate_request(request, "cart", redeem=True))["mandate_type"] == "cart"
+        with pytest.raises(ap2_auth.AP2AuthenticationError, match="already been used"):
+            await middleware.authenticate_request(request, "cart", redeem=True)
+        assert await middleware.authenticate_request(request)  # plain authentication stays repeatable
+        with pytest.raises(ap2_auth.AP2MandateTypeError):
+            await middleware.authenticate_request(request, "intent")
+
+        # Detached signatures (AP2Client format) are redeemed by signature
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        pem = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+        request = FakeRequest({
+            "X-AP2-Mandate": json.dumps(MANDATE),
+            "X-AP2-Signature": rsa_pss_sign(private_key, canonicalize(MANDATE)).hex(),
+            "X-AP2-Public-Key": pem,
+        })
+        assert await middleware.authenticate_request(request, "cart", redeem=True)
+        with pytest.raises(ap2_auth.AP2AuthenticationError, match="already been used"):
+            await middleware.authenticate_request(request, "cart", redeem=True)
+
+
+class TestReplayStoreBenchmark:
+    """Throughput benchmark for the in-process store"""
+
+    @pytest.mark.slow
+    def test_check_throughput(self):
+        store = BloomReplayStore()
+        keys = [f"webhook-{n:08d}" for n in range(100000)]
+
+        started = time.perf_counter()
+        for key in keys:
+            store.seen(key)
+        elapsed = time.perf_counter() - started
+
+        stats = store.get_stats()
+        print(f"\nreplay store: {len(keys) / elapsed:,.0f} checks/s, k={stats['hash_count']}, "
+              f"{stats['memory_bytes'] / 1e6:.1f}MB for {stats['bucket_capacity']:,} keys per bucket")
+        assert stats["replays"] == 0
+        assert len(keys) / elapsed > 10000
@@ -0,0 +1,161 @@
+"""
+Signature Suite Test Suite
+Tests RS256, ES256 and EdDSA mandate signatures, algorithm negotiation,
+verifiable credential proofs per suite, and a suite benchmark
+"""
+
+import base64
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+
+from ..core.payments.crypto_executor import (
+    EDDSA,
+    ES256,
+    RS256,
+    CryptoExecutor,
+    algorithm_for_key,
+    generate_private_key,
+    normalize_algorithm,
+    sign_message,
+    verify_message,
+)
+from ..core.payments.cryptographic_mandate_validator import CryptographicMandateValidator, KeyManager
+from ..core.payments.verifiable_credential import ProofType, VDCManager
+from ..core.exceptions import ValidationError
+
+SUITES = (RS256, ES256, EDDSA)
+MANDATE = {"type": "intent", "userId": "user-1", "businessId": "biz-1", "constraints": {"max_amount": 250}}
+
+
+@pytest.fixture(scope="module")
+def key_manager():
+    manager = KeyManager()
+    for algorithm in SUITES:
+        manager.generate_key_pair(f"{algorithm.lower()}-key", algorithm=algorithm)
+    return manager
+
+
+@pytest.fixture
+def validator(key_manager):
+    executor = CryptoExecutor(max_workers=2)
+    yield CryptographicMandateValidator(key_manager, executor)
+    executor.shutdown()
+
+
+class TestSuites:
+    """Test suite for the raw sign/verify functions"""
+
+    @pytest.mark.parametrize("algorithm,size", [(RS256, 256), (ES256, 64), (EDDSA, 64)])
+    def test_round_trip_and_signature_size(self, algorithm, size):
+        private_key = generate_private_key(algorithm)
+        signature = sign_message(private_key, b"mandate")
+        assert len(signature) == size
+        assert algorithm_for_key(private_key.public_key()) == algorithm
+        assert verify_message(private_key.public_key(), signature, b"mandate", algorithm)
+        assert not verify_message(private_key.public_key(), signature, b"mandate!", algorithm)
+
+    def test_algorithm_must_match_key(self):
+        ed_key = generate_private_key(EDDSA)
+        signature = sign_message(ed_key, b"m")
+        assert not verify_message(ed_key.public_key(), signature, b"m", RS256)
+        with pytest.raises(ValueError):
+            sign_message(ed_key, b"m", ES256)
+        assert normalize_algorithm("ed25519") == EDDSA
+        with pytest.raises(ValueError):
+            normalize_algorithm("HS256")
+
+    @pytest.mark.asyncio
+    async def test_executor_infers_suite_from_pem(self):
+        private_key = generate_private_key(EDDSA)
+        pem = private_key.public_key().public_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+        executor = CryptoExecutor(max_workers=1)
+        try:
+            signature = await executor.sign(private_key, b"mandate")
+            assert await executor.verify(pem, signature, b"mandate")
+        finally:
+            executor.shutdown()
+
+
+class TestMandateNegotiation:
+    """Test suite for algorithm selection in CryptographicMandateValidator"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("algorithm", SUITES)
+    async def test_requested_algorithm_selects_a_matching_key(self, validator, algorithm):
+        signature = validator.sign_mandate(dict(MANDATE), algorithm=algorithm)
+        assert signature.algorithm == algorithm
+        assert signature.key_id == f"{algorithm.lower()}-key"
+        assert validator.verify_mandate(dict(MANDATE), signature)
+
+        signed = await validator.create_signed_mandate_async(dict(MANDATE), key_id=signature.key_id)
+        assert signed["signature"]["algorithm"] == algorithm
+        assert await validator.verify_signed_mandate_async(signed)
+
+    def test_default_uses_current_key_and_rejects_mismatches(self, validator):
+        assert validator.sign_mandate(dict(MANDATE)).algorithm == RS256
+        with pytest.raises(ValidationError):
+            validator.sign_mandate(dict(MANDATE), key_id="eddsa-key", algorithm=ES256)
+        with pytest.raises(ValidationError):
+            validator.sign_mandate(dict(MANDATE), algorithm="HS256")
+
+    def test_relabelled_algorithm_does_not_verify(self, validator):
+        signature = validator.sign_mandate(dict(MANDATE), algorithm=EDDSA)
+        signature.algorithm = RS256
+        assert not validator.verify_mandate(dict(MANDATE), signature)
+
+    @pytest.mark.asyncio
+    async def test_verify_many_mixes_suites(self, validator):
+        signed = [await validator.create_signed_mandate_async(dict(MANDATE), key_id=f"{a.lower()}-key")
+                  for a in SUITES]
+        assert await validator.verify_many(signed) == [True, True, True]
+
+
+class TestCredentialProofs:
+    """Test suite for verifiable credential proofs per suite"""
+
+    @pytest.mark.parametrize("algorithm,proof_type", [
+        (RS256, ProofType.RSA_SIGNATURE),
+        (ES256, ProofType.ECDSA_SIGNATURE),
+        (EDDSA, ProofType.ED25519_SIGNATURE),
+    ])
+    def test_proof_type_follows_issuer_key(self, validator, algorithm, proof_type):
+        manager = VDCManager(validator)
+        credential = manager.create_identity_credential("user-1", {"name": "User"}, f"{algorithm.lower()}-key")
+
+        assert credential.proof.type == proof_type
+        assert manager.verify_credential(credential)
+        credential.credential_subject.properties["name"] = "Someone Else"
+        assert not manager.verify_credential(credential)
+
+
+class TestSuiteBenchmark:
+    """Benchmark comparing the signature suites"""
+
+    @pytest.mark.slow
+    def test_ed25519_is_much_cheaper_than_rsa(self, key_manager):
+        validator = CryptographicMandateValidator(key_manager)
+        rounds = 200
+        results = {}
+        for algorithm in SUITES:
+            key_id = f"{algorithm.lower()}-key"
+            started = time.perf_counter()
+            signatures = [validator.sign_mandate(dict(MANDATE), key_id=key_id) for _ in range(rounds)]
+            sign_us = (time.perf_counter() - started) * 1e6 / rounds
+
+            started = time.perf_counter()
+            assert all(validator.verify_mandate(dict(MANDATE), signature) for signature in signatures)
+            verify_us = (time.perf_counter() - started) * 1e6 / rounds
+
+            size = len(base64.b64decode(signatures[0].signature))
+            results[algorithm] = (sign_us, verify_us, size)
+
+        print()
+        for algorithm, (sign_us, verify_us, size) in results.items():
+            print(f"{algorithm:>6}: sign {sign_us:8.1f}us  verify {verify_us:8.1f}us  signature {size} bytes")
+
+        assert results[EDDSA][0] * 5 < results[RS256][0]
+        assert results[EDDSA][2] == results[ES256][2] == 64 and results[RS256][2] == 256
@@ -0,0 +1,173 @@
+"""
+Slot Inventory Test Suite
+Tests bitmap availability, compare-and-set reservation under concurrency,
+and Booking-table persistence with the unique active-slot index
+"""
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+import pytest
+
+from sqlalchemy import text
+
+from ..core.database_models import AsyncDatabaseManager, booking_slot_index_present
+from ..core.slot_inventory import AvailabilityEngine, DatabaseSlotStore, SlotInventory, SlotSchedule
+
+DAY = ("biz-1", "svc-1", "2026-03-02")
+
+
+@asynccontextmanager
+async def _two_processes(database_url):
+    """Two database managers on one database, as two server processes would have"""
+    first, second = AsyncDatabaseManager(database_url), AsyncDatabaseManager(database_url)
+    await first.create_tables()
+    try:
+        yield first, second
+    finally:
+        await first.close()
+        await second.close()
+
+
+def _booking_fields(n):
+    return {
+        "confirmation_number": f"BK{n:08d}",
+        "agent_id": "agent-1",
+        "customer_name": f"Customer {n}",
+        "customer_email": f"c{n}@example.com",
+        "booking_data": {},
+        "total_amount": 100.0,
+    }
+
+
+class TestSlotSchedule:
+    """Test suite for the slot grid"""
+
+    def test_index_round_trips_and_rejects_off_grid_times(self):
+        schedule = SlotSchedule()
+        assert schedule.slot_count == 16
+        assert [schedule.index_of(schedule.time_of(i)) for i in range(16)] == list(range(16))
+        for time_str in ("08:30", "09:15", "17:00", "noon", None):
+            assert schedule.index_of(time_str) is None
+
+
+class TestSlotInventory:
+    """Test suite for in-memory bitmaps"""
+
+    def test_reserve_and_release_are_compare_and_set(self):
+        inventory = SlotInventory()
+        assert inventory.reserve(DAY, "10:00", "booking-a")
+        assert not inventory.reserve(DAY, "10:00", "booking-b")
+        assert "10:00" not in inventory.available_times(DAY)
+        assert len(inventory.available_times(DAY)) == 15
+
+        assert not inventory.release(DAY, "10:00", "booking-b")
+        assert inventory.release(DAY, "10:00", "booking-a")
+        assert inventory.bitmap(DAY) == 0
+        assert inventory.reserve(DAY, "10:00", "booking-b")
+
+    def test_days_are_independent(self):
+        inventory = SlotInventory()
+        inventory.reserve(DAY, "09:00", "a")
+        assert inventory.is_available(("biz-1", "svc-1", "2026-03-03"), "09:00")
+        assert inventory.is_available(("biz-1", "svc-2", "2026-03-02"), "09:00")
+
+    def test_concurrent_threads_get_one_winner_per_slot(self):
+        inventory = SlotInventory()
+        winners = []
+        barrier = threading.Barrier(32)
+
+        def book(n):
+            barrier.wait()
+            for time_str in ("09:00", "09:30", "10:00"):
+                if inventory.reserve(DAY, time_str, f"booking-{n}"):
+                    winners.append(time_str)
+
+        threads = [threading.Thread(target=book, args=(n,)) for n in range(32)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(winners) == ["09:00", "09:30", "10:00"]
+
+
+class TestAvailabilityEngine:
+    """Test suite for database-backed reservations"""
+
+    @pytest.fixture
+    def database_url(self, tmp_path):
+        return f"sqlite:///{tmp_path / 'slots.db'}"
+
+    @pytest.mark.asyncio
+    async def test_booking_burst_persists_one_row_per_slot(self, database_url):
+        async with _two_processes(database_url) as databases:
+            engine = AvailabilityEngine(store=DatabaseSlotStore(databases[0]))
+
+            results = await asyncio.gather(*(
+                engine.reserve(*DAY, "11:00", f"booking-{n}", _booking_fields(n)) for n in range(20)
+            ))
+            assert results.count(True) == 1
+            assert engine.get_stats()["conflicts"] == 19
+
+            store = DatabaseSlotStore(databases[1])
+            assert list(await store.booked_slots(DAY)) == ["11:00"]
+
+    @pytest.mark.asyncio
+    async def test_unique_index_settles_races_between_processes(self, database_url):
+        async with _two_processes(database_url) as databases:
+            worker_a = AvailabilityEngine(store=DatabaseSlotStore(databases[0]))
+            worker_b = AvailabilityEngine(store=DatabaseSlotStore(databases[1]))
+            # Both workers load the empty day before either books
+            assert "14:00" in await worker_a.available_times(*DAY)
+            assert "14:00" in await worker_b.available_times(*DAY)
+
+            assert await worker_a.reserve(*DAY, "14:00", "booking-a", _booking_fields(1))
+            assert not await worker_b.reserve(*DAY, "14:00", "booking-b", _booking_fields(2))
+            assert "14:00" not in await worker_b.available_times(*DAY)
+
+    @pytest.mark.asyncio
+    async def test_release_cancels_booking_and_frees_slot_for_new_process(self, database_url):
+        async with _two_processes(database_url) as databases:
+            engine = AvailabilityEngine(store=DatabaseSlotStore(databases[0]))
+            assert await engine.reserve(*DAY, "15:30", "booking-a", _booking_fields(1))
+
+            restarted = AvailabilityEngine(store=DatabaseSlotStore(databases[1]))
+            assert not await restarted.is_available(*DAY, "15:30")
+            assert await restarted.release(*DAY, "15:30", "booking-a")
+
+            assert await restarted.reserve(*DAY, "15:30", "booking-b", _booking_fields(2))
+            assert await DatabaseSlotStore(databases[0]).booked_slots(DAY) == {"15:30": "booking-b"}
+
+    @pytest.mark.asyncio
+    async def test_cancellation_on_another_process_frees_slot(self, database_url):
+        async with _two_processes(database_url) as databases:
+            worker_a = AvailabilityEngine(store=DatabaseSlotStore(databases[0]))
+            worker_b = AvailabilityEngine(store=DatabaseSlotStore(databases[1]))
+            assert await worker_a.reserve(*DAY, "12:00", "booking-a", _booking_fields(1))
+            assert not await worker_b.is_available(*DAY, "12:00")
+
+            assert await worker_a.release(*DAY, "12:00", "booking-a")
+            # worker_b's copy still shows the slot taken; reserve re-reads the day
+            assert await worker_b.reserve(*DAY, "12:00", "booking-b", _booking_fields(2))
+
+    @pytest.mark.asyncio
+    async def test_loaded_days_are_refreshed(self, database_url):
+        async with _two_processes(database_url) as databases:
+            worker_a = AvailabilityEngine(store=DatabaseSlotStore(databases[0]))
+            worker_b = AvailabilityEngine(store=DatabaseSlotStore(databases[1]), refresh_seconds=0)
+            assert "13:00" in await worker_b.available_times(*DAY)
+
+            assert await worker_a.reserve(*DAY, "13:00", "booking-a", _booking_fields(1))
+            assert "13:00" not in await worker_b.available_times(*DAY)
+
+    @pytest.mark.asyncio
+    async def test_create_tables_adds_slot_index_to_existing_table(self, database_url):
+        async with _two_processes(database_url) as databases:
+            async with databases[0].engine.begin() as connection:
+                await connection.execute(text("DROP INDEX uq_booking_active_slot"))
+                assert not await connection.run_sync(booking_slot_index_present)
+
+            await databases[1].create_tables()
+            async with databases[0].engine.connect() as connection:
+                assert await connection.run_sync(booking_slot_index_present)
@@ -0,0 +1,136 @@
+"""
+SSE Backpressure Test Suite
+Tests slow-consumer policies and queue metrics for SSE client queues
+"""
+
+import asyncio
+import pytest
+
+from ..core.a2a_integration import A2ATaskRequest
+from ..core.a2a_streaming_tasks import A2ATaskStreamManager
+from ..core.mcp_sse_transport import MCPSSEEvent, MCPSSEIntegration, MCPSSETransportManager
+from ..core.sse_backpressure import BackpressurePolicy, ClientEventQueue
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+class TestClientEventQueue:
+    """Test suite for the policy-applying queue"""
+
+    def test_drop_newest_refuses_when_full(self):
+        queue = ClientEventQueue(maxsize=2, policy=BackpressurePolicy.DROP_NEWEST)
+        assert [queue.offer(n) for n in range(3)] == [True, True, False]
+        assert _drain(queue) == [0, 1]
+        assert queue.dropped == 1
+
+    def test_drop_oldest_keeps_latest(self):
+        queue = ClientEventQueue(maxsize=2, policy=BackpressurePolicy.DROP_OLDEST)
+        assert all(queue.offer(n) for n in range(4))
+        assert _drain(queue) == [2, 3]
+        assert queue.dropped == 2
+
+    def test_coalesce_replaces_pending_event_with_same_key(self):
+        queue = ClientEventQueue(maxsize=10, policy=BackpressurePolicy.COALESCE)
+        queue.offer("created")
+        for percent in range(100):
+            queue.offer(f"progress-{percent}", "task-1")
+        queue.offer("other-task", "task-2")
+        queue.offer("completed")
+
+        assert queue.qsize() == 4
+        assert _drain(queue) == ["created", "progress-99", "other-task", "completed"]
+        assert queue.coalesced == 99
+        assert queue.dropped == 0
+        assert len(queue._queue) <= 2 * queue.maxsize  # coalesced slots are compacted
+
+    def test_disconnect_after_max_drops(self):
+        queue = ClientEventQueue(maxsize=1, policy=BackpressurePolicy.DISCONNECT, max_drops=3)
+        queue.offer("first")
+        for n in range(3):
+            assert not queue.offer(n)
+
+        assert queue.closed
+        assert _drain(queue) == [None]
+        assert not queue.offer("after close")
+
+    def test_close_always_delivers_sentinel(self):
+        queue = ClientEventQueue(maxsize=1, policy=BackpressurePolicy.DROP_NEWEST)
+        queue.offer("pending")
+        queue.close()
+        assert _drain(queue) == [None]
+
+    @pytest.mark.asyncio
+    async def test_metrics_report_depth_and_lag(self):
+        queue = ClientEventQueue(maxsize=5)
+        queue.offer("a")
+        queue.offer("b")
+        await asyncio.sleep(0.02)
+
+        metrics = queue.metrics()
+        assert metrics["depth"] == 2
+        assert metrics["max_depth"] == 2
+        assert metrics["lag_seconds"] >= 0.01
+        assert await queue.get() == "a"
+
+
+class TestTransportBackpressure:
+    """Test suite for backpressure in MCPSSETransportManager"""
+
+    @pytest.mark.asyncio
+    async def test_slow_client_gets_latest_task_state(self):
+        manager = MCPSSETransportManager()
+        integration = MCPSSEIntegration(manager)
+        queue = await manager.connect_client("slow", {})
+        await manager.subscribe_client("slow", "a2a_tasks")
+        _drain(queue)
+
+        for step in range(50):
+            await integration.notify_a2a_task_update("task-1", "running", {"step": step})
+        await integration.notify_a2a_task_update("task-1", "completed", {"step": 50})
+
+        payloads = _drain(queue)
+        assert len(payloads) == 2
+        assert b'"step": 49' in payloads[0]
+        assert b'"task_status": "completed"' in payloads[1]
+        assert manager.get_client_metrics()["slow"]["coalesced"] == 49
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_removes_slow_client(self):
+        manager = MCPSSETransportManager(backpressure_policy=BackpressurePolicy.DISCONNECT)
+        slow = await manager.connect_client("slow", {})
+        fast = await manager.connect_client("fast", {})
+
+        for n in range(slow.maxsize + slow.max_drops):
+            await manager.broadcast_event(MCPSSEEvent(event_type="resource_updated", data={"n": n}))
+            _drain(fast)
+
+        assert _drain(slow) == [None]
+        assert manager.get_fanout_stats()["disconnected"] == 1
+        assert list(manager.get_client_metrics()) == ["fast"]
+
+
+class TestTaskStreamBackpressure:
+    """Test suite for bounded A2A task stream queues"""
+
+    @pytest.mark.asyncio
+    async def test_progress_backlog_is_coalesced(self):
+        manager = A2ATaskStreamManager(queue_size=5)
+        manager.create_task_stream("task-1", A2ATaskRequest(task_id="task-1", capability="booking", input={}))
+        await asyncio.sleep(0)
+        stream = manager.get_task_stream("task-1")
+        await stream.__anext__()  # heartbeat
+        await stream.__anext__()  # replayed task_created
+
+        for step in range(1, 201):
+            await manager.update_task_progress("task-1", f"step-{step}", completed_steps=step, total_steps=200)
+
+        (metrics,) = manager.get_stream_metrics("task-1")
+        assert metrics["depth"] == 1
+        assert metrics["coalesced"] == 199
+        assert '"current_step": "step-200"' in await stream.__anext__()
+        await stream.aclose()
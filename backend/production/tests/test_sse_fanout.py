@@ -0,0 +1,147 @@
+"""
+SSE Fan-out Test Suite
+Tests encode-once delivery and the subscription index behind MCPSSETransportManager
+"""
+
+import asyncio
+import json
+import time
+import pytest
+
+from ..core import mcp_sse_transport
+from ..core.mcp_sse_transport import MCPSSEEvent, MCPSSETransportManager
+from ..core.sse_fanout import SSEFanout
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+async def _connect(manager, count, subscription_type=None):
+    queues = []
+    for i in range(count):
+        client_id = f"{subscription_type or 'client'}-{i}"
+        queue = await manager.connect_client(client_id, {})
+        _drain(queue)  # connection confirmation
+        if subscription_type:
+            await manager.subscribe_client(client_id, subscription_type)
+        queues.append(queue)
+    return queues
+
+
+class TestMCPSSEEventEncoding:
+    """Test suite for MCPSSEEvent wire encoding"""
+
+    def test_encode_is_cached_and_terminated(self):
+        event = MCPSSEEvent(event_type="resource_updated", data={"uri": "bais://x"}, id="42", retry=1000)
+
+        wire = event.encode()
+        assert wire == b'id: 42\nretry: 1000\nevent: resource_updated\ndata: {"uri": "bais://x"}\n\n'
+        assert event.encode() is wire
+        assert event.to_sse_format() == wire.decode()
+
+
+class TestSSEFanout:
+    """Test suite for the fan-out engine"""
+
+    def test_publish_routes_through_subscription_index(self):
+        fanout = SSEFanout()
+        queues = {client_id: asyncio.Queue() for client_id in ("a", "b", "c")}
+        for client_id, queue in queues.items():
+            fanout.register(client_id, queue)
+        fanout.subscribe("a", "tools")
+        fanout.subscribe("b", "tools")
+        fanout.subscribe("c", "resources")
+
+        assert fanout.publish(b"tools-event", "tools") == 2
+        assert fanout.publish(b"nobody", "prompts") == 0
+        assert fanout.publish(b"everyone") == 3
+        assert _drain(queues["a"]) == [b"tools-event", b"everyone"]
+        assert _drain(queues["c"]) == [b"everyone"]
+
+        fanout.unregister("a")
+        assert fanout.subscriber_count("tools") == 1
+
+    def test_full_queue_drops_and_counts(self):
+        fanout = SSEFanout()
+        fanout.register("slow", asyncio.Queue(maxsize=1))
+
+        assert fanout.send("slow", b"first")
+        assert not fanout.send("slow", b"second")
+        assert fanout.subscriber("slow").dropped == 1
+        assert fanout.get_stats()["dropped"] == 1
+
+
+class TestMCPSSETransportFanout:
+    """Test suite for MCPSSETransportManager broadcasting through the fan-out engine"""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_serializes_once(self, monkeypatch):
+        manager = MCPSSETransportManager()
+        queues = await _connect(manager, 50, "tools")
+        dumps_calls = []
+        real_dumps = json.dumps
+        monkeypatch.setattr(mcp_sse_transport.json, "dumps",
+                            lambda *args, **kwargs: dumps_calls.append(1) or real_dumps(*args, **kwargs))
+
+        delivered = await manager.broadcast_event(MCPSSEEvent(event_type="tool_executed", data={"n": 1}), "tools")
+
+        assert delivered == 50
+        assert len(dumps_calls) == 1
+        payloads = [queue.get_nowait() for queue in queues]
+        assert all(payload is payloads[0] for payload in payloads)
+
+    @pytest.mark.asyncio
+    async def test_broadcast_does_not_wait_for_membership_lock(self):
+        manager = MCPSSETransportManager()
+        queues = await _connect(manager, 3)
+
+        async with manager._lock:
+            delivered = await asyncio.wait_for(
+                manager.broadcast_event(MCPSSEEvent(event_type="ping", data={})), timeout=1.0
+            )
+        assert delivered == 3
+        assert all(queue.qsize() == 1 for queue in queues)
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_and_disconnect_leave_the_index(self):
+        manager = MCPSSETransportManager()
+        queue_a, queue_b = await _connect(manager, 2, "resources")
+        await manager.unsubscribe_client("resources-0", "resources")
+        await manager.disconnect_client("resources-1")
+
+        assert await manager.broadcast_event(MCPSSEEvent(event_type="resource_updated", data={}), "resources") == 0
+        assert _drain(queue_a) == []
+        assert _drain(queue_b) == [None]
+        assert await manager.get_active_clients_count() == 1
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_broadcast_cost_at_10k_clients(self):
+        """Benchmark: one topic broadcast to 10k subscribers, plus a topic with 10 subscribers"""
+        manager = MCPSSETransportManager()
+        subscribers = await _connect(manager, 10000, "a2a_tasks")
+        await _connect(manager, 10, "prompts")
+        data = {"task_id": "task-1", "task_status": "running", "task_data": {"progress": 0.5, "steps": list(range(20))}}
+
+        rounds = 20
+        started = time.perf_counter()
+        for _ in range(rounds):
+            assert await manager.broadcast_event(MCPSSEEvent(event_type="a2a_task_update", data=data),
+                                                 "a2a_tasks") == 10000
+            for queue in subscribers:
+                queue.get_nowait()
+        broadcast_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await manager.broadcast_event(MCPSSEEvent(event_type="prompt_updated", data=data), "prompts")
+        narrow_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        print(f"\nbroadcast to 10k subscribers: {broadcast_ms:.2f}ms, to 10 of 10,010 clients: {narrow_ms:.3f}ms")
+        assert broadcast_ms < 100
+        # The index means a narrow topic does not pay for the other 10k connections
+        assert narrow_ms < 1
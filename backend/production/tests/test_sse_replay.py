@@ -0,0 +1,167 @@
+"""
+SSE Replay Test Suite
+Tests Last-Event-ID resumption for the MCP SSE transport and A2A task streams
+"""
+
+import asyncio
+import json
+import pytest
+
+from ..core.a2a_integration import A2ATaskRequest, A2ATaskResult
+from ..core.a2a_streaming_tasks import A2ATaskStreamManager
+from ..core.mcp_sse_transport import MCPSSEEvent, MCPSSEHandler, MCPSSETransportManager
+from ..core.sse_replay import EventReplayBuffer, SequenceClock, parse_event_id, payload_sequence
+
+
+class _Request:
+    """Minimal stand-in for a Starlette request with headers"""
+
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+        self.client = None
+
+    async def is_disconnected(self):
+        return False
+
+
+def _event_ids(chunks):
+    return [payload_sequence(chunk) for chunk in chunks]
+
+
+class TestReplayPrimitives:
+    """Test suite for sequence ids and the replay ring"""
+
+    def test_clock_is_monotonic_and_observes_remote_ids(self):
+        clock = SequenceClock()
+        first, second = clock.next(), clock.next()
+        assert second > first
+        clock.observe(second + 1000)
+        assert clock.next() == second + 1001
+
+    def test_parse_event_id(self):
+        assert parse_event_id(" 42 ") == 42
+        assert parse_event_id("a1b2-uuid") is None
+        assert parse_event_id(None) is None
+        assert payload_sequence(b"id: 7\nevent: x\ndata: {}\n\n") == 7
+        assert payload_sequence(b"event: ping\ndata: {}\n\n") is None
+
+    def test_since_returns_missed_events_across_topics_in_order(self):
+        buffer = EventReplayBuffer(capacity=10)
+        base = buffer.horizon
+        buffer.append("tools", base + 1, "t1")
+        buffer.append("*", base + 2, "all")
+        buffer.append("tools", base + 4, "t2")
+        buffer.append("tools", base + 3, "late")  # relayed out of order
+        buffer.append("resources", base + 5, "other topic")
+
+        assert buffer.since(["tools", "*"], base + 1) == [(base + 2, "all"), (base + 3, "late"), (base + 4, "t2")]
+        assert buffer.since("tools", base + 4) == []
+        assert [event for _, event in buffer.since("tools", None)] == ["t1", "late", "t2"]
+
+    def test_gap_is_reported(self):
+        buffer = EventReplayBuffer(capacity=2)
+        base = buffer.horizon
+        for offset in range(1, 4):
+            buffer.append("tools", base + offset, offset)
+
+        assert buffer.since("tools", base) is None  # base + 1 was evicted
+        assert buffer.since("tools", base + 1) == [(base + 2, 2), (base + 3, 3)]
+        assert buffer.since("tools", base - 5) is None  # older than this process
+
+    def test_id_just_below_horizon_resumes(self):
+        buffer = EventReplayBuffer(capacity=10)
+        base = buffer.horizon
+        buffer.append("tools", base, "first")  # shared counter issued the horizon itself
+
+        assert buffer.since("tools", base - 1) == [(base, "first")]
+        assert buffer.since("tools", base - 2) is None
+
+
+class TestMCPSSEResume:
+    """Test suite for resuming MCP SSE connections"""
+
+    @pytest.mark.asyncio
+    async def test_reconnect_replays_only_missed_events(self):
+        manager = MCPSSETransportManager()
+        for n in range(5):
+            await manager.broadcast_event(MCPSSEEvent(event_type="tool_executed", data={"n": n}), "tools")
+        await manager.broadcast_event(MCPSSEEvent(event_type="prompt_updated", data={}), "prompts")
+        ids = [sequence for sequence, _ in manager._replay.since(["tools", "*"], None)]
+        assert len(ids) == 5
+
+        response = await MCPSSEHandler(manager).handle_sse_connection(
+            _Request({"last-event-id": str(ids[1])}), client_id="resumed", subscriptions=["tools"])
+        stream = response.body_iterator
+        connected = await stream.__anext__()
+        replayed = [await stream.__anext__() for _ in range(3)]
+
+        assert connected.startswith(b"event: connected")
+        assert _event_ids(replayed) == ids[2:]
+
+        # Live events continue after the replayed ones, without duplicates
+        await manager.broadcast_event(MCPSSEEvent(event_type="tool_executed", data={"n": 5}), "tools")
+        live = await stream.__anext__()
+        if payload_sequence(live) is None:
+            live = await stream.__anext__()  # the transport's own connection confirmation
+        assert payload_sequence(live) > ids[-1]
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_unknown_last_event_id_gets_stream_reset(self):
+        manager = MCPSSETransportManager()
+        response = await MCPSSEHandler(manager).handle_sse_connection(
+            _Request({"last-event-id": "1"}), client_id="stale", subscriptions=["tools"])
+        stream = response.body_iterator
+        await stream.__anext__()
+
+        reset = await stream.__anext__()
+        assert reset.startswith(b"event: stream_reset")
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_control_events_carry_no_id(self):
+        manager = MCPSSETransportManager()
+        queue = await manager.connect_client("client", {})
+
+        assert payload_sequence(queue.get_nowait()) is None
+        await manager.broadcast_event(MCPSSEEvent(event_type="resource_updated", data={}))
+        assert payload_sequence(queue.get_nowait()) is not None
+
+
+class TestTaskStreamResume:
+    """Test suite for resuming A2A task streams"""
+
+    @staticmethod
+    async def _collect(stream):
+        return [json.loads(chunk.split("data: ", 1)[1]) async for chunk in stream]
+
+    @pytest.mark.asyncio
+    async def test_reconnect_replays_missed_task_events(self):
+        manager = A2ATaskStreamManager()
+        manager.create_task_stream("task-1", A2ATaskRequest(task_id="task-1", capability="booking", input={}))
+        await asyncio.sleep(0)
+        for step in range(1, 4):
+            await manager.update_task_progress("task-1", f"step-{step}", completed_steps=step, total_steps=3)
+        await manager.complete_task("task-1", A2ATaskResult(task_id="task-1", status="completed", output={}))
+
+        everything = await self._collect(manager.get_task_stream("task-1"))
+        assert [event["event_type"] for event in everything] == [
+            "heartbeat", "task_created", "task_progress", "task_progress", "task_progress", "task_completed"]
+
+        resumed = await self._collect(manager.get_task_stream("task-1", str(everything[3]["id"])))
+        assert [event["id"] for event in resumed[1:]] == [event["id"] for event in everything[4:]]
+
+    @pytest.mark.asyncio
+    async def test_expired_last_event_id_gets_progress_snapshot(self):
+        manager = A2ATaskStreamManager()
+        manager.create_task_stream("task-2", A2ATaskRequest(task_id="task-2", capability="booking", input={}))
+        await manager.update_task_progress("task-2", "halfway", completed_steps=1, total_steps=2)
+
+        stream = manager.get_task_stream("task-2", "1")
+        await stream.__anext__()
+        snapshot = json.loads((await stream.__anext__()).split("data: ", 1)[1])
+        await stream.aclose()
+
+        assert snapshot["event_type"] == "task_progress"
+        assert snapshot["id"] is None
+        assert snapshot["data"]["current_step"] == "halfway"
@@ -0,0 +1,125 @@
+"""
+Subscription Index Test Suite
+Tests topic <-> client routing used by the A2A SSE connection manager,
+and batched, deduplicated delivery through MCPSSETransportManager
+"""
+
+import time
+import pytest
+
+from ..core.mcp_sse_transport import MCPSSEEvent, MCPSSETransportManager
+from ..core.subscription_index import SubscriptionIndex
+
+
+def _drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+class TestSubscriptionIndex:
+    """Test suite for the bidirectional index"""
+
+    def test_both_directions_stay_in_step(self):
+        index = SubscriptionIndex()
+        assert index.subscribe("a", ("task", "t1"))
+        assert not index.subscribe("a", ("task", "t1"))
+        index.subscribe("a", ("agent", "x"))
+        index.subscribe("b", ("task", "t1"))
+
+        assert index.clients(("task", "t1")) == {"a", "b"}
+        assert index.topics_of("a") == {("task", "t1"), ("agent", "x")}
+
+        assert index.unsubscribe("b", ("task", "t1"))
+        assert "b" not in index
+        assert index.remove_client("a") == {("task", "t1"), ("agent", "x")}
+        assert index.topic_counts() == {}
+        assert len(index) == 0
+
+    def test_match_deduplicates_across_topics(self):
+        index = SubscriptionIndex()
+        index.subscribe("both", ("task", "t1"))
+        index.subscribe("both", ("agent", "x"))
+        index.subscribe("task-only", ("task", "t1"))
+
+        assert index.match([("task", "t1"), ("agent", "x"), ("task", "unknown")]) == {"both", "task-only"}
+
+
+class TestBatchedDelivery:
+    """Test suite for one-pass delivery to subscribers plus extra clients"""
+
+    @pytest.mark.asyncio
+    async def test_client_matching_several_filters_receives_event_once(self):
+        manager = MCPSSETransportManager()
+        queues = {}
+        for client_id in ("general", "task-and-agent", "bystander"):
+            queues[client_id] = await manager.connect_client(client_id, {})
+            _drain(queues[client_id])
+        await manager.subscribe_client("general", "a2a_tasks")
+        await manager.subscribe_client("task-and-agent", "a2a_tasks")
+
+        delivered = await manager.broadcast_event(
+            MCPSSEEvent(event_type="a2a_task_event", data={"task_id": "t1"}),
+            "a2a_tasks",
+            extra_clients={"task-and-agent", "remote-client"}
+        )
+
+        assert delivered == 2
+        assert len(_drain(queues["task-and-agent"])) == 1
+        assert len(_drain(queues["general"])) == 1
+        assert _drain(queues["bystander"]) == []
+
+    @pytest.mark.asyncio
+    async def test_send_local_many_skips_broadcast_subscribers(self):
+        manager = MCPSSETransportManager()
+        first = await manager.connect_client("first", {})
+        second = await manager.connect_client("second", {})
+        await manager.subscribe_client("second", "a2a_tasks")
+        _drain(first), _drain(second)
+
+        assert manager.send_local_many(["first", "second", "elsewhere"], b"data: {}\n\n",
+                                       skip_subscription="a2a_tasks") == 1
+        assert _drain(first) == [b"data: {}\n\n"]
+        assert _drain(second) == []
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_routing_load_50k_tasks_5k_clients(self):
+        """Load test: 5k clients following 10 tasks each (50k tasks) and one of 100 agents"""
+        manager = MCPSSETransportManager()
+        index = SubscriptionIndex()
+        clients, tasks_per_client, agents = 5000, 10, 100
+        queues = []
+        for n in range(clients):
+            client_id = f"client-{n}"
+            queues.append(await manager.connect_client(client_id, {}))
+            for t in range(tasks_per_client):
+                index.subscribe(client_id, ("task", f"task-{n * tasks_per_client + t}"))
+            index.subscribe(client_id, ("agent", f"agent-{n % agents}"))
+        for queue in queues:
+            _drain(queue)
+        assert len(index.topic_counts()) == clients * tasks_per_client + agents
+
+        # Task owned by client-0, whose agent is also followed by 49 other clients
+        rounds = 200
+        started = time.perf_counter()
+        for _ in range(rounds):
+            targets = index.match([("task", "task-0"), ("agent", "agent-0")])
+            await manager.broadcast_event(MCPSSEEvent(event_type="a2a_task_event", data={"task_id": "task-0"}),
+                                          "a2a_tasks", extra_clients=targets)
+        route_ms = (time.perf_counter() - started) * 1000 / rounds
+        assert len(targets) == clients // agents
+        assert queues[0].qsize() == min(rounds, queues[0].maxsize)  # once per event, not twice
+
+        started = time.perf_counter()
+        for n in range(clients):
+            index.remove_client(f"client-{n}")
+            await manager.disconnect_client(f"client-{n}")
+        disconnect_ms = (time.perf_counter() - started) * 1000 / clients
+
+        print(f"\nroute to task+agent subscribers: {route_ms:.3f}ms, disconnect: {disconnect_ms:.4f}ms per client")
+        assert index.topic_counts() == {}
+        # Independent of the 50k tasks: each disconnect touches only its own topics
+        assert disconnect_ms < 1
+        assert route_ms < 5
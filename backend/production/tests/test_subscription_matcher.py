@@ -0,0 +1,190 @@
+"""
+Subscription Matcher Test Suite
+Tests compiled, indexed filter matching and bounded concurrent delivery
+in MCPSubscriptionManager.publish_event
+"""
+
+import asyncio
+import random
+import time
+import pytest
+
+from ..core.mcp_subscription_manager import (
+    MCPSubscriptionManager,
+    NotificationEvent,
+    SubscriptionFilter,
+    SubscriptionType,
+)
+from ..core.subscription_matcher import CompiledFilter, PrefixTrie, SubscriptionMatcher
+
+
+def _reference_match(filters: SubscriptionFilter, event_data):
+    """The interpreted filter check publish_event used before compilation"""
+    for values, key in ((filters.resource_uris, "resource_uri"), (filters.resource_types, "resource_type"),
+                        (filters.tool_names, "tool_name"), (filters.prompt_names, "prompt_name"),
+                        (filters.event_types, "event_type")):
+        if values:
+            value = event_data.get(key)
+            if value and value not in values:
+                return False
+    if filters.metadata_filters:
+        event_metadata = event_data.get("metadata", {})
+        for key, value in filters.metadata_filters.items():
+            if event_metadata.get(key) != value:
+                return False
+    return True
+
+
+def _event(subscription_type=SubscriptionType.RESOURCE_CHANGE, **data):
+    return NotificationEvent(event_type="updated", subscription_type=subscription_type, data=data)
+
+
+class TestPrefixTrie:
+    """Test suite for the URI prefix trie"""
+
+    def test_matches_every_stored_prefix_and_prunes_on_remove(self):
+        trie = PrefixTrie()
+        trie.add("availability://", "all")
+        trie.add("availability://hotel-", "hotels")
+        trie.add("booking://", "bookings")
+
+        assert trie.matches("availability://hotel-7") == {"all", "hotels"}
+        assert trie.matches("booking") == set()
+
+        trie.remove("availability://hotel-", "hotels")
+        trie.remove("booking://", "bookings")
+        assert trie.matches("availability://hotel-7") == {"all"}
+        assert "b" not in trie._root
+
+
+class TestSubscriptionMatcher:
+    """Test suite for indexed matching"""
+
+    def test_agrees_with_interpreted_filters(self):
+        rng = random.Random(7)
+        uris = [f"availability://hotel-{n}" for n in range(5)]
+        tools = ["search", "book", "cancel"]
+        matcher = SubscriptionMatcher()
+        filters = {}
+        for n in range(300):
+            criteria = SubscriptionFilter(
+                resource_uris=rng.sample(uris, 2) if rng.random() < 0.3 else None,
+                tool_names=rng.sample(tools, 1) if rng.random() < 0.4 else None,
+                event_types=["updated"] if rng.random() < 0.2 else None,
+                metadata_filters={"region": rng.choice(["eu", "us"])} if rng.random() < 0.3 else {}
+            )
+            filters[f"sub-{n}"] = criteria
+            matcher.add(f"sub-{n}", CompiledFilter(criteria))
+
+        for _ in range(200):
+            event_data = {"metadata": {"region": rng.choice(["eu", "us", "apac"])}}
+            if rng.random() < 0.7:
+                event_data["resource_uri"] = rng.choice(uris + ["other://x"])
+            if rng.random() < 0.7:
+                event_data["tool_name"] = rng.choice(tools)
+            if rng.random() < 0.5:
+                event_data["event_type"] = rng.choice(["updated", "deleted"])
+
+            expected = {sid for sid, criteria in filters.items() if _reference_match(criteria, event_data)}
+            assert set(matcher.match(event_data)) == expected
+
+    def test_prefix_pattern_and_business_id_filters(self):
+        matcher = SubscriptionMatcher()
+        matcher.add("prefix", CompiledFilter(SubscriptionFilter(resource_uri_prefixes=["availability://hotel-"])))
+        matcher.add("pattern", CompiledFilter(SubscriptionFilter(resource_uri_patterns=[r"availability://.*-\d+"])))
+        matcher.add("business", CompiledFilter(SubscriptionFilter(business_ids=["biz-1"])))
+
+        assert set(matcher.match({"resource_uri": "availability://hotel-12"})) == {"prefix", "pattern", "business"}
+        assert set(matcher.match({"resource_uri": "availability://spa-x", "business_id": "biz-2"})) == set()
+        assert set(matcher.match({"business_id": "biz-1", "resource_uri": "booking://1"})) == {"business"}
+
+        matcher.remove("prefix")
+        assert set(matcher.match({"resource_uri": "availability://hotel-12"})) == {"pattern", "business"}
+
+    def test_invalid_pattern_is_rejected(self):
+        with pytest.raises(ValueError):
+            CompiledFilter(SubscriptionFilter(resource_uri_patterns=["("]))
+
+    @pytest.mark.parametrize("patterns", [["a" * 257], [f"p{n}" for n in range(11)]])
+    def test_oversized_patterns_are_rejected(self, patterns):
+        with pytest.raises(ValueError):
+            CompiledFilter(SubscriptionFilter(resource_uri_patterns=patterns))
+
+
+class TestPublishEvent:
+    """Test suite for publish_event delivery"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_filter_stores_nothing(self):
+        manager = MCPSubscriptionManager()
+        with pytest.raises(ValueError):
+            await manager.create_subscription("bad", SubscriptionType.RESOURCE_CHANGE,
+                                              SubscriptionFilter(resource_uri_patterns=["("]))
+
+        assert await manager.get_client_subscriptions("bad") == []
+        assert manager.get_statistics()["total_subscriptions"] == 0
+        assert await manager.publish_event(_event(resource_uri="availability://hotel-1")) == 0
+
+    @pytest.mark.asyncio
+    async def test_only_active_matching_subscriptions_are_notified(self):
+        manager = MCPSubscriptionManager()
+        notified = []
+
+        async def record(subscription, notification):
+            notified.append(subscription.client_id)
+
+        manager.add_notification_callback(record)
+        await manager.create_subscription("hotel", SubscriptionType.RESOURCE_CHANGE,
+                                          SubscriptionFilter(resource_uri_prefixes=["availability://hotel-"]))
+        paused = await manager.create_subscription("paused", SubscriptionType.RESOURCE_CHANGE)
+        cancelled = await manager.create_subscription("cancelled", SubscriptionType.RESOURCE_CHANGE)
+        await manager.create_subscription("tools", SubscriptionType.TOOL_EXECUTION)
+        await manager.pause_subscription(paused.subscription_id)
+        await manager.cancel_subscription(cancelled.subscription_id)
+
+        assert await manager.publish_event(_event(resource_uri="availability://hotel-1")) == 1
+        assert notified == ["hotel"]
+
+    @pytest.mark.asyncio
+    async def test_deliveries_run_concurrently_within_bound(self):
+        manager = MCPSubscriptionManager(max_concurrent_notifications=4)
+        in_flight = {"now": 0, "peak": 0}
+
+        async def slow_callback(subscription, notification):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+
+        manager.add_notification_callback(slow_callback)
+        for n in range(20):
+            await manager.create_subscription(f"client-{n}", SubscriptionType.CUSTOM_EVENT)
+
+        started = time.perf_counter()
+        assert await manager.publish_event(_event(SubscriptionType.CUSTOM_EVENT)) == 20
+        elapsed = time.perf_counter() - started
+
+        assert in_flight["peak"] == 4
+        assert elapsed < 20 * 0.01
+
+    @pytest.mark.slow
+    @pytest.mark.asyncio
+    async def test_publish_cost_tracks_matches_not_total_subscriptions(self):
+        """Benchmark: 50k business-scoped subscriptions, events matching one of them"""
+        manager = MCPSubscriptionManager(max_subscriptions_per_client=10)
+        for n in range(50000):
+            await manager.create_subscription(
+                f"client-{n}", SubscriptionType.RESOURCE_CHANGE,
+                SubscriptionFilter(business_ids=[f"biz-{n}"], resource_uri_prefixes=[f"availability://biz-{n}/"])
+            )
+
+        rounds = 500
+        started = time.perf_counter()
+        for n in range(rounds):
+            matched = await manager.publish_event(
+                _event(business_id=f"biz-{n}", resource_uri=f"availability://biz-{n}/rooms"))
+            assert matched == 1
+        publish_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        print(f"\npublish against 50k subscriptions: {publish_ms:.3f}ms per event")
+        assert publish_ms < 2
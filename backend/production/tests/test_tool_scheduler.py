@@ -0,0 +1,167 @@
+"""
+Tool Scheduler Test Suite
+Tests concurrent execution of the tool calls in one model turn
+"""
+
+import asyncio
+import pytest
+
+from ..core.tool_scheduler import ToolCall, ToolScheduler
+
+
+class RecordingExecutor:
+    """Sleeps per call and tracks how many calls overlap"""
+
+    def __init__(self, delays=None, default_delay=0.05):
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def __call__(self, tool_name, tool_input):
+        self.calls.append((tool_name, tool_input))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delays.get(tool_input.get("query"), self.default_delay))
+            return {"tool": tool_name, "query": tool_input.get("query")}
+        finally:
+            self.active -= 1
+
+
+def _search(call_id, query):
+    return ToolCall(id=call_id, name="bais_search_businesses", input={"query": query})
+
+
+class TestToolScheduler:
+    """Test suite for ToolScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_independent_calls_overlap(self):
+        """Wall time tracks the slowest call, not the sum"""
+        executor = RecordingExecutor(default_delay=0.1)
+
+        turn = await ToolScheduler(executor).run([_search(f"t{i}", f"q{i}") for i in range(4)])
+
+        assert executor.peak == 4
+        assert turn.wall_seconds < 0.25
+        assert turn.tool_seconds >= 0.4
+        assert turn.to_dict()["speedup"] > 1.5
+
+    @pytest.mark.asyncio
+    async def test_results_keep_request_order(self):
+        """A fast later call does not reorder the results"""
+        executor = RecordingExecutor(delays={"slow": 0.1, "fast": 0.0})
+        scheduler = ToolScheduler(executor)
+
+        completed = [r.call.id async for r in scheduler.iter_completed([_search("a", "slow"), _search("b", "fast")])]
+        turn = await scheduler.run([_search("a", "slow"), _search("b", "fast")])
+
+        assert completed == ["b", "a"]
+        assert [r.call.id for r in turn.results] == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        executor = RecordingExecutor()
+
+        await ToolScheduler(executor, max_concurrency=2).run([_search(f"t{i}", f"q{i}") for i in range(6)])
+
+        assert executor.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_run_once(self):
+        """Duplicate calls share one execution but each tool_use gets a result"""
+        executor = RecordingExecutor()
+
+        turn = await ToolScheduler(executor).run([_search("a", "spa"), _search("b", "brewery"), _search("c", "spa")])
+
+        assert len(executor.calls) == 2
+        assert [r.call.id for r in turn.results] == ["a", "b", "c"]
+        assert turn.results[2].result == turn.results[0].result
+        assert turn.to_dict()["deduplicated"] == 1
+
+    @pytest.mark.asyncio
+    async def test_per_tool_timeout(self):
+        """A slow tool yields an error result without holding up the others"""
+        executor = RecordingExecutor(delays={"hang": 5}, default_delay=0.0)
+        scheduler = ToolScheduler(executor, default_timeout_seconds=0.05)
+
+        turn = await scheduler.run([_search("a", "hang"), _search("b", "spa")])
+
+        assert turn.results[0].timed_out
+        assert "timed out" in turn.results[0].result["error"]
+        assert turn.results[1].result == {"tool": "bais_search_businesses", "query": "spa"}
+        assert turn.wall_seconds < 1
+
+    @pytest.mark.asyncio
+    async def test_bookings_do_not_overlap(self):
+        """Side-effecting tools run one at a time, in model order"""
+        executor = RecordingExecutor()
+        calls = [
+            ToolCall(id="b1", name="bais_execute_service", input={"service_id": "botox"}),
+            ToolCall(id="b2", name="bais_execute_service", input={"service_id": "hydrafacial"}),
+        ]
+
+        await ToolScheduler(executor).run(calls)
+
+        assert executor.peak == 1
+        assert [tool_input["service_id"] for _, tool_input in executor.calls] == ["botox", "hydrafacial"]
+
+    @pytest.mark.asyncio
+    async def test_identical_bookings_both_run(self):
+        """Two identical bookings are two bookings, not one shared result"""
+        executor = RecordingExecutor()
+        booking = {"service_id": "botox", "query": "botox"}
+        calls = [
+            ToolCall(id="b1", name="bais_execute_service", input=booking),
+            ToolCall(id="b2", name="bais_execute_service", input=dict(booking)),
+        ]
+
+        turn = await ToolScheduler(executor).run(calls)
+
+        assert len(executor.calls) == 2
+        assert turn.to_dict()["deduplicated"] == 0
+
+    @pytest.mark.asyncio
+    async def test_booking_timeout_reports_pending_and_completes(self):
+        """A slow booking is reported as pending and is not cancelled"""
+        executor = RecordingExecutor(delays={"slow": 0.2})
+        scheduler = ToolScheduler(executor, timeouts={"bais_execute_service": 0.05})
+        call = ToolCall(id="b1", name="bais_execute_service", input={"query": "slow"})
+
+        turn = await scheduler.run([call])
+
+        assert turn.results[0].timed_out
+        assert turn.results[0].result["status"] == "pending"
+        assert executor.active == 1
+        await asyncio.sleep(0.3)
+        assert executor.active == 0
+
+    @pytest.mark.asyncio
+    async def test_disconnect_does_not_cancel_booking(self):
+        """Closing the stream mid-turn stops waiting but lets the booking finish"""
+        finished = []
+
+        async def executor(tool_name, tool_input):
+            await asyncio.sleep(0.1)
+            finished.append(tool_name)
+            return {"tool": tool_name}
+
+        calls = [
+            _search("a", "spa"),
+            ToolCall(id="b1", name="bais_execute_service", input={"service_id": "botox"}),
+        ]
+        stream = ToolScheduler(executor).iter_completed(calls)
+
+        async def consume():
+            async for _ in stream:
+                pass
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.sleep(0.02)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        await asyncio.sleep(0.15)
+
+        assert finished == ["bais_execute_service"]
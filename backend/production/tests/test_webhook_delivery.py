@@ -0,0 +1,234 @@
+"""
+Webhook Delivery Test Suite
+Tests queued, pooled, batched callback delivery with retries, and its use by
+MCPSubscriptionManager
+"""
+
+import asyncio
+import json
+import time
+import pytest
+import httpx
+
+from ..core.mcp_subscription_manager import MCPSubscriptionManager, NotificationEvent, SubscriptionType
+from ..core.webhook_delivery import (
+    InMemoryWebhookOutbox,
+    RedisWebhookOutbox,
+    WebhookDelivery,
+    WebhookDispatcher,
+)
+
+
+class MockPoolManager:
+    """One httpx client per pool name, answering through a MockTransport handler"""
+
+    def __init__(self, handler):
+        self.transport = httpx.MockTransport(handler)
+        self.pools = {}
+
+    def get_or_create_pool(self, name, base_url, config):
+        if name not in self.pools:
+            self.pools[name] = httpx.AsyncClient(base_url=base_url, transport=self.transport)
+        return self.pools[name]
+
+
+def _dispatcher(handler, **kwargs):
+    kwargs.setdefault("base_backoff_seconds", 0.001)
+    kwargs.setdefault("max_backoff_seconds", 0.002)
+    return WebhookDispatcher(outbox=InMemoryWebhookOutbox(), pool_manager=MockPoolManager(handler), **kwargs)
+
+
+class TestWebhookDispatcher:
+    """Test suite for the delivery worker"""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_failures_then_delivers(self):
+        calls = []
+
+        def handler(request):
+            calls.append(json.loads(request.content))
+            return httpx.Response(503 if len(calls) < 3 else 200)
+
+        dispatcher = _dispatcher(handler)
+        await dispatcher.submit("https://hooks.example/cb", {"n": 1})
+        assert await dispatcher.drain(timeout=2)
+        await dispatcher.stop()
+
+        assert calls == [{"n": 1}] * 3
+        assert dispatcher.delivered == 1 and dispatcher.failed_attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_and_exhausted_retries_are_dead_lettered(self):
+        dispatcher = _dispatcher(
+            lambda request: httpx.Response(404 if request.url.path == "/gone" else 500), max_attempts=3
+        )
+        results = []
+        dispatcher.add_result_hook(lambda delivery, ok, error: results.append((delivery.url, ok)))
+
+        await dispatcher.submit("https://hooks.example/gone", {})
+        await dispatcher.submit("https://hooks.example/broken", {})
+        assert await dispatcher.drain(timeout=2)
+        await dispatcher.stop()
+
+        dead = {d.url: d for d in await dispatcher.outbox.dead_letters()}
+        assert dead["https://hooks.example/gone"].attempts == 1
+        assert dead["https://hooks.example/broken"].attempts == 3
+        assert dead["https://hooks.example/broken"].last_error == "HTTP 500"
+        assert results.count(("https://hooks.example/broken", False)) == 3
+
+    @pytest.mark.asyncio
+    async def test_batchable_deliveries_share_a_post(self):
+        bodies = []
+
+        def handler(request):
+            bodies.append(json.loads(request.content))
+            return httpx.Response(200)
+
+        dispatcher = _dispatcher(handler, max_batch_size=3)
+        # Queue before the worker runs so they are claimed together
+        for n in range(5):
+            await dispatcher.outbox.enqueue(WebhookDelivery(url="https://hooks.example/batch",
+                                                            payload={"n": n}, batchable=True))
+        await dispatcher.start()
+        assert await dispatcher.drain(timeout=2)
+        await dispatcher.stop()
+
+        assert sorted(len(body["notifications"]) for body in bodies) == [2, 3]
+        assert dispatcher.delivered == 5 and dispatcher.batches_sent == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_destination_is_capped_and_does_not_block_others(self):
+        in_flight = {"slow": 0, "peak": 0}
+        finished = []
+
+        async def handler(request):
+            if request.url.host == "slow.example":
+                in_flight["slow"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["slow"])
+                await asyncio.sleep(0.05)
+                in_flight["slow"] -= 1
+            finished.append(request.url.host)
+            return httpx.Response(200)
+
+        dispatcher = _dispatcher(handler, max_per_destination=2)
+        for n in range(6):
+            await dispatcher.submit(f"https://slow.example/{n}", {})
+        await dispatcher.submit("https://fast.example/cb", {})
+
+        assert await dispatcher.drain(timeout=2)
+        await dispatcher.stop()
+
+        assert finished[0] == "fast.example"
+        assert in_flight["peak"] == 2
+        assert set(dispatcher._pool_manager.pools) == {"webhook:https://slow.example", "webhook:https://fast.example"}
+
+    @pytest.mark.asyncio
+    async def test_busy_destination_cannot_fill_the_in_flight_slots(self):
+        finished = []
+
+        async def handler(request):
+            if request.url.host == "slow.example":
+                await asyncio.sleep(0.05)
+            finished.append(request.url.host)
+            return httpx.Response(200)
+
+        dispatcher = _dispatcher(handler, max_in_flight=4, max_per_destination=2)
+        # Older than the fast delivery, and more of them than the worker has slots
+        for n in range(10):
+            await dispatcher.outbox.enqueue(WebhookDelivery(url=f"https://slow.example/{n}", payload={},
+                                                            next_attempt_at=time.time() - 1))
+        await dispatcher.outbox.enqueue(WebhookDelivery(url="https://fast.example/cb", payload={}))
+        await dispatcher.start()
+
+        assert await dispatcher.drain(timeout=2)
+        await dispatcher.stop()
+        assert finished[0] == "fast.example" and finished.count("slow.example") == 10
+
+    def test_backoff_grows_exponentially_up_to_the_cap(self):
+        dispatcher = WebhookDispatcher(base_backoff_seconds=1, max_backoff_seconds=30)
+        for attempts, ceiling in ((1, 1), (2, 2), (4, 8), (10, 30)):
+            delay = dispatcher.backoff_seconds(attempts)
+            assert ceiling / 2 <= delay <= ceiling
+
+
+class TestRedisWebhookOutbox:
+    """Test suite for the durable outbox"""
+
+    @pytest.mark.asyncio
+    async def test_claims_are_exclusive_and_expired_leases_return(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        first = RedisWebhookOutbox(fakeredis.aioredis.FakeRedis(server=server), lease_seconds=10)
+        second = RedisWebhookOutbox(fakeredis.aioredis.FakeRedis(server=server), lease_seconds=10)
+
+        now = time.time()
+        await first.enqueue(WebhookDelivery(url="https://a.example/", payload={"n": 1}, next_attempt_at=now))
+        await first.enqueue(WebhookDelivery(url="https://a.example/", payload={"n": 2}, next_attempt_at=now + 60))
+
+        claimed = await first.claim(10, now)
+        assert [d.payload for d in claimed] == [{"n": 1}]
+        assert await second.claim(10, now) == []
+        assert await second.pending_count() == 2
+
+        # The first worker died: after the lease the delivery is claimable again
+        reclaimed = await second.claim(10, now + 11)
+        assert [d.payload for d in reclaimed] == [{"n": 1}]
+
+        reclaimed[0].attempts = 1
+        reclaimed[0].next_attempt_at = now + 30
+        await second.reschedule(reclaimed[0])
+        assert await second.next_due_at() == pytest.approx(now + 30)
+
+        # Only what accept() takes is claimed; the rest stays due
+        await first.enqueue(WebhookDelivery(url="https://b.example/", payload={"n": 3}, next_attempt_at=now))
+        claimed = await first.claim(10, now + 30, accept=lambda d: d.destination == "https://a.example")
+        assert [d.payload for d in claimed] == [{"n": 1}]
+        await first.reschedule(claimed[0])
+
+        retried = await second.claim(10, now + 30)
+        assert sorted(d.payload["n"] for d in retried) == [1, 3]
+        assert next(d for d in retried if d.payload == {"n": 1}).attempts == 1
+
+        # Renewing at POST time keeps a delivery that waited out its lease from being re-claimed
+        await second.renew(retried, now + 35)
+        assert await first.claim(10, now + 41) == []
+        for delivery in retried:
+            await second.dead_letter(delivery)
+        assert sorted(d.payload["n"] for d in await first.dead_letters()) == [1, 3]
+        assert await first.pending_count() == 1
+
+
+class TestSubscriptionCallbacks:
+    """Test suite for callback_url notifications"""
+
+    @pytest.mark.asyncio
+    async def test_publish_queues_instead_of_awaiting_http(self):
+        received = []
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            received.append(json.loads(request.content))
+            return httpx.Response(500 if request.url.path == "/failing" else 200)
+
+        dispatcher = _dispatcher(handler, max_attempts=1)
+        manager = MCPSubscriptionManager(webhook_dispatcher=dispatcher)
+        ok = await manager.create_subscription("ok", SubscriptionType.CUSTOM_EVENT,
+                                               callback_url="https://hooks.example/ok")
+        failing = await manager.create_subscription("failing", SubscriptionType.CUSTOM_EVENT,
+                                                    callback_url="https://hooks.example/failing")
+
+        event = NotificationEvent(event_type="updated", subscription_type=SubscriptionType.CUSTOM_EVENT, data={})
+        assert await asyncio.wait_for(manager.publish_event(event), 0.5) == 2
+        assert received == []
+
+        release.set()
+        assert await dispatcher.drain(timeout=2)
+        await manager.stop()
+        assert dispatcher._worker is not None and not dispatcher._worker.done()  # not the manager's to stop
+        assert dispatcher._result_hooks == []
+        await dispatcher.stop()
+
+        assert {body["subscription_id"] for body in received} == {ok.subscription_id, failing.subscription_id}
+        assert ok.error_count == 0 and failing.error_count == 1
+        assert manager.get_statistics()["webhooks"]["dead_lettered"] == 1
@@ -0,0 +1,183 @@
+"""
+Workflow Event Bus Test Suite
+Tests non-blocking publish with per-listener queues and workers
+"""
+
+import asyncio
+import time
+import pytest
+
+from ..core.workflow_event_bus import (
+    AuditLogListener, ListenerOverflowPolicy, WorkflowEvent, WorkflowEventBus, WorkflowEventType
+)
+
+
+class RecordingListener:
+    """Records handled events, optionally slowly or failing"""
+
+    def __init__(self, delay: float = 0.0, fail_on=None, release: asyncio.Event = None,
+                 overflow_policy: ListenerOverflowPolicy = ListenerOverflowPolicy.BLOCK):
+        self.overflow_policy = overflow_policy
+        self.delay = delay
+        self.fail_on = fail_on
+        self.release = release
+        self.handled = []
+
+    async def handle_event(self, event):
+        if self.release is not None:
+            await self.release.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if event.workflow_id == self.fail_on:
+            raise RuntimeError("listener failure")
+        self.handled.append(event.workflow_id)
+
+    def get_supported_events(self):
+        return list(WorkflowEventType)
+
+
+def _event(workflow_id, event_type=WorkflowEventType.PAYMENT_COMPLETED):
+    return WorkflowEvent(event_type=event_type, workflow_id=workflow_id)
+
+
+class TestWorkflowEventBus:
+    """Test suite for enqueue-and-return publishing"""
+
+    @pytest.mark.asyncio
+    async def test_publish_does_not_wait_for_slow_listener(self):
+        bus = WorkflowEventBus()
+        audit = RecordingListener(delay=0.2)
+        fast = RecordingListener()
+        bus.subscribe(WorkflowEventType.PAYMENT_COMPLETED, audit)
+        bus.subscribe(WorkflowEventType.PAYMENT_COMPLETED, fast)
+
+        started = time.perf_counter()
+        for n in range(5):
+            await bus.publish(_event(f"wf-{n}"))
+        assert time.perf_counter() - started < 0.05
+
+        await asyncio.sleep(0.05)
+        assert fast.handled == [f"wf-{n}" for n in range(5)]
+        assert len(audit.handled) < 5
+
+        await bus.stop()
+        assert audit.handled == fast.handled
+
+    @pytest.mark.asyncio
+    async def test_failing_listener_keeps_processing_and_is_counted(self):
+        bus = WorkflowEventBus()
+        listener = RecordingListener(fail_on="wf-1")
+        bus.subscribe(WorkflowEventType.PAYMENT_FAILED, listener)
+
+        for n in range(3):
+            await bus.publish(_event(f"wf-{n}", WorkflowEventType.PAYMENT_FAILED))
+        assert await bus.drain(timeout=1)
+
+        assert listener.handled == ["wf-0", "wf-2"]
+        metrics = bus.get_metrics()["listeners"][0]
+        assert metrics["processed"] == 2 and metrics["failed"] == 1
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_listener_queue_drops_oldest(self):
+        bus = WorkflowEventBus(listener_queue_size=3)
+        release = asyncio.Event()
+        listener = RecordingListener(release=release, overflow_policy=ListenerOverflowPolicy.DROP_OLDEST)
+        bus.subscribe(WorkflowEventType.MANDATE_CREATED, listener)
+
+        for n in range(6):
+            await bus.publish(_event(f"wf-{n}", WorkflowEventType.MANDATE_CREATED))
+            await asyncio.sleep(0)  # the worker takes wf-0 and blocks on release
+
+        metrics = bus.get_metrics()["listeners"][0]
+        assert metrics["depth"] == 3 and metrics["dropped"] == 2
+
+        release.set()
+        assert await bus.drain(timeout=1)
+        assert listener.handled == ["wf-0", "wf-3", "wf-4", "wf-5"]
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_listener_queue_blocks_publish_by_default(self):
+        """Backpressure: publish waits for room and nothing is lost"""
+        bus = WorkflowEventBus(listener_queue_size=2)
+        release = asyncio.Event()
+        listener = RecordingListener(release=release)
+        bus.subscribe(WorkflowEventType.MANDATE_CREATED, listener)
+
+        publishes = [asyncio.ensure_future(bus.publish(_event(f"wf-{n}", WorkflowEventType.MANDATE_CREATED)))
+                     for n in range(5)]
+        await asyncio.sleep(0.01)
+        assert sum(task.done() for task in publishes) == 3  # wf-0 taken by the worker, wf-1 and wf-2 queued
+
+        release.set()
+        await asyncio.gather(*publishes)
+        assert await bus.drain(timeout=1)
+        assert listener.handled == [f"wf-{n}" for n in range(5)]
+        assert bus.get_metrics()["listeners"][0]["dropped"] == 0
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_audit_listener_spills_instead_of_dropping(self):
+        class AuditLogger:
+            def __init__(self):
+                self.logged = []
+                self.release = asyncio.Event()
+
+            async def log_workflow_event(self, workflow_id, **kwargs):
+                await self.release.wait()
+                self.logged.append(workflow_id)
+
+        audit_logger = AuditLogger()
+        bus = WorkflowEventBus(listener_queue_size=2)
+        bus.subscribe(WorkflowEventType.PAYMENT_COMPLETED, AuditLogListener(audit_logger))
+
+        started = time.perf_counter()
+        for n in range(6):
+            await bus.publish(_event(f"wf-{n}"))
+        assert time.perf_counter() - started < 0.05
+
+        audit_logger.release.set()
+        assert await bus.drain(timeout=1)
+        assert audit_logger.logged == [f"wf-{n}" for n in range(6)]
+        metrics = bus.get_metrics()["listeners"][0]
+        assert metrics["dropped"] == 0 and metrics["spilled"] > 0
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_drain_waits_for_unsubscribed_listener(self):
+        bus = WorkflowEventBus()
+        listener = RecordingListener(delay=0.02)
+        bus.subscribe(WorkflowEventType.PAYMENT_COMPLETED, listener)
+        for n in range(3):
+            await bus.publish(_event(f"wf-{n}"))
+        bus.unsubscribe(WorkflowEventType.PAYMENT_COMPLETED, listener)
+
+        assert await bus.drain(timeout=1)
+        assert listener.handled == ["wf-0", "wf-1", "wf-2"]
+        await bus.stop()
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded_and_metrics_report_publish_latency(self):
+        bus = WorkflowEventBus(max_history_size=10)
+        for n in range(25):
+            await bus.publish(_event(f"wf-{n}"))
+
+        history = bus.get_event_history(limit=0)
+        assert [e.workflow_id for e in history] == [f"wf-{n}" for n in range(15, 25)]
+        metrics = bus.get_metrics()
+        assert metrics["published"] == 25 and metrics["history_size"] == 10
+        assert metrics["publish_latency_ms"]["max"] >= metrics["publish_latency_ms"]["avg"] > 0
+
+    @pytest.mark.asyncio
+    async def test_unsubscribed_listener_finishes_queued_events_then_stops(self):
+        bus = WorkflowEventBus()
+        listener = RecordingListener()
+        bus.subscribe(WorkflowEventType.PAYMENT_COMPLETED, listener)
+        await bus.publish(_event("wf-0"))
+        bus.unsubscribe(WorkflowEventType.PAYMENT_COMPLETED, listener)
+        await bus.publish(_event("wf-1"))
+
+        await asyncio.sleep(0.01)
+        assert listener.handled == ["wf-0"]
+        assert bus.get_metrics()["listeners"] == []
@@ -16,6 +16,11 @@ import os
 import re
 import logging
 
+try:
+    from backend.production.core.slot_inventory import get_availability_engine
+except ImportError:
+    from core.slot_inventory import get_availability_engine
+
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
@@ -38,6 +43,7 @@ app.add_middleware(
 BUSINESS_STORE = {}
 API_KEYS_STORE = {}
 BOOKINGS_STORE = {}  # Store bookings
+SLOT_INVENTORY = get_availability_engine().inventory  # Per (business, service, date) slot bitmaps
 AVAILABILITY_CACHE = {}  # Cache availability data
 
 # LLM Platform Registration Status (one-time BAIS platform registration)
@@ -509,38 +515,16 @@ async def check_availability(
 
 
 def generate_available_slots(business_id: str, service_id: str, date: str, preferred_time: Optional[str] = None) -> List[Dict[str, Any]]:
-    """Generate available time slots for a date"""
-    # Check existing bookings
-    existing_bookings = [
-        b for b in BOOKINGS_STORE.values()
-        if b["business_id"] == business_id
-        and b["service_id"] == service_id
-        and b["appointment_date"] == date
-        and b["status"] == "confirmed"
-    ]
-    
-    booked_times = {b["appointment_time"] for b in existing_bookings}
-    
-    # Standard business hours (9 AM to 5 PM)
-    available_slots = []
-    for hour in range(9, 17):
-        for minute in [0, 30]:  # Every 30 minutes
-            time_str = f"{hour:02d}:{minute:02d}"
-            if time_str not in booked_times:
-                available_slots.append({
-                    "time": time_str,
-                    "available": True
-                })
+    """Generate available time slots for a date (standard hours, every 30 minutes)"""
+    day_key = (business_id, service_id, date)
     
     # If preferred time is specified, check if it's available
     if preferred_time:
-        preferred_slot = next((s for s in available_slots if s["time"] == preferred_time), None)
-        if preferred_slot:
-            return [preferred_slot]
-        else:
-            return []  # Preferred time not available
+        if SLOT_INVENTORY.is_available(day_key, preferred_time):
+            return [{"time": preferred_time, "available": True}]
+        return []  # Preferred time not available
     
-    return available_slots
+    return [{"time": time_str, "available": True} for time_str in SLOT_INVENTORY.available_times(day_key)]
 
 
 def get_service_pricing(service: Dict[str, Any], date: str, time: Optional[str]) -> Dict[str, Any]:
@@ -586,20 +570,6 @@ async def create_booking(request: BookingRequest):
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    # Check availability
-    available_slots = generate_available_slots(
-        request.business_id,
-        request.service_id,
-        request.appointment_date,
-        request.appointment_time
-    )
-    
-    if not available_slots or request.appointment_time not in [s["time"] for s in available_slots]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Time slot {request.appointment_time} is not available on {request.appointment_date}"
-        )
-    
     # Calculate pricing
     pricing = get_service_pricing(service, request.appointment_date, request.appointment_time)
     total_amount = pricing["base_rate"]
@@ -614,8 +584,16 @@ async def create_booking(request: BookingRequest):
                     total_amount = param_def["pricing"][param_value]["base_rate"]
                     break
     
-    # Create booking
+    # Reserve the slot atomically; concurrent requests for it get exactly one winner
     booking_id = str(uuid.uuid4())
+    day_key = (request.business_id, request.service_id, request.appointment_date)
+    if not SLOT_INVENTORY.reserve(day_key, request.appointment_time, booking_id):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Time slot {request.appointment_time} is not available on {request.appointment_date}"
+        )
+    
+    # Create booking
     confirmation_code = f"BK{booking_id[:8].upper()}"
     
     booking = {